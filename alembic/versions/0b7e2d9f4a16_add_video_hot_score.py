@@ -0,0 +1,36 @@
+"""add video hot score
+
+Revision ID: 0b7e2d9f4a16
+Revises: f3c8a1d6e9b4
+Create Date: 2026-10-17 20:41:52.367105
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b7e2d9f4a16'
+down_revision: Union[str, Sequence[str], None] = 'f3c8a1d6e9b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('videos', sa.Column('hot_score', sa.Double(), server_default='0', nullable=False))
+    op.create_index('ix_videos_feed_hot', 'videos', ['is_public', 'is_deleted', 'status', 'hot_score', 'id'], unique=False)
+    # 评论数此前没有维护，先按评论表回填，再计算初始热度分（不含时间衰减，由定期任务重算）
+    op.execute("UPDATE videos SET comment_count = (SELECT COUNT(*) FROM comments WHERE comments.video_id = videos.id)")
+    op.execute(
+        "UPDATE videos SET hot_score = "
+        "COALESCE(like_count, 0) * 2 + COALESCE(comment_count, 0) + COALESCE(view_count, 0) / 10"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_videos_feed_hot', table_name='videos')
+    op.drop_column('videos', 'hot_score')
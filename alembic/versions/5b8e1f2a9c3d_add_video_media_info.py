@@ -0,0 +1,36 @@
+"""add video media info
+
+Revision ID: 5b8e1f2a9c3d
+Revises: 2c4ca0750aca
+Create Date: 2026-10-17 10:12:40.118203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b8e1f2a9c3d'
+down_revision: Union[str, Sequence[str], None] = '2c4ca0750aca'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('videos', sa.Column('fps', sa.Float(), nullable=True))
+    op.add_column('videos', sa.Column('width', sa.Integer(), nullable=True))
+    op.add_column('videos', sa.Column('height', sa.Integer(), nullable=True))
+    op.add_column('videos', sa.Column('codec', sa.String(length=32), nullable=True))
+    op.add_column('videos', sa.Column('bitrate', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('videos', 'bitrate')
+    op.drop_column('videos', 'codec')
+    op.drop_column('videos', 'height')
+    op.drop_column('videos', 'width')
+    op.drop_column('videos', 'fps')
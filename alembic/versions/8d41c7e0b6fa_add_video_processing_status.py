@@ -0,0 +1,33 @@
+"""add video processing status
+
+Revision ID: 8d41c7e0b6fa
+Revises: 5b8e1f2a9c3d
+Create Date: 2026-10-17 11:03:27.540912
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d41c7e0b6fa'
+down_revision: Union[str, Sequence[str], None] = '5b8e1f2a9c3d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 存量视频均视为已发布
+    op.add_column('videos', sa.Column('status', sa.Enum('PROCESSING', 'PUBLISHED', 'FAILED', name='videostatusenum'), server_default='PUBLISHED', nullable=False))
+    op.add_column('videos', sa.Column('processing_progress', sa.Integer(), nullable=True))
+    op.add_column('videos', sa.Column('processing_error', sa.String(length=255), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('videos', 'processing_error')
+    op.drop_column('videos', 'processing_progress')
+    op.drop_column('videos', 'status')
@@ -0,0 +1,29 @@
+"""add media blob thumbnails
+
+Revision ID: 9a4e6c1b2d57
+Revises: 0b7e2d9f4a16
+Create Date: 2026-10-18 10:12:08.413720
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4e6c1b2d57'
+down_revision: Union[str, Sequence[str], None] = '0b7e2d9f4a16'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 已有的缩略图由 python -m app.tasks.media_tasks thumbnails 检查存储后登记，登记前列表返回原图
+    op.add_column('media_blobs', sa.Column('thumbnails', sa.String(length=255), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('media_blobs', 'thumbnails')
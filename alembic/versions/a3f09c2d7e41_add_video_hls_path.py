@@ -0,0 +1,28 @@
+"""add video hls path
+
+Revision ID: a3f09c2d7e41
+Revises: 8d41c7e0b6fa
+Create Date: 2026-10-17 13:40:02.771530
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3f09c2d7e41'
+down_revision: Union[str, Sequence[str], None] = '8d41c7e0b6fa'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('videos', sa.Column('hls_path', sa.String(length=500), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('videos', 'hls_path')
@@ -0,0 +1,28 @@
+"""add video preview track
+
+Revision ID: e5d1a8c3f7b2
+Revises: c7b2e94f1d08
+Create Date: 2026-10-17 18:05:37.519264
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5d1a8c3f7b2'
+down_revision: Union[str, Sequence[str], None] = 'c7b2e94f1d08'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('videos', sa.Column('preview_track_path', sa.String(length=500), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('videos', 'preview_track_path')
@@ -0,0 +1,31 @@
+"""add video feed indexes
+
+Revision ID: f3c8a1d6e9b4
+Revises: e5d1a8c3f7b2
+Create Date: 2026-10-17 19:26:11.803417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3c8a1d6e9b4'
+down_revision: Union[str, Sequence[str], None] = 'e5d1a8c3f7b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_videos_feed_latest', 'videos', ['is_public', 'is_deleted', 'status', 'created_at', 'id'], unique=False)
+    op.create_index('ix_videos_feed_recommend', 'videos', ['is_public', 'is_deleted', 'status', 'view_count', 'created_at', 'id'], unique=False)
+    op.create_index('ix_videos_uploader_created', 'videos', ['uploader_id', 'is_deleted', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_videos_uploader_created', table_name='videos')
+    op.drop_index('ix_videos_feed_recommend', table_name='videos')
+    op.drop_index('ix_videos_feed_latest', table_name='videos')
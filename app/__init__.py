@@ -1,9 +1,10 @@
 from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
 
 from app.middlewares import *
 from app.api import api_router_v1
 from app.db.mongodb import connect_to_mongo, close_mongo_connection
+from app.storage import close_storage
+from app.utils.process_pool import shutdown_process_pool
 
 
 def create_app():
@@ -14,9 +15,10 @@ def create_app():
     # add_exception_handler(app)
     add_logging_middleware(app)
     add_test_mode_middleware(app)  # 测试模式中间件
+    # 媒体文件快速通道（Range/ETag/zero-copy），必须最后添加以位于最外层
+    add_media_middleware(app, prefix=f"{api_router_v1.prefix}/media")
     # 通过 api_router 注册所有子路由
     app.include_router(api_router_v1)
-    app.mount(f"{api_router_v1.prefix}/media", StaticFiles(directory="media"), name="media")
 
     # MongoDB连接生命周期
     @app.on_event("startup")
@@ -26,6 +28,8 @@ def create_app():
     @app.on_event("shutdown")
     async def shutdown_event():
         await close_mongo_connection()
+        shutdown_process_pool()
+        await close_storage()
 
     return app
 
@@ -1,9 +1,9 @@
+import os
 from fastapi import APIRouter, Depends, Query, Body
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from sqlalchemy.orm import joinedload
 from app.models.mysql.watch_history import WatchHistory
-from app.models.mysql.video import Video
+from app.crud.video.video import get_video_cards_by_ids
 
 from app.dependencies import get_db, get_current_user
 from app.schemas.http.response import ResponseSchema
@@ -13,6 +13,9 @@ from app.services.analytics.analytics import (
     get_video_analytics,
     log_video_view
 )
+from app.services.user.user_card import get_user_card_loader
+from app.storage import get_storage
+from app.storage.tiered import TieredStorage
 
 router = APIRouter()
 
@@ -51,13 +54,10 @@ async def get_watch_history_mysql(
     video_ids = [h.video_id for h in history_list]
     videos = {}
     if video_ids:
-        v_result = await db.execute(
-            select(Video)
-            .options(joinedload(Video.uploader))  # 预加载 uploader，防止异步懒加载报错
-            .where(Video.id.in_(video_ids))
-        )
-        for v in v_result.scalars().all():
+        for v in await get_video_cards_by_ids(db, video_ids):
             videos[v.id] = v
+    # 上传者只查卡片需要的列，一次加载
+    uploaders = await get_user_card_loader(db).load_many([v.uploader_id for v in videos.values()])
     items = []
     for h in history_list:
         v = videos.get(h.video_id)
@@ -69,7 +69,7 @@ async def get_watch_history_mysql(
                 'file_path': v.file_path,
                 'duration': v.duration,
                 'uploader_id': v.uploader_id,
-                'uploader_username': getattr(v.uploader, 'username', None) if hasattr(v, 'uploader') else None,
+                'uploader_username': uploaders.get(v.uploader_id, {}).get('username'),
                 'created_at': v.created_at,
                 'like_count': v.like_count,
                 'history_last_watch_at': h.last_watch_at,
@@ -144,4 +144,15 @@ async def delete_watch_history(
         return ResponseSchema.fail(msg="未找到观看历史记录")
     await db.delete(history)
     await db.commit()
-    return ResponseSchema.success(msg="已删除观看历史") 
\ No newline at end of file
+    return ResponseSchema.success(msg="已删除观看历史") 
+
+
+@router.get("/media/tiering", response_model=ResponseSchema)
+async def get_media_tiering_metrics(
+    current_user=Depends(get_current_user),
+):
+    """媒体分层存储的命中 / 回温 / 淘汰统计（当前 API 进程自启动以来的累计值）"""
+    storage = get_storage()
+    if not isinstance(storage, TieredStorage):
+        return ResponseSchema.success(data={"enabled": False})
+    return ResponseSchema.success(data={"enabled": True, "pid": os.getpid(), **storage.metrics.as_dict()})
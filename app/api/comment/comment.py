@@ -38,11 +38,12 @@ async def get_comments(
     size: int = Query(20, le=50, description="每页数量，最大不超过 50"),
     parent_id: int = Query(None, description="父评论ID，用于获取回复"),
     order: str = Query("latest", description="排序方式：latest(最新), hottest(最热)"),
+    with_total: bool = Query(True, description="是否返回总数（缓存的近似值），不需要时传 false"),
     db: AsyncSession = Depends(get_db),
 ):
     """获取视频评论列表"""
     try:
-        comments = await get_video_comment_list(db, video_id, page, size, parent_id, order)
+        comments = await get_video_comment_list(db, video_id, page, size, parent_id, order, with_total)
         return ResponseSchema.success(data=comments)
     except Exception as e:
         return ResponseSchema.fail(msg=f"获取评论失败: {str(e)}")
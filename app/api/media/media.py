@@ -0,0 +1,266 @@
+"""
+媒体文件服务端点（替代 StaticFiles 挂载）
+
+- 单区间 / 多区间 Range（multipart/byteranges）与 If-Range
+- 强 ETag、Last-Modified、If-None-Match / If-Modified-Since 304
+- uuid 命名的上传文件返回 immutable 长期缓存头
+- 文件通过存储后端查找：本地文件在服务器支持 ASGI zero-copy send 扩展时由服务器直接 sendfile，
+  否则按块 pread 并通过 posix_fadvise 提示内核顺序预读；对象存储按区间流式转发
+- 本地存储的预签名上传：PUT 带 expires/signature 查询参数，签名有效时把请求体流式写入对应 key
+"""
+
+import mimetypes
+import os
+import posixpath
+from urllib.parse import parse_qs
+from uuid import uuid4
+
+import anyio
+from starlette.types import Receive, Scope, Send
+
+from app.core.config import settings
+from app.storage.base import StorageBackend, StorageStat
+from app.storage.blob import QUARANTINE_DIR
+from app.utils.http_range import (
+    RangeNotSatisfiable,
+    http_date,
+    if_range_matches,
+    is_immutable_name,
+    is_not_modified,
+    parse_range_header,
+)
+
+ZERO_COPY_EXTENSION = "http.response.zerocopysend"
+
+mimetypes.add_type("application/vnd.apple.mpegurl", ".m3u8")
+mimetypes.add_type("video/mp2t", ".ts")
+mimetypes.add_type("image/webp", ".webp")
+mimetypes.add_type("text/vtt", ".vtt")
+
+
+def media_storage_key(media_path: str) -> str | None:
+    """将 URL 中媒体根目录下的相对路径转换为存储 key，拒绝越出根目录和隔离区的路径"""
+    normalized = posixpath.normpath("/" + media_path).lstrip("/")
+    if not normalized or normalized == ".":
+        return None
+    key = posixpath.join(settings.MEDIA_ROOT, normalized)
+    # 被清理任务隔离的文件（已删除视频等）不再对外提供
+    if key.startswith(QUARANTINE_DIR + "/"):
+        return None
+    return key
+
+
+class UploadRejected(Exception):
+    def __init__(self, status: int):
+        self.status = status
+
+
+class MediaFileEndpoint:
+    """
+    纯 ASGI 媒体文件端点，scope["media_path"] 为媒体根目录下的相对路径（由 MediaMiddleware 写入）。
+    """
+
+    def __init__(self, storage: StorageBackend, chunk_size: int | None = None, max_upload_bytes: int | None = None):
+        self.storage = storage
+        self.chunk_size = chunk_size or settings.MEDIA_READ_CHUNK_SIZE
+        # 预签名上传目前只用于视频直传
+        self.max_upload_bytes = max_upload_bytes or settings.VIDEO_MAX_SIZE_MB * 1024 * 1024
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        method = scope["method"]
+        if method == "PUT":
+            await self.receive_upload(scope, receive, send, media_storage_key(scope["media_path"]))
+            return
+        if method not in ("GET", "HEAD"):
+            await self._send_empty(send, 405, [(b"allow", b"GET, HEAD, PUT")])
+            return
+
+        key = media_storage_key(scope["media_path"])
+        stat_result = await self.storage.stat(key) if key else None
+        if stat_result is None:
+            await self._send_empty(send, 404)
+            return
+
+        await self.serve_file(scope, send, key, stat_result)
+
+    async def serve_file(self, scope: Scope, send: Send, key: str, stat_result: StorageStat) -> None:
+        headers = {k.decode("latin-1"): v.decode("latin-1") for k, v in scope["headers"]}
+        size = stat_result.size
+        etag = stat_result.etag
+        last_modified = http_date(stat_result.mtime)
+        content_type = mimetypes.guess_type(key)[0] or "application/octet-stream"
+
+        if is_immutable_name(posixpath.basename(key)):
+            cache_control = f"public, max-age={settings.MEDIA_IMMUTABLE_MAX_AGE}, immutable"
+        else:
+            cache_control = f"public, max-age={settings.MEDIA_CACHE_MAX_AGE}"
+
+        base_headers = [
+            (b"accept-ranges", b"bytes"),
+            (b"etag", etag.encode("latin-1")),
+            (b"last-modified", last_modified.encode("latin-1")),
+            (b"cache-control", cache_control.encode("latin-1")),
+        ]
+
+        if is_not_modified(headers, etag, stat_result.mtime):
+            await self._send_empty(send, 304, base_headers)
+            return
+
+        ranges = None
+        range_header = headers.get("range")
+        if range_header and if_range_matches(headers.get("if-range"), etag, last_modified):
+            try:
+                ranges = parse_range_header(range_header, size, settings.MEDIA_MAX_RANGES)
+            except RangeNotSatisfiable:
+                await self._send_empty(send, 416, base_headers + [(b"content-range", f"bytes */{size}".encode())])
+                return
+
+        send_body = scope["method"] == "GET"
+        if not ranges:
+            await self._send_start(send, 200, base_headers, content_type, size)
+            if send_body:
+                await self._send_ranges(scope, send, key, [(0, size - 1)] if size else [])
+            else:
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+        elif len(ranges) == 1:
+            start, end = ranges[0]
+            range_headers = base_headers + [(b"content-range", f"bytes {start}-{end}/{size}".encode())]
+            await self._send_start(send, 206, range_headers, content_type, end - start + 1)
+            if send_body:
+                await self._send_ranges(scope, send, key, ranges)
+            else:
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+        else:
+            await self._send_multipart(scope, send, key, ranges, size, content_type, base_headers, send_body)
+
+    async def receive_upload(self, scope: Scope, receive: Receive, send: Send, key: str | None) -> None:
+        """
+        预签名上传：校验签名后把请求体流式写入 key（写完整体可见），响应与对象存储的 PUT 一致。
+        超出大小上限时立即中断，不必等客户端传完。
+        """
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        expires = query.get("expires", [""])[0]
+        signature = query.get("signature", [""])[0]
+        if not key or not self.storage.verify_presigned(key, "PUT", expires, signature):
+            await self._send_empty(send, 403)
+            return
+
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length is not None:
+            if not content_length.isdigit():
+                await self._send_empty(send, 400)
+                return
+            if int(content_length) > self.max_upload_bytes:
+                await self._send_empty(send, 413)
+                return
+
+        async def body():
+            received = 0
+            while True:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    raise UploadRejected(499)
+                chunk = message.get("body", b"")
+                received += len(chunk)
+                if received > self.max_upload_bytes:
+                    raise UploadRejected(413)
+                if chunk:
+                    yield chunk
+                if not message.get("more_body", False):
+                    break
+
+        try:
+            stat_result = await self.storage.put_stream(key, body())
+        except UploadRejected as e:
+            if e.status != 499:
+                await self._send_empty(send, e.status)
+            return
+        await self._send_empty(send, 200, [(b"etag", stat_result.etag.encode("latin-1"))])
+
+    async def _send_multipart(self, scope, send, key, ranges, size, content_type, base_headers, send_body):
+        boundary = uuid4().hex
+        part_headers = [
+            f"--{boundary}\r\nContent-Type: {content_type}\r\nContent-Range: bytes {start}-{end}/{size}\r\n\r\n".encode("latin-1")
+            for start, end in ranges
+        ]
+        tail = f"\r\n--{boundary}--\r\n".encode("latin-1")
+        # 除第一段外，每段分隔符前都有一个 CRLF（紧跟上一段数据之后）
+        content_length = (
+            sum(len(h) for h in part_headers)
+            + sum(end - start + 1 for start, end in ranges)
+            + 2 * (len(ranges) - 1)
+            + len(tail)
+        )
+        await self._send_start(
+            send, 206, base_headers, f"multipart/byteranges; boundary={boundary}", content_length
+        )
+        if not send_body:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        for index, (start, end) in enumerate(ranges):
+            prefix = (b"\r\n" if index else b"") + part_headers[index]
+            await send({"type": "http.response.body", "body": prefix, "more_body": True})
+            await self._send_ranges(scope, send, key, [(start, end)], final=False)
+        await send({"type": "http.response.body", "body": tail, "more_body": False})
+
+    async def _send_ranges(self, scope, send, key, ranges, final: bool = True):
+        """依次发送文件中的各个区间；final=True 时最后发送 more_body=False 结束响应"""
+        full_path = self.storage.local_path(key)
+        if full_path is None:
+            for start, end in ranges:
+                async for chunk in self.storage.get_range(key, start, end):
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        else:
+            await self._send_local_ranges(scope, send, full_path, ranges)
+
+        if final:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+    async def _send_local_ranges(self, scope, send, full_path, ranges):
+        with open(full_path, "rb") as file:
+            fd = file.fileno()
+            zero_copy = ZERO_COPY_EXTENSION in scope.get("extensions", {})
+            for start, end in ranges:
+                length = end - start + 1
+                if zero_copy:
+                    # 服务器通过 os.sendfile 直接从页缓存写入 socket，数据不经过 Python
+                    await send({
+                        "type": ZERO_COPY_EXTENSION,
+                        "file": file,
+                        "offset": start,
+                        "count": length,
+                        "more_body": True,
+                    })
+                    continue
+
+                if hasattr(os, "posix_fadvise"):
+                    os.posix_fadvise(fd, start, length, os.POSIX_FADV_SEQUENTIAL)
+                    os.posix_fadvise(fd, start, min(length, settings.MEDIA_READAHEAD_BYTES), os.POSIX_FADV_WILLNEED)
+                offset = start
+                while offset <= end:
+                    chunk = await anyio.to_thread.run_sync(os.pread, fd, min(self.chunk_size, end - offset + 1), offset)
+                    if not chunk:
+                        break
+                    offset += len(chunk)
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+
+    @staticmethod
+    async def _send_start(send, status, headers, content_type, content_length):
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": headers + [
+                (b"content-type", content_type.encode("latin-1")),
+                (b"content-length", str(content_length).encode("latin-1")),
+            ],
+        })
+
+    @staticmethod
+    async def _send_empty(send, status, headers=None):
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": (headers or []) + [(b"content-length", b"0")],
+        })
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.dependencies import get_db, get_current_user
 from app.schemas.http.response import ResponseSchema
@@ -92,11 +92,12 @@ async def following_list(
     size: int = 20,
     search: str = '',
     order: str = 'desc',
+    with_total: bool = Query(True, description="是否返回总数（缓存的近似值），不需要时传 false"),
     db: AsyncSession = Depends(get_db),
     current_user=Depends(get_current_user)
 ):
     print(f"[DEBUG] /user/following_list user_id={user_id}")
-    data = await get_following_list_service(db, user_id, page, size, search, order, current_user.id)
+    data = await get_following_list_service(db, user_id, page, size, search, order, current_user.id, with_total)
     return ResponseSchema.success(data=data)
 
 @router.get('/fans_list', response_model=ResponseSchema)
@@ -105,11 +106,12 @@ async def fans_list(
     page: int = 1,
     size: int = 20,
     search: str = '',
+    with_total: bool = Query(True, description="是否返回总数（缓存的近似值），不需要时传 false"),
     db: AsyncSession = Depends(get_db),
     current_user=Depends(get_current_user)
 ):
     print(f"[DEBUG] /user/fans_list user_id={user_id}")
-    data = await get_fans_list_service(db, user_id, page, size, search, current_user.id)
+    data = await get_fans_list_service(db, user_id, page, size, search, current_user.id, with_total)
     return ResponseSchema.success(data=data)
 
 @router.post('/remove_follow', response_model=ResponseSchema)
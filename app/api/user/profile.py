@@ -14,6 +14,7 @@ from app.services.user.profile_service import (
 
 from app.schemas.user.auth import ChangePasswordRequest
 from app.services.user.profile_service import change_password
+from app.services.user.user_card import invalidate_user_card
 from fastapi import HTTPException
 from app.crud.user.user import get_user_by_id
 from app.services.video.video import get_my_video_list
@@ -117,6 +118,7 @@ async def update_profile(
     })
     if not updated_user:
         raise HTTPException(status_code=404, detail="用户不存在")
+    await invalidate_user_card(db, current_user.id)
 
     return ResponseSchema.success(data="资料更新成功！")
 
@@ -152,10 +154,14 @@ async def get_user_videos(
     user_id: int,
     page: int = Query(1, ge=1),
     size: int = Query(8, le=50),
+    cursor: str | None = Query(None, description="上一页返回的 next_cursor，传入时忽略 page"),
+    with_total: bool | None = Query(None, description="是否返回总数，默认页码分页返回、游标分页不返回"),
     db: AsyncSession = Depends(get_db),
 ):
     """
-    获取指定用户的作品列表
+    获取指定用户的作品列表（支持页码分页和游标分页）
     """
-    data = await get_my_video_list(db, user_id, page, size)
+    data = await get_my_video_list(
+        db, user_id, page, size, only_published=True, cursor=cursor, with_total=with_total
+    )
     return ResponseSchema.success(data=data)
@@ -1,47 +1,77 @@
 import os
-from fastapi import APIRouter, UploadFile, File, Form, Depends
+from typing import Optional
+from fastapi import APIRouter, UploadFile, File, Form, Depends, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.dependencies import get_db, get_current_user
 from app.schemas.http.response import ResponseSchema, BizCode
+from app.schemas.video import UploadInitRequest, DirectUploadInitRequest
 from app.services.video import save_user_video
+from app.services.video.upload_session import (
+    init_upload_session,
+    get_upload_session,
+    append_upload_chunk,
+    complete_upload_session,
+    abort_upload_session,
+)
+from app.services.video.direct_upload import init_direct_upload, complete_direct_upload
 from app.crud.video.video import count_user_videos
 from app.core.config import settings
 
 router = APIRouter()
 
 
+async def check_test_mode_video_limit(db: AsyncSession, user_id: int):
+    """
+    测试模式：检查用户视频数量限制，超限时返回错误响应，否则返回 None
+    """
+    is_test_mode = os.getenv("APP_ENV", "dev") == "test"
+    if is_test_mode:
+        max_videos = getattr(settings, "TEST_MODE_MAX_VIDEOS", 10)
+        current_video_count = await count_user_videos(db, user_id)
+        if current_video_count >= max_videos:
+            return ResponseSchema.error(
+                code=BizCode.PERMISSION_DENIED,
+                msg=f"测试模式：每个用户最多只能上传 {max_videos} 个视频，您当前已有 {current_video_count} 个视频",
+            )
+    return None
+
+
+def uploaded_video_payload(db_video) -> dict:
+    """上传接口的统一返回结构"""
+    return {
+        "url": db_video.file_path,
+        "video_id": db_video.id,
+        "status": db_video.status,
+        "progress": db_video.processing_progress,
+    }
+
+
 @router.post("/upload_video", response_model=ResponseSchema)
 async def upload_video(
     title: str = Form(..., description="视频标题，必填"),
     description: str = Form("", description="视频描述，可选"),
     video: UploadFile = File(..., description="上传的视频文件"),
-    cover: UploadFile = File(..., description="视频封面图"),
+    cover: Optional[UploadFile] = File(None, description="视频封面图，可选；不传或无效时自动从视频中挑选关键帧"),
     db: AsyncSession = Depends(get_db),
     current_user=Depends(get_current_user),
 ):
     """
     上传用户视频接口：
-    - 接收视频文件和封面图片
+    - 接收视频文件和封面图片（封面可选，不传或无效时由后台任务挑选最佳关键帧）
     - 校验、保存文件，生成唯一文件名
-    - 将视频元信息写入数据库
-    - 返回视频播放地址或资源路径
+    - 将视频记录写入数据库（status=processing），探测/转码/封面/发布由后台任务完成
+    - 返回视频ID、处理状态和资源路径
     
     测试模式限制：
     - 每个用户最多上传10个视频
     """
     # 测试模式：检查用户视频数量限制
-    is_test_mode = os.getenv("APP_ENV", "dev") == "test"
-    if is_test_mode:
-        max_videos = getattr(settings, "TEST_MODE_MAX_VIDEOS", 10)
-        current_video_count = await count_user_videos(db, current_user.id)
-        if current_video_count >= max_videos:
-            return ResponseSchema.error(
-                code=BizCode.PERMISSION_DENIED,
-                msg=f"测试模式：每个用户最多只能上传 {max_videos} 个视频，您当前已有 {current_video_count} 个视频",
-            )
-    
-    url = await save_user_video(
+    limit_error = await check_test_mode_video_limit(db, current_user.id)
+    if limit_error:
+        return limit_error
+
+    db_video = await save_user_video(
         db=db,
         video_file=video,
         cover_file=cover,
@@ -50,4 +80,116 @@ async def upload_video(
         description=description,
     )
 
-    return ResponseSchema.success(data={"url": url})
+    return ResponseSchema.success(data=uploaded_video_payload(db_video))
+
+
+@router.post("/upload_sessions", response_model=ResponseSchema)
+async def create_upload_session(
+    req: UploadInitRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+    """
+    分片断点续传 - 初始化：
+    - 校验声明的文件类型和总大小
+    - 在 MEDIA_ROOT/videos 下预分配最终文件，Redis 记录上传进度
+    - 返回 upload_id 和允许的分片大小
+    """
+    limit_error = await check_test_mode_video_limit(db, current_user.id)
+    if limit_error:
+        return limit_error
+
+    data = await init_upload_session(current_user.id, req)
+    return ResponseSchema.success(data=data)
+
+
+@router.get("/upload_sessions/{upload_id}", response_model=ResponseSchema)
+async def upload_session_status(
+    upload_id: str,
+    current_user=Depends(get_current_user),
+):
+    """
+    分片断点续传 - 查询进度：断线后客户端从返回的 offset 继续上传
+    """
+    data = await get_upload_session(current_user.id, upload_id)
+    return ResponseSchema.success(data=data)
+
+
+@router.put("/upload_sessions/{upload_id}", response_model=ResponseSchema)
+async def upload_chunk(
+    upload_id: str,
+    request: Request,
+    offset: int = Query(..., ge=0, description="本分片在文件中的起始偏移量"),
+    current_user=Depends(get_current_user),
+):
+    """
+    分片断点续传 - 上传分片：
+    - 请求体为原始二进制字节（application/octet-stream）
+    - offset 必须等于服务端已接收的字节数
+    - 字节直接写入最终文件位置
+    """
+    data = await append_upload_chunk(current_user.id, upload_id, offset, request.stream())
+    return ResponseSchema.success(data=data)
+
+
+@router.post("/upload_sessions/{upload_id}/complete", response_model=ResponseSchema)
+async def complete_upload(
+    upload_id: str,
+    cover: Optional[UploadFile] = File(None, description="视频封面图，可选；不传或无效时自动从视频中挑选关键帧"),
+    db: AsyncSession = Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+    """
+    分片断点续传 - 完成上传：
+    - 校验全部字节已到齐
+    - 保存封面（可选），写入视频记录并投递后台处理任务
+    """
+    db_video = await complete_upload_session(db, current_user.id, upload_id, cover)
+    return ResponseSchema.success(data=uploaded_video_payload(db_video))
+
+
+@router.delete("/upload_sessions/{upload_id}", response_model=ResponseSchema)
+async def cancel_upload(
+    upload_id: str,
+    current_user=Depends(get_current_user),
+):
+    """
+    分片断点续传 - 放弃上传：删除会话和已写入的部分文件
+    """
+    await abort_upload_session(current_user.id, upload_id)
+    return ResponseSchema.success(msg="上传已取消")
+
+
+@router.post("/direct_uploads", response_model=ResponseSchema)
+async def create_direct_upload(
+    req: DirectUploadInitRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+    """
+    预签名直传 - 初始化：
+    - 校验声明的文件类型、总大小，记录客户端计算的 sha256
+    - 返回短期有效的预签名上传地址，客户端把文件原始字节直接 PUT 到该地址（不经过本接口）
+    """
+    limit_error = await check_test_mode_video_limit(db, current_user.id)
+    if limit_error:
+        return limit_error
+
+    data = await init_direct_upload(current_user.id, req)
+    return ResponseSchema.success(data=data)
+
+
+@router.post("/direct_uploads/{upload_id}/complete", response_model=ResponseSchema)
+async def complete_direct(
+    upload_id: str,
+    cover: Optional[UploadFile] = File(None, description="视频封面图，可选；不传或无效时自动从视频中挑选关键帧"),
+    db: AsyncSession = Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+    """
+    预签名直传 - 完成上传：
+    - 校验已上传文件的大小、类型和 sha256 摘要
+    - 保存封面（可选），写入视频记录并投递后台处理任务
+    """
+    db_video = await complete_direct_upload(db, current_user.id, upload_id, cover)
+    return ResponseSchema.success(data=uploaded_video_payload(db_video))
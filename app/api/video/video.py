@@ -1,10 +1,11 @@
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.dependencies import get_db, get_current_user
-from app.schemas.http.response import ResponseSchema
+from app.dependencies import get_db, get_current_user, get_optional_current_user
+from app.schemas.http.response import ResponseSchema, BizCode
 from app.services import get_my_video_list, get_recommended_videos
 from app.services.video.video import get_video_detail, get_latest_videos, get_hot_videos
+from app.services.video.search import search_videos
 
 router = APIRouter()
 
@@ -12,15 +13,17 @@ router = APIRouter()
 async def my_list(
     page: int = Query(1, ge=1, description="分页页码，从 1 开始"),
     size: int = Query(20, le=50, description="每页数量，最大不超过 50"),
+    cursor: str | None = Query(None, description="上一页返回的 next_cursor，传入时忽略 page"),
+    with_total: bool | None = Query(None, description="是否返回总数，默认页码分页返回、游标分页不返回"),
     db: AsyncSession = Depends(get_db),
     current_user=Depends(get_current_user),
 ):
     """
     获取当前登录用户的视频列表
-    - 支持分页查询
+    - 支持页码分页和游标分页（next_cursor）
     - 返回用户本人上传的视频记录（不含逻辑删除/违规下架等）
     """
-    data = await get_my_video_list(db, current_user.id, page, size)
+    data = await get_my_video_list(db, current_user.id, page, size, cursor=cursor, with_total=with_total)
     return ResponseSchema.success(data=data)
 
 
@@ -28,15 +31,38 @@ async def my_list(
 async def recommend_videos(
     page: int = Query(1, ge=1, description="分页页码，从 1 开始"),
     size: int = Query(20, le=50, description="每页数量，最大不超过 50"),
+    cursor: str | None = Query(None, description="上一页返回的 next_cursor，传入时忽略 page"),
+    with_total: bool | None = Query(None, description="是否返回总数，默认页码分页返回、游标分页不返回"),
     db: AsyncSession = Depends(get_db),
+    current_user=Depends(get_optional_current_user),
 ):
     """
     获取推荐视频列表
     - 可作为首页 feed 使用
     - 当前实现为简单推荐（后续可对接推荐系统）
-    - 支持分页
+    - 支持页码分页和游标分页（next_cursor），深翻页使用游标
+    - 登录用户游标翻页时不返回已看过的视频
     """
-    data = await get_recommended_videos(db, page=page, size=size)
+    data = await get_recommended_videos(
+        db, page=page, size=size, cursor=cursor, with_total=with_total, user_id=getattr(current_user, 'id', None)
+    )
+    return ResponseSchema.success(data=data)
+
+
+@router.get("/recommend/personal", response_model=ResponseSchema)
+async def personal_recommend_videos(
+    page: int = Query(1, ge=1, description="分页页码，从 1 开始"),
+    size: int = Query(20, le=50, description="每页数量，最大不超过 50"),
+    db: AsyncSession = Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+    """
+    获取个性化推荐视频列表
+    - 根据当前用户最近的点赞、收藏、观看记录，按相似视频打分排序
+    - 没有互动记录或推荐数据未构建时返回普通推荐列表（personalized=false）
+    """
+    from app.services.video.recommend import get_personal_recommendations
+    data = await get_personal_recommendations(db, current_user.id, page, size)
     return ResponseSchema.success(data=data)
 
 
@@ -59,10 +85,15 @@ async def video_detail(
 async def latest_videos(
     page: int = Query(1, ge=1, description="分页页码，从 1 开始"),
     size: int = Query(20, le=50, description="每页数量，最大不超过 50"),
+    cursor: str | None = Query(None, description="上一页返回的 next_cursor，传入时忽略 page"),
+    with_total: bool | None = Query(None, description="是否返回总数，默认页码分页返回、游标分页不返回"),
     db: AsyncSession = Depends(get_db),
+    current_user=Depends(get_optional_current_user),
 ):
-    """获取最新视频列表"""
-    data = await get_latest_videos(db, page, size)
+    """获取最新视频列表（登录用户游标翻页时不返回已看过的视频）"""
+    data = await get_latest_videos(
+        db, page, size, cursor=cursor, with_total=with_total, user_id=getattr(current_user, 'id', None)
+    )
     return ResponseSchema.success(data=data)
 
 
@@ -70,10 +101,15 @@ async def latest_videos(
 async def hot_videos(
     page: int = Query(1, ge=1, description="分页页码，从 1 开始"),
     size: int = Query(20, le=50, description="每页数量，最大不超过 50"),
+    cursor: str | None = Query(None, description="上一页返回的 next_cursor，传入时忽略 page"),
+    with_total: bool | None = Query(None, description="是否返回总数，默认页码分页返回、游标分页不返回"),
     db: AsyncSession = Depends(get_db),
+    current_user=Depends(get_optional_current_user),
 ):
-    """获取热门视频列表"""
-    data = await get_hot_videos(db, page, size)
+    """获取热门视频列表（登录用户游标翻页时不返回已看过的视频）"""
+    data = await get_hot_videos(
+        db, page, size, cursor=cursor, with_total=with_total, user_id=getattr(current_user, 'id', None)
+    )
     return ResponseSchema.success(data=data)
 
 
@@ -81,16 +117,52 @@ async def hot_videos(
 async def following_feed(
     page: int = Query(1, ge=1, description="分页页码，从 1 开始"),
     size: int = Query(20, le=50, description="每页数量，最大不超过 50"),
+    cursor: str | None = Query(None, description="上一页返回的 next_cursor，传入后忽略 page"),
     db: AsyncSession = Depends(get_db),
     current_user=Depends(get_current_user),
 ):
     """
-    获取我关注的用户的视频流
+    获取我关注的用户的视频流（按发布时间倒序，total 固定为 null，翻页使用 next_cursor）
     """
     from app.services.video.video import get_following_feed_videos
-    data = await get_following_feed_videos(db, current_user.id, page, size)
+    data = await get_following_feed_videos(db, current_user.id, page, size, cursor=cursor)
+    return ResponseSchema.success(data=data)
+
+
+@router.get("/search", response_model=ResponseSchema)
+async def search_videos_api(
+    q: str = Query(..., min_length=1, max_length=100, description="搜索关键词，匹配标题和描述"),
+    page: int = Query(1, ge=1, description="分页页码，从 1 开始"),
+    size: int = Query(20, le=50, description="每页数量，最大不超过 50"),
+    db: AsyncSession = Depends(get_db),
+    current_user=Depends(get_optional_current_user),
+):
+    """
+    搜索视频
+    - 中文按相邻两字匹配，英文、数字按单词匹配，按相关度（BM25）排序
+    - 登录用户记录搜索历史
+    """
+    data = await search_videos(db, q, page, size, user_id=getattr(current_user, 'id', None))
+    return ResponseSchema.success(data=data)
+
+@router.get("/{video_id}/processing", response_model=ResponseSchema)
+async def video_processing_status(
+    video_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+    """
+    查询视频后台处理进度（探测、转码、封面、发布）
+    - 仅上传者本人可查询
+    """
+    from app.services.video.video import get_video_processing_status
+
+    data = await get_video_processing_status(db, video_id, current_user.id)
+    if not data:
+        return ResponseSchema.fail(code=BizCode.NOT_FOUND, msg="视频不存在")
     return ResponseSchema.success(data=data)
 
+
 @router.delete("/{video_id}", response_model=ResponseSchema)
 async def delete_video(
     video_id: int,
@@ -65,6 +65,131 @@ class Settings(BaseSettings):
     # ========= Media =========
     MEDIA_ROOT: str
     MEDIA_URL: str
+    MEDIA_CACHE_MAX_AGE: int = Field(default=3600, description="普通媒体文件（默认头像、播放列表等）的缓存时间（秒）")
+    MEDIA_IMMUTABLE_MAX_AGE: int = Field(default=365 * 24 * 3600, description="uuid 命名的上传文件的强缓存时间（秒）")
+    MEDIA_READ_CHUNK_SIZE: int = Field(default=512 * 1024, description="非 zero-copy 模式下每次读取发送的字节数")
+    MEDIA_READAHEAD_BYTES: int = Field(default=4 * 1024 * 1024, description="Range 请求时提示内核预读的字节数")
+    MEDIA_MAX_RANGES: int = Field(default=16, description="单个请求允许的最大 Range 区间数，超出则返回完整文件")
+
+    # ========= Storage =========
+    STORAGE_BACKEND: str = Field(default="local", description="媒体存储后端：local（本地磁盘）/ s3（S3 兼容对象存储）")
+    MEDIA_PUBLIC_BASE_URL: str = Field(default="/api/v1", description="本地存储文件对外访问前缀（拼接相对路径即为媒体端点地址）")
+    S3_ENDPOINT_URL: str = Field(default="", description="S3 服务地址，MinIO 等自建服务填写如 http://127.0.0.1:9000，AWS 留空")
+    S3_REGION: str = Field(default="us-east-1", description="S3 区域")
+    S3_BUCKET: str = Field(default="", description="存放媒体文件的 bucket")
+    S3_ACCESS_KEY: str = Field(default="", description="S3 Access Key")
+    S3_SECRET_KEY: str = Field(default="", description="S3 Secret Key")
+    S3_MULTIPART_PART_SIZE: int = Field(default=8 * 1024 * 1024, description="分片上传每片大小（字节，最小 5MB）")
+    S3_MULTIPART_CONCURRENCY: int = Field(default=4, description="分片上传时同时在途的分片数")
+
+    # ========= Media Tiering =========
+    MEDIA_ARCHIVE_BACKEND: str = Field(default="", description="冷数据归档层：留空不分层 / local（MEDIA_ARCHIVE_DIR 目录）/ s3（MEDIA_ARCHIVE_S3_BUCKET）")
+    MEDIA_ARCHIVE_DIR: str = Field(default="", description="本地归档目录的绝对路径（建议挂载更便宜的大容量磁盘），其下保持与 MEDIA_ROOT 相同的结构")
+    MEDIA_ARCHIVE_S3_BUCKET: str = Field(default="", description="归档用的 bucket（可配置低频/归档存储类型）")
+    MEDIA_WARM_CACHE_DIR: str = Field(default="", description="回温缓存目录，留空使用项目根目录下的 media_warm")
+    MEDIA_WARM_CACHE_MAX_BYTES: int = Field(default=2 * 1024 * 1024 * 1024, description="回温缓存容量上限（字节），超出后按最近访问时间淘汰")
+    MEDIA_TIER_COLD_MAX_VIEWS: int = Field(default=100, description="累计观看数不超过该值的视频才会被归档")
+    MEDIA_TIER_IDLE_DAYS: int = Field(default=30, description="最近多少天内没有观看记录（MongoDB video_views）才视为冷视频")
+    MEDIA_TIER_MIN_AGE_DAYS: int = Field(default=30, description="发布超过多少天的视频才参与归档")
+    MEDIA_TIER_MOVE_RATE: float = Field(default=10, description="分层任务每秒最多移动的文件数，<=0 不限速")
+    MEDIA_TIER_INTERVAL_SECONDS: int = Field(default=24 * 3600, description="celery beat 定期执行分层任务的间隔（秒）")
+
+    # ========= Upload =========
+    VIDEO_MAX_SIZE_MB: int = Field(default=100, description="单个视频文件大小上限（MB）")
+    UPLOAD_CHUNK_MAX_SIZE: int = Field(default=8 * 1024 * 1024, description="分片上传单个分片的最大字节数")
+    UPLOAD_SESSION_EXPIRE_SECONDS: int = Field(default=24 * 3600, description="分片上传会话在 Redis 中的过期时间（秒）")
+    DIRECT_UPLOAD_EXPIRE_SECONDS: int = Field(default=3600, description="预签名直传地址及其上传会话的有效期（秒）")
+
+    # ========= Media Processing =========
+    MEDIA_PROCESS_WORKERS: int = Field(default=2, description="媒体处理进程池的工作进程数")
+    MEDIA_PROBE_CONCURRENCY: int = Field(default=4, description="同时进行的媒体探测任务上限（含排队）")
+    MEDIA_PROBE_TIMEOUT: float = Field(default=30.0, description="单次媒体探测超时时间（秒），超时后使用兜底信息")
+
+    # ========= Thumbnail =========
+    THUMBNAIL_FORMAT: str = Field(default="webp", description="封面/头像缩略图格式：webp / jpeg")
+    THUMBNAIL_QUALITY: int = Field(default=80, description="缩略图压缩质量")
+    THUMBNAIL_TIMEOUT: float = Field(default=30.0, description="单张图片生成缩略图的超时时间（秒）")
+    COVER_THUMB_WIDTHS: str = Field(default="320,640", description="封面缩略图宽度档位，逗号分隔；列表取最小档，详情取最大档")
+    AVATAR_THUMB_WIDTHS: str = Field(default="64,160", description="头像缩略图边长档位（正方形），逗号分隔")
+    THUMBNAIL_BACKFILL_INTERVAL_SECONDS: int = Field(default=24 * 3600, description="celery beat 定期补齐缺少的缩略图的间隔（秒），调整档位或格式后也可手动执行")
+
+    # ========= Celery =========
+    CELERY_BROKER_URL: str = Field(default="", description="Celery broker 地址，留空则使用本地 Redis")
+    CELERY_RESULT_BACKEND: str = Field(default="", description="Celery 结果存储地址，留空则使用本地 Redis")
+    CELERY_TASK_ALWAYS_EAGER: bool = Field(default=False, description="是否在当前进程同步执行任务（单元测试用）")
+    FFMPEG_BIN: str = Field(default="ffmpeg", description="ffmpeg 可执行文件路径，用于转码")
+    HLS_ENABLED: bool = Field(default=True, description="是否为上传的视频生成 HLS 自适应码率播放列表")
+    HLS_SEGMENT_SECONDS: int = Field(default=6, description="HLS 分片时长（秒）")
+    COVER_SAMPLE_FRAMES: int = Field(default=24, description="未提供有效封面时，自动选封面均匀采样的候选帧数")
+    SPRITE_ENABLED: bool = Field(default=True, description="是否生成拖动预览雪碧图和 WebVTT 缩略图轨道")
+    SPRITE_INTERVAL_SECONDS: float = Field(default=5.0, description="拖动预览截帧间隔（秒），超长视频会自动放大间隔")
+    SPRITE_MAX_TILES: int = Field(default=500, description="单个视频最多截取的预览帧数")
+    SPRITE_TILE_WIDTH: int = Field(default=160, description="预览缩略图宽度（像素），高度按宽高比计算")
+    SPRITE_COLUMNS: int = Field(default=10, description="每张雪碧图的列数")
+    SPRITE_ROWS: int = Field(default=10, description="每张雪碧图的行数")
+    SPRITE_FORMAT: str = Field(default="webp", description="雪碧图格式：webp / jpeg")
+    SPRITE_QUALITY: int = Field(default=70, description="雪碧图压缩质量")
+    SPRITE_WORKERS: int = Field(default=2, description="并行生成雪碧图的线程数")
+
+    # ========= Media GC =========
+    MEDIA_GC_GRACE_SECONDS: int = Field(default=2 * 24 * 3600, description="未被引用的文件至少保留多久才回收（秒），不小于上传会话有效期")
+    MEDIA_GC_MODE: str = Field(default="quarantine", description="孤儿文件处理方式：quarantine（移入隔离区）/ delete（直接删除）")
+    MEDIA_GC_QUARANTINE_DAYS: int = Field(default=7, description="隔离区文件保留天数，过期后彻底删除")
+    MEDIA_GC_BATCH_SIZE: int = Field(default=1000, description="按主键分批扫描数据库时每批的行数")
+    MEDIA_GC_SCAN_RATE: float = Field(default=2000, description="每秒最多检查的文件数，<=0 不限速")
+    MEDIA_GC_DELETE_RATE: float = Field(default=50, description="每秒最多隔离/删除的文件数，<=0 不限速")
+    MEDIA_GC_INTERVAL_SECONDS: int = Field(default=6 * 3600, description="celery beat 定期执行清理任务的间隔（秒）")
+
+    # ========= Feed =========
+    FEED_CACHE_ENABLED: bool = Field(default=True, description="热门 / 最新 / 推荐列表是否走 Redis 有序集合索引，关闭或 Redis 不可用时直接查询 MySQL")
+    FEED_INDEX_REBUILD_SECONDS: int = Field(default=3600, description="列表索引的最长使用时间（秒），过期后下一次请求投递后台任务从 MySQL 重建，兜底增量更新遗漏")
+    FEED_CARD_TTL_SECONDS: int = Field(default=600, description="视频卡片缓存的过期时间（秒）")
+    COUNT_CACHE_TTL_SECONDS: int = Field(default=60, description="列表总数（COUNT）缓存的过期时间（秒），<=0 不缓存")
+    TIMELINE_MAX_ITEMS: int = Field(default=800, description="每个用户关注时间线保留的视频数，更早的视频回退到 MySQL 查询")
+    TIMELINE_FANOUT_MAX_FOLLOWERS: int = Field(default=5000, description="粉丝数超过该值的创作者发布视频时不写入粉丝时间线，改为读取时拉取")
+    TIMELINE_TTL_SECONDS: int = Field(default=7 * 24 * 3600, description="时间线的过期时间（秒），用户长期不读取时释放内存")
+    TIMELINE_FANOUT_BATCH_SIZE: int = Field(default=1000, description="写扩散时每批处理的粉丝数")
+    HOT_SCORE_HALF_LIFE_HOURS: float = Field(default=0, description="热度分随发布时间衰减的半衰期（小时），<=0 不衰减")
+    HOT_SCORE_RECOMPUTE_BATCH_SIZE: int = Field(default=1000, description="定期重算热度分时每批更新的行数")
+    HOT_SCORE_RECOMPUTE_INTERVAL_SECONDS: int = Field(default=3600, description="celery beat 定期重算热度分的间隔（秒），开启衰减时应小于半衰期")
+
+    # ========= Recommend =========
+    RECOMMEND_NEIGHBORS: int = Field(default=50, description="每个视频保存的相似视频数")
+    RECOMMEND_SHRINKAGE: float = Field(default=10.0, description="相似度收缩系数，共现用户数少的视频对相似度向 0 收缩")
+    RECOMMEND_LOOKBACK_DAYS: int = Field(default=180, description="构建相似度时使用最近多少天的点赞、收藏、观看记录")
+    RECOMMEND_HISTORY_ITEMS: int = Field(default=50, description="个性化推荐时每类互动取用户最近的多少条记录")
+    RECOMMEND_MAX_CANDIDATES: int = Field(default=500, description="个性化推荐最多返回的候选视频数（可翻页的范围）")
+    RECOMMEND_NEIGHBOR_TTL_SECONDS: int = Field(default=3 * 24 * 3600, description="相似视频列表的过期时间（秒），应大于全量重建间隔")
+    RECOMMEND_FULL_REBUILD_INTERVAL_SECONDS: int = Field(default=24 * 3600, description="celery beat 全量重建相似视频的间隔（秒）")
+    RECOMMEND_INCREMENTAL_INTERVAL_SECONDS: int = Field(default=900, description="celery beat 增量更新相似视频的间隔（秒），只重算期间有新互动的视频")
+
+    # ========= Trending =========
+    TRENDING_HALF_LIFE_HOURS: float = Field(default=24, description="观看趋势分数的半衰期（小时），越早的观看权重越低")
+    TRENDING_MAX_DAYS: int = Field(default=30, description="观看计数保留的天数，也是热门视频统计可选的最大天数")
+    TRENDING_TOP_N: int = Field(default=50, description="每个统计窗口发布到 Redis 的热门视频数")
+    TRENDING_INTERVAL_SECONDS: int = Field(default=300, description="celery beat 重新计算热门视频的间隔（秒）")
+
+    # ========= Seen Filter =========
+    SEEN_FILTER_ENABLED: bool = Field(default=True, description="推荐 / 热门 / 最新列表是否过滤登录用户已看过的视频")
+    SEEN_FILTER_CAPACITY: int = Field(default=2000, description="每个用户布隆过滤器的容量（视频数），超过后由定期任务按最近观看记录重建；修改容量或误判率后已有过滤器失效，需重建")
+    SEEN_FILTER_ERROR_RATE: float = Field(default=0.01, description="布隆过滤器的误判率（未看过的视频被当作已看过）")
+    SEEN_FILTER_TTL_SECONDS: int = Field(default=30 * 24 * 3600, description="过滤器的过期时间（秒），用户长期不活跃时释放内存")
+    SEEN_FILTER_MAX_ROUNDS: int = Field(default=3, description="过滤后不满一页时最多补取的次数（含第一次）")
+    SEEN_FILTER_REBUILD_INTERVAL_SECONDS: int = Field(default=3600, description="celery beat 重建已满过滤器的间隔（秒）")
+
+    # ========= Search =========
+    SEARCH_INDEX_DIR: str = Field(default="", description="搜索索引（倒排表 .npy 文件）的目录，留空使用项目根目录下的 search_index；构建任务与 API 进程需能访问同一目录")
+    SEARCH_TITLE_WEIGHT: int = Field(default=3, description="标题中词项的词频权重（描述为 1）")
+    SEARCH_DESCRIPTION_CHARS: int = Field(default=200, description="描述参与索引的前若干字")
+    SEARCH_BM25_K1: float = Field(default=1.2, description="BM25 词频饱和参数 k1")
+    SEARCH_BM25_B: float = Field(default=0.75, description="BM25 文档长度归一化参数 b")
+    SEARCH_MAX_RESULTS: int = Field(default=1000, description="每次搜索最多可翻页的结果数")
+    SEARCH_SYNC_INTERVAL_SECONDS: float = Field(default=2.0, description="API 进程检查索引新版本和视频变更的最短间隔（秒）")
+    SEARCH_REBUILD_INTERVAL_SECONDS: int = Field(default=24 * 3600, description="celery beat 全量重建搜索索引的间隔（秒），重建时合并增量并清理变更记录")
+    SEARCH_HISTORY_SIZE: int = Field(default=20, description="每个用户保留的搜索历史条数")
+
+    # ========= User Card =========
+    USER_CARD_TTL_SECONDS: int = Field(default=3600, description="用户卡片（ID、用户名、unique_id、头像）缓存的过期时间（秒），修改用户名或头像时立即删除")
 
     # ========= Log =========
     LOG_LEVEL: str
@@ -157,6 +282,26 @@ class Settings(BaseSettings):
             return f"redis://:{self.REDIS_PASSWORD}@{self.REDIS_HOST}:{self.REDIS_PORT}/0"
         return f"redis://{self.REDIS_HOST}:{self.REDIS_PORT}/0"
 
+    @property
+    def CELERY_BROKER(self) -> str:
+        return self.CELERY_BROKER_URL or self.redis_url_for_db(1)
+
+    @property
+    def CELERY_BACKEND(self) -> str:
+        return self.CELERY_RESULT_BACKEND or self.redis_url_for_db(2)
+
+    def redis_url_for_db(self, db: int) -> str:
+        """同一 Redis 实例的其他逻辑库，避免 Celery 数据与业务缓存混在 db0"""
+        return f"{self.REDIS_URL.rsplit('/', 1)[0]}/{db}"
+
+    @property
+    def cover_thumb_widths(self) -> list[int]:
+        return sorted(int(w) for w in self.COVER_THUMB_WIDTHS.split(",") if w.strip())
+
+    @property
+    def avatar_thumb_widths(self) -> list[int]:
+        return sorted(int(w) for w in self.AVATAR_THUMB_WIDTHS.split(",") if w.strip())
+
     @property
     def media_root_abs(self) -> str:
         """媒体文件根目录的绝对路径"""
@@ -164,6 +309,16 @@ class Settings(BaseSettings):
         project_root = os.path.abspath(os.path.join(base_dir, ".."))
         return os.path.join(project_root, self.MEDIA_ROOT)
     
+    @property
+    def media_warm_cache_dir(self) -> str:
+        """回温缓存目录的绝对路径"""
+        return self.MEDIA_WARM_CACHE_DIR or os.path.join(self.media_root_parent, "media_warm")
+
+    @property
+    def search_index_dir(self) -> str:
+        """搜索索引目录的绝对路径"""
+        return self.SEARCH_INDEX_DIR or os.path.join(self.media_root_parent, "search_index")
+
     @property
     def media_root_parent(self) -> str:
         """媒体文件根目录的绝对路径（别名，保持向后兼容）"""
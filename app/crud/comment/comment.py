@@ -1,11 +1,14 @@
 from typing import List, Optional, Tuple
 from sqlalchemy import select, func, desc
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload
-from sqlalchemy import select, func, desc, delete
+from sqlalchemy import select, func, desc, delete, update
 
 from app.models.mysql.comment import Comment
 from app.models.mysql.comment_interaction import CommentInteraction
+from app.models.mysql.video import Video
+from app.crud.video.video import refresh_video_hot_score
+from app.crud.count_cache import cached_count, invalidate_counts
+from app.models.redis.count import comment_count_key
 from app.schemas.comment.comment import CommentCreate
 
 
@@ -20,18 +23,36 @@ async def create_comment(db: AsyncSession, comment_data: CommentCreate, user_id:
     db.add(db_comment)
     await db.commit()
     await db.refresh(db_comment)
+
+    # 更新视频评论数
+    await update_video_comment_count(db, db_comment.video_id)
+    await invalidate_counts(comment_count_key(db_comment.video_id, db_comment.parent_id))
     return db_comment
 
 
+async def update_video_comment_count(db: AsyncSession, video_id: int) -> None:
+    """更新视频评论数（含回复）及热度分"""
+    comment_count = await db.scalar(
+        select(func.count(Comment.id)).where(Comment.video_id == video_id)
+    )
+    await db.execute(
+        update(Video).where(Video.id == video_id).values(comment_count=comment_count or 0)
+        .execution_options(synchronize_session=False)
+    )
+    await refresh_video_hot_score(db, video_id)
+    await db.commit()
+
+
 async def get_video_comments(
     db: AsyncSession, 
     video_id: int, 
     skip: int = 0, 
     limit: int = 20,
     parent_id: Optional[int] = None,
-    order: str = "latest"
-) -> Tuple[int, List[Comment]]:
-    """获取视频评论列表"""
+    order: str = "latest",
+    with_total: bool = True,
+) -> Tuple[Optional[int], List[Comment]]:
+    """获取视频评论列表（with_total=False 时不统计总数，返回 None）"""
     # 查询条件
     where_conditions = [Comment.video_id == video_id]
     if parent_id is not None:
@@ -39,16 +60,17 @@ async def get_video_comments(
     else:
         where_conditions.append(Comment.parent_id.is_(None))  # 只查询一级评论
     
-    # 查询总数
-    total_stmt = select(func.count(Comment.id)).where(*where_conditions)
-    total = await db.scalar(total_stmt)
+    # 查询总数（短时间缓存）
+    total = None
+    if with_total:
+        total_stmt = select(func.count(Comment.id)).where(*where_conditions)
+        total = await cached_count(db, comment_count_key(video_id, parent_id), total_stmt)
     
-    # 查询评论列表，预加载用户信息
+    # 查询评论列表（评论者卡片由 get_user_card_loader 批量加载）
     if order == "hottest":
         # 按热度排序（点赞数）
         stmt = (
             select(Comment)
-            .options(joinedload(Comment.user))
             .where(*where_conditions)
             .order_by(desc(Comment.like_count), desc(Comment.created_at))
             .offset(skip)
@@ -58,14 +80,13 @@ async def get_video_comments(
         # 按最新排序（默认）
         stmt = (
             select(Comment)
-            .options(joinedload(Comment.user))
             .where(*where_conditions)
             .order_by(desc(Comment.created_at))
             .offset(skip)
             .limit(limit)
         )
     result = await db.execute(stmt)
-    comments = result.scalars().unique().all()
+    comments = result.scalars().all()
     
     return total, comments
 
@@ -100,7 +121,7 @@ async def get_comment_reply_count(db: AsyncSession, comment_id: int) -> int:
 async def get_comment_by_id(db: AsyncSession, comment_id: int) -> Optional[Comment]:
     """根据ID获取评论"""
     result = await db.execute(
-        select(Comment).options(joinedload(Comment.user)).where(Comment.id == comment_id)
+        select(Comment).where(Comment.id == comment_id)
     )
     return result.scalars().first()
 
@@ -112,8 +133,11 @@ async def delete_comment(db: AsyncSession, comment_id: int, user_id: int) -> boo
     )
     comment = result.scalars().first()
     if comment:
+        video_id, parent_id = comment.video_id, comment.parent_id
         await db.delete(comment)
         await db.commit()
+        await update_video_comment_count(db, video_id)
+        await invalidate_counts(comment_count_key(video_id, parent_id))
         return True
     return False
 
@@ -199,13 +223,12 @@ async def get_comment_tree(db: AsyncSession, video_id: int, parent_id: Optional[
     """递归获取评论树"""
     stmt = (
         select(Comment)
-        .options(joinedload(Comment.user))
         .where(Comment.video_id == video_id)
         .where(Comment.parent_id == parent_id)
         .order_by(Comment.created_at.asc())
     )
     result = await db.execute(stmt)
-    comments = result.scalars().unique().all()
+    comments = result.scalars().all()
     for comment in comments:
         comment.children = await get_comment_tree(db, video_id, comment.id)
     return comments
@@ -237,6 +260,9 @@ async def delete_comment_with_permission(db: AsyncSession, comment_id: int, user
     if not comment:
         return False
     if comment.user_id == user_id or video_owner_id == user_id:
+        video_id, parent_id = comment.video_id, comment.parent_id
         await delete_comment_and_children(db, comment_id)
+        await update_video_comment_count(db, video_id)
+        await invalidate_counts(comment_count_key(video_id, parent_id))
         return True
     return False 
\ No newline at end of file
@@ -0,0 +1,58 @@
+"""
+列表总数缓存
+
+分页接口的总数只用于展示，允许短时间不准：COUNT 结果缓存 COUNT_CACHE_TTL_SECONDS 秒，
+改变列表成员的写操作（发布/删除视频、发表/删除评论、关注/取关）提交后删除对应的 key。
+Redis 不可用时直接查询数据库。
+"""
+
+import logging
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.redis import get_redis_aioredis_client, get_redis_sync_client
+
+logger = logging.getLogger(__name__)
+
+
+async def cached_count(db: AsyncSession, key: str, stmt) -> int:
+    """读取缓存的总数，未命中时执行 COUNT 语句 stmt 并写入缓存"""
+    if settings.COUNT_CACHE_TTL_SECONDS <= 0:
+        return await db.scalar(stmt) or 0
+    try:
+        redis = await get_redis_aioredis_client()
+        cached = await redis.get(key)
+        if cached is not None:
+            return int(cached)
+    except Exception as e:
+        logger.warning(f"Count cache unavailable: {e}")
+        return await db.scalar(stmt) or 0
+
+    count = await db.scalar(stmt) or 0
+    try:
+        await redis.set(key, count, ex=settings.COUNT_CACHE_TTL_SECONDS)
+    except Exception as e:
+        logger.warning(f"Failed to cache count {key}: {e}")
+    return count
+
+
+async def invalidate_counts(*keys: str) -> None:
+    """写操作提交后删除受影响的总数缓存"""
+    if not keys:
+        return
+    try:
+        redis = await get_redis_aioredis_client()
+        await redis.delete(*keys)
+    except Exception as e:
+        logger.warning(f"Failed to invalidate counts {keys}: {e}")
+
+
+def invalidate_counts_sync(*keys: str) -> None:
+    """invalidate_counts 的同步版本，供 Celery 任务使用"""
+    if not keys:
+        return
+    try:
+        get_redis_sync_client().delete(*keys)
+    except Exception as e:
+        logger.warning(f"Failed to invalidate counts {keys}: {e}")
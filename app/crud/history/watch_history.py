@@ -0,0 +1,19 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.mysql.watch_history import WatchHistory
+
+
+def recent_watched_statement(user_id: int, limit: int):
+    """用户最近观看过的视频 ID（按最后观看时间倒序）"""
+    return (
+        select(WatchHistory.video_id)
+        .where(WatchHistory.user_id == user_id)
+        .order_by(WatchHistory.last_watch_at.desc())
+        .limit(limit)
+    )
+
+
+async def get_recent_watched_video_ids(db: AsyncSession, user_id: int, limit: int) -> list[int]:
+    result = await db.execute(recent_watched_statement(user_id, limit))
+    return list(result.scalars().all())
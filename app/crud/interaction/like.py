@@ -4,6 +4,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.mysql.like import Like
 from app.models.mysql.video import Video
+from app.crud.video.video import refresh_video_hot_score
 
 
 async def toggle_video_like(db: AsyncSession, video_id: int, user_id: int) -> bool:
@@ -41,6 +42,8 @@ async def update_video_like_count(db: AsyncSession, video_id: int) -> None:
     video = await db.scalar(select(Video).where(Video.id == video_id))
     if video:
         video.like_count = like_count or 0
+        await db.flush()
+        await refresh_video_hot_score(db, video_id)
         await db.commit()
 
 
@@ -0,0 +1,80 @@
+from typing import Iterable
+from sqlalchemy import func, update
+from sqlalchemy.dialects.mysql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.orm import Session
+
+from app.models.mysql.media_blob import MediaBlob
+
+
+# 按摘要登记文件并把引用数 +1（已存在则只加引用），并发上传同一内容时由唯一索引保证只有一行
+def _acquire_stmt(digest: str, size: int, path: str):
+    stmt = insert(MediaBlob).values(digest=digest, size=size, path=path, ref_count=1, created_at=func.now())
+    return stmt.on_duplicate_key_update(ref_count=MediaBlob.ref_count + 1, updated_at=func.now())
+
+
+# 引用数 -1，不直接删除文件：归零的文件超过保留期后由清理任务回收
+def _release_stmt(paths: list[str]):
+    return (
+        update(MediaBlob)
+        .where(MediaBlob.path.in_(paths), MediaBlob.ref_count > 0)
+        .values(ref_count=MediaBlob.ref_count - 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+# 登记一份内容并返回其实际存储路径（内容已存在时返回已有文件的路径）
+async def acquire_blob(db: AsyncSession, digest: str, size: int, path: str) -> str:
+    await db.execute(_acquire_stmt(digest, size, path))
+    return await db.scalar(select(MediaBlob.path).where(MediaBlob.digest == digest))
+
+
+# 释放若干文件路径上的引用（不是内容寻址存储中的路径会被忽略，如默认头像）
+async def release_blobs(db: AsyncSession, paths: Iterable[str | None]) -> None:
+    paths = [p for p in paths if p]
+    if paths:
+        await db.execute(_release_stmt(paths))
+
+
+# 同步版本，供 Celery worker 使用
+def acquire_blob_sync(session: Session, digest: str, size: int, path: str) -> str:
+    session.execute(_acquire_stmt(digest, size, path))
+    return session.scalar(select(MediaBlob.path).where(MediaBlob.digest == digest))
+
+
+def release_blobs_sync(session: Session, paths: Iterable[str | None]) -> None:
+    paths = [p for p in paths if p]
+    if paths:
+        session.execute(_release_stmt(paths))
+
+
+# 记录图片已生成的缩略图档位（保持 updated_at 不变，它用于判断引用数归零的时间）
+def _record_thumbnails_stmt(path: str, variants: Iterable[str]):
+    return (
+        update(MediaBlob)
+        .where(MediaBlob.path == path)
+        .values(thumbnails=",".join(sorted(variants)) or None, updated_at=MediaBlob.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def parse_thumbnails(value: str | None) -> set[str]:
+    return set(value.split(",")) if value else set()
+
+
+# 批量查询图片已生成的缩略图档位：{路径: 档位集合}，不在内容寻址存储中的路径不在结果中
+async def get_blob_thumbnails(db: AsyncSession, paths: Iterable[str | None]) -> dict[str, set[str]]:
+    paths = list({p for p in paths if p})
+    if not paths:
+        return {}
+    result = await db.execute(select(MediaBlob.path, MediaBlob.thumbnails).where(MediaBlob.path.in_(paths)))
+    return {row.path: parse_thumbnails(row.thumbnails) for row in result.all()}
+
+
+async def record_blob_thumbnails(db: AsyncSession, path: str, variants: Iterable[str]) -> None:
+    await db.execute(_record_thumbnails_stmt(path, variants))
+
+
+def record_blob_thumbnails_sync(session: Session, path: str, variants: Iterable[str]) -> None:
+    session.execute(_record_thumbnails_stmt(path, variants))
@@ -2,6 +2,8 @@ from sqlalchemy import select, func, desc, asc, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.mysql.follow import Follow
 from app.models.mysql.user import User
+from app.crud.count_cache import cached_count, invalidate_counts
+from app.models.redis.count import following_count_key, fans_count_key
 
 async def toggle_follow(db: AsyncSession, user_id: int, followed_user_id: int) -> bool:
     existing = await db.scalar(
@@ -10,12 +12,14 @@ async def toggle_follow(db: AsyncSession, user_id: int, followed_user_id: int) -
     if existing:
         await db.delete(existing)
         await db.commit()
-        return False
+        followed = False
     else:
         follow = Follow(user_id=user_id, followed_user_id=followed_user_id)
         db.add(follow)
         await db.commit()
-        return True
+        followed = True
+    await invalidate_counts(following_count_key(user_id), fans_count_key(followed_user_id))
+    return followed
 
 async def is_following(db: AsyncSession, user_id: int, followed_user_id: int) -> bool:
     result = await db.scalar(
@@ -23,19 +27,26 @@ async def is_following(db: AsyncSession, user_id: int, followed_user_id: int) ->
     )
     return result is not None
 
+async def get_followed_ids_among(db: AsyncSession, user_id: int, candidate_ids) -> set[int]:
+    """candidate_ids 中当前仍被 user_id 关注的用户"""
+    if not candidate_ids:
+        return set()
+    result = await db.execute(
+        select(Follow.followed_user_id).where(Follow.user_id == user_id, Follow.followed_user_id.in_(candidate_ids))
+    )
+    return set(result.scalars().all())
+
 async def get_fans_count(db: AsyncSession, user_id: int) -> int:
-    result = await db.scalar(
-        select(func.count(Follow.id)).where(Follow.followed_user_id == user_id)
+    return await cached_count(
+        db, fans_count_key(user_id), select(func.count(Follow.id)).where(Follow.followed_user_id == user_id)
     )
-    return result or 0
 
 async def get_following_count(db: AsyncSession, user_id: int) -> int:
-    result = await db.scalar(
-        select(func.count(Follow.id)).where(Follow.user_id == user_id)
+    return await cached_count(
+        db, following_count_key(user_id), select(func.count(Follow.id)).where(Follow.user_id == user_id)
     )
-    return result or 0
 
-async def get_following_list(db: AsyncSession, user_id: int, page: int, size: int, search: str = None, order: str = 'desc', current_user_id: int = None):
+async def get_following_list(db: AsyncSession, user_id: int, page: int, size: int, search: str = None, order: str = 'desc', current_user_id: int = None, with_total: bool = True):
     stmt = select(Follow, User).join(User, Follow.followed_user_id == User.id).where(Follow.user_id == user_id)
     if search:
         stmt = stmt.where(or_(User.username.ilike(f'%{search}%'), User.unique_id.ilike(f'%{search}%')))
@@ -67,10 +78,11 @@ async def get_following_list(db: AsyncSession, user_id: int, page: int, size: in
             is_mutual=is_mutual
         ))
     
-    total = await db.scalar(select(func.count()).select_from(Follow).where(Follow.user_id == user_id))
+    # 总数不随搜索条件变化，与关注数共用缓存
+    total = await get_following_count(db, user_id) if with_total else None
     return {"total": total, "items": items}
 
-async def get_fans_list(db: AsyncSession, user_id: int, page: int, size: int, search: str = None, current_user_id: int = None):
+async def get_fans_list(db: AsyncSession, user_id: int, page: int, size: int, search: str = None, current_user_id: int = None, with_total: bool = True):
     stmt = select(Follow, User).join(User, Follow.user_id == User.id).where(Follow.followed_user_id == user_id)
     if search:
         stmt = stmt.where(or_(User.username.ilike(f'%{search}%'), User.unique_id.ilike(f'%{search}%')))
@@ -99,5 +111,6 @@ async def get_fans_list(db: AsyncSession, user_id: int, page: int, size: int, se
             is_mutual=is_mutual
         ))
     
-    total = await db.scalar(select(func.count()).select_from(Follow).where(Follow.followed_user_id == user_id))
+    # 总数不随搜索条件变化，与粉丝数共用缓存
+    total = await get_fans_count(db, user_id) if with_total else None
     return {"total": total, "items": items} 
\ No newline at end of file
@@ -24,6 +24,18 @@ async def get_user_by_id(db: AsyncSession, user_id: int) -> Optional[User]:
     return result.scalars().first()
 
 
+# 用户卡片需要的列（列表中的上传者、评论者），不读取简介、地址等宽列
+USER_CARD_COLUMNS = (User.id, User.username, User.unique_id, User.profile_picture)
+
+
+# 按ID批量查询用户卡片
+async def get_user_cards(db: AsyncSession, user_ids: List[int]) -> List[dict]:
+    if not user_ids:
+        return []
+    result = await db.execute(select(*USER_CARD_COLUMNS).where(User.id.in_(user_ids)))
+    return [dict(row._mapping) for row in result.all()]
+
+
 # 分页获取所有用户
 async def get_all_users(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[User]:
     result = await db.execute(select(User).offset(skip).limit(limit))
@@ -1,11 +1,157 @@
 from typing import Optional, List, Tuple
-from sqlalchemy import desc, func
+from sqlalchemy import func, literal_column, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.orm import joinedload
 
-from app.models.mysql.video import Video
+from app.core.config import settings
+from app.models.mysql.follow import Follow
+from app.models.mysql.video import Video, VideoStatusEnum
 from app.schemas.video import VideoCreate, VideoUpdate
+from app.utils.pagination import encode_cursor, decode_cursor
+from app.crud.count_cache import cached_count, invalidate_counts
+from app.models.redis.count import PUBLISHED_VIDEO_COUNT_KEY, uploader_video_count_key, uploader_video_count_keys
+
+
+# 对外可见的视频：公开 + 未删除 + 后台处理已完成
+def published_video_conditions():
+    return (
+        Video.is_public == True,
+        Video.is_deleted == False,
+        Video.status == VideoStatusEnum.PUBLISHED,
+    )
+
+
+# 列表卡片需要的列：不读取 description 等宽列和媒体探测信息
+VIDEO_CARD_COLUMNS = (
+    Video.id, Video.title, Video.file_path, Video.cover_image, Video.hls_path, Video.preview_track_path,
+    Video.duration, Video.uploader_id, Video.is_public, Video.is_deleted, Video.status, Video.processing_progress,
+    Video.view_count, Video.like_count, Video.collect_count, Video.comment_count, Video.created_at, Video.updated_at,
+)
+
+
+class VideoCard:
+    """
+    列表中的视频卡片，由 VIDEO_CARD_COLUMNS 的查询行构造。
+    只是普通对象，不进入会话的 identity map，也没有属性追踪和懒加载；需要完整字段时按 ID 查询 Video。
+    """
+    __slots__ = tuple(column.key for column in VIDEO_CARD_COLUMNS)
+
+    def __init__(self, row):
+        for name, value in zip(self.__slots__, row):
+            setattr(self, name, value)
+
+
+# 按视频ID批量查询卡片（不保证顺序，conditions 为额外的过滤条件）
+async def get_video_cards_by_ids(db: AsyncSession, video_ids: List[int], *conditions) -> List[VideoCard]:
+    if not video_ids:
+        return []
+    result = await db.execute(select(*VIDEO_CARD_COLUMNS).where(Video.id.in_(video_ids), *conditions))
+    return [VideoCard(row) for row in result.all()]
+
+
+# 批量查询参与搜索的视频（对外可见），返回 (id, title, description)
+async def get_search_documents(db: AsyncSession, video_ids: List[int]) -> List[tuple]:
+    if not video_ids:
+        return []
+    result = await db.execute(
+        select(Video.id, Video.title, Video.description).where(Video.id.in_(video_ids), *published_video_conditions())
+    )
+    return [tuple(row) for row in result.all()]
+
+
+# 衰减指数的上限：POW(2, 1024) 超出 DOUBLE 范围会报 ERROR 1690，2^1000 时分数已可视为 0
+HOT_SCORE_MAX_HALF_LIVES = 1000
+
+
+# 热度分的 SQL 表达式：点赞数*2 + 评论数 + 播放量/10，配置了半衰期时再按发布时长指数衰减
+def hot_score_expression():
+    score = Video.like_count * 2 + Video.comment_count + Video.view_count / 10
+    half_life = settings.HOT_SCORE_HALF_LIFE_HOURS
+    if half_life > 0:
+        age_seconds = func.timestampdiff(literal_column("SECOND"), Video.created_at, func.now())
+        half_lives = func.least(age_seconds / (half_life * 3600), HOT_SCORE_MAX_HALF_LIVES)
+        score = score / func.pow(2, half_lives)
+    return func.coalesce(score, 0)
+
+
+# 重新计算单个视频的热度分（计数更新之后调用，由调用方提交）；热度分不算视频信息修改，保持 updated_at 不变
+async def refresh_video_hot_score(db: AsyncSession, video_id: int) -> None:
+    await db.execute(
+        update(Video).where(Video.id == video_id)
+        .values(hot_score=hot_score_expression(), updated_at=Video.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+
+
+# 视频发布、删除（可见性变化）后删除相关的总数缓存
+async def invalidate_video_counts(uploader_id: int) -> None:
+    await invalidate_counts(PUBLISHED_VIDEO_COUNT_KEY, *uploader_video_count_keys(uploader_id))
+
+
+# 观看次数 +1（原子自增）并更新热度分
+async def increment_video_view_count(db: AsyncSession, video_id: int) -> None:
+    await db.execute(
+        update(Video).where(Video.id == video_id).values(view_count=Video.view_count + 1)
+        .execution_options(synchronize_session=False)
+    )
+    await refresh_video_hot_score(db, video_id)
+    await db.commit()
+
+# 各视频列表的排序键，全部倒序，最后一个固定为 id 保证顺序唯一
+FEED_ORDERINGS = {
+    "recommend": (Video.view_count, Video.created_at, Video.id),
+    "latest": (Video.created_at, Video.id),
+    "hot": (Video.hot_score, Video.id),
+    "uploader": (Video.created_at, Video.id),
+}
+
+
+async def paginate_video_feed(
+    db: AsyncSession,
+    feed: str,
+    conditions,
+    skip: int,
+    limit: int,
+    cursor: Optional[str] = None,
+    with_total: Optional[bool] = None,
+    count_key: Optional[str] = None,
+) -> Tuple[Optional[int], List[VideoCard], Optional[str]]:
+    """
+    视频列表分页：传入游标时按 (排序键, id) < 游标 做键集分页，不再 OFFSET；否则按 skip 做页码分页（兼容旧接口）。
+    多取一条判断是否还有下一页，有则返回最后一条的游标。
+
+    Args:
+        feed: 列表名（FEED_ORDERINGS 的键）
+        with_total: 是否统计总数，默认页码分页统计、游标分页不统计
+        count_key: 总数缓存的 key，为空时每次执行 COUNT
+
+    Returns:
+        Tuple[Optional[int], List[VideoCard], Optional[str]]: (总数或 None, 视频卡片列表, 下一页游标或 None)
+    """
+    order_keys = FEED_ORDERINGS[feed]
+    if with_total is None:
+        with_total = cursor is None
+
+    total = None
+    if with_total:
+        count_stmt = select(func.count(Video.id)).where(*conditions)
+        total = await cached_count(db, count_key, count_stmt) if count_key else await db.scalar(count_stmt)
+
+    stmt = (
+        select(*VIDEO_CARD_COLUMNS, *order_keys)
+        .where(*conditions)
+        .order_by(*(key.desc() for key in order_keys))
+        .limit(limit + 1)
+    )
+    if cursor:
+        stmt = stmt.where(tuple_(*order_keys) < tuple_(*decode_cursor(feed, cursor, len(order_keys))))
+    else:
+        stmt = stmt.offset(skip)
+    rows = (await db.execute(stmt)).all()
+
+    width = len(VIDEO_CARD_COLUMNS)
+    next_cursor = encode_cursor(feed, rows[limit - 1][width:]) if len(rows) > limit else None
+    return total, [VideoCard(row) for row in rows[:limit]], next_cursor
 
 
 # 统计某用户发布的视频数量（排除已删除）
@@ -43,6 +189,7 @@ async def create_video(db: AsyncSession, video_data: VideoCreate, uploader_id: i
     db.add(db_video)
     await db.commit()
     await db.refresh(db_video)
+    await invalidate_counts(*uploader_video_count_keys(uploader_id))
     return db_video
 
 
@@ -67,88 +214,100 @@ async def delete_video(db: AsyncSession, video_id: int) -> bool:
     return False
 
 
-# 获取当前用户上传的视频（带分页和上传者信息）
+# 获取用户上传的视频（带分页，按上传时间倒序）
 async def get_my_videos(
     db: AsyncSession,
     user_id: int,
     skip: int,
     limit: int,
-) -> Tuple[int, List[Video]]:
+    only_published: bool = False,
+    cursor: Optional[str] = None,
+    with_total: Optional[bool] = None,
+) -> Tuple[Optional[int], List[VideoCard], Optional[str]]:
 
-    total_stmt = select(func.count(Video.id)).where(
-        Video.uploader_id == user_id,
-        Video.is_deleted == False
+    where_conditions = [Video.uploader_id == user_id, Video.is_deleted == False]
+    if only_published:
+        where_conditions.extend(published_video_conditions())
+    return await paginate_video_feed(
+        db, "uploader", where_conditions, skip, limit, cursor, with_total, uploader_video_count_key(user_id, only_published)
     )
-    total = await db.scalar(total_stmt)
 
-    stmt = (
-        select(Video)
-        .options(joinedload(Video.uploader))
-        .where(
-            Video.uploader_id == user_id,
-            Video.is_deleted == False
-        )
-        .offset(skip)
-        .limit(limit)
-    )
-    result = await db.execute(stmt)
-    video_list = result.scalars().unique().all()
 
-    return total, video_list
+# 获取推荐视频列表（公开 + 未删除 + 已发布，按浏览量和创建时间排序，含分页）
+async def get_recommend_video_list(
+    db: AsyncSession, skip: int, limit: int, cursor: Optional[str] = None, with_total: Optional[bool] = None
+) -> Tuple[Optional[int], List[VideoCard], Optional[str]]:
+    return await paginate_video_feed(
+        db, "recommend", published_video_conditions(), skip, limit, cursor, with_total, PUBLISHED_VIDEO_COUNT_KEY
+    )
 
 
+# 获取最新视频列表（公开 + 未删除 + 已发布 + 创建时间倒序，含分页）
+async def get_latest_video_list(
+    db: AsyncSession, skip: int, limit: int, cursor: Optional[str] = None, with_total: Optional[bool] = None
+) -> Tuple[Optional[int], List[VideoCard], Optional[str]]:
+    return await paginate_video_feed(
+        db, "latest", published_video_conditions(), skip, limit, cursor, with_total, PUBLISHED_VIDEO_COUNT_KEY
+    )
 
-# 获取推荐视频列表（公开 + 未删除 + 排序，含分页）
-async def get_recommend_video_list(db: AsyncSession, skip: int, limit: int) -> Tuple[int, List[Video]]:
-    # 查询符合条件的视频总数
-    total_stmt = select(func.count(Video.id)).where(Video.is_public == True, Video.is_deleted == False)
-    total = await db.scalar(total_stmt)
 
-    # 按照浏览量和创建时间排序
-    stmt = (
-        select(Video)
-        .options(joinedload(Video.uploader))
-        .where(Video.is_public == True, Video.is_deleted == False)
-        .order_by(desc(Video.view_count), desc(Video.created_at))
-        .offset(skip)
-        .limit(limit)
+# 获取热门视频列表（公开 + 未删除 + 已发布 + 综合热度排序，含分页）
+async def get_hot_video_list(
+    db: AsyncSession, skip: int, limit: int, cursor: Optional[str] = None, with_total: Optional[bool] = None
+) -> Tuple[Optional[int], List[VideoCard], Optional[str]]:
+    return await paginate_video_feed(
+        db, "hot", published_video_conditions(), skip, limit, cursor, with_total, PUBLISHED_VIDEO_COUNT_KEY
     )
-    result = await db.execute(stmt)
-    video_list = result.scalars().unique().all()
 
-    return total, video_list
 
 
-# 获取最新视频列表（公开 + 未删除 + 创建时间倒序，含分页）
-async def get_latest_video_list(db: AsyncSession, skip: int, limit: int):
-    total_stmt = select(func.count(Video.id)).where(Video.is_public == True, Video.is_deleted == False)
-    total = await db.scalar(total_stmt)
+# 关注的用户发布的视频查询（按 ID 倒序，before_id 为游标：只取更早的视频；uploader_ids 限定部分关注的用户）
+def _following_videos_statement(columns, user_id: int, limit: int, before_id: Optional[int], uploader_ids, skip: int = 0):
     stmt = (
-        select(Video)
-        .options(joinedload(Video.uploader))
-        .where(Video.is_public == True, Video.is_deleted == False)
-        .order_by(desc(Video.created_at))
+        select(*columns)
+        .join(Follow, Follow.followed_user_id == Video.uploader_id)
+        .where(Follow.user_id == user_id, *published_video_conditions())
+        .order_by(Video.id.desc())
         .offset(skip)
         .limit(limit)
     )
-    result = await db.execute(stmt)
-    video_list = result.scalars().unique().all()
-    return total, video_list
+    if before_id:
+        stmt = stmt.where(Video.id < before_id)
+    if uploader_ids is not None:
+        stmt = stmt.where(Video.uploader_id.in_(uploader_ids))
+    return stmt
 
 
-# 获取热门视频列表（公开 + 未删除 + 综合热度排序，含分页）
-async def get_hot_video_list(db: AsyncSession, skip: int, limit: int):
-    total_stmt = select(func.count(Video.id)).where(Video.is_public == True, Video.is_deleted == False)
-    total = await db.scalar(total_stmt)
-    # 热度算法：点赞数*2 + 评论数 + 播放量/10
-    stmt = (
-        select(Video)
-        .options(joinedload(Video.uploader))
-        .where(Video.is_public == True, Video.is_deleted == False)
-        .order_by((Video.like_count * 2 + Video.comment_count + Video.view_count / 10).desc(), Video.created_at.desc())
-        .offset(skip)
+# 获取关注的用户发布的视频 ID
+async def get_following_video_ids(
+    db: AsyncSession,
+    user_id: int,
+    limit: int,
+    before_id: Optional[int] = None,
+    uploader_ids: Optional[List[int]] = None,
+) -> List[int]:
+    result = await db.execute(_following_videos_statement((Video.id,), user_id, limit, before_id, uploader_ids))
+    return list(result.scalars().all())
+
+
+# 获取关注的用户发布的视频（上传者卡片由 get_user_card_loader 批量加载）
+async def get_following_video_list(
+    db: AsyncSession,
+    user_id: int,
+    skip: int,
+    limit: int,
+    before_id: Optional[int] = None,
+) -> List[VideoCard]:
+    result = await db.execute(_following_videos_statement(VIDEO_CARD_COLUMNS, user_id, limit, before_id, None, skip))
+    return [VideoCard(row) for row in result.all()]
+
+
+# 获取某个用户最近发布的视频 ID（关注 / 取关时更新时间线）
+async def get_recent_video_ids_by_uploader(db: AsyncSession, uploader_id: int, limit: int) -> List[int]:
+    result = await db.execute(
+        select(Video.id)
+        .where(Video.uploader_id == uploader_id, *published_video_conditions())
+        .order_by(Video.id.desc())
         .limit(limit)
     )
-    result = await db.execute(stmt)
-    video_list = result.scalars().unique().all()
-    return total, video_list
+    return list(result.scalars().all())
@@ -1,5 +1,6 @@
+from sqlalchemy import create_engine
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
-from sqlalchemy.orm import declarative_base
+from sqlalchemy.orm import declarative_base, sessionmaker, Session
 from app.core.config import settings
 from typing import AsyncGenerator
 
@@ -19,3 +20,21 @@ Base = declarative_base()
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with async_session() as session:
         yield session
+
+
+# 同步 session 工厂（Celery 等后台进程使用），首次调用时才创建引擎
+_sync_session_factory = None
+
+
+def get_sync_session() -> Session:
+    """
+    获取同步数据库会话，供 Celery worker 等非异步环境使用：
+
+        with get_sync_session() as session:
+            ...
+    """
+    global _sync_session_factory
+    if _sync_session_factory is None:
+        sync_engine = create_engine(settings.SYNC_DATABASE_URL, pool_pre_ping=True, future=True)
+        _sync_session_factory = sessionmaker(bind=sync_engine, expire_on_commit=False)
+    return _sync_session_factory()
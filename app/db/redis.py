@@ -1,4 +1,5 @@
 import aioredis
+import redis
 from app.core.config import settings
 
 # 创建 Redis 连接池
@@ -13,3 +14,18 @@ async def get_redis_aioredis_client():
             decode_responses=True
         )
     return redis_client
+
+
+# 同步客户端（Celery worker 等非异步环境使用），首次调用时才创建
+_sync_redis_client = None
+
+
+def get_redis_sync_client() -> redis.Redis:
+    global _sync_redis_client
+    if _sync_redis_client is None:
+        _sync_redis_client = redis.Redis.from_url(
+            settings.REDIS_URL,
+            encoding='utf-8',
+            decode_responses=True
+        )
+    return _sync_redis_client
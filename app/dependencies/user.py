@@ -88,3 +88,19 @@ async def get_current_user(
 
     # 返回用户
     return user
+
+
+async def get_optional_current_user(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db),
+) -> User | None:
+    """
+    可选的当前登录用户依赖
+    - 公开接口按登录状态做个性化处理时使用
+    - 未登录或 token 无效时返回 None，不返回 401
+    """
+    try:
+        return await get_current_user(request, credentials, db)
+    except HTTPException:
+        return None
@@ -2,4 +2,5 @@ from .cors import *
 from .exception import *
 from .logging import *
 from .trace import *
-from .test_mode import *
\ No newline at end of file
+from .test_mode import *
+from .media import *
\ No newline at end of file
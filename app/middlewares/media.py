@@ -0,0 +1,45 @@
+"""
+媒体文件快速通道
+
+媒体请求（视频/封面/头像/HLS 分片）体积大、数量多，经过 BaseHTTPMiddleware 时
+每个响应块都要在内存流中转一次，也无法使用 zero-copy send 扩展。
+这里用纯 ASGI 中间件在最外层拦截 {API 前缀}/media/* 请求，直接交给 MediaFileEndpoint，
+只保留 CORS 处理（HLS 播放器通过 XHR 拉取播放列表和分片，需要跨域头）。
+本地存储的预签名直传（PUT）同样走这里，上传的字节不经过业务中间件和接口。
+"""
+
+from starlette.middleware.cors import CORSMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.api.media import MediaFileEndpoint
+from app.middlewares.cors import CORS_ALLOW_ORIGINS
+from app.storage import get_storage
+
+
+class MediaMiddleware:
+    def __init__(self, app: ASGIApp, prefix: str):
+        self.app = app
+        self.prefix = prefix.rstrip("/") + "/"
+        self.media_app = CORSMiddleware(
+            MediaFileEndpoint(get_storage()),
+            allow_origins=CORS_ALLOW_ORIGINS,
+            allow_credentials=True,
+            allow_methods=["GET", "HEAD", "PUT"],
+            allow_headers=["*"],
+            expose_headers=["Content-Range", "Accept-Ranges", "Content-Length", "ETag"],
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and scope["path"].startswith(self.prefix):
+            scope = dict(scope)
+            scope["media_path"] = scope["path"][len(self.prefix):]
+            await self.media_app(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+
+def add_media_middleware(app, prefix: str):
+    """
+    需要在所有中间件之后添加，保证位于最外层
+    """
+    app.add_middleware(MediaMiddleware, prefix=prefix)
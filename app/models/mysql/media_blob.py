@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, BigInteger, String
+from app.models.mysql.base import Base
+
+
+class MediaBlob(Base):
+    """
+    内容寻址的媒体文件：同一份内容（sha256 相同）只在磁盘上保存一次，
+    视频、封面、头像等记录通过相对路径共享它，ref_count 记录引用数。
+    ref_count 归零的文件由后台清理任务统一回收。
+    """
+    __tablename__ = 'media_blobs'
+
+    id = Column(Integer, primary_key=True, index=True)
+    digest = Column(String(64), nullable=False, unique=True)  # 内容 sha256（十六进制）
+    path = Column(String(500), nullable=False, unique=True)  # 相对路径，如 media/blobs/ab/cd/{digest}.mp4
+    size = Column(BigInteger, nullable=False)  # 文件大小（字节）
+    ref_count = Column(Integer, nullable=False, default=0)  # 引用计数（updated_at 即最后一次增减的时间）
+    thumbnails = Column(String(255), nullable=True)  # 已生成的缩略图档位，如 320.webp,640.webp（图片才有）
+
+    def __repr__(self):
+        return f"<MediaBlob {self.digest[:12]} refs={self.ref_count}>"
@@ -1,29 +1,61 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Float, Double, Index
+from sqlalchemy import Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.models.mysql.base import Base
+from enum import Enum
+
+
+# 视频处理状态枚举
+class VideoStatusEnum(str, Enum):
+    PROCESSING = "processing"  # 上传完成，等待/正在后台处理
+    PUBLISHED = "published"  # 处理完成，已发布
+    FAILED = "failed"  # 处理失败
 
 
 class Video(Base):
     __tablename__ = 'videos'
+    __table_args__ = (
+        # 视频列表游标分页：过滤条件 + (排序键, id) 倒序的索引范围扫描
+        Index('ix_videos_feed_latest', 'is_public', 'is_deleted', 'status', 'created_at', 'id'),
+        Index('ix_videos_feed_recommend', 'is_public', 'is_deleted', 'status', 'view_count', 'created_at', 'id'),
+        Index('ix_videos_uploader_created', 'uploader_id', 'is_deleted', 'created_at', 'id'),
+        Index('ix_videos_feed_hot', 'is_public', 'is_deleted', 'status', 'hot_score', 'id'),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(255), nullable=False, index=True)  # 视频标题
     description = Column(Text, nullable=True)  # 视频描述
     file_path = Column(String(500), nullable=False)  # 视频文件路径
     cover_image = Column(String(500), nullable=True)  # 封面图片路径
+    hls_path = Column(String(500), nullable=True)  # HLS 主播放列表路径（master.m3u8）
+    preview_track_path = Column(String(500), nullable=True)  # 拖动预览的 WebVTT 缩略图轨道路径（thumbnails.vtt）
     duration = Column(Integer, nullable=True)  # 视频时长（秒）
 
+    # 媒体探测信息
+    fps = Column(Float, nullable=True)  # 帧率
+    width = Column(Integer, nullable=True)  # 分辨率宽
+    height = Column(Integer, nullable=True)  # 分辨率高
+    codec = Column(String(32), nullable=True)  # 视频编码（FOURCC，如 avc1）
+    bitrate = Column(Integer, nullable=True)  # 平均码率（bps）
+
     uploader_id = Column(Integer, ForeignKey("users.id"), nullable=False)  # 上传者 ID
     uploader = relationship("User", backref="videos")  # ORM 反向关系
 
     is_public = Column(Boolean, default=True)  # 是否公开
     is_deleted = Column(Boolean, default=False)  # 逻辑删除标志位
 
+    # 后台处理流水线状态
+    status = Column(SQLEnum(VideoStatusEnum), default=VideoStatusEnum.PUBLISHED, server_default=VideoStatusEnum.PUBLISHED.name, nullable=False)
+    processing_progress = Column(Integer, default=100)  # 处理进度 0-100
+    processing_error = Column(String(255), nullable=True)  # 处理失败原因
+
     view_count = Column(Integer, default=0)  # 观看次数
     like_count = Column(Integer, default=0)  # 点赞数
     collect_count = Column(Integer, default=0)  # 收藏数
     comment_count = Column(Integer, default=0)  # 评论数
+    # 热度分：点赞/评论/观看变化时随计数一起更新，并由定期任务重算（开启时间衰减时）
+    hot_score = Column(Double, default=0, server_default='0', nullable=False)
 
     def __repr__(self):
         return f"<Video {self.title}>"
@@ -0,0 +1,33 @@
+"""
+列表总数缓存相关的 Redis key 约定（String，带短过期时间）
+"""
+
+# 对外可见的视频总数（热门 / 最新 / 推荐列表共用）
+PUBLISHED_VIDEO_COUNT_KEY = "count:videos:published"
+# 用户上传的视频数：count:videos:uploader:{user_id}:{all|published}
+UPLOADER_VIDEO_COUNT_PREFIX = "count:videos:uploader:"
+# 视频评论数：count:comments:{video_id}:{root|parent_id}
+COMMENT_COUNT_PREFIX = "count:comments:"
+# 关注数 / 粉丝数：count:following:{user_id} / count:fans:{user_id}
+FOLLOWING_COUNT_PREFIX = "count:following:"
+FANS_COUNT_PREFIX = "count:fans:"
+
+
+def uploader_video_count_key(user_id: int, only_published: bool) -> str:
+    return f"{UPLOADER_VIDEO_COUNT_PREFIX}{user_id}:{'published' if only_published else 'all'}"
+
+
+def uploader_video_count_keys(user_id: int) -> list[str]:
+    return [uploader_video_count_key(user_id, False), uploader_video_count_key(user_id, True)]
+
+
+def comment_count_key(video_id: int, parent_id: int | None) -> str:
+    return f"{COMMENT_COUNT_PREFIX}{video_id}:{'root' if parent_id is None else parent_id}"
+
+
+def following_count_key(user_id: int) -> str:
+    return f"{FOLLOWING_COUNT_PREFIX}{user_id}"
+
+
+def fans_count_key(user_id: int) -> str:
+    return f"{FANS_COUNT_PREFIX}{user_id}"
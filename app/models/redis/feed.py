@@ -0,0 +1,56 @@
+"""
+视频列表（热门 / 最新 / 推荐）缓存及关注时间线相关的 Redis key 约定
+"""
+
+# 列表索引（ZSET，member 为补零的视频 ID，score 为排序键）：feed:index:{feed}
+FEED_INDEX_PREFIX = "feed:index:"
+# 视频卡片（String，JSON）：feed:card:{video_id}
+FEED_CARD_PREFIX = "feed:card:"
+# 关注时间线（ZSET，member 为补零的视频 ID，score 为视频 ID）：timeline:{user_id}
+TIMELINE_PREFIX = "timeline:"
+# 粉丝过多、不做写扩散的创作者（Set），读取时间线时再拉取他们的视频
+TIMELINE_PULL_CREATORS_KEY = "timeline:pull_creators"
+
+FEED_MEMBER_WIDTH = 12  # 补零后的 ID 宽度，使同分成员的字典序与数值序一致
+
+
+def feed_member(video_id: int) -> str:
+    """有序集合中视频的 member"""
+    return f"{video_id:0{FEED_MEMBER_WIDTH}d}"
+
+
+def feed_index_key(feed: str) -> str:
+    return f"{FEED_INDEX_PREFIX}{feed}"
+
+
+def feed_index_ready_key(feed: str) -> str:
+    """索引已完整构建的标记（带过期，过期后下一次请求重建索引）"""
+    return f"{FEED_INDEX_PREFIX}{feed}:ready"
+
+
+def feed_index_lock_key(feed: str) -> str:
+    """重建索引的互斥锁（从投递重建任务到重建完成一直持有）"""
+    return f"{FEED_INDEX_PREFIX}{feed}:lock"
+
+
+def feed_index_dirty_key(feed: str) -> str:
+    """重建期间分数有变化的视频（Set），替换正式索引前后重放"""
+    return f"{FEED_INDEX_PREFIX}{feed}:dirty"
+
+
+def feed_index_tmp_key(feed: str, token: str) -> str:
+    """重建中的临时索引，每次重建使用不同的 key"""
+    return f"{FEED_INDEX_PREFIX}{feed}:rebuild:{token}"
+
+
+def feed_card_key(video_id: int) -> str:
+    return f"{FEED_CARD_PREFIX}{video_id}"
+
+
+def timeline_key(user_id: int) -> str:
+    return f"{TIMELINE_PREFIX}{user_id}"
+
+
+def timeline_ready_key(user_id: int) -> str:
+    """时间线已从 MySQL 完整构建的标记（带过期，长期不活跃的用户时间线随之失效）"""
+    return f"{TIMELINE_PREFIX}{user_id}:ready"
@@ -0,0 +1,14 @@
+"""
+视频推荐（item-item 协同过滤）相关的 Redis key 约定
+"""
+
+# 视频的相似视频（ZSET，member 为视频 ID，score 为相似度）：rec:item:{video_id}
+REC_ITEM_PREFIX = "rec:item:"
+# 上一次构建相似视频的时间（String，Unix 时间戳），增量构建只重算此后有新互动的视频
+REC_BUILT_AT_KEY = "rec:built_at"
+# 构建任务互斥锁，避免全量与增量构建同时执行
+REC_BUILD_LOCK_KEY = "rec:build:lock"
+
+
+def item_neighbors_key(video_id: int) -> str:
+    return f"{REC_ITEM_PREFIX}{video_id}"
@@ -0,0 +1,12 @@
+"""
+视频搜索索引相关的 Redis key 约定
+"""
+
+# 当前索引版本（String）：search_index_dir 下的子目录名，由 app.tasks.search_tasks 全量构建后更新
+SEARCH_INDEX_VERSION_KEY = "search:index:version"
+# 构建锁（String）
+SEARCH_BUILD_LOCK_KEY = "search:index:lock"
+# 视频变更记录（ZSET）：视频 ID -> 变更序号，API 进程按序号增量更新内存中的索引
+SEARCH_CHANGES_KEY = "search:changes"
+# 变更序号（String，INCR）
+SEARCH_CHANGE_SEQ_KEY = "search:changes:seq"
@@ -0,0 +1,22 @@
+"""
+用户已观看视频的布隆过滤器相关的 Redis key 约定
+"""
+
+# 位图（String）：seen:{user_id}
+SEEN_FILTER_PREFIX = "seen:"
+# 自上次重建以来加入的视频数（String）：seen:{user_id}:count
+# 超过容量的用户记入 SEEN_FILTER_SATURATED_KEY（Set），由定期任务按最近的观看记录重建
+SEEN_FILTER_SATURATED_KEY = "seen:saturated"
+
+
+def seen_filter_key(user_id: int) -> str:
+    return f"{SEEN_FILTER_PREFIX}{user_id}"
+
+
+def seen_filter_count_key(user_id: int) -> str:
+    return f"{SEEN_FILTER_PREFIX}{user_id}:count"
+
+
+def seen_filter_ready_key(user_id: int) -> str:
+    """过滤器已从观看记录构建的标记"""
+    return f"{SEEN_FILTER_PREFIX}{user_id}:ready"
@@ -0,0 +1,23 @@
+"""
+观看趋势（热门视频统计）相关的 Redis key 约定
+"""
+
+# 每小时的观看次数 / 观看时长（Hash，field 为视频 ID）：trending:views:{YYYYMMDDHH} / trending:watch:{YYYYMMDDHH}，UTC 小时
+TRENDING_VIEWS_PREFIX = "trending:views:"
+TRENDING_WATCH_PREFIX = "trending:watch:"
+# 最近 {days} 天的热门视频（String，JSON 列表，按衰减后的分数降序）：trending:top:{days}
+TRENDING_TOP_PREFIX = "trending:top:"
+
+TRENDING_HOUR_FORMAT = "%Y%m%d%H"
+
+
+def trending_views_key(hour: str) -> str:
+    return f"{TRENDING_VIEWS_PREFIX}{hour}"
+
+
+def trending_watch_key(hour: str) -> str:
+    return f"{TRENDING_WATCH_PREFIX}{hour}"
+
+
+def trending_top_key(days: int) -> str:
+    return f"{TRENDING_TOP_PREFIX}{days}"
@@ -0,0 +1,22 @@
+"""
+分片上传 / 预签名直传相关的 Redis key 约定
+"""
+
+# 上传会话（Hash）：upload:session:{upload_id}
+UPLOAD_SESSION_PREFIX = "upload:session:"
+# 分片写入互斥锁（String，带过期）：upload:lock:{upload_id}
+UPLOAD_LOCK_PREFIX = "upload:lock:"
+# 预签名直传会话（Hash）：upload:direct:{upload_id}
+DIRECT_UPLOAD_PREFIX = "upload:direct:"
+
+
+def upload_session_key(upload_id: str) -> str:
+    return f"{UPLOAD_SESSION_PREFIX}{upload_id}"
+
+
+def upload_lock_key(upload_id: str) -> str:
+    return f"{UPLOAD_LOCK_PREFIX}{upload_id}"
+
+
+def direct_upload_key(upload_id: str) -> str:
+    return f"{DIRECT_UPLOAD_PREFIX}{upload_id}"
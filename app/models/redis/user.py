@@ -0,0 +1,10 @@
+"""
+用户卡片缓存相关的 Redis key 约定
+"""
+
+# 用户卡片（String，JSON）：user:card:{user_id}
+USER_CARD_PREFIX = "user:card:"
+
+
+def user_card_key(user_id: int) -> str:
+    return f"{USER_CARD_PREFIX}{user_id}"
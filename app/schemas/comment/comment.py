@@ -40,7 +40,7 @@ class CommentOut(BaseModel):
 
 
 class CommentListResponse(BaseModel):
-    total: int
+    total: Optional[int] = None  # 总数（缓存的近似值），请求 with_total=false 时为空
     items: List[CommentOut]
 
 
@@ -1 +1,2 @@
-from .video import *
\ No newline at end of file
+from .video import *
+from .upload import *
\ No newline at end of file
@@ -0,0 +1,32 @@
+from pydantic import BaseModel, Field
+
+
+# 分片上传初始化请求体
+class UploadInitRequest(BaseModel):
+    title: str = Field(..., description="视频标题，必填")
+    description: str = Field("", description="视频描述，可选")
+    filename: str = Field(..., description="原始文件名，用于确定扩展名")
+    content_type: str = Field(..., description="视频 MIME 类型")
+    total_size: int = Field(..., gt=0, description="视频文件总字节数")
+
+
+# 分片上传会话状态，断点续传时客户端据此从 offset 继续上传
+class UploadSessionOut(BaseModel):
+    upload_id: str  # 上传会话ID
+    offset: int  # 服务端已确认接收的字节数
+    total_size: int  # 文件总字节数
+    chunk_size: int  # 建议/允许的单个分片最大字节数
+    expires_in: int  # 会话剩余有效期（秒）
+
+
+# 预签名直传初始化请求体：客户端先在本地计算 sha256，完成时服务端据此校验
+class DirectUploadInitRequest(UploadInitRequest):
+    sha256: str = Field(..., pattern=r"^[0-9a-fA-F]{64}$", description="视频文件的 sha256 十六进制摘要")
+
+
+# 预签名直传地址，客户端用 method 把文件原始字节直接发送到 upload_url
+class DirectUploadOut(BaseModel):
+    upload_id: str  # 直传会话ID，完成时使用
+    upload_url: str  # 预签名上传地址
+    method: str  # 上传使用的 HTTP 方法
+    expires_in: int  # 上传地址剩余有效期（秒）
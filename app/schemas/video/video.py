@@ -1,6 +1,7 @@
 from pydantic import BaseModel
 from typing import Optional, List
 from datetime import datetime
+from app.models.mysql.video import VideoStatusEnum
 
 # 视频基础字段，所有视频相关模型共用
 class VideoBase(BaseModel):
@@ -12,6 +13,13 @@ class VideoBase(BaseModel):
 class VideoCreate(VideoBase):
     cover_image: Optional[str] = None  # 封面图片路径，可选
     duration: Optional[int] = None  # 视频时长（秒），可选
+    fps: Optional[float] = None  # 帧率，可选
+    width: Optional[int] = None  # 分辨率宽，可选
+    height: Optional[int] = None  # 分辨率高，可选
+    codec: Optional[str] = None  # 视频编码，可选
+    bitrate: Optional[int] = None  # 平均码率（bps），可选
+    status: VideoStatusEnum = VideoStatusEnum.PUBLISHED  # 处理状态，后台处理中为 processing
+    processing_progress: int = 100  # 处理进度 0-100
 
 # 更新视频请求体，支持部分字段更新，全部可选
 class VideoUpdate(BaseModel):
@@ -31,14 +39,17 @@ class VideoOut(VideoBase):
 class MyVideoListOut(BaseModel):
     id: int  # 视频ID
     title: str  # 视频标题
-    cover_image: Optional[str]  # 封面图片路径
+    cover_image: Optional[str]  # 封面缩略图路径（列表档）
     file_path: str  # 视频文件路径
+    hls_path: Optional[str] = None  # HLS 主播放列表路径，未打包时为空
     created_at: datetime  # 创建时间
-    duration: int  # 视频时长（秒）
+    duration: Optional[int]  # 视频时长（秒），后台处理完成前可能为空
     like_count: int  # 点赞数量
+    status: VideoStatusEnum = VideoStatusEnum.PUBLISHED  # 处理状态
+    processing_progress: Optional[int] = None  # 处理进度 0-100
     uploader_id: int  # 上传者ID
-    uploader_username: str  # 上传者用户名
-    uploader_unique_id: str  # 上传者唯一ID
+    uploader_username: Optional[str] = None  # 上传者用户名，上传者不存在时为空
+    uploader_unique_id: Optional[str] = None  # 上传者唯一ID，上传者不存在时为空
 
     class Config:
         from_attributes = True  # 支持ORM模型转换
@@ -52,16 +63,25 @@ class VideoListResponse(BaseModel):
 class RecommendVideoOut(BaseModel):
     id: int  # 视频ID
     title: str  # 视频标题
-    cover_image: str  # 封面图片路径
+    cover_image: str  # 封面缩略图路径（列表档）
     file_path: str  # 视频文件路径
+    hls_path: Optional[str] = None  # HLS 主播放列表路径，未打包时为空
     created_at: datetime  # 创建时间
     duration: int  # 视频时长（秒）
 
     uploader_id: int  # 上传者ID
-    uploader_username: str  # 上传者用户名
-    uploader_unique_id: str  # 上传者唯一ID
+    uploader_username: Optional[str] = None  # 上传者用户名，上传者不存在时为空
+    uploader_unique_id: Optional[str] = None  # 上传者唯一ID，上传者不存在时为空
 
     like_count: int  # 点赞数
 
     class Config:
         from_attributes = True  # 支持ORM模型转换
+
+
+# 视频后台处理状态（仅上传者可查询）
+class VideoProcessingOut(BaseModel):
+    id: int  # 视频ID
+    status: VideoStatusEnum  # 处理状态
+    progress: int  # 处理进度 0-100
+    error: Optional[str] = None  # 失败原因
@@ -1,8 +1,12 @@
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
 from app.db.mongodb import get_mongo_db
-from app.models.mongodb import UserBehaviorLog, VideoViewHistory, VideoAnalytics
-from app.models.mysql.video import Video
+from app.core.config import settings
+from app.models.mongodb import UserBehaviorLog, UserPreference, VideoViewHistory, VideoAnalytics
+from app.services.analytics.trending import get_trending_videos, record_view_event
+from app.services.user.user_card import get_user_card_loader
+from app.services.video.seen_filter import mark_videos_seen
+from app.crud.video.video import get_video_cards_by_ids
 from app.models.mysql.watch_history import WatchHistory
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
@@ -48,6 +52,8 @@ async def log_video_view(
         device_info=device_info or {}
     )
     await db_mongo[view.Config.collection].insert_one(view.dict())
+    await record_view_event(video_id, watch_duration, view.timestamp)
+    await mark_videos_seen(user_id, [video_id])
     # MySQL
     if db:
         # 查找是否已有记录
@@ -63,6 +69,21 @@ async def log_video_view(
         await db.commit()
 
 
+async def record_search_query(user_id: int, query: str):
+    """记录搜索历史：保留最近 SEARCH_HISTORY_SIZE 条，重复的搜索移到最后"""
+    db = get_mongo_db()
+    collection = db[UserPreference.Config.collection]
+    await collection.update_one({"user_id": user_id}, {"$pull": {"search_history": query}})
+    await collection.update_one(
+        {"user_id": user_id},
+        {
+            "$push": {"search_history": {"$each": [query], "$slice": -settings.SEARCH_HISTORY_SIZE}},
+            "$set": {"updated_at": datetime.utcnow()},
+        },
+        upsert=True
+    )
+
+
 async def update_video_analytics(video_id: int, **updates):
     """更新视频分析数据"""
     db = get_mongo_db()
@@ -97,9 +118,11 @@ async def get_user_watch_history(user_id: int, limit: int = 50, db: AsyncSession
     # 查询视频详情
     video_map = {}
     if db and video_ids:
-        result = await db.execute(select(Video).where(Video.id.in_(video_ids)))
-        for v in result.scalars().all():
+        for v in await get_video_cards_by_ids(db, video_ids):
             video_map[v.id] = v
+    uploaders = {}
+    if video_map:
+        uploaders = await get_user_card_loader(db).load_many([v.uploader_id for v in video_map.values()])
     # 组装前端需要的结构
     result_list = []
     for h in history_list:
@@ -112,7 +135,7 @@ async def get_user_watch_history(user_id: int, limit: int = 50, db: AsyncSession
                 'file_path': v.file_path,
                 'duration': v.duration,
                 'uploader_id': v.uploader_id,
-                'uploader_username': getattr(v.uploader, 'username', None) if hasattr(v, 'uploader') else None,
+                'uploader_username': uploaders.get(v.uploader_id, {}).get('username'),
                 'created_at': v.created_at,
                 'like_count': v.like_count,
                 'history_timestamp': h.get('timestamp'),
@@ -123,12 +146,29 @@ async def get_user_watch_history(user_id: int, limit: int = 50, db: AsyncSession
 
 
 async def get_popular_videos(days: int = 7, limit: int = 20) -> List[Dict[str, Any]]:
-    """获取热门视频（基于观看数据）"""
+    """
+    获取热门视频（基于观看数据）。
+    优先读取定期任务按时间衰减分数发布到 Redis 的结果，尚未发布时直接聚合 MongoDB 观看记录。
+
+    Returns:
+        list: [{"_id": 视频 ID, "view_count": 窗口内的观看次数, "total_watch_time": 窗口内的观看时长（秒）,
+                "score": 时间衰减后的趋势分数}]，按 score 降序（不是按 view_count）
+    """
+    trending = await get_trending_videos(days, limit)
+    if trending is not None:
+        return trending
+    return await aggregate_popular_videos(days, limit)
+
+
+async def aggregate_popular_videos(days: int = 7, limit: int = 20) -> List[Dict[str, Any]]:
+    """聚合最近 days 天的全部观看记录，与定期任务相同：按每次观看衰减后的分数之和排序"""
     db = get_mongo_db()
     collection = db[VideoViewHistory.Config.collection]
     
     # 计算时间范围
-    start_date = datetime.utcnow() - timedelta(days=days)
+    now = datetime.utcnow()
+    start_date = now - timedelta(days=days)
+    half_life_ms = max(settings.TRENDING_HALF_LIFE_HOURS, 1e-6) * 3600 * 1000
     
     # 聚合查询
     pipeline = [
@@ -136,9 +176,10 @@ async def get_popular_videos(days: int = 7, limit: int = 20) -> List[Dict[str, A
         {"$group": {
             "_id": "$video_id",
             "view_count": {"$sum": 1},
-            "total_watch_time": {"$sum": "$watch_duration"}
+            "total_watch_time": {"$sum": "$watch_duration"},
+            "score": {"$sum": {"$pow": [0.5, {"$divide": [{"$subtract": [now, "$timestamp"]}, half_life_ms]}]}},
         }},
-        {"$sort": {"view_count": -1}},
+        {"$sort": {"score": -1, "_id": -1}},
         {"$limit": limit}
     ]
     
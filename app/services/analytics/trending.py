@@ -0,0 +1,47 @@
+"""
+观看趋势：记录每小时的观看计数，读取定期任务发布的热门视频
+
+    trending:views:{YYYYMMDDHH}   Hash    视频 ID -> 该小时的观看次数
+    trending:watch:{YYYYMMDDHH}   Hash    视频 ID -> 该小时的观看时长（秒）
+    trending:top:{days}           String  最近 days 天的热门视频（app.tasks.trending_tasks 计算）
+"""
+
+import json
+import logging
+from datetime import datetime
+
+from app.core.config import settings
+from app.db.redis import get_redis_aioredis_client
+from app.models.redis.trending import TRENDING_HOUR_FORMAT, trending_top_key, trending_views_key, trending_watch_key
+
+logger = logging.getLogger(__name__)
+
+
+async def record_view_event(video_id: int, watch_duration: int = 0, timestamp: datetime | None = None) -> None:
+    """观看计数加一，Redis 出错只记录日志（观看记录已写入 MongoDB，可由 --backfill 补齐）"""
+    hour = (timestamp or datetime.utcnow()).strftime(TRENDING_HOUR_FORMAT)
+    ttl = (settings.TRENDING_MAX_DAYS + 1) * 24 * 3600
+    try:
+        redis = await get_redis_aioredis_client()
+        pipe = redis.pipeline(transaction=False)
+        pipe.hincrby(trending_views_key(hour), video_id, 1)
+        pipe.expire(trending_views_key(hour), ttl)
+        if watch_duration:
+            pipe.hincrby(trending_watch_key(hour), video_id, int(watch_duration))
+            pipe.expire(trending_watch_key(hour), ttl)
+        await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Failed to record view event of video {video_id}: {e}")
+
+
+async def get_trending_videos(days: int, limit: int) -> list[dict] | None:
+    """读取已发布的热门视频；尚未计算或 Redis 不可用时返回 None"""
+    try:
+        redis = await get_redis_aioredis_client()
+        published = await redis.get(trending_top_key(days))
+    except Exception as e:
+        logger.warning(f"Trending videos unavailable: {e}")
+        return None
+    if published is None:
+        return None
+    return json.loads(published)[:limit]
@@ -14,6 +14,15 @@ from app.crud.comment.comment import (
 from app.schemas.comment.comment import CommentCreate, CommentOut, CommentListResponse
 from app.models.mysql.comment import Comment
 from app.models.mysql.video import Video
+from app.services.user.user_card import get_user_card_loader
+from app.services.video.feed_cache import refresh_video_in_feeds
+
+
+def _comment_user(card: dict | None) -> dict | None:
+    """评论者卡片中评论需要的字段"""
+    if card is None:
+        return None
+    return {"id": card["id"], "username": card["username"], "profile_picture": card["profile_picture"]}
 
 
 async def create_video_comment(
@@ -24,6 +33,7 @@ async def create_video_comment(
     """创建视频评论"""
     # 创建评论
     comment = await create_comment(db, comment_data, user_id)
+    await refresh_video_in_feeds(db, comment.video_id)
     
     # 获取回复数量（只对一级评论计算）
     reply_count = 0
@@ -37,11 +47,7 @@ async def create_video_comment(
         like_count=comment.like_count,
         dislike_count=comment.dislike_count,
         created_at=comment.created_at,
-        user={
-            "id": comment.user.id,
-            "username": comment.user.username,
-            "profile_picture": comment.user.profile_picture
-        },
+        user=_comment_user(await get_user_card_loader(db).load(comment.user_id)),
         parent_id=comment.parent_id,
         reply_count=reply_count
     )
@@ -53,13 +59,15 @@ async def get_video_comment_list(
     page: int = 1,
     size: int = 20,
     parent_id: Optional[int] = None,
-    order: str = "latest"
+    order: str = "latest",
+    with_total: bool = True,
 ) -> CommentListResponse:
-    """获取视频评论列表"""
+    """获取视频评论列表（with_total=False 时不统计总数）"""
     skip = (page - 1) * size
-    total, comments = await get_video_comments(db, video_id, skip, size, parent_id, order)
+    total, comments = await get_video_comments(db, video_id, skip, size, parent_id, order, with_total)
     
     # 组装评论列表
+    users = await get_user_card_loader(db).load_many([comment.user_id for comment in comments])
     items = []
     for comment in comments:
         # 获取回复数量（对所有评论都计算）
@@ -71,11 +79,7 @@ async def get_video_comment_list(
             like_count=comment.like_count,
             dislike_count=comment.dislike_count,
             created_at=comment.created_at,
-            user={
-                "id": comment.user.id,
-                "username": comment.user.username,
-                "profile_picture": comment.user.profile_picture
-            },
+            user=_comment_user(users.get(comment.user_id)),
             parent_id=comment.parent_id,
             reply_count=reply_count
         )
@@ -117,16 +121,27 @@ async def delete_user_comment(
     user_id: int
 ) -> bool:
     """删除用户评论"""
-    return await delete_comment(db, comment_id, user_id) 
+    comment = await db.get(Comment, comment_id)
+    deleted = await delete_comment(db, comment_id, user_id)
+    if deleted:
+        await refresh_video_in_feeds(db, comment.video_id)
+    return deleted
+
+
+def _collect_comment_user_ids(comments, user_ids: set) -> set:
+    for comment in comments:
+        user_ids.add(comment.user_id)
+        _collect_comment_user_ids(getattr(comment, 'children', []), user_ids)
+    return user_ids
 
 
-async def build_comment_tree(comment) -> tuple:
-    """递归组装评论树并统计所有子评论数量"""
+async def build_comment_tree(comment, users: dict) -> tuple:
+    """递归组装评论树并统计所有子评论数量，users 为整棵树评论者的卡片"""
     children = getattr(comment, 'children', [])
     reply_count = 0
     children_out = []
     for child in children:
-        child_out, child_reply_count = await build_comment_tree(child)
+        child_out, child_reply_count = await build_comment_tree(child, users)
         children_out.append(child_out)
         reply_count += 1 + child_reply_count
     comment_out = {
@@ -135,11 +150,7 @@ async def build_comment_tree(comment) -> tuple:
         "like_count": comment.like_count,
         "dislike_count": comment.dislike_count,
         "created_at": comment.created_at,
-        "user": {
-            "id": comment.user.id,
-            "username": comment.user.username,
-            "profile_picture": comment.user.profile_picture
-        },
+        "user": _comment_user(users.get(comment.user_id)),
         "parent_id": comment.parent_id,
         "reply_count": reply_count,
         "children": children_out
@@ -150,9 +161,11 @@ async def build_comment_tree(comment) -> tuple:
 async def get_video_comment_tree(db: AsyncSession, video_id: int) -> list:
     """获取视频评论树"""
     comments = await get_comment_tree(db, video_id, None)
+    # 整棵树的评论者一次加载
+    users = await get_user_card_loader(db).load_many(_collect_comment_user_ids(comments, set()))
     tree = []
     for comment in comments:
-        comment_out, _ = await build_comment_tree(comment)
+        comment_out, _ = await build_comment_tree(comment, users)
         tree.append(comment_out)
     return tree
 
@@ -166,4 +179,7 @@ async def delete_comment_service(db: AsyncSession, comment_id: int, user_id: int
     video = await db.get(Video, comment.video_id)
     if not video:
         return False
-    return await delete_comment_with_permission(db, comment_id, user_id, video.uploader_id) 
\ No newline at end of file
+    deleted = await delete_comment_with_permission(db, comment_id, user_id, video.uploader_id)
+    if deleted:
+        await refresh_video_in_feeds(db, video.id)
+    return deleted
\ No newline at end of file
@@ -11,6 +11,7 @@ from app.crud.interaction.collection import (
     get_video_collect_count
 )
 from app.services.analytics.analytics import log_user_behavior, update_video_analytics
+from app.services.video.feed_cache import refresh_video_in_feeds
 
 
 async def toggle_video_like_service(
@@ -21,6 +22,7 @@ async def toggle_video_like_service(
     """切换视频点赞状态"""
     is_liked = await toggle_video_like(db, video_id, user_id)
     like_count = await get_video_like_count(db, video_id)
+    await refresh_video_in_feeds(db, video_id)
     
     # 记录用户行为到MongoDB（异步）
     try:
@@ -0,0 +1,4 @@
+from .probe import *
+from .blob import *
+from .thumbnail import *
+from .cover import *
@@ -0,0 +1,110 @@
+"""
+内容寻址媒体存储
+
+上传的文件按内容 sha256 存放，相同内容只保存一份；调用方拿到的相对路径
+直接写入 Video.file_path / cover_image / User.profile_picture。
+引用数的增减与业务记录在同一个事务中提交。
+"""
+
+import asyncio
+import hashlib
+import os
+
+from fastapi import UploadFile, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.media.blob import acquire_blob
+from app.storage import get_storage
+from app.storage.blob import blob_relative_path, blob_tmp_full_path, place_blob
+from app.storage.local import save_file_to_local, hash_local_file
+from app.utils.file_validator import IngestValidator
+
+
+async def save_upload_as_blob(db: AsyncSession, file: UploadFile, validator: IngestValidator) -> str:
+    """
+    流式保存上传文件并登记到内容寻址存储。类型嗅探、大小限制、摘要计算与写盘在同一次遍历中完成。
+
+    Args:
+        db: 异步数据库会话（调用方负责提交）
+        file: 上传文件
+        validator: 流式校验器，决定允许的类型和大小上限；扩展名按嗅探出的真实类型确定
+
+    Returns:
+        str: 文件相对路径（内容已存在时为已有文件的路径）
+
+    Raises:
+        HTTPException: 文件类型不符或超出大小限制
+    """
+    tmp_full_path = blob_tmp_full_path()
+    try:
+        digest, size = await save_file_to_local(file, tmp_full_path, validator)
+        relative_path = await acquire_blob(db, digest, size, blob_relative_path(digest, validator.ext))
+        await place_blob(get_storage(), tmp_full_path, relative_path)
+    finally:
+        if os.path.exists(tmp_full_path):
+            os.remove(tmp_full_path)
+    return relative_path
+
+
+async def adopt_local_file_as_blob(db: AsyncSession, full_path: str, ext: str) -> str:
+    """
+    把已经落盘的文件（如分片上传完成的视频）移入内容寻址存储。
+
+    Returns:
+        str: 文件相对路径（内容已存在时原文件会被删除，返回已有文件的路径）
+    """
+    digest, size = await asyncio.to_thread(hash_local_file, full_path)
+    relative_path = await acquire_blob(db, digest, size, blob_relative_path(digest, ext))
+    await place_blob(get_storage(), full_path, relative_path)
+    return relative_path
+
+
+async def adopt_stored_object_as_blob(
+        db: AsyncSession,
+        key: str,
+        validator: IngestValidator,
+        expected_size: int,
+        expected_digest: str,
+) -> str:
+    """
+    把客户端直传到存储后端的暂存对象校验后移入内容寻址存储。
+    文件头嗅探、大小限制与摘要计算在一次流式读取中完成；对象存储之间的移动为服务端复制。
+
+    Args:
+        db: 异步数据库会话（调用方负责提交）
+        key: 暂存对象 key
+        validator: 流式校验器，扩展名按嗅探出的真实类型确定
+        expected_size: 客户端声明的字节数
+        expected_digest: 客户端声明的 sha256 十六进制摘要
+
+    Returns:
+        str: 文件相对路径（内容已存在时删除暂存对象，返回已有文件的路径）
+
+    Raises:
+        HTTPException: 对象不存在、大小或摘要与声明不符、文件类型不符（校验失败的暂存对象会被删除）
+    """
+    storage = get_storage()
+    stat = await storage.stat(key)
+    if stat is None:
+        raise HTTPException(status_code=400, detail="视频文件尚未上传")
+    try:
+        if stat.size != expected_size:
+            raise HTTPException(status_code=400, detail="视频文件大小与声明不一致")
+        hasher = hashlib.sha256()
+        async for chunk in storage.get_range(key, 0, stat.size - 1):
+            validator.feed(chunk)
+            hasher.update(chunk)
+        validator.finish()
+        digest = hasher.hexdigest()
+        if validator.size != expected_size or digest != expected_digest.lower():
+            raise HTTPException(status_code=400, detail="视频文件摘要校验失败")
+    except HTTPException:
+        await storage.delete(key)
+        raise
+
+    relative_path = await acquire_blob(db, digest, stat.size, blob_relative_path(digest, validator.ext))
+    if await storage.stat(relative_path) is None:
+        await storage.move(key, relative_path)
+    else:
+        await storage.delete(key)
+    return relative_path
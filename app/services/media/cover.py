@@ -0,0 +1,57 @@
+"""
+自动封面服务
+
+正常情况下自动封面由 Celery 任务链的 cover 阶段生成；这里供 broker 不可用、
+降级为直接发布时使用，挑帧在进程池中执行，不阻塞事件循环。
+"""
+
+import asyncio
+import logging
+import os
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import settings
+from app.services.media.blob import adopt_local_file_as_blob
+from app.services.media.thumbnail import generate_thumbnails
+from app.storage import get_storage
+from app.storage.blob import blob_tmp_full_path
+from app.utils.media.keyframe import extract_cover_frame
+from app.utils.process_pool import run_in_process_pool
+
+logger = logging.getLogger(__name__)
+
+
+async def extract_stored_cover(db: AsyncSession, video_relative_path: str, duration: int | None) -> str | None:
+    """
+    从存储中的视频挑选最佳关键帧作为封面，存入内容寻址存储并生成缩略图。
+
+    Returns:
+        str | None: 封面相对路径（随 db 一起提交），失败返回 None
+    """
+    storage = get_storage()
+    cover_tmp_path = blob_tmp_full_path(".jpg")
+    video_path = storage.local_path(video_relative_path)
+    downloaded = None
+    try:
+        if video_path is None:
+            downloaded = video_path = blob_tmp_full_path(os.path.splitext(video_relative_path)[-1])
+            await storage.download(video_relative_path, video_path)
+        await run_in_process_pool(
+            extract_cover_frame, video_path, cover_tmp_path, settings.COVER_SAMPLE_FRAMES, min(1.0, (duration or 0) / 2),
+            timeout=settings.MEDIA_PROBE_TIMEOUT,
+        )
+        cover_relative_path = await adopt_local_file_as_blob(db, cover_tmp_path, ".jpg")
+    except asyncio.TimeoutError:
+        logger.warning(f"Cover extraction timed out after {settings.MEDIA_PROBE_TIMEOUT}s: {video_relative_path}")
+        return None
+    except Exception as e:
+        logger.warning(f"Cover extraction failed for {video_relative_path}: {e}")
+        return None
+    finally:
+        for path in (cover_tmp_path, downloaded):
+            if path and os.path.exists(path):
+                os.remove(path)
+
+    await generate_thumbnails(db, cover_relative_path, settings.cover_thumb_widths)
+    return cover_relative_path
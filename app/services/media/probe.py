@@ -0,0 +1,86 @@
+"""
+媒体探测服务
+
+在有界进程池中执行 OpenCV 探测，事件循环只负责等待结果；
+探测失败或超时时返回兜底信息，不影响上传主流程。
+"""
+
+import asyncio
+import logging
+import os
+
+from app.core import settings
+from app.storage import get_storage
+from app.storage.blob import blob_tmp_full_path
+from app.utils.media.probe import probe_video_file
+from app.utils.process_pool import run_in_process_pool
+
+logger = logging.getLogger(__name__)
+
+# 限制同时提交到进程池的探测任务数，避免大量上传时排队任务无限堆积；
+# 超时的探测在子进程中结束前仍占用名额
+_probe_semaphore: asyncio.Semaphore | None = None
+
+
+def _get_probe_semaphore() -> asyncio.Semaphore:
+    global _probe_semaphore
+    if _probe_semaphore is None:
+        _probe_semaphore = asyncio.Semaphore(settings.MEDIA_PROBE_CONCURRENCY)
+    return _probe_semaphore
+
+
+def fallback_media_info() -> dict:
+    """探测失败时的兜底信息：时长记为 0，其余字段留空"""
+    return {
+        "duration": 0,
+        "fps": None,
+        "width": None,
+        "height": None,
+        "codec": None,
+        "bitrate": None,
+    }
+
+
+async def probe_media(full_path: str) -> dict:
+    """
+    异步获取视频元信息（时长、帧率、分辨率、编码、码率）。
+
+    Args:
+        full_path: 视频文件完整路径
+
+    Returns:
+        dict: 可直接展开到 VideoCreate 的媒体信息字段
+    """
+    try:
+        return await run_in_process_pool(
+            probe_video_file,
+            full_path,
+            timeout=settings.MEDIA_PROBE_TIMEOUT,
+            semaphore=_get_probe_semaphore(),
+        )
+    except asyncio.TimeoutError:
+        logger.warning(f"Media probe timed out after {settings.MEDIA_PROBE_TIMEOUT}s: {full_path}")
+    except Exception as e:
+        logger.warning(f"Media probe failed for {full_path}: {e}")
+    return fallback_media_info()
+
+
+async def probe_stored_media(relative_path: str) -> dict:
+    """
+    探测存储后端中的视频：本地存储直接探测原文件，对象存储先下载到临时文件。
+    """
+    storage = get_storage()
+    local_path = storage.local_path(relative_path)
+    if local_path is not None:
+        return await probe_media(local_path)
+
+    tmp_path = blob_tmp_full_path(os.path.splitext(relative_path)[-1])
+    try:
+        await storage.download(relative_path, tmp_path)
+        return await probe_media(tmp_path)
+    except Exception as e:
+        logger.warning(f"Failed to fetch {relative_path} for probing: {e}")
+        return fallback_media_info()
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
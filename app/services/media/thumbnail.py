@@ -0,0 +1,126 @@
+"""
+封面 / 头像缩略图服务
+
+图片存入内容寻址存储后，在进程池中按配置的宽度档位生成 WebP（或 JPEG）缩略图，
+路径由源文件摘要和宽度唯一确定；已生成的档位记录在 media_blobs.thumbnails，
+列表接口按整页一次查询已有档位，缺少的档位回退到原图，由 media.thumbnails 任务补生成。
+"""
+
+import asyncio
+import logging
+import os
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import settings
+from app.crud.media.blob import get_blob_thumbnails, record_blob_thumbnails
+from app.storage import get_storage
+from app.storage.base import StorageBackend
+from app.storage.blob import blob_tmp_full_path, thumbnail_relative_path, thumbnail_variant, THUMBNAIL_EXTS
+from app.utils.media.thumbnail import make_thumbnails
+from app.utils.process_pool import run_in_process_pool
+
+logger = logging.getLogger(__name__)
+
+
+async def ensure_thumbnails(
+        storage: StorageBackend,
+        relative_path: str,
+        widths: list[int],
+        square: bool = False,
+        in_process_pool: bool = True,
+) -> set[str]:
+    """
+    为存储中的图片生成缺少的缩略图档位（已存在的档位跳过，相同内容只生成一次）。
+
+    Args:
+        storage: 存储后端
+        relative_path: 源图片相对路径（内容寻址存储中的路径）
+        widths: 宽度档位（格式取 THUMBNAIL_FORMAT）
+        square: 是否居中裁剪为正方形（头像）
+        in_process_pool: 是否在进程池中生成（API 进程）；False 时在线程中生成（已在 Celery worker 中）
+
+    Returns:
+        set[str]: 存储中已有的档位（thumbnail_variant），生成失败的档位不在其中
+    """
+    fmt = settings.THUMBNAIL_FORMAT
+    present, missing = set(), []
+    for width in widths:
+        thumb_path = thumbnail_relative_path(relative_path, width, fmt)
+        if thumb_path is None:
+            return set()
+        if await storage.stat(thumb_path) is None:
+            missing.append((width, thumb_path))
+        else:
+            present.add(thumbnail_variant(width, fmt))
+    if not missing:
+        return present
+
+    outputs = [(width, blob_tmp_full_path(THUMBNAIL_EXTS[fmt])) for width, _ in missing]
+    src_path = storage.local_path(relative_path)
+    downloaded = None
+    try:
+        if src_path is None:
+            downloaded = src_path = blob_tmp_full_path(os.path.splitext(relative_path)[-1])
+            await storage.download(relative_path, src_path)
+        args = (make_thumbnails, src_path, outputs, fmt, settings.THUMBNAIL_QUALITY, square)
+        if in_process_pool:
+            await run_in_process_pool(*args, timeout=settings.THUMBNAIL_TIMEOUT)
+        else:
+            await asyncio.to_thread(*args)
+        for (width, thumb_path), (_, tmp_path) in zip(missing, outputs):
+            await storage.put_file(thumb_path, tmp_path)
+            present.add(thumbnail_variant(width, fmt))
+    except asyncio.TimeoutError:
+        logger.warning(f"Thumbnail generation timed out after {settings.THUMBNAIL_TIMEOUT}s: {relative_path}")
+    except Exception as e:
+        logger.warning(f"Thumbnail generation failed for {relative_path}: {e}")
+    finally:
+        for _, tmp_path in outputs:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        if downloaded and os.path.exists(downloaded):
+            os.remove(downloaded)
+    return present
+
+
+async def generate_thumbnails(db: AsyncSession, relative_path: str, widths: list[int], square: bool = False) -> bool:
+    """
+    生成缩略图并把已有档位记录到 media_blobs.thumbnails（随 db 一起提交）。
+
+    Returns:
+        bool: 是否全部生成成功（源图片无法解析、超时等返回 False）
+    """
+    variants = await ensure_thumbnails(get_storage(), relative_path, widths, square)
+    await record_blob_thumbnails(db, relative_path, variants)
+    fmt = settings.THUMBNAIL_FORMAT
+    return all(thumbnail_variant(width, fmt) in variants for width in widths)
+
+
+async def load_thumbnail_variants(db: AsyncSession, paths) -> dict[str, set[str]]:
+    """批量查询图片已生成的缩略图档位，供 cover_variant / avatar_variant 使用（一次查询）"""
+    return await get_blob_thumbnails(db, paths)
+
+
+def _pick_variant(source: str | None, variants: set[str] | None, widths: list[int], large: bool) -> str | None:
+    """按偏好顺序取第一个已生成的档位；都没有（生成失败、档位或格式已调整但尚未补生成）时返回原图"""
+    if not source or not variants:
+        return source
+    fmt = settings.THUMBNAIL_FORMAT
+    for width in (reversed(widths) if large else widths):
+        if thumbnail_variant(width, fmt) in variants:
+            return thumbnail_relative_path(source, width, fmt) or source
+    return source
+
+
+def cover_variant(cover_image: str | None, variants: set[str] | None, large: bool = False) -> str | None:
+    """
+    列表卡片使用最小档封面，详情页使用最大档；variants 为 load_thumbnail_variants 查到的已生成档位，
+    旧数据（不在内容寻址存储中）或没有可用档位时返回原图。
+    """
+    return _pick_variant(cover_image, variants, settings.cover_thumb_widths, large)
+
+
+def avatar_variant(profile_picture: str | None, variants: set[str] | None, large: bool = False) -> str | None:
+    """头像缩略图，规则同 cover_variant（默认头像返回原路径）"""
+    return _pick_variant(profile_picture, variants, settings.avatar_thumb_widths, large)
@@ -2,7 +2,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.crud.user.follow import toggle_follow, is_following, get_fans_count, get_following_count, get_following_list, get_fans_list
 
 async def toggle_follow_service(db: AsyncSession, user_id: int, followed_user_id: int) -> bool:
-    return await toggle_follow(db, user_id, followed_user_id)
+    # 延迟导入：app.services.video 会导入本模块
+    from app.services.video.timeline import update_timeline_on_follow
+    followed = await toggle_follow(db, user_id, followed_user_id)
+    await update_timeline_on_follow(db, user_id, followed_user_id, followed)
+    return followed
 
 async def is_following_service(db: AsyncSession, user_id: int, followed_user_id: int) -> bool:
     return await is_following(db, user_id, followed_user_id)
@@ -13,8 +17,8 @@ async def get_fans_count_service(db: AsyncSession, user_id: int) -> int:
 async def get_following_count_service(db: AsyncSession, user_id: int) -> int:
     return await get_following_count(db, user_id)
 
-async def get_following_list_service(db, user_id, page, size, search=None, order='desc', current_user_id=None):
-    return await get_following_list(db, user_id, page, size, search, order, current_user_id)
+async def get_following_list_service(db, user_id, page, size, search=None, order='desc', current_user_id=None, with_total=True):
+    return await get_following_list(db, user_id, page, size, search, order, current_user_id, with_total)
 
-async def get_fans_list_service(db, user_id, page, size, search=None, current_user_id=None):
-    return await get_fans_list(db, user_id, page, size, search, current_user_id) 
\ No newline at end of file
+async def get_fans_list_service(db, user_id, page, size, search=None, current_user_id=None, with_total=True):
+    return await get_fans_list(db, user_id, page, size, search, current_user_id, with_total) 
\ No newline at end of file
@@ -1,26 +1,24 @@
-import os
-from uuid import uuid4
-from fastapi import UploadFile
+from fastapi import UploadFile, HTTPException
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core import settings
 from app.crud.video import count_user_videos
 from app.models.mysql.user import User
 from app.crud.user.user import update_user_profile_picture, check_password, update_password
 from app.schemas.user.profile import UserProfileResponse
-from app.utils.file_validator import validate_image
-from app.storage.local import save_file_to_local
+from app.utils.file_validator import image_ingest_validator
+from app.services.media.blob import save_upload_as_blob
+from app.services.media.thumbnail import generate_thumbnails
+from app.crud.media.blob import release_blobs
 from app.services.user.follow_service import get_following_count_service, get_fans_count_service
+from app.services.user.user_card import invalidate_user_card
 from datetime import datetime, timezone
 
-# 用户头像存储目录（相对于MEDIA_ROOT）
-AVATAR_DIR = os.path.join(settings.MEDIA_ROOT, "avatars")
-
 async def save_user_avatar(db: AsyncSession, file: UploadFile, user_id: int) -> str:
     """
     校验上传文件是否为合法图片并保存为用户头像。
-    - 验证文件类型和大小
-    - 生成唯一文件名
-    - 保存文件到本地存储路径
+    - 边写入边校验文件头类型和大小
+    - 按内容摘要保存到内容寻址存储，并生成正方形缩略图
     - 更新用户数据库中的头像路径字段（相对路径）
 
     Args:
@@ -31,18 +29,17 @@ async def save_user_avatar(db: AsyncSession, file: UploadFile, user_id: int) ->
     Returns:
         str: 头像相对路径
     """
-    validate_image(file)  # 校验上传文件是否合法（类型、大小）
-
-    # 生成唯一文件名，格式：user_{user_id}_{uuid}.jpg
-    filename = f"user_{user_id}_{uuid4().hex}.jpg"
-    relative_path = os.path.join(AVATAR_DIR, filename)  # 存储时用相对路径
-    full_path = os.path.join(f"{settings.media_root_abs}/avatars", filename)  # 绝对路径
-
-    # 异步保存文件到本地磁盘
-    await save_file_to_local(file, full_path)
+    # 按内容摘要保存，相同图片只存一份；释放旧头像的引用（默认头像不在存储中，会被忽略；
+    # 重复上传同一张图片时先加后减，引用数不变）
+    old_path = await db.scalar(select(User.profile_picture).where(User.id == user_id))
+    relative_path = await save_upload_as_blob(db, file, image_ingest_validator())
+    if not await generate_thumbnails(db, relative_path, settings.avatar_thumb_widths, square=True):
+        raise HTTPException(status_code=400, detail="头像图片无法解析")
+    await release_blobs(db, [old_path])
 
     # 更新数据库用户头像字段，存储相对路径
     await update_user_profile_picture(db=db, user_id=user_id, path=relative_path)
+    await invalidate_user_card(db, user_id)
 
     return relative_path
 
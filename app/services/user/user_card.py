@@ -0,0 +1,96 @@
+"""
+用户卡片（列表中的上传者、评论者）的批量加载
+
+    user:card:{user_id}   String  {"id", "username", "unique_id", "profile_picture"}（JSON）
+
+列表接口先收集整页（含评论树所有层级）的用户 ID，再调用一次 load_many：
+请求内已加载过的直接复用，其余一次 MGET 读取共享缓存，缓存未命中的一次查询 MySQL（只查卡片需要的列）并回填。
+加载器保存在数据库会话的 info 中，与会话同为请求级；Redis 不可用时直接查询 MySQL。
+"""
+
+import json
+import logging
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.crud.user.user import get_user_cards
+from app.db.redis import get_redis_aioredis_client
+from app.models.redis.user import user_card_key
+
+logger = logging.getLogger(__name__)
+
+_LOADER_KEY = "user_card_loader"
+
+
+class UserCardLoader:
+    """请求级的用户卡片加载器，同一请求内每个用户只加载一次"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        # 用户 ID -> 卡片；None 表示用户不存在
+        self._cards: dict[int, dict | None] = {}
+
+    async def load_many(self, user_ids) -> dict[int, dict]:
+        """批量加载用户卡片，返回 {用户 ID: 卡片}（不存在的用户不在结果中）"""
+        missing = list(dict.fromkeys(user_id for user_id in user_ids if user_id is not None and user_id not in self._cards))
+        if missing:
+            await self._fetch(missing)
+        return {user_id: self._cards[user_id] for user_id in user_ids if self._cards.get(user_id) is not None}
+
+    async def load(self, user_id: int) -> dict | None:
+        return (await self.load_many([user_id])).get(user_id)
+
+    def forget(self, user_id: int) -> None:
+        self._cards.pop(user_id, None)
+
+    async def _fetch(self, user_ids: list[int]) -> None:
+        redis = None
+        try:
+            redis = await get_redis_aioredis_client()
+            cached = await redis.mget([user_card_key(user_id) for user_id in user_ids])
+            for user_id, card in zip(user_ids, cached):
+                if card:
+                    self._cards[user_id] = json.loads(card)
+        except Exception as e:
+            logger.warning(f"User card cache unavailable: {e}")
+            redis = None
+
+        missing = [user_id for user_id in user_ids if user_id not in self._cards]
+        if not missing:
+            return
+        cards = await get_user_cards(self.db, missing)
+        for card in cards:
+            self._cards[card["id"]] = card
+        for user_id in missing:
+            self._cards.setdefault(user_id, None)
+
+        if redis is not None and cards:
+            try:
+                pipe = redis.pipeline(transaction=False)
+                for card in cards:
+                    pipe.set(user_card_key(card["id"]), json.dumps(card, ensure_ascii=False), ex=settings.USER_CARD_TTL_SECONDS)
+                await pipe.execute()
+            except Exception as e:
+                logger.warning(f"Failed to cache user cards: {e}")
+
+
+def get_user_card_loader(db: AsyncSession) -> UserCardLoader:
+    """取当前请求（数据库会话）的加载器，没有时创建"""
+    loader = db.info.get(_LOADER_KEY)
+    if loader is None:
+        loader = db.info[_LOADER_KEY] = UserCardLoader(db)
+    return loader
+
+
+async def invalidate_user_card(db: AsyncSession, user_id: int) -> None:
+    """
+    用户名、头像修改后删除卡片缓存，Redis 出错只记录日志（缓存随过期时间失效）。
+    视频列表卡片（feed:card）不缓存上传者的用户名，读取时从这里的卡片填充，无需逐个删除。
+    """
+    get_user_card_loader(db).forget(user_id)
+    try:
+        redis = await get_redis_aioredis_client()
+        await redis.delete(user_card_key(user_id))
+    except Exception as e:
+        logger.warning(f"Failed to invalidate user card {user_id}: {e}")
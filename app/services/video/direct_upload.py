@@ -0,0 +1,125 @@
+"""
+预签名直传上传服务
+
+视频字节不经过 API 进程：
+1. init：客户端声明文件名、类型、总大小和 sha256，服务端在 Redis 中创建直传会话，
+   返回指向暂存 key（MEDIA_ROOT/incoming/）的短期预签名上传地址
+   （对象存储为 S3 预签名 PUT，本地存储为带 HMAC 签名的媒体端点地址）
+2. 客户端把文件原始字节直接 PUT 到该地址
+3. complete：服务端校验暂存对象的大小、文件头类型和摘要，移入内容寻址存储，
+   写入视频记录并投递后台处理任务
+
+过期未完成的暂存对象由媒体清理任务回收。
+"""
+
+import os
+from uuid import uuid4
+from fastapi import UploadFile, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import settings
+from app.models.mysql.video import Video
+from app.db.redis import get_redis_aioredis_client
+from app.models.redis.upload import direct_upload_key, upload_lock_key
+from app.schemas.video import DirectUploadInitRequest, DirectUploadOut
+from app.storage import get_storage
+from app.storage.blob import incoming_relative_path
+from app.utils.file_validator import validate_video_meta, video_ingest_validator
+from app.services.media.blob import adopt_stored_object_as_blob
+from app.services.video.video import save_user_cover, register_uploaded_video
+from app.services.video.upload_session import UPLOAD_LOCK_EXPIRE_SECONDS
+
+
+async def _load_direct_session(redis, upload_id: str, user_id: int) -> dict:
+    """读取直传会话并校验归属"""
+    session = await redis.hgetall(direct_upload_key(upload_id))
+    if not session:
+        raise HTTPException(status_code=404, detail="上传会话不存在或已过期")
+    if int(session["user_id"]) != user_id:
+        raise HTTPException(status_code=403, detail="无权限操作该上传会话")
+    return session
+
+
+async def init_direct_upload(user_id: int, req: DirectUploadInitRequest) -> DirectUploadOut:
+    """
+    创建预签名直传会话。
+
+    Args:
+        user_id: 上传用户ID
+        req: 初始化请求体（标题、描述、文件名、类型、总大小、sha256）
+
+    Returns:
+        DirectUploadOut: 预签名上传地址
+    """
+    validate_video_meta(req.filename, req.content_type, req.total_size, settings.VIDEO_MAX_SIZE_MB)
+
+    upload_id = uuid4().hex
+    key = incoming_relative_path(upload_id, os.path.splitext(req.filename)[-1])
+    expires_in = settings.DIRECT_UPLOAD_EXPIRE_SECONDS
+    try:
+        upload_url = await get_storage().presign(key, expires_in, method="PUT")
+    except ValueError as e:
+        raise HTTPException(status_code=503, detail=f"直传上传不可用：{e}")
+
+    session = {
+        "user_id": user_id,
+        "title": req.title,
+        "description": req.description,
+        "total_size": req.total_size,
+        "sha256": req.sha256.lower(),
+        "key": key,
+    }
+    redis = await get_redis_aioredis_client()
+    redis_key = direct_upload_key(upload_id)
+    await redis.hset(redis_key, mapping=session)
+    await redis.expire(redis_key, expires_in)
+
+    return DirectUploadOut(upload_id=upload_id, upload_url=upload_url, method="PUT", expires_in=expires_in)
+
+
+async def complete_direct_upload(
+        db: AsyncSession,
+        user_id: int,
+        upload_id: str,
+        cover_file: UploadFile | None,
+) -> Video:
+    """
+    完成直传：校验暂存对象的大小和摘要，保存封面（可选），写入视频记录并投递后台处理任务。
+    校验失败时暂存对象被删除，客户端可在地址过期前重新上传后再次完成；
+    校验通过后写入视频记录失败时会话被删除，需要重新发起上传。
+
+    Returns:
+        Video: 新建的视频记录
+    """
+    redis = await get_redis_aioredis_client()
+    session = await _load_direct_session(redis, upload_id, user_id)
+
+    # 防止重复提交的完成请求各自创建一条视频记录
+    lock_key = upload_lock_key(upload_id)
+    if not await redis.set(lock_key, 1, nx=True, ex=UPLOAD_LOCK_EXPIRE_SECONDS):
+        raise HTTPException(status_code=409, detail="该上传正在处理，请稍后查询")
+
+    try:
+        video_relative_path = await adopt_stored_object_as_blob(
+            db,
+            session["key"],
+            video_ingest_validator(settings.VIDEO_MAX_SIZE_MB),
+            int(session["total_size"]),
+            session["sha256"],
+        )
+        try:
+            cover_relative_path = await save_user_cover(db, cover_file)
+            video = await register_uploaded_video(
+                db, user_id, session["title"], session["description"], video_relative_path, cover_relative_path
+            )
+        except Exception:
+            # 暂存对象已移入内容寻址存储，会话无法再次完成：回滚未提交的引用（文件由清理任务回收），
+            # 删除会话，重试时返回 404，由客户端重新发起上传
+            await db.rollback()
+            await redis.delete(direct_upload_key(upload_id))
+            raise
+        await redis.delete(direct_upload_key(upload_id))
+    finally:
+        await redis.delete(lock_key)
+
+    return video
@@ -0,0 +1,327 @@
+"""
+视频列表缓存：热门 / 最新 / 推荐列表的 Redis 有序集合索引
+
+    feed:index:{feed}   ZSET    member 为补零的视频 ID，score 为排序键（hot_score / 发布时间戳 / 观看数）
+    feed:card:{id}      String  视频卡片 JSON（不含上传者的用户名，读取时从用户卡片填充）
+
+分页只访问 Redis：按 score 倒序取一页视频 ID（同分时补零 ID 的字典序倒序即 ID 倒序），
+再用一次 MGET 取出卡片；只有缺失的卡片和索引重建才查询 MySQL。
+
+视频发布、删除、点赞、评论、观看后增量更新索引中的分数并删除卡片；
+索引带过期标记，过期后由下一次请求投递后台任务（feed.rebuild_index）从 MySQL 整体重建，兜底增量更新的遗漏。
+重建写入独立的临时 key，期间的增量更新记录在 feed:index:{feed}:dirty 中，替换正式索引前后各重放一次。
+Redis 不可用或索引正在首次构建时返回 None，由调用方回退到 MySQL 分页。
+"""
+
+import asyncio
+import json
+import logging
+from uuid import uuid4
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud.video.video import get_video_cards_by_ids, published_video_conditions
+from app.db.redis import get_redis_aioredis_client, get_redis_sync_client
+from app.models.mysql.video import Video
+from app.models.redis.feed import (
+    feed_card_key,
+    feed_index_dirty_key,
+    feed_index_key,
+    feed_index_lock_key,
+    feed_index_ready_key,
+    feed_index_tmp_key,
+    feed_member,
+)
+from app.services.user.user_card import get_user_card_loader
+from app.utils.pagination import decode_cursor, encode_cursor
+
+logger = logging.getLogger(__name__)
+
+# 各列表在有序集合中的分数
+FEED_SCORES = {
+    "hot": lambda row: float(row.hot_score or 0),
+    "latest": lambda row: row.created_at.timestamp() if row.created_at else 0.0,
+    "recommend": lambda row: float(row.view_count or 0),
+}
+FEED_INDEX_COLUMNS = (Video.id, Video.created_at, Video.view_count, Video.hot_score)
+
+REBUILD_BATCH_SIZE = 1000
+# 重建锁的有效期，重建过程中每批续期；投递失败时锁到期后才会再次投递
+REBUILD_LOCK_SECONDS = 300
+
+# 正在重建（持有重建锁）时把视频记入待重放集合
+_RECORD_DIRTY_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    redis.call('SADD', KEYS[2], ARGV[1])
+    redis.call('EXPIRE', KEYS[2], ARGV[2])
+end
+"""
+
+
+def _cursor_feed(feed: str) -> str:
+    # 与 MySQL 分页的游标区分开，Redis 不可用时 MySQL 分页会拒绝这里的游标
+    return f"z:{feed}"
+
+
+def _visible_row_statement(video_id: int):
+    return select(*FEED_INDEX_COLUMNS).where(Video.id == video_id, *published_video_conditions())
+
+
+def _queue_video_update(pipe, video_id: int, row):
+    """
+    把单个视频的索引更新加入 pipeline：不可见（row 为 None）时从各索引移除，否则更新分数；卡片一律删除。
+    索引正在重建时同时记入待重放集合，避免更新只写到即将被替换的旧索引中。
+    """
+    member = feed_member(video_id)
+    for feed, score in FEED_SCORES.items():
+        if row is None:
+            pipe.zrem(feed_index_key(feed), member)
+        else:
+            pipe.zadd(feed_index_key(feed), {member: score(row)})
+        pipe.eval(
+            _RECORD_DIRTY_SCRIPT, 2, feed_index_lock_key(feed), feed_index_dirty_key(feed), member, REBUILD_LOCK_SECONDS
+        )
+    pipe.delete(feed_card_key(video_id))
+
+
+async def refresh_video_in_feeds(db: AsyncSession, video_id: int) -> None:
+    """视频发布、删除或计数变化后调用（数据库修改已提交），Redis 出错只记录日志"""
+    if not settings.FEED_CACHE_ENABLED:
+        return
+    row = (await db.execute(_visible_row_statement(video_id))).first()
+    try:
+        redis = await get_redis_aioredis_client()
+        pipe = redis.pipeline(transaction=False)
+        _queue_video_update(pipe, video_id, row)
+        await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Failed to update feed index for video {video_id}: {e}")
+
+
+def refresh_video_in_feeds_sync(session: Session, video_id: int) -> None:
+    """refresh_video_in_feeds 的同步版本，供 Celery 任务使用"""
+    if not settings.FEED_CACHE_ENABLED:
+        return
+    row = session.execute(_visible_row_statement(video_id)).first()
+    try:
+        pipe = get_redis_sync_client().pipeline(transaction=False)
+        _queue_video_update(pipe, video_id, row)
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"Failed to update feed index for video {video_id}: {e}")
+
+
+def _replay_dirty_videos(session: Session, redis, feed: str, target_key: str) -> int:
+    """按 MySQL 当前状态重放待重放集合中的视频到 target_key，返回重放的视频数"""
+    dirty_key = feed_index_dirty_key(feed)
+    score = FEED_SCORES[feed]
+    replayed = 0
+    while True:
+        members = redis.spop(dirty_key, REBUILD_BATCH_SIZE)
+        if not members:
+            return replayed
+        # 结束之前的读事务，读取最新提交的数据
+        session.rollback()
+        video_ids = [int(member) for member in members]
+        rows = {row.id: row for row in session.execute(
+            select(*FEED_INDEX_COLUMNS).where(Video.id.in_(video_ids), *published_video_conditions())
+        )}
+        pipe = redis.pipeline(transaction=False)
+        for video_id in video_ids:
+            row = rows.get(video_id)
+            if row is None:
+                pipe.zrem(target_key, feed_member(video_id))
+            else:
+                pipe.zadd(target_key, {feed_member(video_id): score(row)})
+        pipe.execute()
+        replayed += len(video_ids)
+
+
+def rebuild_feed_index_sync(session: Session, redis, feed: str) -> int:
+    """
+    按主键分批把已发布视频写入本次重建独有的临时 key，重放重建期间的变更后原子替换正式索引，
+    再重放一次替换前写入旧索引的变更。由 feed.rebuild_index 任务调用，返回索引中的视频数。
+    """
+    key = feed_index_key(feed)
+    lock_key = feed_index_lock_key(feed)
+    tmp_key = feed_index_tmp_key(feed, uuid4().hex)
+    score = FEED_SCORES[feed]
+    # 持有锁期间的增量更新会记入待重放集合；此前的变更已提交，扫描时能读到
+    redis.set(lock_key, 1, ex=REBUILD_LOCK_SECONDS)
+    redis.delete(feed_index_dirty_key(feed))
+    session.rollback()
+    total = 0
+    try:
+        last_id = 0
+        while True:
+            rows = session.execute(
+                select(*FEED_INDEX_COLUMNS)
+                .where(Video.id > last_id, *published_video_conditions())
+                .order_by(Video.id)
+                .limit(REBUILD_BATCH_SIZE)
+            ).all()
+            if not rows:
+                break
+            pipe = redis.pipeline(transaction=False)
+            pipe.zadd(tmp_key, {feed_member(row.id): score(row) for row in rows})
+            # 重建进程中途退出时临时 key 随之过期
+            pipe.expire(tmp_key, REBUILD_LOCK_SECONDS)
+            pipe.expire(lock_key, REBUILD_LOCK_SECONDS)
+            pipe.execute()
+            last_id = rows[-1].id
+            total += len(rows)
+
+        _replay_dirty_videos(session, redis, feed, tmp_key)
+        pipe = redis.pipeline(transaction=True)
+        if redis.exists(tmp_key):
+            pipe.rename(tmp_key, key)
+            pipe.persist(key)
+        else:
+            pipe.delete(key)
+        pipe.execute()
+        _replay_dirty_videos(session, redis, feed, key)
+        redis.set(feed_index_ready_key(feed), 1, ex=settings.FEED_INDEX_REBUILD_SECONDS)
+    finally:
+        redis.delete(tmp_key, lock_key)
+    logger.info(f"Rebuilt feed index {feed}: {total} videos")
+    return total
+
+
+async def _ensure_index(redis, feed: str) -> bool:
+    """
+    索引过期时投递后台重建任务（同一时间只投递一次），重建完成前继续使用旧索引；
+    没有旧索引（首次构建）时返回 False，由调用方回退到 MySQL 分页。
+    """
+    if await redis.exists(feed_index_ready_key(feed)):
+        return True
+    if await redis.set(feed_index_lock_key(feed), 1, nx=True, ex=REBUILD_LOCK_SECONDS):
+        from app.tasks.feed_tasks import enqueue_feed_index_rebuild
+
+        # apply_async 是同步网络调用；投递失败时保留锁，到期后再由请求重新投递
+        await asyncio.to_thread(enqueue_feed_index_rebuild, feed)
+    return bool(await redis.exists(feed_index_key(feed)))
+
+
+async def _page_entries(redis, feed: str, page: int, size: int, cursor_values) -> list[tuple[str, float]]:
+    """取一页（多取一条用于判断是否还有下一页）的 (member, score)"""
+    key = feed_index_key(feed)
+    if cursor_values is None:
+        start = (page - 1) * size
+        return await redis.zrevrange(key, start, start + size, withscores=True)
+
+    score, video_id = cursor_values
+    member = feed_member(video_id)
+    pipe = redis.pipeline(transaction=False)
+    pipe.zrevrank(key, member)
+    pipe.zscore(key, member)
+    rank, current = await pipe.execute()
+    if rank is not None and current == score:
+        # 游标所在的视频仍在原位置：从它的下一名开始
+        return await redis.zrevrange(key, rank + 1, rank + 1 + size, withscores=True)
+
+    # 游标所在的视频已移出或分数已变：从 (游标分数, 游标 ID) 之后继续。
+    # 包含与游标同分的视频，跳过其中 ID 不小于游标的（它们排在游标之前，已经返回过）
+    entries, offset = [], 0
+    while len(entries) <= size:
+        batch = await redis.zrevrangebyscore(key, score, "-inf", start=offset, num=size + 1, withscores=True)
+        entries.extend((m, s) for m, s in batch if s < score or m < member)
+        if len(batch) <= size:
+            break
+        offset += len(batch)
+    return entries[:size + 1]
+
+
+async def load_video_cards(db: AsyncSession, redis, video_ids: list[int]) -> list[dict]:
+    """
+    一次 MGET 取卡片，缺失的一次性从 MySQL 加载并回填；已不可见的视频从索引中移除。
+    上传者的用户名、唯一 ID 每次从用户卡片（修改资料后即失效）填充，不随视频卡片缓存。
+    """
+    if not video_ids:
+        return []
+    cached = await redis.mget([feed_card_key(video_id) for video_id in video_ids])
+    cards = {video_id: json.loads(card) for video_id, card in zip(video_ids, cached) if card}
+
+    missing = [video_id for video_id in video_ids if video_id not in cards]
+    if missing:
+        from app.services.media.thumbnail import load_thumbnail_variants
+        from app.services.video.video import video_to_dict
+
+        videos = await get_video_cards_by_ids(db, missing, *published_video_conditions())
+        variants = await load_thumbnail_variants(db, [video.cover_image for video in videos])
+        pipe = redis.pipeline(transaction=False)
+        for video in videos:
+            card = jsonable_encoder(video_to_dict(video, None, variants.get(video.cover_image)))
+            cards[video.id] = card
+            pipe.set(feed_card_key(video.id), json.dumps(card, ensure_ascii=False), ex=settings.FEED_CARD_TTL_SECONDS)
+        stale = [feed_member(video_id) for video_id in missing if video_id not in cards]
+        if stale:
+            for feed in FEED_SCORES:
+                pipe.zrem(feed_index_key(feed), *stale)
+        await pipe.execute()
+
+    uploaders = await get_user_card_loader(db).load_many([card["uploader_id"] for card in cards.values()])
+    items = []
+    for video_id in video_ids:
+        card = cards.get(video_id)
+        if card is None:
+            continue
+        uploader = uploaders.get(card["uploader_id"], {})
+        items.append({**card, "uploader_username": uploader.get("username"), "uploader_unique_id": uploader.get("unique_id")})
+    return items
+
+
+async def get_cached_feed_page(
+        db: AsyncSession,
+        feed: str,
+        page: int,
+        size: int,
+        cursor: str | None = None,
+        with_total: bool | None = None,
+) -> dict | None:
+    """
+    从 Redis 索引分页读取视频列表。
+
+    Args:
+        feed: hot / latest / recommend
+        page: 页码（传入 cursor 时忽略）
+        cursor: 上一页返回的 next_cursor
+        with_total: 是否返回总数（ZCARD），默认页码分页返回、游标分页不返回
+
+    Returns:
+        dict | None: {"total", "items"（卡片字典）, "next_cursor"}；缓存不可用时返回 None
+    """
+    if not settings.FEED_CACHE_ENABLED:
+        return None
+    cursor_values = None
+    if cursor:
+        try:
+            cursor_values = decode_cursor(_cursor_feed(feed), cursor, 2)
+        except HTTPException:
+            # MySQL 分页产生的游标，继续由 MySQL 分页
+            return None
+    if with_total is None:
+        with_total = cursor is None
+
+    try:
+        redis = await get_redis_aioredis_client()
+        if not await _ensure_index(redis, feed):
+            return None
+        entries = await _page_entries(redis, feed, page, size, cursor_values)
+        total = await redis.zcard(feed_index_key(feed)) if with_total else None
+        has_more = len(entries) > size
+        entries = entries[:size]
+        items = await load_video_cards(db, redis, [int(member) for member, _ in entries])
+    except Exception as e:
+        logger.warning(f"Feed cache {feed} unavailable, fallback to MySQL: {e}")
+        return None
+
+    next_cursor = None
+    if has_more:
+        member, score = entries[-1]
+        next_cursor = encode_cursor(_cursor_feed(feed), [score, int(member)])
+    return {"total": total, "items": items, "next_cursor": next_cursor}
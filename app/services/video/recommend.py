@@ -0,0 +1,79 @@
+"""
+个性化推荐：用用户最近的点赞、收藏、观看记录，在离线构建的相似视频列表（rec:item:{video_id}）上打分
+
+    score(c) = Σ 权重(h) × 相似度(h, c)，h 为用户最近互动过的视频
+
+一次 pipeline 取出所有历史视频的近邻，打分在进程内完成，卡片复用列表缓存；
+没有互动记录、相似度尚未构建或 Redis 不可用时返回热门推荐列表。
+"""
+
+import logging
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.redis import get_redis_aioredis_client
+from app.models.mysql.collection import Collection
+from app.models.mysql.like import Like
+from app.models.mysql.watch_history import WatchHistory
+from app.models.redis.recommend import item_neighbors_key
+from app.services.video.feed_cache import load_video_cards
+from app.utils.recommend import INTERACTION_WEIGHTS, score_candidates
+
+logger = logging.getLogger(__name__)
+
+
+async def get_user_history_weights(db: AsyncSession, user_id: int) -> dict[int, float]:
+    """用户最近互动过的视频及权重（同一视频多种互动权重相加）"""
+    limit = settings.RECOMMEND_HISTORY_ITEMS
+    sources = (
+        (Like.video_id, Like.user_id, Like.created_at, INTERACTION_WEIGHTS["like"]),
+        (Collection.video_id, Collection.user_id, Collection.created_at, INTERACTION_WEIGHTS["collect"]),
+        (WatchHistory.video_id, WatchHistory.user_id, WatchHistory.last_watch_at, INTERACTION_WEIGHTS["watch"]),
+    )
+    history: dict[int, float] = {}
+    for video_column, user_column, time_column, weight in sources:
+        result = await db.execute(
+            select(video_column).where(user_column == user_id).order_by(time_column.desc()).limit(limit)
+        )
+        for video_id in result.scalars().all():
+            history[video_id] = history.get(video_id, 0.0) + weight
+    return history
+
+
+async def _rank_candidates(db: AsyncSession, redis, user_id: int) -> list[tuple[int, float]]:
+    history = await get_user_history_weights(db, user_id)
+    if not history:
+        return []
+    pipe = redis.pipeline(transaction=False)
+    for video_id in history:
+        pipe.zrevrange(item_neighbors_key(video_id), 0, settings.RECOMMEND_NEIGHBORS - 1, withscores=True)
+    neighbor_lists = {
+        video_id: [(int(member), score) for member, score in neighbors]
+        for video_id, neighbors in zip(history, await pipe.execute())
+    }
+    return score_candidates(history, neighbor_lists, settings.RECOMMEND_MAX_CANDIDATES)
+
+
+async def get_personal_recommendations(db: AsyncSession, user_id: int, page: int, size: int = 20) -> dict:
+    """
+    分页获取个性化推荐视频。
+
+    Returns:
+        dict: {"total"（可翻页的候选数）, "items", "next_cursor"（固定为 None）, "personalized"}
+    """
+    try:
+        redis = await get_redis_aioredis_client()
+        ranked = await _rank_candidates(db, redis, user_id)
+        if ranked:
+            start = (page - 1) * size
+            items = await load_video_cards(db, redis, [video_id for video_id, _ in ranked[start:start + size]])
+            return {"total": len(ranked), "items": items, "next_cursor": None, "personalized": True}
+    except Exception as e:
+        logger.warning(f"Personal recommendation unavailable for user {user_id}: {e}")
+
+    from app.services.video.video import get_recommended_videos
+
+    data = await get_recommended_videos(db, page=page, size=size)
+    return {**data, "personalized": False}
@@ -0,0 +1,170 @@
+"""
+视频搜索：标题、描述的全文检索，BM25 排序（app.utils.search）
+
+    search:index:version   String  当前索引版本（search_index_dir 下的子目录）
+    search:changes         ZSET    视频 ID -> 变更序号
+    search:changes:seq     String  变更序号
+
+索引由 app.tasks.search_tasks 全量构建到磁盘，每个 API 进程以 mmap 方式加载（多个进程共享页缓存）。
+视频发布、删除时记录变更，各进程最多每 SEARCH_SYNC_INTERVAL_SECONDS 秒按序号取一次新的变更，
+从 MySQL 读取这些视频的标题、描述更新内存中的增量；发现新版本时重新加载。
+索引尚未构建或无法加载时按标题 LIKE 查询 MySQL。
+"""
+
+import asyncio
+import logging
+import os
+import time
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.crud.video.video import get_search_documents, get_video_cards_by_ids, published_video_conditions
+from app.db.redis import get_redis_aioredis_client, get_redis_sync_client
+from app.models.mysql.video import Video
+from app.models.redis.search import SEARCH_CHANGE_SEQ_KEY, SEARCH_CHANGES_KEY, SEARCH_INDEX_VERSION_KEY
+from app.services.analytics.analytics import record_search_query
+from app.services.video.feed_cache import load_video_cards
+from app.utils.search import InvertedIndex, load_segment
+
+logger = logging.getLogger(__name__)
+
+# 变更序号与变更记录原子写入，避免并发写入时序号小的记录晚于序号大的记录出现
+_RECORD_CHANGE_SCRIPT = """
+local seq = redis.call('INCR', KEYS[1])
+redis.call('ZADD', KEYS[2], seq, ARGV[1])
+return seq
+"""
+
+
+class _IndexState:
+    """当前进程加载的索引"""
+
+    def __init__(self):
+        self.index: InvertedIndex | None = None
+        self.version: str | None = None
+        self.seq = 0  # 已应用的最大变更序号
+        self.synced_at = 0.0
+        self.lock = asyncio.Lock()
+
+
+_state = _IndexState()
+
+
+def open_search_index(path: str) -> tuple[InvertedIndex, dict]:
+    """加载磁盘上的索引（阻塞调用）"""
+    segment, meta = load_segment(path)
+    index = InvertedIndex(
+        segment,
+        k1=settings.SEARCH_BM25_K1,
+        b=settings.SEARCH_BM25_B,
+        title_weight=settings.SEARCH_TITLE_WEIGHT,
+        description_chars=settings.SEARCH_DESCRIPTION_CHARS,
+    )
+    return index, meta
+
+
+async def record_search_change(video_id: int) -> None:
+    """视频发布、删除或标题描述修改后调用，Redis 出错只记录日志（由下一次全量重建修正）"""
+    try:
+        redis = await get_redis_aioredis_client()
+        await redis.eval(_RECORD_CHANGE_SCRIPT, 2, SEARCH_CHANGE_SEQ_KEY, SEARCH_CHANGES_KEY, video_id)
+    except Exception as e:
+        logger.warning(f"Failed to record search change of video {video_id}: {e}")
+
+
+def record_search_change_sync(video_id: int) -> None:
+    """record_search_change 的同步版本，供 Celery 任务使用"""
+    try:
+        get_redis_sync_client().eval(_RECORD_CHANGE_SCRIPT, 2, SEARCH_CHANGE_SEQ_KEY, SEARCH_CHANGES_KEY, video_id)
+    except Exception as e:
+        logger.warning(f"Failed to record search change of video {video_id}: {e}")
+
+
+async def _apply_changes(db: AsyncSession, index: InvertedIndex, video_ids: list[int]) -> None:
+    documents = await get_search_documents(db, video_ids)
+    for video_id in video_ids:
+        index.remove(video_id)
+    for video_id, title, description in documents:
+        index.add(video_id, title, description)
+
+
+async def _current_index(db: AsyncSession) -> InvertedIndex | None:
+    """当前进程的索引，超过同步间隔时先加载新版本、应用新的变更"""
+    state = _state
+    if state.index is not None and time.monotonic() - state.synced_at < settings.SEARCH_SYNC_INTERVAL_SECONDS:
+        return state.index
+    async with state.lock:
+        if time.monotonic() - state.synced_at < settings.SEARCH_SYNC_INTERVAL_SECONDS:
+            return state.index
+        try:
+            redis = await get_redis_aioredis_client()
+            version = await redis.get(SEARCH_INDEX_VERSION_KEY)
+            if version and version != state.version:
+                index, meta = await asyncio.to_thread(open_search_index, os.path.join(settings.search_index_dir, version))
+                state.index, state.version, state.seq = index, version, meta["seq"]
+                logger.info(f"Search index {version} loaded: {len(index)} videos")
+            if state.index is not None:
+                changes = await redis.zrangebyscore(SEARCH_CHANGES_KEY, f"({state.seq}", "+inf", withscores=True)
+                if changes:
+                    await _apply_changes(db, state.index, [int(member) for member, _ in changes])
+                    state.seq = int(max(seq for _, seq in changes))
+        except Exception as e:
+            logger.warning(f"Search index sync failed: {e}")
+        state.synced_at = time.monotonic()
+        return state.index
+
+
+async def _search_titles(db: AsyncSession, query: str, limit: int) -> tuple[int, list[int]]:
+    """索引不可用时按标题子串查询（新视频在前）"""
+    result = await db.execute(
+        select(Video.id)
+        .where(Video.title.contains(query, autoescape=True), *published_video_conditions())
+        .order_by(Video.id.desc())
+        .limit(limit)
+    )
+    video_ids = list(result.scalars().all())
+    return len(video_ids), video_ids
+
+
+async def _load_cards(db: AsyncSession, video_ids: list[int]) -> list:
+    try:
+        redis = await get_redis_aioredis_client()
+        return await load_video_cards(db, redis, video_ids)
+    except Exception as e:
+        logger.warning(f"Feed card cache unavailable for search: {e}")
+
+    from app.services.video.video import videos_to_dicts
+
+    cards = {card.id: card for card in await get_video_cards_by_ids(db, video_ids, *published_video_conditions())}
+    return await videos_to_dicts(db, [cards[video_id] for video_id in video_ids if video_id in cards])
+
+
+async def search_videos(db: AsyncSession, query: str, page: int, size: int = 20, user_id: int | None = None) -> dict:
+    """
+    分页搜索视频（只返回对外可见的视频），登录用户记录搜索历史。
+
+    Returns:
+        dict: {"total"（可翻页的结果数，最多 SEARCH_MAX_RESULTS）, "items", "next_cursor"（固定为 None）}
+    """
+    query = query.strip()
+    if not query:
+        return {"total": 0, "items": [], "next_cursor": None}
+    if user_id:
+        try:
+            await record_search_query(user_id, query)
+        except Exception as e:
+            logger.warning(f"Failed to record search history of user {user_id}: {e}")
+
+    start = (page - 1) * size
+    limit = min(start + size, settings.SEARCH_MAX_RESULTS)
+    index = await _current_index(db)
+    if index is not None:
+        total, ranked = index.search(query, limit)
+        video_ids = [video_id for video_id, _ in ranked[start:]]
+    else:
+        total, video_ids = await _search_titles(db, query, settings.SEARCH_MAX_RESULTS)
+        video_ids = video_ids[start:limit]
+    items = await _load_cards(db, video_ids)
+    return {"total": min(total, settings.SEARCH_MAX_RESULTS), "items": items, "next_cursor": None}
@@ -0,0 +1,141 @@
+"""
+用户已观看视频的布隆过滤器：推荐 / 热门 / 最新列表去掉登录用户看过的视频
+
+    seen:{user_id}          String  位图（SEEN_FILTER_CAPACITY 个视频、SEEN_FILTER_ERROR_RATE 误判率）
+    seen:{user_id}:count    String  自上次重建以来加入的视频数
+    seen:{user_id}:ready    String  已从观看记录构建的标记
+    seen:saturated          Set     加入数超过容量、等待重建的用户
+
+观看（log_video_view）和打开详情时写入；游标翻页读取列表时一条 BITFIELD 命令检查整页视频。
+过滤器只会误判“看过”，不会漏掉看过的视频；超过容量后误判率上升，由定期任务按最近的观看记录重建。
+Redis 不可用时不做过滤。
+"""
+
+import logging
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.crud.history.watch_history import get_recent_watched_video_ids
+from app.db.redis import get_redis_aioredis_client
+from app.models.redis.seen import SEEN_FILTER_SATURATED_KEY, seen_filter_count_key, seen_filter_key, seen_filter_ready_key
+from app.utils.bloom import bloom_offsets, bloom_size
+
+logger = logging.getLogger(__name__)
+
+
+def _offsets(video_ids) -> list[list[int]]:
+    bits, hashes = bloom_size(settings.SEEN_FILTER_CAPACITY, settings.SEEN_FILTER_ERROR_RATE)
+    return [bloom_offsets(video_id, bits, hashes) for video_id in video_ids]
+
+
+def seen_filter_set_args(video_ids) -> list:
+    """BITFIELD 置位参数（SET u1 offset 1 ...），同步重建任务共用"""
+    args = []
+    for offsets in _offsets(video_ids):
+        for offset in offsets:
+            args += ["SET", "u1", offset, 1]
+    return args
+
+
+def _queue_add(pipe, user_id: int, video_ids) -> None:
+    pipe.execute_command("BITFIELD", seen_filter_key(user_id), *seen_filter_set_args(video_ids))
+    pipe.expire(seen_filter_key(user_id), settings.SEEN_FILTER_TTL_SECONDS)
+
+
+async def mark_videos_seen(user_id: int, video_ids: list[int]) -> None:
+    """把视频加入用户的过滤器，Redis 出错只记录日志"""
+    if not settings.SEEN_FILTER_ENABLED or not video_ids:
+        return
+    try:
+        redis = await get_redis_aioredis_client()
+        pipe = redis.pipeline(transaction=False)
+        _queue_add(pipe, user_id, video_ids)
+        pipe.incrby(seen_filter_count_key(user_id), len(video_ids))
+        pipe.expire(seen_filter_count_key(user_id), settings.SEEN_FILTER_TTL_SECONDS)
+        # 构建标记与位图一起续期，否则标记先过期后会重复加入观看记录；尚未构建时不存在，不受影响
+        pipe.expire(seen_filter_ready_key(user_id), settings.SEEN_FILTER_TTL_SECONDS)
+        count = (await pipe.execute())[2]
+        if count > settings.SEEN_FILTER_CAPACITY:
+            await redis.sadd(SEEN_FILTER_SATURATED_KEY, user_id)
+    except Exception as e:
+        logger.warning(f"Failed to update seen filter of user {user_id}: {e}")
+
+
+async def _ensure_seen_filter(db: AsyncSession, redis, user_id: int) -> None:
+    """过滤器尚未构建（新用户或已过期）时加入最近的观看记录；只置位不清空，不会丢掉刚写入的视频"""
+    if await redis.exists(seen_filter_ready_key(user_id)):
+        return
+    video_ids = await get_recent_watched_video_ids(db, user_id, settings.SEEN_FILTER_CAPACITY // 2)
+    pipe = redis.pipeline(transaction=False)
+    if video_ids:
+        _queue_add(pipe, user_id, video_ids)
+        pipe.incrby(seen_filter_count_key(user_id), len(video_ids))
+        pipe.expire(seen_filter_count_key(user_id), settings.SEEN_FILTER_TTL_SECONDS)
+    pipe.set(seen_filter_ready_key(user_id), 1, ex=settings.SEEN_FILTER_TTL_SECONDS)
+    await pipe.execute()
+
+
+async def get_seen_video_ids(db: AsyncSession, user_id: int, video_ids: list[int]) -> set[int]:
+    """video_ids 中（可能）已看过的视频"""
+    if not video_ids:
+        return set()
+    redis = await get_redis_aioredis_client()
+    await _ensure_seen_filter(db, redis, user_id)
+    offsets = _offsets(video_ids)
+    args = []
+    for item_offsets in offsets:
+        for offset in item_offsets:
+            args += ["GET", "u1", offset]
+    flags = await redis.execute_command("BITFIELD", seen_filter_key(user_id), *args)
+    seen = set()
+    position = 0
+    for video_id, item_offsets in zip(video_ids, offsets):
+        if all(flags[position:position + len(item_offsets)]):
+            seen.add(video_id)
+        position += len(item_offsets)
+    return seen
+
+
+def _item_id(item) -> int:
+    return item["id"] if isinstance(item, dict) else item.id
+
+
+async def drop_seen_videos(
+        db: AsyncSession,
+        user_id: int | None,
+        fetch,
+        page: int,
+        size: int,
+        cursor: str | None = None,
+        with_total: bool | None = None,
+) -> dict:
+    """
+    取一页列表并去掉已看过的视频；不满一页时沿 next_cursor 补取缺少的条数（最多 SEEN_FILTER_MAX_ROUNDS 次）。
+    每次补取的视频全部消费，next_cursor 始终指向最后检查过的视频，翻页不会跳过未看过的视频。
+
+    只过滤游标分页的请求：页码分页的下一页从固定偏移开始，会与补取的视频重复，total 也无法扣除看过的视频，
+    因此原样返回。
+
+    Args:
+        fetch: async (page, size, cursor, with_total) -> {"total", "items", "next_cursor"}
+    """
+    data = await fetch(page, size, cursor, with_total)
+    if not user_id or not cursor or not settings.SEEN_FILTER_ENABLED:
+        return data
+
+    total = data["total"]
+    items = []
+    rounds = 0
+    while True:
+        try:
+            seen = await get_seen_video_ids(db, user_id, [_item_id(item) for item in data["items"]])
+        except Exception as e:
+            logger.warning(f"Seen filter unavailable for user {user_id}: {e}")
+            seen = set()
+        items += [item for item in data["items"] if _item_id(item) not in seen]
+        rounds += 1
+        if len(items) >= size or not data["next_cursor"] or rounds >= settings.SEEN_FILTER_MAX_ROUNDS:
+            break
+        data = await fetch(page, size - len(items), data["next_cursor"], False)
+    return {"total": total, "items": items, "next_cursor": data["next_cursor"]}
@@ -0,0 +1,133 @@
+"""
+关注时间线：每个用户一个 Redis 有序集合，保存关注的用户最近发布的视频
+
+    timeline:{user_id}          ZSET    member 为补零的视频 ID，score 为视频 ID
+    timeline:{user_id}:ready    String  已从 MySQL 完整构建的标记
+    timeline:pull_creators      Set     粉丝过多、不做写扩散的创作者（粉丝数回落后移出）
+
+视频发布后写入粉丝的时间线（app.tasks.feed_tasks.fanout_video），读取时与拉取集合中
+已关注创作者的最新视频合并，再用视频卡片缓存填充。
+关注 / 取关时把对方最近的视频写入 / 移出时间线；时间线之外的更早视频和 Redis 不可用时回退到 MySQL。
+"""
+
+import logging
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.crud.user.follow import get_followed_ids_among
+from app.crud.video.video import get_following_video_ids, get_following_video_list, get_recent_video_ids_by_uploader
+from app.db.redis import get_redis_aioredis_client
+from app.models.redis.feed import TIMELINE_PULL_CREATORS_KEY, feed_member, timeline_key, timeline_ready_key
+from app.services.video.feed_cache import load_video_cards
+from app.utils.pagination import decode_cursor, encode_cursor
+
+logger = logging.getLogger(__name__)
+
+TIMELINE_CURSOR_FEED = "following"
+
+
+async def _ensure_timeline(db: AsyncSession, redis, user_id: int) -> None:
+    """时间线未构建或已过期时从 MySQL 取最新的 TIMELINE_MAX_ITEMS 条重建"""
+    if await redis.exists(timeline_ready_key(user_id)):
+        return
+    video_ids = await get_following_video_ids(db, user_id, settings.TIMELINE_MAX_ITEMS)
+    key = timeline_key(user_id)
+    pipe = redis.pipeline(transaction=True)
+    pipe.delete(key)
+    if video_ids:
+        pipe.zadd(key, {feed_member(video_id): video_id for video_id in video_ids})
+        pipe.expire(key, settings.TIMELINE_TTL_SECONDS)
+    pipe.set(timeline_ready_key(user_id), 1, ex=settings.TIMELINE_TTL_SECONDS)
+    await pipe.execute()
+
+
+async def _pulled_video_ids(db: AsyncSession, redis, user_id: int, limit: int, before_id: int | None) -> list[int]:
+    """拉取集合中当前用户关注的创作者的最新视频"""
+    creators = {int(creator) for creator in await redis.smembers(TIMELINE_PULL_CREATORS_KEY)}
+    followed = await get_followed_ids_among(db, user_id, creators)
+    if not followed:
+        return []
+    return await get_following_video_ids(db, user_id, limit, before_id, list(followed))
+
+
+async def _read_timeline(db: AsyncSession, user_id: int, skip: int, size: int, before_id: int | None) -> dict | None:
+    need = skip + size + 1  # 多取一条用于判断是否还有下一页
+    if need > settings.TIMELINE_MAX_ITEMS:
+        return None
+    redis = await get_redis_aioredis_client()
+    await _ensure_timeline(db, redis, user_id)
+
+    key = timeline_key(user_id)
+    pipe = redis.pipeline(transaction=False)
+    pipe.zrevrangebyscore(key, f"({before_id}" if before_id else "+inf", "-inf", start=0, num=need)
+    pipe.zcard(key)
+    pushed, length = await pipe.execute()
+    if len(pushed) < need and length >= settings.TIMELINE_MAX_ITEMS:
+        # 已翻到截断的时间线末尾，更早的视频只在 MySQL 中
+        return None
+
+    pulled = await _pulled_video_ids(db, redis, user_id, need, before_id)
+    video_ids = sorted({int(member) for member in pushed} | set(pulled), reverse=True)[skip:need]
+    has_more = len(video_ids) > size
+    video_ids = video_ids[:size]
+
+    items = await load_video_cards(db, redis, video_ids)
+    visible = {item["id"] for item in items}
+    stale = [feed_member(video_id) for video_id in video_ids if video_id not in visible]
+    if stale:
+        await redis.zrem(key, *stale)
+
+    next_cursor = encode_cursor(TIMELINE_CURSOR_FEED, [video_ids[-1]]) if has_more else None
+    return {"total": None, "items": items, "next_cursor": next_cursor}
+
+
+async def get_following_timeline(
+        db: AsyncSession, user_id: int, page: int, size: int, cursor: str | None = None
+) -> dict:
+    """
+    关注的用户发布的视频，按发布先后（视频 ID）倒序。
+
+    Args:
+        page: 页码（传入 cursor 时忽略）
+        cursor: 上一页返回的 next_cursor
+
+    Returns:
+        dict: {"total"（固定为 None）, "items", "next_cursor"}
+    """
+    before_id = decode_cursor(TIMELINE_CURSOR_FEED, cursor, 1)[0] if cursor else None
+    skip = 0 if cursor else (page - 1) * size
+
+    try:
+        data = await _read_timeline(db, user_id, skip, size, before_id)
+        if data is not None:
+            return data
+    except Exception as e:
+        logger.warning(f"Timeline of user {user_id} unavailable, fallback to MySQL: {e}")
+
+    from app.services.video.video import videos_to_dicts
+
+    videos = await get_following_video_list(db, user_id, skip, size + 1, before_id)
+    next_cursor = encode_cursor(TIMELINE_CURSOR_FEED, [videos[size - 1].id]) if len(videos) > size else None
+    return {"total": None, "items": await videos_to_dicts(db, videos[:size]), "next_cursor": next_cursor}
+
+
+async def update_timeline_on_follow(db: AsyncSession, user_id: int, followed_user_id: int, followed: bool) -> None:
+    """关注后写入对方最近的视频，取关后移出；时间线尚未构建时无需处理，Redis 出错只记录日志"""
+    try:
+        redis = await get_redis_aioredis_client()
+        if not await redis.exists(timeline_ready_key(user_id)):
+            return
+        video_ids = await get_recent_video_ids_by_uploader(db, followed_user_id, settings.TIMELINE_MAX_ITEMS)
+        if not video_ids:
+            return
+        key = timeline_key(user_id)
+        pipe = redis.pipeline(transaction=False)
+        if followed:
+            pipe.zadd(key, {feed_member(video_id): video_id for video_id in video_ids})
+            pipe.zremrangebyrank(key, 0, -settings.TIMELINE_MAX_ITEMS - 1)
+        else:
+            pipe.zrem(key, *[feed_member(video_id) for video_id in video_ids])
+        await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Failed to update timeline of user {user_id}: {e}")
@@ -0,0 +1,202 @@
+"""
+分片断点续传上传服务
+
+协议：
+1. init：客户端声明文件名、类型、总大小，服务端在本地 MEDIA_ROOT/videos 下预分配暂存文件，
+   并在 Redis 中创建上传会话（记录已接收的偏移量）
+2. PUT chunk：客户端携带 offset 上传一段原始字节，offset 必须等于服务端已确认的偏移量，
+   字节直接写入暂存文件；第一个分片按文件头魔数校验真实类型
+3. 中断后客户端查询会话状态，从返回的 offset 继续上传
+4. complete：全部字节到齐后上传封面（可选），暂存文件按摘要存入存储后端（内容寻址），
+   此时才调用 create_video 写入数据库并投递后台处理任务
+"""
+
+import os
+from typing import AsyncIterator
+from uuid import uuid4
+from fastapi import UploadFile, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import settings
+from app.models.mysql.video import Video
+from app.db.redis import get_redis_aioredis_client
+from app.models.redis.upload import upload_session_key, upload_lock_key
+from app.schemas.video import UploadInitRequest, UploadSessionOut
+from app.storage.local import allocate_local_file, write_stream_to_local
+from app.utils.file_validator import validate_video_meta, video_ingest_validator
+from app.services.media.blob import adopt_local_file_as_blob
+from app.services.video.video import save_user_cover, register_uploaded_video
+
+# 分片写入锁的过期时间（秒），防止进程异常退出后锁无法释放
+UPLOAD_LOCK_EXPIRE_SECONDS = 300
+
+
+def _session_out(upload_id: str, session: dict, expires_in: int) -> UploadSessionOut:
+    return UploadSessionOut(
+        upload_id=upload_id,
+        offset=int(session["offset"]),
+        total_size=int(session["total_size"]),
+        chunk_size=settings.UPLOAD_CHUNK_MAX_SIZE,
+        expires_in=max(expires_in, 0),
+    )
+
+
+async def _load_session(redis, upload_id: str, user_id: int) -> dict:
+    """读取上传会话并校验归属"""
+    session = await redis.hgetall(upload_session_key(upload_id))
+    if not session:
+        raise HTTPException(status_code=404, detail="上传会话不存在或已过期")
+    if int(session["user_id"]) != user_id:
+        raise HTTPException(status_code=403, detail="无权限操作该上传会话")
+    return session
+
+
+async def init_upload_session(user_id: int, req: UploadInitRequest) -> UploadSessionOut:
+    """
+    创建分片上传会话，并在最终存储位置预分配空文件。
+
+    Args:
+        user_id: 上传用户ID
+        req: 初始化请求体（标题、描述、文件名、类型、总大小）
+
+    Returns:
+        UploadSessionOut: 上传会话状态
+    """
+    validate_video_meta(req.filename, req.content_type, req.total_size, settings.VIDEO_MAX_SIZE_MB)
+
+    upload_id = uuid4().hex
+    ext_video = os.path.splitext(req.filename)[-1].lower()
+    video_filename = f"video_{user_id}_{upload_id}{ext_video}"
+    video_relative_path = os.path.join(settings.MEDIA_ROOT, os.path.join("videos", video_filename))
+    video_full_path = os.path.join(settings.media_root_parent, video_relative_path)
+    await allocate_local_file(video_full_path)
+
+    session = {
+        "user_id": user_id,
+        "title": req.title,
+        "description": req.description,
+        "content_type": req.content_type,
+        "total_size": req.total_size,
+        "offset": 0,
+        "file_path": video_relative_path,
+    }
+    redis = await get_redis_aioredis_client()
+    key = upload_session_key(upload_id)
+    await redis.hset(key, mapping=session)
+    await redis.expire(key, settings.UPLOAD_SESSION_EXPIRE_SECONDS)
+
+    return _session_out(upload_id, session, settings.UPLOAD_SESSION_EXPIRE_SECONDS)
+
+
+async def get_upload_session(user_id: int, upload_id: str) -> UploadSessionOut:
+    """查询上传会话进度，客户端断线重连后据此续传"""
+    redis = await get_redis_aioredis_client()
+    session = await _load_session(redis, upload_id, user_id)
+    ttl = await redis.ttl(upload_session_key(upload_id))
+    return _session_out(upload_id, session, ttl)
+
+
+async def append_upload_chunk(
+        user_id: int,
+        upload_id: str,
+        offset: int,
+        stream: AsyncIterator[bytes],
+) -> UploadSessionOut:
+    """
+    将一个分片从 offset 处写入最终文件，并推进 Redis 中记录的偏移量。
+
+    Args:
+        user_id: 上传用户ID
+        upload_id: 上传会话ID
+        offset: 客户端声明的分片起始偏移量，必须等于服务端已确认的偏移量
+        stream: 请求体字节流
+
+    Returns:
+        UploadSessionOut: 写入后的会话状态
+    """
+    redis = await get_redis_aioredis_client()
+
+    # 同一会话同一时刻只允许一个分片写入（与完成请求互斥），会话在持有锁之后读取，偏移量不会过期
+    lock_key = upload_lock_key(upload_id)
+    if not await redis.set(lock_key, 1, nx=True, ex=UPLOAD_LOCK_EXPIRE_SECONDS):
+        raise HTTPException(status_code=409, detail="该上传会话有分片正在写入，请稍后重试")
+
+    try:
+        session = await _load_session(redis, upload_id, user_id)
+        current_offset = int(session["offset"])
+        total_size = int(session["total_size"])
+        if offset != current_offset:
+            raise HTTPException(status_code=409, detail=f"偏移量不匹配，服务端已接收 {current_offset} 字节")
+
+        full_path = os.path.join(settings.media_root_parent, session["file_path"])
+        max_bytes = min(settings.UPLOAD_CHUNK_MAX_SIZE, total_size - current_offset)
+        # 第一个分片携带文件头：嗅探真实容器类型，伪造的文件在第一个分片就被拒绝
+        validator = video_ingest_validator(settings.VIDEO_MAX_SIZE_MB) if offset == 0 else None
+        written = await write_stream_to_local(stream, full_path, offset, max_bytes, validator)
+
+        key = upload_session_key(upload_id)
+        session["offset"] = current_offset + written
+        await redis.hset(key, "offset", session["offset"])
+        await redis.expire(key, settings.UPLOAD_SESSION_EXPIRE_SECONDS)
+    finally:
+        await redis.delete(lock_key)
+
+    return _session_out(upload_id, session, settings.UPLOAD_SESSION_EXPIRE_SECONDS)
+
+
+async def complete_upload_session(
+        db: AsyncSession,
+        user_id: int,
+        upload_id: str,
+        cover_file: UploadFile | None,
+) -> Video:
+    """
+    完成分片上传：校验字节已全部到齐，保存封面（可选），写入视频记录并投递后台处理任务。
+    会话在移入内容寻址存储之前删除，重复提交的完成请求返回 404；之后写入视频记录失败时需要重新发起上传。
+
+    Returns:
+        Video: 新建的视频记录
+    """
+    redis = await get_redis_aioredis_client()
+
+    # 与分片写入互斥，防止重复提交的完成请求各自创建一条视频记录
+    lock_key = upload_lock_key(upload_id)
+    if not await redis.set(lock_key, 1, nx=True, ex=UPLOAD_LOCK_EXPIRE_SECONDS):
+        raise HTTPException(status_code=409, detail="该上传正在处理，请稍后查询")
+
+    try:
+        session = await _load_session(redis, upload_id, user_id)
+        if int(session["offset"]) != int(session["total_size"]):
+            raise HTTPException(status_code=400, detail="视频文件尚未上传完成")
+
+        # 认领会话：锁过期后到达的完成请求也只有一个能删除成功
+        if not await redis.delete(upload_session_key(upload_id)):
+            raise HTTPException(status_code=404, detail="上传会话不存在或已过期")
+
+        try:
+            cover_relative_path = await save_user_cover(db, cover_file)
+            # 分片写入的文件移入内容寻址存储（重复上传的内容直接复用已有文件）
+            video_full_path = os.path.join(settings.media_root_parent, session["file_path"])
+            ext_video = os.path.splitext(session["file_path"])[-1]
+            video_relative_path = await adopt_local_file_as_blob(db, video_full_path, ext_video)
+            video = await register_uploaded_video(
+                db, user_id, session["title"], session["description"], video_relative_path, cover_relative_path
+            )
+        except Exception:
+            # 回滚未提交的引用（已写入的文件由清理任务回收）
+            await db.rollback()
+            raise
+    finally:
+        await redis.delete(lock_key)
+
+    return video
+
+
+async def abort_upload_session(user_id: int, upload_id: str) -> None:
+    """放弃上传：删除会话及已写入的部分文件"""
+    redis = await get_redis_aioredis_client()
+    session = await _load_session(redis, upload_id, user_id)
+    full_path = os.path.join(settings.media_root_parent, session["file_path"])
+    if os.path.exists(full_path):
+        os.remove(full_path)
+    await redis.delete(upload_session_key(upload_id))
@@ -1,13 +1,18 @@
 import os
-import cv2
-from uuid import uuid4
-from fastapi import UploadFile
+import asyncio
+import logging
+from functools import partial
+from fastapi import UploadFile, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core import settings
-from app.utils.file_validator import validate_video, validate_image
-from app.storage.local import save_file_to_local
+from app.utils.file_validator import video_ingest_validator, image_ingest_validator
+from app.services.media.probe import probe_stored_media
+from app.services.media.blob import save_upload_as_blob
+from app.services.media.thumbnail import generate_thumbnails, load_thumbnail_variants, cover_variant, avatar_variant
+from app.services.media.cover import extract_stored_cover
+from app.crud.media.blob import release_blobs
 from app.schemas.video import VideoCreate, MyVideoListOut, RecommendVideoOut
-from app.crud.video import create_video, get_my_videos, get_recommend_video_list, get_video_by_id, get_latest_video_list, get_hot_video_list,delete_video
+from app.crud.video import VIDEO_CARD_COLUMNS, VideoCard, create_video, increment_video_view_count, invalidate_video_counts, get_my_videos, get_recommend_video_list, get_video_by_id, get_latest_video_list, get_hot_video_list,delete_video
 from app.crud.user.user import get_user_by_id
 from sqlalchemy import select, func
 from app.models.mysql.like import Like
@@ -15,155 +20,258 @@ from app.models.mysql.collection import Collection
 from app.models.mysql.comment import Comment
 from app.services.interaction.interaction import get_video_interaction_status
 from app.services.analytics.analytics import log_user_behavior, log_video_view, update_video_analytics
-from app.models.mysql.video import Video
+from app.models.mysql.video import Video, VideoStatusEnum
+from app.schemas.video import VideoProcessingOut
+from app.tasks.video_tasks import enqueue_video_processing
+from app.services.video.feed_cache import get_cached_feed_page, refresh_video_in_feeds
+from app.services.video.search import record_search_change
+from app.services.video.seen_filter import drop_seen_videos, mark_videos_seen
+from app.services.video.timeline import get_following_timeline
+from app.services.user.user_card import get_user_card_loader
+from app.tasks.feed_tasks import fanout_video
 from sqlalchemy.future import select
-from sqlalchemy.orm import joinedload
 from app.services.user.follow_service import is_following_service, get_fans_count_service
 from app.schemas.http.response import BizCode
 
+logger = logging.getLogger(__name__)
+
 # 视频文件存储目录
 VIDEO_DIR = os.path.join(settings.MEDIA_ROOT, "videos")
 # 视频封面存储目录
 COVER_DIR = os.path.join(settings.MEDIA_ROOT, "covers")
 
 
+async def save_user_cover(db: AsyncSession, cover_file: UploadFile | None) -> str | None:
+    """
+    校验并保存用户上传的封面（内容寻址存储 + 各档缩略图），随视频记录一起提交。
+
+    Returns:
+        str | None: 封面相对路径；未上传或图片无效时返回 None，由后台任务自动挑选关键帧作为封面
+    """
+    if cover_file is None or not cover_file.filename:
+        return None
+    try:
+        cover_relative_path = await save_upload_as_blob(db, cover_file, image_ingest_validator())
+    except HTTPException as e:
+        logger.info(f"Ignore invalid cover {cover_file.filename}: {e.detail}")
+        return None
+    if not await generate_thumbnails(db, cover_relative_path, settings.cover_thumb_widths):
+        # 无法解码的图片不作为封面，撤销刚登记的引用
+        await release_blobs(db, [cover_relative_path])
+        return None
+    return cover_relative_path
+
+
+async def register_uploaded_video(
+        db: AsyncSession,
+        uploader_id: int,
+        title: str,
+        description: str,
+        video_relative_path: str,
+        cover_relative_path: str | None,
+) -> Video:
+    """
+    视频文件落盘后写入 status=processing 的视频记录，并投递后台处理任务链
+    （探测、转码、封面、发布）。broker 不可用时降级为在进程池中探测（没有封面时挑选关键帧）后直接发布。
+
+    Returns:
+        Video: 新建的视频记录
+    """
+    video_data = VideoCreate(
+        title=title,
+        description=description,
+        file_path=video_relative_path,
+        cover_image=cover_relative_path,
+        status=VideoStatusEnum.PROCESSING,
+        processing_progress=0,
+    )
+    video = await create_video(db, video_data, uploader_id)
+
+    # apply_async 是同步网络调用（eager 模式下会执行整条任务链），放到线程中避免阻塞事件循环
+    if await asyncio.to_thread(enqueue_video_processing, video.id):
+        # eager 模式下任务链已在其他会话中修改了记录
+        await db.refresh(video)
+        return video
+
+    logger.warning(f"Video pipeline unavailable, publishing video {video.id} without transcoding")
+    media_info = await probe_stored_media(video_relative_path)
+    for key, value in media_info.items():
+        setattr(video, key, value)
+    if not video.cover_image:
+        video.cover_image = await extract_stored_cover(db, video_relative_path, video.duration)
+    video.status = VideoStatusEnum.PUBLISHED
+    video.processing_progress = 100
+    await db.commit()
+    await db.refresh(video)
+    await invalidate_video_counts(video.uploader_id)
+    await refresh_video_in_feeds(db, video.id)
+    await record_search_change(video.id)
+    try:
+        await asyncio.to_thread(fanout_video, video.id)
+    except Exception as e:
+        logger.warning(f"Timeline fanout failed for video {video.id}: {e}")
+    return video
+
+
 async def save_user_video(
         db: AsyncSession,
         video_file: UploadFile,
-        cover_file: UploadFile,
+        cover_file: UploadFile | None,
         uploader_id: int,
         title: str,
         description: str,
-) -> str:
+) -> Video:
     """
     校验上传的视频和封面文件，保存到本地并写入数据库。
-    同时使用 OpenCV 获取视频时长（秒）。
+    探测、转码等耗时处理交给后台任务链，接口立即返回 status=processing 的视频记录。
 
     Args:
         db: 异步数据库会话
         video_file: 上传的视频文件
-        cover_file: 上传的视频封面文件
+        cover_file: 上传的视频封面文件，可选
         uploader_id: 上传用户ID
         title: 视频标题
         description: 视频描述
 
     Returns:
-        str: 视频访问的完整URL路径
+        Video: 新建的视频记录
     """
-    # 校验视频文件和封面图片合法性
-    validate_video(video_file)
-    validate_image(cover_file)
-
-    # 生成视频文件名与路径
-    ext_video = os.path.splitext(video_file.filename)[-1]
-    video_filename = f"video_{uploader_id}_{uuid4().hex}{ext_video}"
-    video_relative_path = os.path.join(settings.MEDIA_ROOT,os.path.join("videos", video_filename))
-    video_full_path = os.path.join(settings.media_root_parent, video_relative_path)
-
-    # 生成封面文件名与路径
-    ext_cover = os.path.splitext(cover_file.filename)[-1]
-    cover_filename = f"cover_{uploader_id}_{uuid4().hex}{ext_cover}"
-    cover_relative_path = os.path.join(settings.MEDIA_ROOT,os.path.join("covers", cover_filename))
-    cover_full_path = os.path.join(settings.media_root_parent, cover_relative_path)
-
-    # 异步保存视频和封面到本地存储
-    await save_file_to_local(video_file, video_full_path)
-    await save_file_to_local(cover_file, cover_full_path)
-
-    # 使用OpenCV打开视频文件，获取帧率和帧数，计算时长（秒）
-    cap = cv2.VideoCapture(video_full_path)
-    if not cap.isOpened():
-        raise RuntimeError("无法打开视频文件")
-
-    fps = cap.get(cv2.CAP_PROP_FPS)
-    frame_count = cap.get(cv2.CAP_PROP_FRAME_COUNT)
-    duration = int(frame_count / fps) if fps > 0 else 0
-    cap.release()
-
-    # 构造数据库插入数据结构
-    video_data = VideoCreate(
-        title=title,
-        description=description,
-        file_path=video_relative_path,
-        cover_image=cover_relative_path,
-        duration=duration,
+    # 边写入边校验视频（文件头嗅探 + 大小限制），按内容摘要保存，相同内容只存一份；
+    # 封面可选，无效时由后台任务自动生成
+    video_relative_path = await save_upload_as_blob(db, video_file, video_ingest_validator(settings.VIDEO_MAX_SIZE_MB))
+    cover_relative_path = await save_user_cover(db, cover_file)
+
+    return await register_uploaded_video(
+        db, uploader_id, title, description, video_relative_path, cover_relative_path
     )
-    # 创建视频记录
-    await create_video(db, video_data, uploader_id)
 
-    # 返回视频URL路径
-    return f"{video_relative_path}"
+
+async def get_video_processing_status(db: AsyncSession, video_id: int, user_id: int) -> VideoProcessingOut | None:
+    """
+    查询视频后台处理进度（仅上传者本人可见）。
+    """
+    video = await get_video_by_id(db, video_id)
+    if not video or video.uploader_id != user_id:
+        return None
+    return VideoProcessingOut(
+        id=video.id,
+        status=video.status,
+        progress=video.processing_progress or 0,
+        error=video.processing_error,
+    )
 
 
-async def get_my_video_list(db: AsyncSession, user_id: int, page: int, size: int = 20):
+async def get_my_video_list(
+        db: AsyncSession,
+        user_id: int,
+        page: int,
+        size: int = 20,
+        only_published: bool = False,
+        cursor: str | None = None,
+        with_total: bool | None = None,
+):
     """
     分页查询用户自己上传的视频列表，包含分页总数和视频详情列表。
 
     Args:
         db: 异步数据库会话
         user_id: 用户ID
-        page: 当前页码，从1开始
+        page: 当前页码，从1开始（传入 cursor 时忽略）
         size: 每页数量，默认20
+        only_published: 是否只返回已发布视频（查看他人主页时为 True）
+        cursor: 上一页返回的 next_cursor
+        with_total: 是否统计总数，默认页码分页统计、游标分页不统计
 
     Returns:
-        dict: 包含总数total和视频列表items
+        dict: 包含总数total、视频列表items和下一页游标next_cursor
     """
     skip = (page - 1) * size
-    total, video_list = await get_my_videos(db=db, user_id=user_id, skip=skip, limit=size)
+    total, video_list, next_cursor = await get_my_videos(
+        db=db, user_id=user_id, skip=skip, limit=size, only_published=only_published, cursor=cursor, with_total=with_total
+    )
 
     # 组装返回列表，映射数据库模型到响应模型
+    uploaders = await get_user_card_loader(db).load_many([v.uploader_id for v in video_list])
+    variants = await load_thumbnail_variants(db, [v.cover_image for v in video_list])
     items = [
         MyVideoListOut(
             id=v.id,
             title=v.title,
-            cover_image=v.cover_image,
+            cover_image=cover_variant(v.cover_image, variants.get(v.cover_image)),
             file_path=v.file_path,
+            hls_path=v.hls_path,
             created_at=v.created_at,
             duration=v.duration,
-            uploader_id=v.uploader.id,
-            uploader_username=v.uploader.username,
-            uploader_unique_id=v.uploader.unique_id,
+            uploader_id=v.uploader_id,
+            uploader_username=uploaders.get(v.uploader_id, {}).get("username"),
+            uploader_unique_id=uploaders.get(v.uploader_id, {}).get("unique_id"),
             like_count=v.like_count,
+            status=v.status,
+            processing_progress=v.processing_progress,
         ) for v in video_list
     ]
 
-    return {"total": total, "items": items}
+    return {"total": total, "items": items, "next_cursor": next_cursor}
 
 
-async def get_recommended_videos(db: AsyncSession, page: int, size: int = 20):
+async def get_recommended_videos(
+        db: AsyncSession,
+        page: int,
+        size: int = 20,
+        cursor: str | None = None,
+        with_total: bool | None = None,
+        user_id: int | None = None,
+):
     """
     分页获取推荐视频列表，包含视频总数和详情列表。
     推荐视频基于公开且未删除的视频，按播放量和创建时间排序。
 
     Args:
         db: 异步数据库会话
-        page: 当前页码，从1开始
+        page: 当前页码，从1开始（传入 cursor 时忽略）
         size: 每页数量，默认20
+        cursor: 上一页返回的 next_cursor
+        with_total: 是否统计总数，默认页码分页统计、游标分页不统计
+        user_id: 当前登录用户，传入时去掉已看过的视频
 
     Returns:
-        dict: 包含总数total和视频列表items
+        dict: 包含总数total、视频列表items和下一页游标next_cursor
     """
+    return await drop_seen_videos(db, user_id, partial(_fetch_recommended_videos, db), page, size, cursor, with_total)
+
+
+async def _fetch_recommended_videos(db: AsyncSession, page: int, size: int, cursor: str | None, with_total: bool | None):
+    cached = await get_cached_feed_page(db, "recommend", page, size, cursor, with_total)
+    if cached is not None:
+        cached["items"] = [RecommendVideoOut(**card) for card in cached["items"]]
+        return cached
+
     skip = (page - 1) * size
-    total, video_list = await get_recommend_video_list(db=db, skip=skip, limit=size)
+    total, video_list, next_cursor = await get_recommend_video_list(
+        db=db, skip=skip, limit=size, cursor=cursor, with_total=with_total
+    )
 
     # 组装推荐视频响应列表
+    uploaders = await get_user_card_loader(db).load_many([v.uploader_id for v in video_list])
+    variants = await load_thumbnail_variants(db, [v.cover_image for v in video_list])
     items = [
         RecommendVideoOut(
             id=v.id,
             title=v.title,
-            cover_image=v.cover_image,
+            cover_image=cover_variant(v.cover_image, variants.get(v.cover_image)),
             file_path=v.file_path,
+            hls_path=v.hls_path,
             created_at=v.created_at,
             duration=v.duration,
-            uploader_id=v.uploader.id,
-            uploader_username=v.uploader.username,
-            uploader_unique_id=v.uploader.unique_id,
+            uploader_id=v.uploader_id,
+            uploader_username=uploaders.get(v.uploader_id, {}).get("username"),
+            uploader_unique_id=uploaders.get(v.uploader_id, {}).get("unique_id"),
             like_count=v.like_count,
         )
         for v in video_list
     ]
 
-    return {"total": total, "items": items}
+    return {"total": total, "items": items, "next_cursor": next_cursor}
 
 
 async def get_video_detail(db: AsyncSession, video_id: int, current_user_id: int | None = None):
@@ -175,8 +283,9 @@ async def get_video_detail(db: AsyncSession, video_id: int, current_user_id: int
     if not video:
         return None
 
-    # 2. 获取作者信息
+    # 2. 获取作者信息（封面、头像的已生成缩略图档位一次查询）
     uploader = await get_user_by_id(db, video.uploader_id)
+    variants = await load_thumbnail_variants(db, [video.cover_image, uploader.profile_picture if uploader else None])
     if not uploader:
         uploader_info = None
     else:
@@ -196,7 +305,7 @@ async def get_video_detail(db: AsyncSession, video_id: int, current_user_id: int
         uploader_info = {
             "id": uploader.id,
             "username": uploader.username,
-            "profile_picture": uploader.profile_picture or "/media/avatars/default.png",
+            "profile_picture": avatar_variant(uploader.profile_picture, variants.get(uploader.profile_picture), large=True) or "/media/avatars/default.png",
             "fans_count": fans_count,
             "is_followed": is_followed,
             "is_mutual": is_mutual,
@@ -225,6 +334,10 @@ async def get_video_detail(db: AsyncSession, video_id: int, current_user_id: int
 
     # 5. 记录用户行为到MongoDB（异步，不阻塞响应）
     if current_user_id:
+        # 观看次数 +1（同时更新热度分和列表索引）
+        await increment_video_view_count(db, video_id)
+        await refresh_video_in_feeds(db, video_id)
+        await mark_videos_seen(current_user_id, [video_id])
         try:
             # 记录视频查看行为
             await log_user_behavior(
@@ -250,13 +363,16 @@ async def get_video_detail(db: AsyncSession, video_id: int, current_user_id: int
         "title": video.title,
         "description": video.description,
         "file_path": video.file_path,
-        "cover_image": video.cover_image,
+        "hls_path": video.hls_path,
+        "preview_track_path": video.preview_track_path,
+        "cover_image": cover_variant(video.cover_image, variants.get(video.cover_image), large=True),
         "duration": video.duration,
         "view_count": video.view_count,
         "like_count": like_count,
         "collect_count": collect_count,
         "comment_count": comment_count,
         "created_at": video.created_at,
+        "status": video.status,
         "uploader": uploader_info,
         "is_liked": is_liked,
         "is_collected": is_collected
@@ -264,16 +380,23 @@ async def get_video_detail(db: AsyncSession, video_id: int, current_user_id: int
     return detail
 
 
-def video_to_dict(video):
+def video_to_dict(video, uploader: dict | None = None, cover_variants: set[str] | None = None):
+    """
+    列表中的视频字典，video 为 VideoCard，uploader 为上传者卡片，
+    cover_variants 为封面已生成的缩略图档位（load_thumbnail_variants）。
+    列表不读取描述，description 保留为 None 以兼容旧客户端，描述在详情中返回
+    """
     return {
         'id': video.id,
         'title': video.title,
-        'description': video.description,
+        'description': None,
         'file_path': video.file_path,
-        'cover_image': video.cover_image,
+        'hls_path': video.hls_path,
+        'preview_track_path': video.preview_track_path,
+        'cover_image': cover_variant(video.cover_image, cover_variants),
         'duration': video.duration,
         'uploader_id': video.uploader_id,
-        'uploader_username': getattr(video.uploader, 'username', None) if hasattr(video, 'uploader') else None,
+        'uploader_username': uploader['username'] if uploader else None,
         'is_public': video.is_public,
         'is_deleted': video.is_deleted,
         'view_count': video.view_count,
@@ -285,75 +408,91 @@ def video_to_dict(video):
     }
 
 
+async def videos_to_dicts(db: AsyncSession, videos) -> list[dict]:
+    """批量转换视频字典，上传者卡片和封面缩略图档位各一次加载"""
+    uploaders = await get_user_card_loader(db).load_many([v.uploader_id for v in videos])
+    variants = await load_thumbnail_variants(db, [v.cover_image for v in videos])
+    return [video_to_dict(v, uploaders.get(v.uploader_id), variants.get(v.cover_image)) for v in videos]
+
+
 async def get_my_like_video_list(db, user_id: int, page: int, size: int):
     stmt = (
-        select(Video)
+        select(*VIDEO_CARD_COLUMNS)
         .join(Like, Like.video_id == Video.id)
         .where(Like.user_id == user_id)
         .order_by(Like.created_at.desc())
         .offset((page - 1) * size)
         .limit(size)
-        .options(joinedload(Video.uploader))
     )
     result = await db.execute(stmt)
-    videos = result.scalars().unique().all()
-    return [video_to_dict(v) for v in videos]
+    return await videos_to_dicts(db, [VideoCard(row) for row in result.all()])
 
 
 async def get_my_favorite_video_list(db, user_id: int, page: int, size: int):
     stmt = (
-        select(Video)
+        select(*VIDEO_CARD_COLUMNS)
         .join(Collection, Collection.video_id == Video.id)
         .where(Collection.user_id == user_id)
         .order_by(Collection.created_at.desc())
         .offset((page - 1) * size)
         .limit(size)
-        .options(joinedload(Video.uploader))
     )
     result = await db.execute(stmt)
-    videos = result.scalars().unique().all()
-    return [video_to_dict(v) for v in videos]
+    return await videos_to_dicts(db, [VideoCard(row) for row in result.all()])
 
 
-async def get_latest_videos(db: AsyncSession, page: int, size: int = 20):
-    skip = (page - 1) * size
-    total, video_list = await get_latest_video_list(db=db, skip=skip, limit=size)
-    items = [video_to_dict(v) for v in video_list]
-    return {"total": total, "items": items}
+async def get_latest_videos(
+        db: AsyncSession,
+        page: int,
+        size: int = 20,
+        cursor: str | None = None,
+        with_total: bool | None = None,
+        user_id: int | None = None,
+):
+    return await drop_seen_videos(db, user_id, partial(_fetch_latest_videos, db), page, size, cursor, with_total)
 
 
-async def get_hot_videos(db: AsyncSession, page: int, size: int = 20):
+async def _fetch_latest_videos(db: AsyncSession, page: int, size: int, cursor: str | None, with_total: bool | None):
+    cached = await get_cached_feed_page(db, "latest", page, size, cursor, with_total)
+    if cached is not None:
+        return cached
+
     skip = (page - 1) * size
-    total, video_list = await get_hot_video_list(db=db, skip=skip, limit=size)
-    items = [video_to_dict(v) for v in video_list]
-    return {"total": total, "items": items}
-
-
-async def get_following_feed_videos(db: AsyncSession, user_id: int, page: int, size: int = 20):
-    # 1. 获取我关注的用户ID列表
-    from app.crud.user.follow import get_following_list
-    following = await get_following_list(db, user_id, 1, 10000)
-    following_ids = [item['id'] for item in following['items']]
-    if not following_ids:
-        return {"total": 0, "items": []}
-    # 2. 查询这些用户的视频
+    total, video_list, next_cursor = await get_latest_video_list(
+        db=db, skip=skip, limit=size, cursor=cursor, with_total=with_total
+    )
+    items = await videos_to_dicts(db, video_list)
+    return {"total": total, "items": items, "next_cursor": next_cursor}
+
+
+async def get_hot_videos(
+        db: AsyncSession,
+        page: int,
+        size: int = 20,
+        cursor: str | None = None,
+        with_total: bool | None = None,
+        user_id: int | None = None,
+):
+    return await drop_seen_videos(db, user_id, partial(_fetch_hot_videos, db), page, size, cursor, with_total)
+
+
+async def _fetch_hot_videos(db: AsyncSession, page: int, size: int, cursor: str | None, with_total: bool | None):
+    cached = await get_cached_feed_page(db, "hot", page, size, cursor, with_total)
+    if cached is not None:
+        return cached
+
     skip = (page - 1) * size
-    from sqlalchemy import select, desc
-    from app.models.mysql.video import Video
-    from sqlalchemy.orm import joinedload
-    stmt = (
-        select(Video)
-        .options(joinedload(Video.uploader))
-        .where(Video.uploader_id.in_(following_ids), Video.is_public == True, Video.is_deleted == False)
-        .order_by(desc(Video.created_at))
-        .offset(skip)
-        .limit(size)
+    total, video_list, next_cursor = await get_hot_video_list(
+        db=db, skip=skip, limit=size, cursor=cursor, with_total=with_total
     )
-    result = await db.execute(stmt)
-    videos = result.scalars().unique().all()
-    items = [video_to_dict(v) for v in videos]
-    # 总数可选查一次
-    return {"total": len(items), "items": items}
+    items = await videos_to_dicts(db, video_list)
+    return {"total": total, "items": items, "next_cursor": next_cursor}
+
+
+async def get_following_feed_videos(
+        db: AsyncSession, user_id: int, page: int, size: int = 20, cursor: str | None = None
+):
+    return await get_following_timeline(db, user_id, page, size, cursor)
 
 async def remove_video(
     db: AsyncSession,
@@ -372,7 +511,12 @@ async def remove_video(
 
     video.is_deleted = True
     video.is_public = False
+    # 释放视频文件和封面的引用，文件由清理任务在引用归零后回收
+    await release_blobs(db, [video.file_path, video.cover_image])
     await db.commit()
+    await invalidate_video_counts(current_user_id)
+    await refresh_video_in_feeds(db, video_id)
+    await record_search_change(video_id)
 
     try:
         await log_user_behavior(
@@ -0,0 +1 @@
+from .factory import *
@@ -0,0 +1,94 @@
+"""
+媒体存储后端接口
+
+key 即数据库中保存的相对路径（如 media/blobs/ab/cd/{digest}.mp4），
+本地后端映射到 media_root_parent 下的文件，对象存储后端直接作为对象键。
+"""
+
+import os
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import AsyncIterator
+
+import aiofiles
+
+
+@dataclass
+class StorageStat:
+    size: int  # 字节数
+    mtime: float  # 最后修改时间（Unix 时间戳）
+    etag: str  # 强 ETag（带双引号）
+
+
+class StorageBackend(ABC):
+
+    @abstractmethod
+    async def put_stream(self, key: str, stream: AsyncIterator[bytes], content_type: str | None = None) -> StorageStat:
+        """把字节流写入 key（整体可见，读者不会看到写了一半的内容）"""
+
+    @abstractmethod
+    async def put_file(self, key: str, src_path: str, content_type: str | None = None) -> StorageStat:
+        """把本地文件存入 key，完成后源文件被移走（本地后端为重命名，对象存储为上传后删除）"""
+
+    @abstractmethod
+    def get_range(self, key: str, start: int, end: int) -> AsyncIterator[bytes]:
+        """按块读取 [start, end] 闭区间的内容"""
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """删除 key，不存在时忽略"""
+
+    @abstractmethod
+    async def stat(self, key: str) -> StorageStat | None:
+        """查询对象信息，不存在时返回 None"""
+
+    @abstractmethod
+    def list_objects(self, prefix: str) -> AsyncIterator[tuple[str, StorageStat]]:
+        """遍历 prefix 目录下的所有对象，产出 (key, 对象信息)，顺序不保证"""
+
+    @abstractmethod
+    async def presign(self, key: str, expires_in: int, method: str = "GET") -> str:
+        """
+        生成客户端可直接访问的临时 URL。
+
+        Raises:
+            ValueError: method 不是 GET / PUT，或后端缺少生成签名所需的配置
+        """
+
+    def verify_presigned(self, key: str, method: str, expires: str, signature: str) -> bool:
+        """
+        校验由 presign 生成的 URL 签名。对象存储由存储服务自己校验签名，上传请求不会到达本服务。
+        """
+        return False
+
+    async def move(self, src_key: str, dst_key: str) -> None:
+        """把 src_key 移动到 dst_key（覆盖已有对象），默认实现为流式复制后删除源对象"""
+        stat = await self.stat(src_key)
+        if stat is None:
+            raise FileNotFoundError(src_key)
+
+        async def chunks():
+            if stat.size:
+                async for chunk in self.get_range(src_key, 0, stat.size - 1):
+                    yield chunk
+
+        await self.put_stream(dst_key, chunks())
+        await self.delete(src_key)
+
+    def local_path(self, key: str) -> str | None:
+        """key 对应的本地文件路径（可直接 sendfile / 交给 ffmpeg），非本地后端返回 None"""
+        return None
+
+    async def download(self, key: str, dst_path: str) -> None:
+        """把对象完整下载到本地文件"""
+        stat = await self.stat(key)
+        if stat is None:
+            raise FileNotFoundError(key)
+        os.makedirs(os.path.dirname(dst_path), exist_ok=True)
+        async with aiofiles.open(dst_path, "wb") as out_file:
+            if stat.size:
+                async for chunk in self.get_range(key, 0, stat.size - 1):
+                    await out_file.write(chunk)
+
+    async def close(self) -> None:
+        """释放连接等资源"""
@@ -0,0 +1,87 @@
+"""
+内容寻址存储的目录布局
+
+    MEDIA_ROOT/blobs/{digest[:2]}/{digest[2:4]}/{digest}{ext}   正式文件，内容永不变化
+    MEDIA_ROOT/blobs/tmp/                                       写入中的临时文件
+    MEDIA_ROOT/thumbs/{digest[:2]}/{digest}_w{width}{ext}       图片缩略图，由源文件摘要和宽度唯一确定
+    MEDIA_ROOT/incoming/{upload_id}{ext}                        预签名直传的暂存对象，校验通过后移入 blobs
+    MEDIA_ROOT/quarantine/{YYYYMMDD}/{原 key}                   清理任务隔离的孤儿文件，保留期后彻底删除，不对外提供
+    MEDIA_ROOT/hls/{video_id}/                                  HLS 码率阶梯（按视频分目录，随视频记录一起回收）
+    MEDIA_ROOT/sprites/{video_id}/                              拖动预览雪碧图和 WebVTT 轨道
+
+文件先写到本地 tmp 下并同时计算摘要，确定摘要后再存入存储后端的正式位置
+（本地后端为同一文件系统内的原子重命名，对象存储为上传）。
+"""
+
+import os
+import re
+from uuid import uuid4
+
+from app.core.config import settings
+from app.storage.base import StorageBackend
+
+BLOB_DIR = os.path.join(settings.MEDIA_ROOT, "blobs")
+BLOB_TMP_DIR = os.path.join(BLOB_DIR, "tmp")
+THUMB_DIR = os.path.join(settings.MEDIA_ROOT, "thumbs")
+INCOMING_DIR = os.path.join(settings.MEDIA_ROOT, "incoming")
+QUARANTINE_DIR = os.path.join(settings.MEDIA_ROOT, "quarantine")
+HLS_DIR = os.path.join(settings.MEDIA_ROOT, "hls")
+SPRITE_DIR = os.path.join(settings.MEDIA_ROOT, "sprites")
+
+THUMBNAIL_EXTS = {"webp": ".webp", "jpeg": ".jpg"}
+
+_DIGEST_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+
+def blob_relative_path(digest: str, ext: str) -> str:
+    """根据摘要生成正式文件的相对路径（两级目录分散，避免单目录文件过多）"""
+    return os.path.join(BLOB_DIR, digest[:2], digest[2:4], f"{digest}{ext.lower()}")
+
+
+def blob_digest(relative_path: str | None) -> str | None:
+    """从内容寻址存储的路径中取出摘要，不是该存储中的路径（如默认头像、旧数据）返回 None"""
+    if not relative_path or not relative_path.startswith(BLOB_DIR + os.sep):
+        return None
+    digest = os.path.splitext(os.path.basename(relative_path))[0]
+    return digest if _DIGEST_PATTERN.match(digest) else None
+
+
+def thumbnail_source_digest(relative_path: str) -> str | None:
+    """从缩略图路径中取出源图片的摘要，不是缩略图路径返回 None"""
+    if not relative_path.startswith(THUMB_DIR + os.sep):
+        return None
+    digest = os.path.basename(relative_path).split("_w", 1)[0]
+    return digest if _DIGEST_PATTERN.match(digest) else None
+
+
+def thumbnail_relative_path(source_path: str | None, width: int, fmt: str) -> str | None:
+    """源图片对应宽度的缩略图路径；源图片不在内容寻址存储中时返回 None"""
+    digest = blob_digest(source_path)
+    if digest is None:
+        return None
+    return os.path.join(THUMB_DIR, digest[:2], f"{digest}_w{width}{THUMBNAIL_EXTS[fmt]}")
+
+
+def thumbnail_variant(width: int, fmt: str) -> str:
+    """缩略图档位名（记录在 media_blobs.thumbnails 中），如 320.webp"""
+    return f"{width}{THUMBNAIL_EXTS[fmt]}"
+
+
+def incoming_relative_path(upload_id: str, ext: str) -> str:
+    """预签名直传的暂存 key"""
+    return os.path.join(INCOMING_DIR, f"{upload_id}{ext.lower()}")
+
+
+def blob_tmp_full_path(ext: str = "") -> str:
+    """生成一个临时文件的完整路径"""
+    return os.path.join(settings.media_root_parent, BLOB_TMP_DIR, f"{uuid4().hex}{ext.lower()}")
+
+
+async def place_blob(storage: StorageBackend, tmp_full_path: str, relative_path: str):
+    """
+    把临时文件存入正式位置。正式位置已有文件（内容相同）时直接丢弃临时文件。
+    """
+    if await storage.stat(relative_path) is not None:
+        os.remove(tmp_full_path)
+        return
+    await storage.put_file(relative_path, tmp_full_path)
@@ -0,0 +1,70 @@
+import os
+
+from app.core.config import settings
+from app.storage.base import StorageBackend
+from app.storage.local import LocalStorage
+from app.storage.tiered import TieredStorage
+
+# 进程内共享的存储后端实例
+_storage: StorageBackend | None = None
+
+
+def _create_backend(backend: str, bucket: str, base_dir: str, media_root: str) -> StorageBackend:
+    if backend == "s3":
+        # 可选依赖，只有启用对象存储时才需要安装 aiobotocore
+        from app.storage.s3 import S3Storage
+
+        return S3Storage(
+            bucket=bucket,
+            endpoint_url=settings.S3_ENDPOINT_URL,
+            region=settings.S3_REGION,
+            access_key=settings.S3_ACCESS_KEY,
+            secret_key=settings.S3_SECRET_KEY,
+            part_size=settings.S3_MULTIPART_PART_SIZE,
+            concurrency=settings.S3_MULTIPART_CONCURRENCY,
+            read_chunk_size=settings.MEDIA_READ_CHUNK_SIZE,
+        )
+    return LocalStorage(base_dir, media_root, settings.MEDIA_PUBLIC_BASE_URL, settings.SECRET_KEY)
+
+
+def create_storage() -> StorageBackend:
+    """
+    按配置创建新的存储后端实例。
+    Celery 任务每次在新的事件循环中运行，需要使用独立实例并在结束后 close。
+    配置了归档层时返回分层存储，冷数据访问时透明回温。
+    """
+    storage = _create_backend(
+        settings.STORAGE_BACKEND, settings.S3_BUCKET, settings.media_root_parent, settings.media_root_abs
+    )
+    if not settings.MEDIA_ARCHIVE_BACKEND:
+        return storage
+
+    archive_dir = settings.MEDIA_ARCHIVE_DIR
+    archive = _create_backend(
+        settings.MEDIA_ARCHIVE_BACKEND,
+        settings.MEDIA_ARCHIVE_S3_BUCKET,
+        archive_dir,
+        os.path.join(archive_dir, settings.MEDIA_ROOT),
+    )
+    return TieredStorage(
+        storage,
+        archive,
+        warm_dir=settings.media_warm_cache_dir,
+        media_root=settings.MEDIA_ROOT,
+        public_base_url=settings.MEDIA_PUBLIC_BASE_URL,
+        warm_max_bytes=settings.MEDIA_WARM_CACHE_MAX_BYTES,
+    )
+
+
+def get_storage() -> StorageBackend:
+    global _storage
+    if _storage is None:
+        _storage = create_storage()
+    return _storage
+
+
+async def close_storage():
+    global _storage
+    if _storage is not None:
+        await _storage.close()
+        _storage = None
@@ -1,28 +1,263 @@
 import aiofiles
+import anyio
+import hashlib
+import hmac
 import os
-from fastapi import UploadFile
+import stat as stat_module
+import time
+from typing import AsyncIterator
+from urllib.parse import urlencode
+from uuid import uuid4
+from fastapi import UploadFile, HTTPException
+
+from app.storage.base import StorageBackend, StorageStat
+from app.utils.file_validator import IngestValidator
+from app.utils.http_range import make_etag
 
 CHUNK_SIZE = 1024 * 1024  # 每次读取写入的文件块大小，1MB
 
-async def save_file_to_local(file: UploadFile, full_path: str):
+async def save_file_to_local(file: UploadFile, full_path: str, validator: IngestValidator | None = None) -> tuple[str, int]:
     """
-    异步将上传的文件保存到本地指定路径。
+    异步将上传的文件保存到本地指定路径，并在写入的同时计算内容摘要。
 
     Args:
         file: FastAPI 上传文件对象
         full_path: 文件保存的完整本地路径
+        validator: 流式校验器（文件头嗅探 + 大小限制），校验失败时删除已写入的部分
+
+    Returns:
+        tuple[str, int]: (sha256 十六进制摘要, 文件字节数)
 
     功能点：
     - 自动创建文件夹（如果不存在）
     - 分块读取上传文件，分块写入，避免内存占用过大
+    - 类型嗅探、大小限制、摘要计算与写盘在同一次遍历中完成，不需要再读一遍文件
     """
     # 确保目标文件夹存在
     os.makedirs(os.path.dirname(full_path), exist_ok=True)
 
-    # 异步打开目标文件，逐块写入内容
-    async with aiofiles.open(full_path, "wb") as out_file:
-        while True:
-            chunk = await file.read(CHUNK_SIZE)  # 读取1MB数据块
-            if not chunk:  # 读到文件末尾，停止循环
-                break
-            await out_file.write(chunk)  # 写入数据块
+    hasher = hashlib.sha256()
+    size = 0
+    try:
+        # 异步打开目标文件，逐块写入内容
+        async with aiofiles.open(full_path, "wb") as out_file:
+            while True:
+                chunk = await file.read(CHUNK_SIZE)  # 读取1MB数据块
+                if not chunk:  # 读到文件末尾，停止循环
+                    break
+                if validator:
+                    validator.feed(chunk)
+                hasher.update(chunk)
+                size += len(chunk)
+                await out_file.write(chunk)  # 写入数据块
+        if validator:
+            validator.finish()
+    except HTTPException:
+        os.remove(full_path)
+        raise
+    return hasher.hexdigest(), size
+
+
+def hash_local_file(full_path: str) -> tuple[str, int]:
+    """
+    计算本地文件的 sha256 摘要（同步阻塞，异步代码中需放到线程里调用）。
+
+    Returns:
+        tuple[str, int]: (sha256 十六进制摘要, 文件字节数)
+    """
+    hasher = hashlib.sha256()
+    size = 0
+    with open(full_path, "rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            hasher.update(chunk)
+            size += len(chunk)
+    return hasher.hexdigest(), size
+
+
+async def allocate_local_file(full_path: str):
+    """
+    为分片上传预先创建一个空文件（文件已存在则保持不变）。
+    """
+    os.makedirs(os.path.dirname(full_path), exist_ok=True)
+    if not os.path.exists(full_path):
+        async with aiofiles.open(full_path, "wb"):
+            pass
+
+
+async def write_stream_to_local(
+        stream: AsyncIterator[bytes],
+        full_path: str,
+        offset: int,
+        max_bytes: int,
+        validator: IngestValidator | None = None,
+) -> int:
+    """
+    将请求体字节流从指定偏移量开始写入本地文件，用于分片上传。
+
+    Args:
+        stream: 请求体异步字节流（Request.stream()）
+        full_path: 目标文件完整路径（即文件最终位置）
+        offset: 写入起始偏移量
+        max_bytes: 本次最多允许写入的字节数，超出立即中断
+        validator: 流式校验器（首个分片用来嗅探文件头），校验失败立即中断
+
+    Returns:
+        int: 实际写入的字节数
+    """
+    written = 0
+    async with aiofiles.open(full_path, "r+b") as out_file:
+        # 截断到 offset，丢弃上一次中断时可能残留的半个分片
+        await out_file.truncate(offset)
+        await out_file.seek(offset)
+        try:
+            async for chunk in stream:
+                if not chunk:
+                    continue
+                written += len(chunk)
+                if written > max_bytes:
+                    raise HTTPException(status_code=413, detail="分片大小超出限制")
+                if validator:
+                    validator.feed(chunk)
+                await out_file.write(chunk)
+            if validator:
+                validator.finish()
+        except HTTPException:
+            await out_file.truncate(offset)
+            raise
+    return written
+
+
+def _scan_directory(directory: str) -> tuple[list[str], list[tuple[str, os.stat_result]]]:
+    """列出一层目录：(子目录列表, [(文件路径, stat)])，目录不存在时返回空"""
+    subdirs, files = [], []
+    try:
+        with os.scandir(directory) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    files.append((entry.path, entry.stat(follow_symlinks=False)))
+    except FileNotFoundError:
+        pass
+    return subdirs, files
+
+
+class LocalStorage(StorageBackend):
+    """
+    本地磁盘存储，key 为相对于 base_dir 的路径，且必须位于 media_root 之内。
+
+    预签名上传模拟对象存储：presign(..., "PUT") 生成带过期时间和 HMAC 签名的媒体端点地址，
+    客户端直接 PUT 字节到该地址，由媒体端点校验签名后写入，不经过业务接口。
+    """
+
+    def __init__(self, base_dir: str, media_root: str, public_base_url: str, signing_key: str | None = None):
+        self.base_dir = os.path.realpath(base_dir)
+        self.media_root = os.path.realpath(media_root)
+        self.public_base_url = public_base_url.rstrip("/")
+        self.signing_key = signing_key
+
+    def local_path(self, key: str) -> str | None:
+        full_path = os.path.realpath(os.path.join(self.base_dir, key.lstrip("/")))
+        if os.path.commonpath([full_path, self.media_root]) != self.media_root:
+            return None
+        return full_path
+
+    def _require_path(self, key: str) -> str:
+        full_path = self.local_path(key)
+        if full_path is None:
+            raise ValueError(f"非法的存储路径: {key}")
+        return full_path
+
+    async def put_stream(self, key: str, stream: AsyncIterator[bytes], content_type: str | None = None) -> StorageStat:
+        full_path = self._require_path(key)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        # 先写同目录下的临时文件，再原子重命名
+        tmp_path = f"{full_path}.{uuid4().hex}.part"
+        try:
+            async with aiofiles.open(tmp_path, "wb") as out_file:
+                async for chunk in stream:
+                    await out_file.write(chunk)
+            os.replace(tmp_path, full_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return await self.stat(key)
+
+    async def put_file(self, key: str, src_path: str, content_type: str | None = None) -> StorageStat:
+        full_path = self._require_path(key)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        os.replace(src_path, full_path)
+        return await self.stat(key)
+
+    async def get_range(self, key: str, start: int, end: int) -> AsyncIterator[bytes]:
+        full_path = self._require_path(key)
+        with open(full_path, "rb") as file:
+            offset = start
+            while offset <= end:
+                chunk = await anyio.to_thread.run_sync(os.pread, file.fileno(), min(CHUNK_SIZE, end - offset + 1), offset)
+                if not chunk:
+                    break
+                offset += len(chunk)
+                yield chunk
+
+    async def delete(self, key: str) -> None:
+        full_path = self._require_path(key)
+        try:
+            os.remove(full_path)
+        except FileNotFoundError:
+            pass
+
+    async def stat(self, key: str) -> StorageStat | None:
+        full_path = self.local_path(key)
+        if full_path is None:
+            return None
+        try:
+            stat_result = await anyio.to_thread.run_sync(os.stat, full_path)
+        except FileNotFoundError:
+            return None
+        if not stat_module.S_ISREG(stat_result.st_mode):
+            return None
+        return StorageStat(
+            size=stat_result.st_size,
+            mtime=stat_result.st_mtime,
+            etag=make_etag(stat_result.st_size, stat_result.st_mtime_ns),
+        )
+
+    async def move(self, src_key: str, dst_key: str) -> None:
+        dst_path = self._require_path(dst_key)
+        os.makedirs(os.path.dirname(dst_path), exist_ok=True)
+        os.replace(self._require_path(src_key), dst_path)
+
+    def _sign(self, key: str, method: str, expires: str) -> str:
+        message = f"{method}\n{key.lstrip('/')}\n{expires}".encode()
+        return hmac.new(self.signing_key.encode(), message, hashlib.sha256).hexdigest()
+
+    def verify_presigned(self, key: str, method: str, expires: str, signature: str) -> bool:
+        if not self.signing_key or not expires.isdigit() or int(expires) < time.time():
+            return False
+        return hmac.compare_digest(self._sign(key, method, expires), signature)
+
+    async def list_objects(self, prefix: str) -> AsyncIterator[tuple[str, StorageStat]]:
+        # 逐层扫描目录，每层在线程中完成，避免大目录阻塞事件循环
+        pending = [self._require_path(prefix)]
+        while pending:
+            subdirs, files = await anyio.to_thread.run_sync(_scan_directory, pending.pop())
+            pending.extend(subdirs)
+            for full_path, stat_result in files:
+                yield os.path.relpath(full_path, self.base_dir), StorageStat(
+                    size=stat_result.st_size,
+                    mtime=stat_result.st_mtime,
+                    etag=make_etag(stat_result.st_size, stat_result.st_mtime_ns),
+                )
+
+    async def presign(self, key: str, expires_in: int, method: str = "GET") -> str:
+        url = f"{self.public_base_url}/{key.lstrip('/')}"
+        # 本地文件由媒体端点公开提供，读取不需要签名
+        if method == "GET":
+            return url
+        if method != "PUT":
+            raise ValueError(f"不支持预签名 {method} 请求，只支持 GET / PUT")
+        if not self.signing_key:
+            raise ValueError("本地存储未配置签名密钥，无法生成预签名上传地址")
+        expires = str(int(time.time()) + expires_in)
+        return f"{url}?{urlencode({'expires': expires, 'signature': self._sign(key, method, expires)})}"
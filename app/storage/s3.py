@@ -0,0 +1,202 @@
+"""
+S3 兼容对象存储后端（AWS S3 / MinIO / 阿里云 OSS 等）
+
+依赖 aiobotocore，仅在 STORAGE_BACKEND=s3 时才会导入本模块。
+大文件使用分片上传，多个分片并发上传；同时在途的分片数受 S3_MULTIPART_CONCURRENCY 限制，
+内存占用上限约为 并发数 × 分片大小。
+"""
+
+import asyncio
+import logging
+import os
+from contextlib import AsyncExitStack
+from typing import AsyncIterator
+
+import aiofiles
+from aiobotocore.config import AioConfig
+from aiobotocore.session import get_session
+from botocore.exceptions import ClientError
+
+from app.storage.base import StorageBackend, StorageStat
+
+logger = logging.getLogger(__name__)
+
+# S3 规定除最后一片外每片至少 5MB
+MIN_PART_SIZE = 5 * 1024 * 1024
+
+
+class S3Storage(StorageBackend):
+
+    def __init__(
+            self,
+            bucket: str,
+            endpoint_url: str | None = None,
+            region: str | None = None,
+            access_key: str | None = None,
+            secret_key: str | None = None,
+            part_size: int = 8 * 1024 * 1024,
+            concurrency: int = 4,
+            read_chunk_size: int = 512 * 1024,
+    ):
+        self.bucket = bucket
+        self.endpoint_url = endpoint_url or None
+        self.region = region or None
+        self.access_key = access_key or None
+        self.secret_key = secret_key or None
+        self.part_size = max(part_size, MIN_PART_SIZE)
+        self.concurrency = max(concurrency, 1)
+        self.read_chunk_size = read_chunk_size
+        self._client = None
+        self._exit_stack: AsyncExitStack | None = None
+        self._client_lock = asyncio.Lock()
+
+    async def _get_client(self):
+        """首次使用时创建客户端（绑定当前事件循环），之后复用其连接池"""
+        if self._client is None:
+            async with self._client_lock:
+                if self._client is None:
+                    exit_stack = AsyncExitStack()
+                    self._client = await exit_stack.enter_async_context(
+                        get_session().create_client(
+                            "s3",
+                            endpoint_url=self.endpoint_url,
+                            region_name=self.region,
+                            aws_access_key_id=self.access_key,
+                            aws_secret_access_key=self.secret_key,
+                            # MinIO 等自建服务通常不支持虚拟主机风格的 bucket 域名
+                            config=AioConfig(
+                                s3={"addressing_style": "path"},
+                                max_pool_connections=self.concurrency * 2 + 10,
+                            ),
+                        )
+                    )
+                    self._exit_stack = exit_stack
+        return self._client
+
+    async def put_stream(self, key: str, stream: AsyncIterator[bytes], content_type: str | None = None) -> StorageStat:
+        client = await self._get_client()
+        extra = {"ContentType": content_type} if content_type else {}
+        semaphore = asyncio.Semaphore(self.concurrency)
+        buffer = bytearray()
+        upload_id = None
+        part_tasks: list[asyncio.Task] = []
+
+        async def upload_part(part_number: int, body: bytes) -> dict:
+            try:
+                resp = await client.upload_part(
+                    Bucket=self.bucket, Key=key, UploadId=upload_id, PartNumber=part_number, Body=body
+                )
+                return {"PartNumber": part_number, "ETag": resp["ETag"]}
+            finally:
+                semaphore.release()
+
+        async def submit_part(body: bytes):
+            nonlocal upload_id
+            if upload_id is None:
+                resp = await client.create_multipart_upload(Bucket=self.bucket, Key=key, **extra)
+                upload_id = resp["UploadId"]
+            # 在途分片达到上限时在这里等待，同时也对上游的读取形成背压
+            await semaphore.acquire()
+            for task in part_tasks:
+                if task.done() and task.exception():
+                    semaphore.release()
+                    raise task.exception()
+            part_tasks.append(asyncio.create_task(upload_part(len(part_tasks) + 1, body)))
+
+        try:
+            async for chunk in stream:
+                buffer += chunk
+                while len(buffer) >= self.part_size:
+                    body = bytes(buffer[:self.part_size])
+                    del buffer[:self.part_size]
+                    await submit_part(body)
+
+            if upload_id is None:
+                # 不足一个分片，直接单次上传
+                await client.put_object(Bucket=self.bucket, Key=key, Body=bytes(buffer), **extra)
+            else:
+                if buffer:
+                    await submit_part(bytes(buffer))
+                parts = await asyncio.gather(*part_tasks)
+                await client.complete_multipart_upload(
+                    Bucket=self.bucket, Key=key, UploadId=upload_id, MultipartUpload={"Parts": parts}
+                )
+        except BaseException:
+            for task in part_tasks:
+                task.cancel()
+            await asyncio.gather(*part_tasks, return_exceptions=True)
+            if upload_id is not None:
+                try:
+                    await client.abort_multipart_upload(Bucket=self.bucket, Key=key, UploadId=upload_id)
+                except Exception as e:
+                    logger.warning(f"Failed to abort multipart upload {key}: {e}")
+            raise
+
+        return await self.stat(key)
+
+    async def put_file(self, key: str, src_path: str, content_type: str | None = None) -> StorageStat:
+        async def file_chunks():
+            async with aiofiles.open(src_path, "rb") as src:
+                while chunk := await src.read(self.part_size):
+                    yield chunk
+
+        stat = await self.put_stream(key, file_chunks(), content_type)
+        os.remove(src_path)
+        return stat
+
+    async def get_range(self, key: str, start: int, end: int) -> AsyncIterator[bytes]:
+        client = await self._get_client()
+        resp = await client.get_object(Bucket=self.bucket, Key=key, Range=f"bytes={start}-{end}")
+        async with resp["Body"] as body:
+            while chunk := await body.read(self.read_chunk_size):
+                yield chunk
+
+    async def delete(self, key: str) -> None:
+        client = await self._get_client()
+        await client.delete_object(Bucket=self.bucket, Key=key)
+
+    async def move(self, src_key: str, dst_key: str) -> None:
+        # 服务端复制，数据不经过本服务（单次复制上限 5GB，远大于视频大小上限）
+        client = await self._get_client()
+        await client.copy_object(Bucket=self.bucket, Key=dst_key, CopySource={"Bucket": self.bucket, "Key": src_key})
+        await client.delete_object(Bucket=self.bucket, Key=src_key)
+
+    async def stat(self, key: str) -> StorageStat | None:
+        client = await self._get_client()
+        try:
+            resp = await client.head_object(Bucket=self.bucket, Key=key)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+        return StorageStat(
+            size=resp["ContentLength"],
+            mtime=resp["LastModified"].timestamp(),
+            etag=resp["ETag"],
+        )
+
+    async def list_objects(self, prefix: str) -> AsyncIterator[tuple[str, StorageStat]]:
+        client = await self._get_client()
+        paginator = client.get_paginator("list_objects_v2")
+        async for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix.rstrip("/") + "/"):
+            for obj in page.get("Contents", []):
+                yield obj["Key"], StorageStat(
+                    size=obj["Size"],
+                    mtime=obj["LastModified"].timestamp(),
+                    etag=obj["ETag"],
+                )
+
+    async def presign(self, key: str, expires_in: int, method: str = "GET") -> str:
+        operation = {"GET": "get_object", "PUT": "put_object"}.get(method)
+        if operation is None:
+            raise ValueError(f"不支持预签名 {method} 请求，只支持 GET / PUT")
+        client = await self._get_client()
+        return await client.generate_presigned_url(
+            operation, Params={"Bucket": self.bucket, "Key": key}, ExpiresIn=expires_in
+        )
+
+    async def close(self) -> None:
+        if self._exit_stack is not None:
+            await self._exit_stack.aclose()
+            self._exit_stack = None
+            self._client = None
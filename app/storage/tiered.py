@@ -0,0 +1,237 @@
+"""
+热/冷分层存储
+
+    hot      正常读写的存储后端（本地磁盘或对象存储）
+    archive  冷数据归档层（更便宜的磁盘目录或另一个存储后端），由分层任务把冷视频移入
+    warm     本地的小容量回温缓存：访问到只在归档层的对象时，先复制到这里再提供服务，
+             超出容量后按最近访问时间（atime）淘汰，归档层的副本始终保留
+
+读取顺序为 hot -> warm -> archive，调用方（媒体端点、转码任务等）无需感知对象当前位于哪一层。
+stat 只查询元数据，读取内容（get_range / download）时才回温。
+"""
+
+import asyncio
+import logging
+import os
+import time
+from dataclasses import asdict, dataclass
+from typing import AsyncIterator
+
+from app.storage.base import StorageBackend, StorageStat
+from app.storage.local import LocalStorage
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TierMetrics:
+    hot_hits: int = 0  # 在热存储中命中
+    warm_hits: int = 0  # 在回温缓存中命中
+    rehydrations: int = 0  # 从归档层回温（未命中）
+    rehydrated_bytes: int = 0
+    rehydrate_seconds: float = 0.0
+    not_found: int = 0
+    evictions: int = 0  # 回温缓存淘汰的文件数
+    demoted_files: int = 0  # 移入归档层的文件数
+    demoted_bytes: int = 0
+
+    def as_dict(self) -> dict:
+        lookups = self.hot_hits + self.warm_hits + self.rehydrations
+        return {
+            **asdict(self),
+            "rehydrate_seconds": round(self.rehydrate_seconds, 3),
+            "hit_ratio": round((self.hot_hits + self.warm_hits) / lookups, 4) if lookups else None,
+        }
+
+
+def _evict_lru(root: str, max_bytes: int) -> int:
+    """回温缓存超出容量时按 atime 从旧到新删除，直到降到容量的 90%，返回删除的文件数"""
+    entries = []
+    total = 0
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            try:
+                stat_result = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat_result.st_atime, stat_result.st_size, path))
+            total += stat_result.st_size
+    if total <= max_bytes:
+        return 0
+
+    evicted = 0
+    target = max_bytes * 0.9
+    for _, size, path in sorted(entries):
+        if total <= target:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+        evicted += 1
+    return evicted
+
+
+class TieredStorage(StorageBackend):
+
+    def __init__(
+            self,
+            hot: StorageBackend,
+            archive: StorageBackend,
+            warm_dir: str,
+            media_root: str,
+            public_base_url: str,
+            warm_max_bytes: int,
+    ):
+        self.hot = hot
+        self.archive = archive
+        self.warm = LocalStorage(warm_dir, os.path.join(warm_dir, media_root), public_base_url)
+        self.warm_max_bytes = warm_max_bytes
+        self.metrics = TierMetrics()
+        # 同一对象的并发回温只执行一次
+        self._rehydrating: dict[str, asyncio.Future] = {}
+
+    async def put_stream(self, key: str, stream: AsyncIterator[bytes], content_type: str | None = None) -> StorageStat:
+        return await self.hot.put_stream(key, stream, content_type)
+
+    async def put_file(self, key: str, src_path: str, content_type: str | None = None) -> StorageStat:
+        return await self.hot.put_file(key, src_path, content_type)
+
+    async def get_range(self, key: str, start: int, end: int) -> AsyncIterator[bytes]:
+        if await self.hot.stat(key) is not None:
+            backend = self.hot
+        elif await self.warm.stat(key) is not None:
+            backend = self.warm
+        else:
+            # 读取内容时才回温；刚回温的文件已被淘汰时直接从归档层读取
+            await self._rehydrate(key)
+            backend = self.warm if await self.warm.stat(key) is not None else self.archive
+        async for chunk in backend.get_range(key, start, end):
+            yield chunk
+
+    async def delete(self, key: str) -> None:
+        await self.hot.delete(key)
+        await self.warm.delete(key)
+        await self.archive.delete(key)
+
+    async def stat(self, key: str) -> StorageStat | None:
+        stat = await self.hot.stat(key)
+        if stat is not None:
+            self.metrics.hot_hits += 1
+            return stat
+
+        stat = await self.warm.stat(key)
+        if stat is not None:
+            self.metrics.warm_hits += 1
+            self._touch(key, stat)
+            return stat
+
+        # 只查询元数据（HEAD / 304、去重检查）不回温，避免把整个对象复制到回温缓存
+        stat = await self.archive.stat(key)
+        if stat is None:
+            self.metrics.not_found += 1
+        return stat
+
+    async def list_objects(self, prefix: str) -> AsyncIterator[tuple[str, StorageStat]]:
+        seen = set()
+        async for key, stat in self.hot.list_objects(prefix):
+            seen.add(key)
+            yield key, stat
+        async for key, stat in self.archive.list_objects(prefix):
+            if key not in seen:
+                yield key, stat
+
+    async def move(self, src_key: str, dst_key: str) -> None:
+        # 在对象所在的层内移动，避免为了移动先回温
+        if await self.hot.stat(src_key) is not None:
+            await self.hot.move(src_key, dst_key)
+        else:
+            await self.archive.move(src_key, dst_key)
+        await self.warm.delete(src_key)
+
+    async def presign(self, key: str, expires_in: int, method: str = "GET") -> str:
+        return await self.hot.presign(key, expires_in, method)
+
+    def verify_presigned(self, key: str, method: str, expires: str, signature: str) -> bool:
+        return self.hot.verify_presigned(key, method, expires, signature)
+
+    def local_path(self, key: str) -> str | None:
+        # 只在归档层的对象返回 None，调用方回退到 get_range / download，由读取触发回温
+        for backend in (self.hot, self.warm):
+            path = backend.local_path(key)
+            if path is not None and os.path.isfile(path):
+                return path
+        return None
+
+    async def close(self) -> None:
+        await self.hot.close()
+        await self.archive.close()
+
+    async def demote(self, key: str) -> int:
+        """
+        把热存储中的对象移入归档层（归档层已有副本时只删除热副本）。
+
+        Returns:
+            int: 移出热存储的字节数，对象不在热存储中返回 0
+        """
+        stat = await self.hot.stat(key)
+        if stat is None:
+            return 0
+        if await self.archive.stat(key) is None:
+            await self.archive.put_stream(key, _read_all(self.hot, key, stat.size))
+        await self.hot.delete(key)
+        self.metrics.demoted_files += 1
+        self.metrics.demoted_bytes += stat.size
+        return stat.size
+
+    def _touch(self, key: str, stat: StorageStat):
+        """只更新 atime 作为 LRU 依据，mtime（ETag）保持不变"""
+        try:
+            os.utime(self.warm.local_path(key), (time.time(), stat.mtime))
+        except OSError:
+            pass
+
+    async def _rehydrate(self, key: str) -> StorageStat | None:
+        pending = self._rehydrating.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._rehydrating[key] = future
+        try:
+            stat = await self._copy_to_warm(key)
+            future.set_result(stat)
+            return stat
+        except BaseException as e:
+            future.set_exception(e)
+            # 没有并发等待者时避免 "Future exception was never retrieved"
+            future.exception()
+            raise
+        finally:
+            del self._rehydrating[key]
+
+    async def _copy_to_warm(self, key: str) -> StorageStat | None:
+        archive_stat = await self.archive.stat(key)
+        if archive_stat is None:
+            self.metrics.not_found += 1
+            return None
+
+        started = time.monotonic()
+        stat = await self.warm.put_stream(key, _read_all(self.archive, key, archive_stat.size))
+        self.metrics.rehydrations += 1
+        self.metrics.rehydrated_bytes += stat.size
+        self.metrics.rehydrate_seconds += time.monotonic() - started
+        logger.info(f"Rehydrated {key} from archive ({stat.size} bytes)")
+
+        evicted = await asyncio.to_thread(_evict_lru, self.warm.media_root, self.warm_max_bytes)
+        self.metrics.evictions += evicted
+        # 刚回温的文件本身可能因容量太小被淘汰，此时直接从归档层读取
+        return await self.warm.stat(key) or archive_stat
+
+
+async def _read_all(backend: StorageBackend, key: str, size: int) -> AsyncIterator[bytes]:
+    if size:
+        async for chunk in backend.get_range(key, 0, size - 1):
+            yield chunk
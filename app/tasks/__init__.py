@@ -0,0 +1 @@
+from .celery_app import celery_app
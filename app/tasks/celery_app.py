@@ -0,0 +1,52 @@
+"""
+Celery 应用
+
+启动 worker：
+    celery -A app.tasks.celery_app worker -l info
+
+定期任务（媒体清理、冷数据归档、热度分重算、推荐相似度构建、热门视频统计、已看过视频过滤器重建）需要另外启动 beat：
+    celery -A app.tasks.celery_app beat -l info
+
+broker / backend 默认使用本地 Redis 的 db1 / db2；
+CELERY_TASK_ALWAYS_EAGER=True 时任务在调用进程内同步执行，便于测试。
+"""
+
+from celery import Celery
+
+from app.core.config import settings
+
+celery_app = Celery(
+    "channel",
+    broker=settings.CELERY_BROKER,
+    backend=settings.CELERY_BACKEND,
+    include=["app.tasks.video_tasks", "app.tasks.media_tasks", "app.tasks.feed_tasks", "app.tasks.recommend_tasks", "app.tasks.trending_tasks", "app.tasks.search_tasks"],
+)
+
+celery_app.conf.update(
+    task_always_eager=settings.CELERY_TASK_ALWAYS_EAGER,
+    task_eager_propagates=True,
+    task_serializer="json",
+    result_serializer="json",
+    accept_content=["json"],
+    # 视频处理耗时长：任务完成后再确认，worker 每次只预取一个任务
+    task_acks_late=True,
+    worker_prefetch_multiplier=1,
+    task_track_started=True,
+    result_expires=24 * 3600,
+    timezone="Asia/Shanghai",
+    beat_schedule={
+        "media-gc": {"task": "media.gc", "schedule": settings.MEDIA_GC_INTERVAL_SECONDS},
+        "media-tier": {"task": "media.tier", "schedule": settings.MEDIA_TIER_INTERVAL_SECONDS},
+        "media-thumbnails": {"task": "media.thumbnails", "schedule": settings.THUMBNAIL_BACKFILL_INTERVAL_SECONDS},
+        "feed-hot-score": {"task": "feed.hot_score", "schedule": settings.HOT_SCORE_RECOMPUTE_INTERVAL_SECONDS},
+        "feed-seen-filter": {"task": "feed.seen_filter", "schedule": settings.SEEN_FILTER_REBUILD_INTERVAL_SECONDS},
+        "recommend-incremental": {"task": "recommend.item_cf", "schedule": settings.RECOMMEND_INCREMENTAL_INTERVAL_SECONDS},
+        "recommend-full": {
+            "task": "recommend.item_cf",
+            "schedule": settings.RECOMMEND_FULL_REBUILD_INTERVAL_SECONDS,
+            "kwargs": {"full": True},
+        },
+        "analytics-trending": {"task": "analytics.trending", "schedule": settings.TRENDING_INTERVAL_SECONDS},
+        "search-build": {"task": "search.build", "schedule": settings.SEARCH_REBUILD_INTERVAL_SECONDS},
+    },
+)
@@ -0,0 +1,206 @@
+"""
+视频列表相关的定期任务
+
+热度分（videos.hot_score）在点赞、评论、观看变化时随计数一起更新；
+开启时间衰减（HOT_SCORE_HALF_LIFE_HOURS > 0）后，没有新互动的视频分数也需要随时间下降，
+由本任务按主键分批重算，同时修正计数更新遗漏造成的偏差。
+
+视频发布后由 feed.fanout 把视频写入各粉丝的关注时间线（写扩散）；
+粉丝数超过 TIMELINE_FANOUT_MAX_FOLLOWERS 的创作者只登记到拉取集合，粉丝读取时间线时再查询他们的视频。
+
+已看过视频的布隆过滤器加满后误判率上升，feed.seen_filter 按最近的观看记录重建这些用户的过滤器。
+
+热门 / 最新 / 推荐列表的 Redis 索引过期后，由第一个请求投递 feed.rebuild_index 在后台从 MySQL 重建。
+
+定期执行（celery beat）：
+    celery -A app.tasks.celery_app beat -l info
+
+手动执行：
+    python -m app.tasks.feed_tasks
+"""
+
+import json
+import logging
+import time
+
+from sqlalchemy import func, select, update
+
+from app.core.config import settings
+from app.crud.history.watch_history import recent_watched_statement
+from app.crud.video.video import hot_score_expression, published_video_conditions
+from app.db.mysql import get_sync_session
+from app.db.redis import get_redis_sync_client
+from app.models.mysql.follow import Follow
+from app.models.mysql.video import Video
+from app.models.redis.feed import TIMELINE_PULL_CREATORS_KEY, feed_member, timeline_key
+from app.models.redis.seen import SEEN_FILTER_SATURATED_KEY, seen_filter_count_key, seen_filter_key, seen_filter_ready_key
+from app.services.video.feed_cache import rebuild_feed_index_sync
+from app.services.video.seen_filter import seen_filter_set_args
+from app.tasks.celery_app import celery_app
+from app.tasks.media_tasks import keyset_batches
+
+logger = logging.getLogger(__name__)
+
+
+def recompute_hot_scores(batch_size: int | None = None) -> dict:
+    """按主键分批重算未删除视频的热度分，每批单独提交，避免长事务锁住整张表"""
+    batch_size = batch_size or settings.HOT_SCORE_RECOMPUTE_BATCH_SIZE
+    started = time.monotonic()
+    updated = 0
+    with get_sync_session() as session:
+        for rows in keyset_batches(session, Video, (), (Video.is_deleted == False,), batch_size):
+            result = session.execute(
+                update(Video)
+                .where(Video.id >= rows[0].id, Video.id <= rows[-1].id, Video.is_deleted == False)
+                .values(hot_score=hot_score_expression(), updated_at=Video.updated_at)
+                .execution_options(synchronize_session=False)
+            )
+            session.commit()
+            updated += result.rowcount
+    report = {"updated": updated, "elapsed": round(time.monotonic() - started, 3)}
+    logger.info(f"Hot score recompute finished: {report}")
+    return report
+
+
+@celery_app.task(name="feed.hot_score")
+def recompute_hot_scores_task() -> dict:
+    """定期重算热度分"""
+    return recompute_hot_scores()
+
+
+def rebuild_feed_index(feed: str) -> dict:
+    """从 MySQL 重建一个列表的 Redis 索引"""
+    started = time.monotonic()
+    with get_sync_session() as session:
+        videos = rebuild_feed_index_sync(session, get_redis_sync_client(), feed)
+    report = {"feed": feed, "videos": videos, "elapsed": round(time.monotonic() - started, 3)}
+    logger.info(f"Feed index rebuild finished: {report}")
+    return report
+
+
+@celery_app.task(name="feed.rebuild_index")
+def rebuild_feed_index_task(feed: str) -> dict:
+    """列表索引过期后重建"""
+    return rebuild_feed_index(feed)
+
+
+def enqueue_feed_index_rebuild(feed: str) -> bool:
+    """
+    投递列表索引重建任务。
+
+    Returns:
+        bool: 是否投递成功（broker 不可用时返回 False，继续使用旧索引或回退到 MySQL 分页）；
+              eager 模式下任务在当前线程执行完毕才返回
+    """
+    try:
+        rebuild_feed_index_task.apply_async(args=(feed,))
+        return True
+    except Exception as e:
+        logger.error(f"Failed to enqueue feed index {feed} rebuild: {e}")
+        return False
+
+
+def fanout_video(video_id: int) -> dict:
+    """
+    把已发布的视频写入上传者所有粉丝的时间线，每个时间线只保留最新的 TIMELINE_MAX_ITEMS 条。
+
+    粉丝过多的创作者登记到拉取集合；粉丝数回落到阈值以下后，先把他最近的视频补写进粉丝的时间线
+    （此前的视频没有写扩散，只能靠读取时拉取取回），再移出拉取集合。
+    """
+    started = time.monotonic()
+    with get_sync_session() as session:
+        video = session.execute(
+            select(Video.id, Video.uploader_id).where(Video.id == video_id, *published_video_conditions())
+        ).first()
+        if video is None:
+            return {"video_id": video_id, "mode": "skipped", "followers": 0}
+
+        followers = session.scalar(
+            select(func.count()).select_from(Follow).where(Follow.followed_user_id == video.uploader_id)
+        ) or 0
+        redis = get_redis_sync_client()
+        if followers > settings.TIMELINE_FANOUT_MAX_FOLLOWERS:
+            redis.sadd(TIMELINE_PULL_CREATORS_KEY, video.uploader_id)
+            return {"video_id": video_id, "mode": "pull", "followers": followers}
+
+        video_ids = [video_id]
+        pruned = bool(redis.sismember(TIMELINE_PULL_CREATORS_KEY, video.uploader_id))
+        if pruned:
+            video_ids = list(session.scalars(
+                select(Video.id)
+                .where(Video.uploader_id == video.uploader_id, *published_video_conditions())
+                .order_by(Video.id.desc())
+                .limit(settings.TIMELINE_MAX_ITEMS)
+            ))
+        members = {feed_member(pushed_id): pushed_id for pushed_id in video_ids}
+        batches = keyset_batches(
+            session,
+            Follow,
+            (Follow.user_id,),
+            (Follow.followed_user_id == video.uploader_id,),
+            settings.TIMELINE_FANOUT_BATCH_SIZE,
+        )
+        for rows in batches:
+            pipe = redis.pipeline(transaction=False)
+            for row in rows:
+                key = timeline_key(row.user_id)
+                pipe.zadd(key, members)
+                pipe.zremrangebyrank(key, 0, -settings.TIMELINE_MAX_ITEMS - 1)
+                pipe.expire(key, settings.TIMELINE_TTL_SECONDS)
+            pipe.execute()
+        if pruned:
+            # 补写完成后再移出，期间读取时间线仍会拉取，不会漏掉视频
+            redis.srem(TIMELINE_PULL_CREATORS_KEY, video.uploader_id)
+
+    report = {
+        "video_id": video_id,
+        "mode": "push",
+        "followers": followers,
+        "pushed": len(video_ids),
+        "elapsed": round(time.monotonic() - started, 3),
+    }
+    logger.info(f"Timeline fanout finished: {report}")
+    return report
+
+
+@celery_app.task(name="feed.fanout")
+def fanout_video_task(video_id: int) -> dict:
+    """视频发布后写入粉丝时间线"""
+    return fanout_video(video_id)
+
+
+def rebuild_seen_filters(user_ids: list[int] | None = None) -> dict:
+    """
+    用最近 SEEN_FILTER_CAPACITY // 2 条观看记录重建布隆过滤器，留出一半容量给之后的观看。
+    默认处理已加满的用户；更早看过的视频会重新出现在列表中。
+    """
+    started = time.monotonic()
+    redis = get_redis_sync_client()
+    if user_ids is None:
+        user_ids = [int(user_id) for user_id in redis.smembers(SEEN_FILTER_SATURATED_KEY)]
+    with get_sync_session() as session:
+        for user_id in user_ids:
+            video_ids = list(session.scalars(recent_watched_statement(user_id, settings.SEEN_FILTER_CAPACITY // 2)))
+            pipe = redis.pipeline(transaction=True)
+            pipe.delete(seen_filter_key(user_id))
+            if video_ids:
+                pipe.execute_command("BITFIELD", seen_filter_key(user_id), *seen_filter_set_args(video_ids))
+                pipe.expire(seen_filter_key(user_id), settings.SEEN_FILTER_TTL_SECONDS)
+            pipe.set(seen_filter_count_key(user_id), len(video_ids), ex=settings.SEEN_FILTER_TTL_SECONDS)
+            pipe.set(seen_filter_ready_key(user_id), 1, ex=settings.SEEN_FILTER_TTL_SECONDS)
+            pipe.srem(SEEN_FILTER_SATURATED_KEY, user_id)
+            pipe.execute()
+    report = {"users": len(user_ids), "elapsed": round(time.monotonic() - started, 3)}
+    logger.info(f"Seen filters rebuilt: {report}")
+    return report
+
+
+@celery_app.task(name="feed.seen_filter")
+def rebuild_seen_filters_task() -> dict:
+    """定期重建已加满的已看过视频过滤器"""
+    return rebuild_seen_filters()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    print(json.dumps(recompute_hot_scores(), ensure_ascii=False, indent=2))
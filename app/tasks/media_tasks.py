@@ -0,0 +1,547 @@
+"""
+媒体文件清理（GC）与冷数据归档
+
+视频软删除、更换头像、转码替换原文件后，旧文件只是释放了引用（media_blobs.ref_count -1），
+磁盘上的文件并不会被删除。清理任务定期回收这些文件：
+
+1. 按主键分批（keyset）扫描 videos / users / media_blobs，收集仍被引用的路径
+2. 引用数归零且超过保留期的 media_blobs 记录：按条件删除记录（期间被重新引用则放弃）
+3. 遍历存储中由上传流程写入的目录，既未被引用、修改时间又超过保留期的文件视为孤儿，
+   移入隔离区 MEDIA_ROOT/quarantine/{日期}/（或直接删除）
+4. 彻底删除隔离区中超过保留天数的文件
+
+dry_run 只统计不修改；检查和删除都有速率限制，避免长时间占满磁盘 IO。
+
+配置了归档层（MEDIA_ARCHIVE_BACKEND）时，分层任务把冷视频的原文件和 HLS 分片移入归档层，
+再次访问时由 TieredStorage 透明回温。
+
+缩略图补生成任务为封面 / 头像补齐当前配置（宽度档位、格式）下缺少的缩略图，并更新 media_blobs.thumbnails；
+调整 COVER_THUMB_WIDTHS / AVATAR_THUMB_WIDTHS / THUMBNAIL_FORMAT 后列表先回退到原图，补生成后切换到缩略图。
+
+定期执行（celery beat）：
+    celery -A app.tasks.celery_app beat -l info
+
+手动执行：
+    python -m app.tasks.media_tasks --dry-run
+    python -m app.tasks.media_tasks tier --dry-run
+    python -m app.tasks.media_tasks thumbnails
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from sqlalchemy import delete, func, literal_column, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud.media.blob import parse_thumbnails, record_blob_thumbnails_sync
+from app.db.mysql import get_sync_session
+from app.models.mongodb.video import VideoViewHistory
+from app.models.mysql.media_blob import MediaBlob
+from app.models.mysql.user import User
+from app.models.mysql.video import Video, VideoStatusEnum
+from app.services.media.thumbnail import ensure_thumbnails
+from app.storage import create_storage
+from app.storage.base import StorageBackend
+from app.storage.blob import (
+    BLOB_DIR,
+    HLS_DIR,
+    INCOMING_DIR,
+    QUARANTINE_DIR,
+    SPRITE_DIR,
+    THUMB_DIR,
+    blob_digest,
+    thumbnail_source_digest,
+    thumbnail_variant,
+)
+from app.storage.tiered import TieredStorage
+from app.tasks.celery_app import celery_app
+
+logger = logging.getLogger(__name__)
+
+# 按视频分目录存放的衍生文件，目录被视频记录引用时整个目录都视为在用
+VIDEO_ASSET_DIRS = (HLS_DIR, SPRITE_DIR)
+
+# 上传流程写入的目录；videos / covers / avatars 为内容寻址存储之前的旧上传目录
+GC_MANAGED_DIRS = [
+    BLOB_DIR,
+    THUMB_DIR,
+    HLS_DIR,
+    SPRITE_DIR,
+    INCOMING_DIR,
+    os.path.join(settings.MEDIA_ROOT, "videos"),
+    os.path.join(settings.MEDIA_ROOT, "covers"),
+    os.path.join(settings.MEDIA_ROOT, "avatars"),
+]
+
+QUARANTINE_DATE_FORMAT = "%Y%m%d"
+
+
+class RateLimiter:
+    """令牌桶：平均每秒不超过 rate 次操作，允许 rate 次的突发（rate<=0 不限速）"""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.capacity = max(rate, 1)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+def keyset_batches(session: Session, model, columns, conditions, batch_size: int):
+    """按主键分批扫描（WHERE id > 上一批最大 id），不使用 OFFSET，每批耗时稳定"""
+    last_id = 0
+    while True:
+        rows = session.execute(
+            select(model.id, *columns)
+            .where(model.id > last_id, *conditions)
+            .order_by(model.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1].id
+
+
+def _stale_before(seconds: int):
+    """数据库时间 now() - seconds，与 func.now() 写入的时间列比较"""
+    return func.date_sub(func.now(), literal_column(f"INTERVAL {int(seconds)} SECOND"))
+
+
+@dataclass
+class MediaGCReport:
+    dry_run: bool
+    mode: str
+    scanned_rows: int = 0  # 扫描的数据库行数
+    scanned_files: int = 0  # 检查的文件数
+    dead_blobs: int = 0  # 回收的 media_blobs 记录数
+    orphan_files: int = 0  # 隔离/删除的孤儿文件数
+    reclaimed_bytes: int = 0  # 孤儿文件总字节数
+    purged_files: int = 0  # 从隔离区彻底删除的文件数
+    errors: int = 0
+    elapsed: float = 0.0  # 耗时（秒）
+
+    def as_dict(self) -> dict:
+        elapsed = max(self.elapsed, 1e-6)
+        return {
+            **asdict(self),
+            "rows_per_second": round(self.scanned_rows / elapsed, 1),
+            "files_per_second": round(self.scanned_files / elapsed, 1),
+            "reclaimed_mb": round(self.reclaimed_bytes / 1024 / 1024, 2),
+        }
+
+
+class MediaGarbageCollector:
+
+    def __init__(
+            self,
+            session: Session,
+            storage: StorageBackend,
+            dry_run: bool = False,
+            mode: str | None = None,
+    ):
+        self.session = session
+        self.storage = storage
+        self.dry_run = dry_run
+        self.mode = mode or settings.MEDIA_GC_MODE
+        # 保留期不能短于上传会话有效期，否则会删掉仍在续传中的文件
+        self.grace_seconds = max(
+            settings.MEDIA_GC_GRACE_SECONDS,
+            settings.UPLOAD_SESSION_EXPIRE_SECONDS,
+            settings.DIRECT_UPLOAD_EXPIRE_SECONDS,
+        )
+        self.batch_size = settings.MEDIA_GC_BATCH_SIZE
+        self.scan_limiter = RateLimiter(settings.MEDIA_GC_SCAN_RATE)
+        self.delete_limiter = RateLimiter(settings.MEDIA_GC_DELETE_RATE)
+        self.report = MediaGCReport(dry_run=dry_run, mode=self.mode)
+
+        self.live_paths: set[str] = set()
+        self.live_asset_dirs: set[str] = set()
+        self.live_digests: set[str] = set()
+        # dry_run 时不删除记录，用它代替“记录已删除”
+        self.dead_digests: set[str] = set()
+        self.quarantine_dir = os.path.join(QUARANTINE_DIR, datetime.now().strftime(QUARANTINE_DATE_FORMAT))
+
+    async def run(self) -> MediaGCReport:
+        started = time.monotonic()
+        self._collect_live_references()
+        self._reclaim_dead_blobs()
+        for directory in GC_MANAGED_DIRS:
+            await self._collect_orphan_files(directory)
+        await self._purge_quarantine()
+        self.report.elapsed = round(time.monotonic() - started, 3)
+        return self.report
+
+    def _keyset_batches(self, model, columns, *conditions):
+        for rows in keyset_batches(self.session, model, columns, conditions, self.batch_size):
+            self.report.scanned_rows += len(rows)
+            yield rows
+
+    def _collect_live_references(self):
+        """收集仍被引用的文件路径：未删除的视频、所有用户头像、引用数大于 0 的内容寻址文件"""
+        for rows in self._keyset_batches(
+                Video,
+                (Video.file_path, Video.cover_image, Video.hls_path, Video.preview_track_path),
+                Video.is_deleted == False,
+        ):
+            for row in rows:
+                self.live_paths.update(path for path in (row.file_path, row.cover_image) if path)
+                self.live_asset_dirs.update(
+                    os.path.dirname(path) for path in (row.hls_path, row.preview_track_path) if path
+                )
+
+        for rows in self._keyset_batches(User, (User.profile_picture,)):
+            self.live_paths.update(row.profile_picture for row in rows if row.profile_picture)
+        # 新用户的默认头像
+        self.live_paths.add(User.profile_picture.default.arg)
+
+        for rows in self._keyset_batches(MediaBlob, (MediaBlob.path,), MediaBlob.ref_count > 0):
+            self.live_paths.update(row.path for row in rows)
+
+        self.live_digests = {digest for digest in map(blob_digest, self.live_paths) if digest}
+
+    def _reclaim_dead_blobs(self):
+        """删除引用数归零且超过保留期的记录，对应文件在遍历目录时作为孤儿回收"""
+        last_change = func.coalesce(MediaBlob.updated_at, MediaBlob.created_at)
+        stale_before = _stale_before(self.grace_seconds)
+        for rows in self._keyset_batches(
+                MediaBlob, (MediaBlob.digest, MediaBlob.path), MediaBlob.ref_count <= 0, last_change < stale_before
+        ):
+            for row in rows:
+                if row.path in self.live_paths:
+                    # 引用数与业务记录不一致，保守起见保留
+                    logger.warning(f"Media blob {row.path} has no refs but is still referenced, skip")
+                    continue
+                if self.dry_run:
+                    self.dead_digests.add(row.digest)
+                    self.report.dead_blobs += 1
+                    continue
+                # 带条件删除：扫描之后又被重新引用（ref_count > 0）的记录不会被删掉
+                result = self.session.execute(
+                    delete(MediaBlob).where(MediaBlob.id == row.id, MediaBlob.ref_count <= 0)
+                )
+                self.report.dead_blobs += result.rowcount
+            if not self.dry_run:
+                self.session.commit()
+
+    def _is_live(self, key: str) -> bool:
+        if key in self.live_paths:
+            return True
+        for asset_dir in VIDEO_ASSET_DIRS:
+            if key.startswith(asset_dir + os.sep):
+                video_dir = key[len(asset_dir) + 1:].split(os.sep, 1)[0]
+                return os.path.join(asset_dir, video_dir) in self.live_asset_dirs
+
+        digest = blob_digest(key) or thumbnail_source_digest(key)
+        if digest is None:
+            return False
+        if digest in self.live_digests:
+            return True
+        if digest in self.dead_digests:
+            return False
+        # 还有记录（引用数归零但未过保留期，或刚被重新上传）：删除前再查一次，缩小与上传并发的窗口
+        return self.session.scalar(select(MediaBlob.id).where(MediaBlob.digest == digest)) is not None
+
+    async def _collect_orphan_files(self, directory: str):
+        cutoff = time.time() - self.grace_seconds
+        async for key, stat in self.storage.list_objects(directory):
+            await self.scan_limiter.acquire()
+            self.report.scanned_files += 1
+            # 修改时间在保留期内的文件可能属于进行中的上传或处理任务
+            if stat.mtime >= cutoff or self._is_live(key):
+                continue
+
+            self.report.orphan_files += 1
+            self.report.reclaimed_bytes += stat.size
+            if self.dry_run:
+                logger.info(f"[dry-run] Orphan media file {key} ({stat.size} bytes)")
+                continue
+            await self.delete_limiter.acquire()
+            try:
+                if self.mode == "delete":
+                    await self.storage.delete(key)
+                else:
+                    await self.storage.move(key, os.path.join(self.quarantine_dir, key))
+            except Exception as e:
+                self.report.errors += 1
+                logger.warning(f"Failed to {self.mode} orphan media file {key}: {e}")
+
+    async def _purge_quarantine(self):
+        expire_before = datetime.now() - timedelta(days=settings.MEDIA_GC_QUARANTINE_DAYS)
+        async for key, _ in self.storage.list_objects(QUARANTINE_DIR):
+            date_dir = key[len(QUARANTINE_DIR) + 1:].split(os.sep, 1)[0]
+            try:
+                quarantined_at = datetime.strptime(date_dir, QUARANTINE_DATE_FORMAT)
+            except ValueError:
+                continue
+            if quarantined_at >= expire_before:
+                continue
+
+            self.report.purged_files += 1
+            if self.dry_run:
+                continue
+            await self.delete_limiter.acquire()
+            try:
+                await self.storage.delete(key)
+            except Exception as e:
+                self.report.errors += 1
+                logger.warning(f"Failed to purge quarantined media file {key}: {e}")
+
+
+@dataclass
+class MediaTierReport:
+    dry_run: bool
+    scanned_rows: int = 0  # 扫描的候选视频数
+    cold_videos: int = 0  # 归档的视频数
+    demoted_files: int = 0  # 移入归档层的文件数
+    demoted_bytes: int = 0
+    errors: int = 0
+    elapsed: float = 0.0  # 耗时（秒）
+
+    def as_dict(self) -> dict:
+        elapsed = max(self.elapsed, 1e-6)
+        return {
+            **asdict(self),
+            "rows_per_second": round(self.scanned_rows / elapsed, 1),
+            "demoted_mb": round(self.demoted_bytes / 1024 / 1024, 2),
+        }
+
+
+class MediaTieringJob:
+    """
+    把冷视频的原文件和 HLS 码率阶梯移入归档层。冷视频：已发布超过 MEDIA_TIER_MIN_AGE_DAYS 天、
+    累计观看数不超过 MEDIA_TIER_COLD_MAX_VIEWS，且最近 MEDIA_TIER_IDLE_DAYS 天内没有观看记录。
+    封面和缩略图体积小、列表页频繁访问，始终留在热存储。
+    """
+
+    def __init__(self, session: Session, storage: TieredStorage, mongo_db, dry_run: bool = False):
+        self.session = session
+        self.storage = storage
+        self.mongo_db = mongo_db
+        self.dry_run = dry_run
+        self.move_limiter = RateLimiter(settings.MEDIA_TIER_MOVE_RATE)
+        self.report = MediaTierReport(dry_run=dry_run)
+
+    async def run(self) -> MediaTierReport:
+        started = time.monotonic()
+        views = self.mongo_db[VideoViewHistory.Config.collection]
+        # 观看记录的时间戳为 UTC
+        idle_since = datetime.utcnow() - timedelta(days=settings.MEDIA_TIER_IDLE_DAYS)
+        for rows in keyset_batches(
+                self.session,
+                Video,
+                (Video.file_path, Video.hls_path),
+                (
+                    Video.is_deleted == False,
+                    Video.status == VideoStatusEnum.PUBLISHED,
+                    Video.view_count <= settings.MEDIA_TIER_COLD_MAX_VIEWS,
+                    Video.created_at < _stale_before(settings.MEDIA_TIER_MIN_AGE_DAYS * 24 * 3600),
+                ),
+                settings.MEDIA_GC_BATCH_SIZE,
+        ):
+            self.report.scanned_rows += len(rows)
+            recently_watched = set(await views.distinct(
+                "video_id", {"video_id": {"$in": [row.id for row in rows]}, "timestamp": {"$gte": idle_since}}
+            ))
+            for row in rows:
+                if row.id not in recently_watched:
+                    await self._demote_video(row)
+        self.report.elapsed = round(time.monotonic() - started, 3)
+        return self.report
+
+    async def _demote_video(self, row):
+        keys = [row.file_path]
+        if row.hls_path:
+            keys += [key async for key, _ in self.storage.hot.list_objects(os.path.dirname(row.hls_path))]
+
+        demoted = 0
+        for key in keys:
+            stat = await self.storage.hot.stat(key)
+            if stat is None:
+                continue
+            demoted += 1
+            self.report.demoted_files += 1
+            self.report.demoted_bytes += stat.size
+            if self.dry_run:
+                continue
+            await self.move_limiter.acquire()
+            try:
+                await self.storage.demote(key)
+            except Exception as e:
+                self.report.errors += 1
+                logger.warning(f"Failed to demote {key} of video {row.id}: {e}")
+        if demoted:
+            self.report.cold_videos += 1
+
+
+@dataclass
+class ThumbnailBackfillReport:
+    dry_run: bool
+    scanned_images: int = 0  # 扫描的封面 / 头像数（内容寻址存储中的图片）
+    missing_images: int = 0  # 缺少当前配置档位的图片数
+    generated_variants: int = 0  # 补生成的档位数
+    failed_images: int = 0  # 补生成后仍有缺失的图片数
+    elapsed: float = 0.0  # 耗时（秒）
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+class ThumbnailBackfillJob:
+    """
+    为封面（未删除的视频）和头像补齐当前配置下缺少的缩略图档位，并把实际存在的档位写回 media_blobs.thumbnails。
+    已在 worker 进程中，直接在线程里生成，不占用 API 的进程池。
+    """
+
+    def __init__(self, session: Session, storage: StorageBackend, dry_run: bool = False):
+        self.session = session
+        self.storage = storage
+        self.dry_run = dry_run
+        self.report = ThumbnailBackfillReport(dry_run=dry_run)
+
+    async def run(self) -> ThumbnailBackfillReport:
+        started = time.monotonic()
+        for rows in keyset_batches(
+                self.session, Video, (Video.cover_image,),
+                (Video.is_deleted == False, Video.cover_image.is_not(None)), settings.MEDIA_GC_BATCH_SIZE,
+        ):
+            await self._backfill([row.cover_image for row in rows], settings.cover_thumb_widths, square=False)
+        for rows in keyset_batches(
+                self.session, User, (User.profile_picture,),
+                (User.profile_picture.is_not(None),), settings.MEDIA_GC_BATCH_SIZE,
+        ):
+            await self._backfill([row.profile_picture for row in rows], settings.avatar_thumb_widths, square=True)
+        self.report.elapsed = round(time.monotonic() - started, 3)
+        return self.report
+
+    async def _backfill(self, paths: list[str], widths: list[int], square: bool):
+        expected = {thumbnail_variant(width, settings.THUMBNAIL_FORMAT) for width in widths}
+        # 旧上传目录中的图片（默认头像等）不在 media_blobs 中，没有缩略图
+        rows = self.session.execute(
+            select(MediaBlob.path, MediaBlob.thumbnails).where(MediaBlob.path.in_(set(paths)))
+        ).all()
+        for row in rows:
+            self.report.scanned_images += 1
+            recorded = parse_thumbnails(row.thumbnails)
+            if expected <= recorded:
+                continue
+            self.report.missing_images += 1
+            if self.dry_run:
+                continue
+            variants = await ensure_thumbnails(self.storage, row.path, widths, square, in_process_pool=False)
+            self.report.generated_variants += len((variants & expected) - recorded)
+            if not expected <= variants:
+                self.report.failed_images += 1
+            record_blob_thumbnails_sync(self.session, row.path, variants)
+        self.session.commit()
+
+
+def run_thumbnail_backfill(dry_run: bool = False) -> dict:
+    """补齐一次封面 / 头像缩略图并返回统计报告"""
+    async def runner():
+        storage = create_storage()
+        try:
+            with get_sync_session() as session:
+                return await ThumbnailBackfillJob(session, storage, dry_run).run()
+        finally:
+            await storage.close()
+
+    report = asyncio.run(runner()).as_dict()
+    logger.info(f"Thumbnail backfill finished: {report}")
+    return report
+
+
+def run_media_tiering(dry_run: bool = False) -> dict:
+    """执行一次冷数据归档并返回统计报告（未配置归档层时不执行）"""
+    async def runner():
+        storage = create_storage()
+        if not isinstance(storage, TieredStorage):
+            await storage.close()
+            return None
+        mongo_client = AsyncIOMotorClient(settings.MONGODB_URL)
+        try:
+            with get_sync_session() as session:
+                job = MediaTieringJob(session, storage, mongo_client[settings.MONGODB_DB], dry_run)
+                return await job.run()
+        finally:
+            mongo_client.close()
+            await storage.close()
+
+    report = asyncio.run(runner())
+    if report is None:
+        logger.info("Media archive tier is not configured, skip tiering")
+        return {"enabled": False}
+    report = report.as_dict()
+    logger.info(f"Media tiering finished: {report}")
+    return report
+
+
+def run_media_gc(dry_run: bool = False, mode: str | None = None) -> dict:
+    """执行一次媒体清理并返回统计报告"""
+    async def runner():
+        storage = create_storage()
+        try:
+            with get_sync_session() as session:
+                return await MediaGarbageCollector(session, storage, dry_run, mode).run()
+        finally:
+            await storage.close()
+
+    report = asyncio.run(runner()).as_dict()
+    logger.info(f"Media GC finished: {report}")
+    return report
+
+
+@celery_app.task(name="media.gc")
+def collect_media_garbage(dry_run: bool = False) -> dict:
+    """定期回收未被引用的媒体文件"""
+    return run_media_gc(dry_run)
+
+
+@celery_app.task(name="media.tier")
+def archive_cold_media(dry_run: bool = False) -> dict:
+    """定期把冷视频移入归档层"""
+    return run_media_tiering(dry_run)
+
+
+@celery_app.task(name="media.thumbnails")
+def backfill_thumbnails(dry_run: bool = False) -> dict:
+    """定期补齐缺少的封面 / 头像缩略图（调整档位或格式后）"""
+    return run_thumbnail_backfill(dry_run)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="媒体文件清理 / 冷数据归档 / 缩略图补生成")
+    parser.add_argument(
+        "job", nargs="?", choices=["gc", "tier", "thumbnails"], default="gc",
+        help="gc：回收未被引用的文件；tier：归档冷视频；thumbnails：补齐缺少的缩略图",
+    )
+    parser.add_argument("--dry-run", action="store_true", help="只统计，不修改数据库和文件")
+    parser.add_argument("--mode", choices=["quarantine", "delete"], help="gc 孤儿文件处理方式，默认取 MEDIA_GC_MODE")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    if args.job == "tier":
+        result = run_media_tiering(args.dry_run)
+    elif args.job == "thumbnails":
+        result = run_thumbnail_backfill(args.dry_run)
+    else:
+        result = run_media_gc(args.dry_run, args.mode)
+    print(json.dumps(result, ensure_ascii=False, indent=2))
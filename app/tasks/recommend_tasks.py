@@ -0,0 +1,213 @@
+"""
+离线构建视频相似度（item-item 协同过滤），结果写入 Redis 供个性化推荐使用
+
+1. 读取最近 RECOMMEND_LOOKBACK_DAYS 天的互动：点赞、收藏、观看记录（MySQL watch_history）
+   以及 MongoDB video_views 中的观看进度，按权重合成用户 × 视频稀疏矩阵
+2. 计算视频之间的相似度（app.utils.recommend.item_cf），每个视频保留 RECOMMEND_NEIGHBORS 个近邻
+3. 写入 rec:item:{video_id}（ZSET），重算后没有近邻的视频删除旧列表
+
+增量构建只重算上一次构建之后有新互动的视频，并把新分数写回这些视频的近邻列表；
+取消点赞等删除类变化由定期全量重建修正。
+
+定期执行（celery beat）：
+    celery -A app.tasks.celery_app beat -l info
+
+手动执行：
+    python -m app.tasks.recommend_tasks --full
+"""
+
+import argparse
+import json
+import logging
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+from pymongo import MongoClient
+
+from app.core.config import settings
+from app.crud.video.video import published_video_conditions
+from app.db.mysql import get_sync_session
+from app.db.redis import get_redis_sync_client
+from app.models.mongodb.video import VideoViewHistory
+from app.models.mysql.collection import Collection
+from app.models.mysql.like import Like
+from app.models.mysql.video import Video
+from app.models.mysql.watch_history import WatchHistory
+from app.models.redis.recommend import REC_BUILD_LOCK_KEY, REC_BUILT_AT_KEY, item_neighbors_key
+from app.tasks.celery_app import celery_app
+from app.tasks.media_tasks import keyset_batches
+from app.utils.recommend import INTERACTION_WEIGHTS, build_interaction_matrix, item_neighbors
+
+logger = logging.getLogger(__name__)
+
+LOAD_BATCH_SIZE = 5000
+BUILD_LOCK_SECONDS = 3600
+
+
+class _Interactions:
+    """按列累积 (用户, 视频, 权重, 是否为上次构建后的新互动)"""
+
+    def __init__(self):
+        self.users: list[int] = []
+        self.videos: list[int] = []
+        self.weights: list[float] = []
+        self.recent: list[bool] = []
+
+    def add(self, user_id: int, video_id: int, weight: float, recent: bool):
+        self.users.append(user_id)
+        self.videos.append(video_id)
+        self.weights.append(weight)
+        self.recent.append(recent)
+
+
+def _load_mysql_interactions(interactions: _Interactions, since_local: datetime | None, since_utc: datetime | None):
+    # likes / collections 的时间由数据库 now() 写入（本地时间），watch_history 由应用写入 UTC
+    local_cutoff = datetime.now() - timedelta(days=settings.RECOMMEND_LOOKBACK_DAYS)
+    utc_cutoff = datetime.utcnow() - timedelta(days=settings.RECOMMEND_LOOKBACK_DAYS)
+    sources = (
+        (Like, Like.created_at, local_cutoff, since_local, INTERACTION_WEIGHTS["like"]),
+        (Collection, Collection.created_at, local_cutoff, since_local, INTERACTION_WEIGHTS["collect"]),
+        (WatchHistory, WatchHistory.last_watch_at, utc_cutoff, since_utc, INTERACTION_WEIGHTS["watch"]),
+    )
+    with get_sync_session() as session:
+        for model, time_column, cutoff, since, weight in sources:
+            columns = (model.user_id, model.video_id, time_column.label("at"))
+            for rows in keyset_batches(session, model, columns, (time_column >= cutoff,), LOAD_BATCH_SIZE):
+                for row in rows:
+                    interactions.add(row.user_id, row.video_id, weight, since is not None and row.at >= since)
+
+
+def _load_view_progress(interactions: _Interactions, since_utc: datetime | None):
+    """MongoDB 观看记录按（用户, 视频）取最大进度；MongoDB 不可用时跳过"""
+    cutoff = datetime.utcnow() - timedelta(days=settings.RECOMMEND_LOOKBACK_DAYS)
+    client = MongoClient(settings.MONGODB_URL, serverSelectionTimeoutMS=5000)
+    try:
+        views = client[settings.MONGODB_DB][VideoViewHistory.Config.collection]
+        pipeline = [
+            {"$match": {"timestamp": {"$gte": cutoff}}},
+            {"$group": {
+                "_id": {"user_id": "$user_id", "video_id": "$video_id"},
+                "progress": {"$max": "$watch_progress"},
+                "at": {"$max": "$timestamp"},
+            }},
+        ]
+        for doc in views.aggregate(pipeline, allowDiskUse=True):
+            progress = min(max(float(doc["progress"] or 0), 0.0), 1.0)
+            if progress > 0:
+                interactions.add(
+                    doc["_id"]["user_id"],
+                    doc["_id"]["video_id"],
+                    INTERACTION_WEIGHTS["progress"] * progress,
+                    since_utc is not None and doc["at"] >= since_utc,
+                )
+    except Exception as e:
+        logger.warning(f"Skip video_views when building recommendations: {e}")
+    finally:
+        client.close()
+
+
+def _published_video_ids() -> np.ndarray:
+    ids = []
+    with get_sync_session() as session:
+        for rows in keyset_batches(session, Video, (), published_video_conditions(), LOAD_BATCH_SIZE):
+            ids.extend(row.id for row in rows)
+    return np.asarray(ids, dtype=np.int64)
+
+
+def _write_neighbors(redis, video_ids: np.ndarray, blocks, incremental: bool) -> int:
+    """
+    写入近邻列表，重算后没有近邻的视频删除旧列表；
+    增量构建时同时把新分数写入近邻视频的列表并截断到 RECOMMEND_NEIGHBORS 个
+    """
+    written = 0
+    for block, columns, neighbors, scores in blocks:
+        pipe = redis.pipeline(transaction=False)
+        for column in np.setdiff1d(block, columns):
+            pipe.delete(item_neighbors_key(int(video_ids[column])))
+        boundaries = np.flatnonzero(np.diff(columns)) + 1
+        for start, end in zip(np.r_[0, boundaries], np.r_[boundaries, len(columns)]):
+            if start == end:
+                continue
+            video_id = int(video_ids[columns[start]])
+            key = item_neighbors_key(video_id)
+            pipe.delete(key)
+            pipe.zadd(key, {int(video_ids[n]): float(s) for n, s in zip(neighbors[start:end], scores[start:end])})
+            pipe.expire(key, settings.RECOMMEND_NEIGHBOR_TTL_SECONDS)
+            written += 1
+            if incremental:
+                for n, s in zip(neighbors[start:end], scores[start:end]):
+                    reverse_key = item_neighbors_key(int(video_ids[n]))
+                    pipe.zadd(reverse_key, {video_id: float(s)})
+                    pipe.zremrangebyrank(reverse_key, 0, -settings.RECOMMEND_NEIGHBORS - 1)
+                    pipe.expire(reverse_key, settings.RECOMMEND_NEIGHBOR_TTL_SECONDS)
+        pipe.execute()
+    return written
+
+
+def build_item_similarity(full: bool = False) -> dict:
+    """构建相似视频列表；没有上一次构建记录时执行全量构建"""
+    redis = get_redis_sync_client()
+    if not redis.set(REC_BUILD_LOCK_KEY, 1, nx=True, ex=BUILD_LOCK_SECONDS):
+        logger.info("Recommendation build is already running, skip")
+        return {"skipped": True}
+    try:
+        started = time.monotonic()
+        run_at = time.time()
+        built_at = None if full else redis.get(REC_BUILT_AT_KEY)
+        since_local = datetime.fromtimestamp(float(built_at)) if built_at else None
+        since_utc = datetime.utcfromtimestamp(float(built_at)) if built_at else None
+
+        interactions = _Interactions()
+        _load_mysql_interactions(interactions, since_local, since_utc)
+        _load_view_progress(interactions, since_utc)
+
+        videos = np.asarray(interactions.videos, dtype=np.int64)
+        visible = np.isin(videos, _published_video_ids())
+        report = {"mode": "incremental" if built_at else "full", "interactions": int(visible.sum())}
+        if not visible.any():
+            redis.set(REC_BUILT_AT_KEY, run_at)
+            return {**report, "videos": 0, "written": 0}
+
+        matrix, video_ids = build_interaction_matrix(
+            np.asarray(interactions.users, dtype=np.int64)[visible],
+            videos[visible],
+            np.asarray(interactions.weights, dtype=np.float32)[visible],
+        )
+        columns = None
+        if built_at:
+            changed = np.unique(videos[visible & np.asarray(interactions.recent, dtype=bool)])
+            columns = np.flatnonzero(np.isin(video_ids, changed))
+        blocks = item_neighbors(
+            matrix,
+            top_k=settings.RECOMMEND_NEIGHBORS,
+            shrinkage=settings.RECOMMEND_SHRINKAGE,
+            columns=columns,
+        )
+        written = _write_neighbors(redis, video_ids, blocks, incremental=bool(built_at))
+        redis.set(REC_BUILT_AT_KEY, run_at)
+    finally:
+        redis.delete(REC_BUILD_LOCK_KEY)
+
+    report.update({
+        "users": matrix.shape[0],
+        "videos": matrix.shape[1],
+        "written": written,
+        "elapsed": round(time.monotonic() - started, 3),
+    })
+    logger.info(f"Recommendation build finished: {report}")
+    return report
+
+
+@celery_app.task(name="recommend.item_cf")
+def build_item_similarity_task(full: bool = False) -> dict:
+    """定期构建相似视频（默认增量）"""
+    return build_item_similarity(full)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="构建视频相似度（item-item 协同过滤）")
+    parser.add_argument("--full", action="store_true", help="全量重建，默认只重算上次构建后有新互动的视频")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    print(json.dumps(build_item_similarity(args.full), ensure_ascii=False, indent=2))
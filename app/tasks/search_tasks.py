@@ -0,0 +1,105 @@
+"""
+全量构建视频搜索索引（app.utils.search），写入 search_index_dir/{版本}/ 后切换 search:index:version
+
+1. 记下当前的变更序号，再按主键分批读取所有对外可见视频的标题、描述
+2. 分词、构建按词项排序的倒排表，保存为 .npy 文件
+3. 切换版本，删除已合并进新索引的变更记录，只保留最近两个版本的目录
+
+构建期间发生的变更序号大于记下的序号，API 进程加载新版本后会重新应用，不会丢失。
+
+定期执行（celery beat）：
+    celery -A app.tasks.celery_app beat -l info
+
+手动执行（首次部署时先执行一次，之前搜索按标题 LIKE 查询 MySQL）：
+    python -m app.tasks.search_tasks
+"""
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import time
+from datetime import datetime
+
+from app.core.config import settings
+from app.crud.video.video import published_video_conditions
+from app.db.mysql import get_sync_session
+from app.db.redis import get_redis_sync_client
+from app.models.mysql.video import Video
+from app.models.redis.search import SEARCH_BUILD_LOCK_KEY, SEARCH_CHANGE_SEQ_KEY, SEARCH_CHANGES_KEY, SEARCH_INDEX_VERSION_KEY
+from app.tasks.celery_app import celery_app
+from app.tasks.media_tasks import keyset_batches
+from app.utils.search import build_segment, save_segment
+
+logger = logging.getLogger(__name__)
+
+LOAD_BATCH_SIZE = 5000
+BUILD_LOCK_SECONDS = 3600
+KEEP_VERSIONS = 2
+
+
+def _published_documents():
+    with get_sync_session() as session:
+        columns = (Video.title, Video.description)
+        for rows in keyset_batches(session, Video, columns, published_video_conditions(), LOAD_BATCH_SIZE):
+            for row in rows:
+                yield row.id, row.title, row.description
+
+
+def _remove_old_versions(root: str, current: str) -> None:
+    versions = sorted(
+        name for name in os.listdir(root) if not name.startswith(".") and os.path.isdir(os.path.join(root, name))
+    )
+    for name in versions[:-KEEP_VERSIONS]:
+        if name != current:
+            shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+
+
+def build_search_index() -> dict:
+    """全量构建搜索索引并切换版本"""
+    redis = get_redis_sync_client()
+    if not redis.set(SEARCH_BUILD_LOCK_KEY, 1, nx=True, ex=BUILD_LOCK_SECONDS):
+        logger.info("Search index build is already running, skip")
+        return {"skipped": True}
+    try:
+        started = time.monotonic()
+        seq = int(redis.get(SEARCH_CHANGE_SEQ_KEY) or 0)
+        segment = build_segment(
+            _published_documents(),
+            title_weight=settings.SEARCH_TITLE_WEIGHT,
+            description_chars=settings.SEARCH_DESCRIPTION_CHARS,
+        )
+        # 每次构建写入新目录（API 进程 mmap 着旧版本的文件，不能原地覆盖），写完后再改名，不会加载到写了一半的目录
+        version = datetime.utcnow().strftime("%Y%m%d%H%M%S%f")
+        root = settings.search_index_dir
+        staging = os.path.join(root, f".{version}")
+        save_segment(staging, segment, {"seq": seq, "videos": len(segment["doc_ids"])})
+        os.rename(staging, os.path.join(root, version))
+        redis.set(SEARCH_INDEX_VERSION_KEY, version)
+        redis.zremrangebyscore(SEARCH_CHANGES_KEY, "-inf", seq)
+        _remove_old_versions(root, version)
+    finally:
+        redis.delete(SEARCH_BUILD_LOCK_KEY)
+
+    report = {
+        "version": version,
+        "videos": len(segment["doc_ids"]),
+        "terms": len(segment["terms"]),
+        "postings": len(segment["postings"]),
+        "elapsed": round(time.monotonic() - started, 3),
+    }
+    logger.info(f"Search index built: {report}")
+    return report
+
+
+@celery_app.task(name="search.build")
+def build_search_index_task() -> dict:
+    """定期全量重建搜索索引"""
+    return build_search_index()
+
+
+if __name__ == "__main__":
+    argparse.ArgumentParser(description="全量构建视频搜索索引").parse_args()
+    logging.basicConfig(level=logging.INFO)
+    print(json.dumps(build_search_index(), ensure_ascii=False, indent=2))
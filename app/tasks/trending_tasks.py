@@ -0,0 +1,146 @@
+"""
+热门视频（观看趋势）的定期计算
+
+观看时按 UTC 小时累加计数（app.services.analytics.trending.record_view_event），本任务按小时读取计数，
+计算带时间衰减的趋势分数：
+
+    score(v) = Σ 该小时观看次数 × 0.5 ^ (距今小时数 / TRENDING_HALF_LIFE_HOURS)
+
+从最近一小时向前累加，每满一天把当前的前 TRENDING_TOP_N 个视频发布为 trending:top:{days}，
+接口读取时与观看记录总数无关。发布的每一项同时带有排序用的 score 和窗口内未衰减的 view_count，
+二者的先后不一定一致。
+
+定期执行（celery beat）：
+    celery -A app.tasks.celery_app beat -l info
+
+手动执行（--backfill 先从 MongoDB 观看记录重建每小时计数，用于首次部署或 Redis 数据丢失后）：
+    python -m app.tasks.trending_tasks --backfill
+"""
+
+import argparse
+import heapq
+import json
+import logging
+import time
+from datetime import datetime, timedelta
+
+from pymongo import MongoClient
+
+from app.core.config import settings
+from app.db.redis import get_redis_sync_client
+from app.models.mongodb.video import VideoViewHistory
+from app.models.redis.trending import TRENDING_HOUR_FORMAT, trending_top_key, trending_views_key, trending_watch_key
+from app.tasks.celery_app import celery_app
+
+logger = logging.getLogger(__name__)
+
+
+def _hour_buckets(now: datetime, days: int):
+    """从当前小时向前的 (小时 key, 距今小时数)"""
+    current = now.replace(minute=0, second=0, microsecond=0)
+    offset = (now - current).total_seconds() / 3600
+    for hours in range(days * 24):
+        yield (current - timedelta(hours=hours)).strftime(TRENDING_HOUR_FORMAT), hours + offset
+
+
+def compute_trending(now: datetime | None = None) -> dict:
+    """计算并发布 1 ~ TRENDING_MAX_DAYS 天各窗口的热门视频"""
+    started = time.monotonic()
+    now = now or datetime.utcnow()
+    redis = get_redis_sync_client()
+    half_life = max(settings.TRENDING_HALF_LIFE_HOURS, 1e-6)
+    scores: dict[int, float] = {}
+    views: dict[int, int] = {}
+    watch: dict[int, int] = {}
+    buckets = list(_hour_buckets(now, settings.TRENDING_MAX_DAYS))
+
+    publish = redis.pipeline(transaction=False)
+    for day in range(settings.TRENDING_MAX_DAYS):
+        day_buckets = buckets[day * 24:(day + 1) * 24]
+        pipe = redis.pipeline(transaction=False)
+        for hour, _ in day_buckets:
+            pipe.hgetall(trending_views_key(hour))
+            pipe.hgetall(trending_watch_key(hour))
+        results = pipe.execute()
+        for (_, age), hour_views, hour_watch in zip(day_buckets, results[::2], results[1::2]):
+            decay = 0.5 ** (age / half_life)
+            for video_id, count in hour_views.items():
+                video_id, count = int(video_id), int(count)
+                scores[video_id] = scores.get(video_id, 0.0) + count * decay
+                views[video_id] = views.get(video_id, 0) + count
+            for video_id, seconds in hour_watch.items():
+                watch[int(video_id)] = watch.get(int(video_id), 0) + int(seconds)
+
+        top = heapq.nlargest(settings.TRENDING_TOP_N, scores.items(), key=lambda item: (item[1], item[0]))
+        items = [
+            {
+                "_id": video_id,
+                "view_count": views[video_id],
+                "total_watch_time": watch.get(video_id, 0),
+                "score": round(score, 4),
+            }
+            for video_id, score in top
+        ]
+        # 过期时间覆盖几次计算间隔，任务停止后回退到直接聚合 MongoDB
+        publish.set(trending_top_key(day + 1), json.dumps(items), ex=settings.TRENDING_INTERVAL_SECONDS * 3)
+    publish.execute()
+
+    report = {"videos": len(scores), "elapsed": round(time.monotonic() - started, 3)}
+    logger.info(f"Trending computed: {report}")
+    return report
+
+
+def backfill_trending_counters(days: int | None = None) -> dict:
+    """从 MongoDB 观看记录重建最近 days 天的每小时计数（覆盖写入，可重复执行）"""
+    days = days or settings.TRENDING_MAX_DAYS
+    since = (datetime.utcnow() - timedelta(days=days)).replace(minute=0, second=0, microsecond=0)
+    ttl = (settings.TRENDING_MAX_DAYS + 1) * 24 * 3600
+    redis = get_redis_sync_client()
+    client = MongoClient(settings.MONGODB_URL)
+    try:
+        views = client[settings.MONGODB_DB][VideoViewHistory.Config.collection]
+        pipeline = [
+            {"$match": {"timestamp": {"$gte": since}}},
+            {"$group": {
+                "_id": {
+                    "hour": {"$dateToString": {"format": "%Y%m%d%H", "date": "$timestamp"}},
+                    "video_id": "$video_id",
+                },
+                "views": {"$sum": 1},
+                "watch": {"$sum": "$watch_duration"},
+            }},
+        ]
+        rows = 0
+        pipe = redis.pipeline(transaction=False)
+        for doc in views.aggregate(pipeline, allowDiskUse=True):
+            hour, video_id = doc["_id"]["hour"], doc["_id"]["video_id"]
+            pipe.hset(trending_views_key(hour), video_id, doc["views"])
+            pipe.hset(trending_watch_key(hour), video_id, int(doc["watch"] or 0))
+            pipe.expire(trending_views_key(hour), ttl)
+            pipe.expire(trending_watch_key(hour), ttl)
+            rows += 1
+            if rows % 1000 == 0:
+                pipe.execute()
+        pipe.execute()
+    finally:
+        client.close()
+    logger.info(f"Trending counters backfilled: {rows} video-hours since {since}")
+    return {"video_hours": rows}
+
+
+@celery_app.task(name="analytics.trending")
+def compute_trending_task() -> dict:
+    """定期计算热门视频"""
+    return compute_trending()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="计算热门视频（观看趋势）")
+    parser.add_argument("--backfill", action="store_true", help="先从 MongoDB 观看记录重建每小时计数")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    result = {}
+    if args.backfill:
+        result["backfill"] = backfill_trending_counters()
+    result["trending"] = compute_trending()
+    print(json.dumps(result, ensure_ascii=False, indent=2))
@@ -0,0 +1,349 @@
+"""
+视频后台处理流水线
+
+上传接口只负责落盘并写入 status=processing 的视频记录，随后投递以下任务链：
+
+    probe（探测元信息） -> transcode（转码） -> hls（自适应码率打包） -> sprites（拖动预览图）
+        -> cover（封面） -> publish（发布）
+
+每个阶段完成后把进度写回 Video.processing_progress，任一阶段失败则标记为 failed。
+"""
+
+import asyncio
+import logging
+import os
+import shutil
+from contextlib import contextmanager
+
+from celery import chain
+
+from app.core.config import settings
+from app.crud.count_cache import invalidate_counts_sync
+from app.crud.media.blob import acquire_blob_sync, record_blob_thumbnails_sync, release_blobs_sync
+from app.db.mysql import get_sync_session
+from app.models.mysql.video import Video, VideoStatusEnum
+from app.models.redis.count import PUBLISHED_VIDEO_COUNT_KEY, uploader_video_count_keys
+from app.services.media.thumbnail import ensure_thumbnails
+from app.services.video.feed_cache import refresh_video_in_feeds_sync
+from app.services.video.search import record_search_change_sync
+from app.storage import create_storage, get_storage
+from app.storage.blob import HLS_DIR, SPRITE_DIR, blob_relative_path, blob_tmp_full_path, place_blob
+from app.storage.local import hash_local_file
+from app.tasks.celery_app import celery_app
+from app.tasks.feed_tasks import fanout_video_task
+from app.utils.media.keyframe import extract_cover_frame
+from app.utils.media.hls import MASTER_PLAYLIST_NAME, package_hls, select_renditions
+from app.utils.media.probe import probe_video_file
+from app.utils.media.sprite import PREVIEW_TRACK_NAME, generate_preview_sprites
+from app.utils.media.transcode import WEB_SAFE_CODECS, ffmpeg_available, transcode_to_web_mp4
+
+logger = logging.getLogger(__name__)
+
+# 各阶段完成后的进度
+PROGRESS_PROBED = 20
+PROGRESS_TRANSCODED = 50
+PROGRESS_PACKAGED = 80
+PROGRESS_SPRITES = 85
+PROGRESS_COVERED = 90
+PROGRESS_PUBLISHED = 100
+
+
+def _run_storage(func):
+    """
+    在新的事件循环中用独立的存储后端实例执行 func(storage)。
+    worker 中没有常驻事件循环，对象存储客户端不能跨事件循环复用。
+    """
+    async def runner():
+        storage = create_storage()
+        try:
+            return await func(storage)
+        finally:
+            await storage.close()
+
+    return asyncio.run(runner())
+
+
+@contextmanager
+def _local_copy(relative_path: str):
+    """ffmpeg / OpenCV 需要本地文件：本地存储直接使用原文件，对象存储先下载到临时文件"""
+    local_path = get_storage().local_path(relative_path)
+    if local_path is not None:
+        yield local_path
+        return
+    tmp_path = blob_tmp_full_path(os.path.splitext(relative_path)[-1])
+    try:
+        _run_storage(lambda storage: storage.download(relative_path, tmp_path))
+        yield tmp_path
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _store_blob(session, tmp_full_path: str, ext: str) -> str:
+    """把任务产出的临时文件登记到内容寻址存储，返回相对路径（随 session 一起提交）"""
+    digest, size = hash_local_file(tmp_full_path)
+    relative_path = acquire_blob_sync(session, digest, size, blob_relative_path(digest, ext))
+    _run_storage(lambda storage: place_blob(storage, tmp_full_path, relative_path))
+    return relative_path
+
+
+def _generate_cover_thumbnails(session, cover_relative_path: str):
+    """为任务截取的封面生成各档缩略图并记录已有档位（已在 worker 进程中，不再投递到进程池）"""
+    variants = _run_storage(lambda storage: ensure_thumbnails(
+        storage, cover_relative_path, settings.cover_thumb_widths, in_process_pool=False
+    ))
+    record_blob_thumbnails_sync(session, cover_relative_path, variants)
+
+
+def _upload_directory(local_dir: str, relative_dir: str):
+    """把本地目录下的所有文件存入存储后端 relative_dir 下（保持相对结构）"""
+    async def upload(storage):
+        for root, _, files in os.walk(local_dir):
+            for name in files:
+                full_path = os.path.join(root, name)
+                key = os.path.join(relative_dir, os.path.relpath(full_path, local_dir))
+                await storage.put_file(key, full_path)
+
+    _run_storage(upload)
+
+
+def _report_progress(task, session, video: Video, stage: str, progress: int):
+    """把进度写回数据库，并同步到 Celery 任务状态"""
+    video.processing_progress = progress
+    session.commit()
+    if not task.request.is_eager:
+        task.update_state(state="PROGRESS", meta={"video_id": video.id, "stage": stage, "progress": progress})
+
+
+def _mark_failed(video_id: int, stage: str, exc: Exception):
+    with get_sync_session() as session:
+        video = session.get(Video, video_id)
+        if video:
+            video.status = VideoStatusEnum.FAILED
+            video.processing_error = f"{stage}: {exc}"[:255]
+            session.commit()
+    logger.error(f"Video {video_id} processing failed at {stage}: {exc}")
+
+
+def _load_video(session, video_id: int) -> Video:
+    video = session.get(Video, video_id)
+    if not video or video.is_deleted:
+        raise RuntimeError("视频不存在或已删除")
+    return video
+
+
+@celery_app.task(bind=True, name="video.probe")
+def probe_video(self, video_id: int) -> int:
+    """探测时长、帧率、分辨率、编码、码率"""
+    try:
+        with get_sync_session() as session:
+            video = _load_video(session, video_id)
+            try:
+                with _local_copy(video.file_path) as video_path:
+                    media_info = probe_video_file(video_path)
+            except Exception as e:
+                logger.warning(f"Media probe failed for video {video_id}: {e}")
+                media_info = {"duration": 0}
+            for key, value in media_info.items():
+                setattr(video, key, value)
+            _report_progress(self, session, video, "probe", PROGRESS_PROBED)
+    except Exception as e:
+        _mark_failed(video_id, "probe", e)
+        raise
+    return video_id
+
+
+@celery_app.task(bind=True, name="video.transcode")
+def transcode_video(self, video_id: int) -> int:
+    """转为 H.264/AAC faststart MP4；已是 H.264 的只做封装转换，没有 ffmpeg 时保留原文件"""
+    try:
+        with get_sync_session() as session:
+            video = _load_video(session, video_id)
+            if not ffmpeg_available(settings.FFMPEG_BIN):
+                logger.warning(f"ffmpeg not found, skip transcoding video {video_id}")
+            else:
+                src_relative_path = video.file_path
+                dst_tmp_path = blob_tmp_full_path(".mp4")
+                copy_video = (video.codec or "") in WEB_SAFE_CODECS
+                try:
+                    with _local_copy(src_relative_path) as src_path:
+                        transcode_to_web_mp4(src_path, dst_tmp_path, settings.FFMPEG_BIN, copy_video)
+                    video.file_path = _store_blob(session, dst_tmp_path, ".mp4")
+                finally:
+                    if os.path.exists(dst_tmp_path):
+                        os.remove(dst_tmp_path)
+
+                # 原文件可能被其他视频共享，只释放引用，由清理任务回收
+                release_blobs_sync(session, [src_relative_path])
+                if not copy_video:
+                    video.codec = "avc1"
+                session.commit()
+            _report_progress(self, session, video, "transcode", PROGRESS_TRANSCODED)
+    except Exception as e:
+        _mark_failed(video_id, "transcode", e)
+        raise
+    return video_id
+
+
+@celery_app.task(bind=True, name="video.hls")
+def package_video_hls(self, video_id: int) -> int:
+    """
+    生成 HLS 码率阶梯（不超过源分辨率）到 MEDIA_ROOT/hls/{video_id}/。
+    打包失败不影响发布，播放端回退到 MP4 直连。
+    """
+    try:
+        with get_sync_session() as session:
+            video = _load_video(session, video_id)
+            if settings.HLS_ENABLED and ffmpeg_available(settings.FFMPEG_BIN):
+                hls_relative_dir = os.path.join(HLS_DIR, str(video.id))
+                hls_tmp_dir = blob_tmp_full_path()
+                try:
+                    with _local_copy(video.file_path) as video_path:
+                        package_hls(
+                            video_path,
+                            hls_tmp_dir,
+                            select_renditions(video.height),
+                            settings.FFMPEG_BIN,
+                            segment_seconds=settings.HLS_SEGMENT_SECONDS,
+                            source_size=(video.width, video.height) if video.width and video.height else None,
+                        )
+                    _upload_directory(hls_tmp_dir, hls_relative_dir)
+                    video.hls_path = os.path.join(hls_relative_dir, MASTER_PLAYLIST_NAME)
+                except Exception as e:
+                    logger.warning(f"HLS packaging failed for video {video_id}, fallback to progressive MP4: {e}")
+                    video.hls_path = None
+                finally:
+                    shutil.rmtree(hls_tmp_dir, ignore_errors=True)
+            _report_progress(self, session, video, "hls", PROGRESS_PACKAGED)
+    except Exception as e:
+        _mark_failed(video_id, "hls", e)
+        raise
+    return video_id
+
+
+@celery_app.task(bind=True, name="video.sprites")
+def generate_video_sprites(self, video_id: int) -> int:
+    """
+    从存储的视频文件截帧生成雪碧图和 WebVTT 缩略图轨道到 MEDIA_ROOT/sprites/{video_id}/，
+    供播放器拖动进度条时预览。生成失败不影响发布。
+    """
+    try:
+        with get_sync_session() as session:
+            video = _load_video(session, video_id)
+            if settings.SPRITE_ENABLED:
+                sprite_relative_dir = os.path.join(SPRITE_DIR, str(video.id))
+                sprite_tmp_dir = blob_tmp_full_path()
+                try:
+                    with _local_copy(video.file_path) as video_path:
+                        generate_preview_sprites(
+                            video_path,
+                            sprite_tmp_dir,
+                            duration=video.duration,
+                            interval=settings.SPRITE_INTERVAL_SECONDS,
+                            tile_width=settings.SPRITE_TILE_WIDTH,
+                            columns=settings.SPRITE_COLUMNS,
+                            rows=settings.SPRITE_ROWS,
+                            max_tiles=settings.SPRITE_MAX_TILES,
+                            fmt=settings.SPRITE_FORMAT,
+                            quality=settings.SPRITE_QUALITY,
+                            workers=settings.SPRITE_WORKERS,
+                        )
+                    _upload_directory(sprite_tmp_dir, sprite_relative_dir)
+                    video.preview_track_path = os.path.join(sprite_relative_dir, PREVIEW_TRACK_NAME)
+                except Exception as e:
+                    logger.warning(f"Preview sprite generation failed for video {video_id}: {e}")
+                    video.preview_track_path = None
+                finally:
+                    shutil.rmtree(sprite_tmp_dir, ignore_errors=True)
+            _report_progress(self, session, video, "sprites", PROGRESS_SPRITES)
+    except Exception as e:
+        _mark_failed(video_id, "sprites", e)
+        raise
+    return video_id
+
+
+@celery_app.task(bind=True, name="video.cover")
+def extract_cover(self, video_id: int) -> int:
+    """
+    未上传封面（或封面无效、文件丢失）时，从均匀采样的候选帧中挑选清晰度和亮度最好的一帧作为封面，
+    并生成缩略图。
+    """
+    try:
+        with get_sync_session() as session:
+            video = _load_video(session, video_id)
+            cover_image = video.cover_image
+            if not cover_image or _run_storage(lambda storage: storage.stat(cover_image)) is None:
+                cover_tmp_path = blob_tmp_full_path(".jpg")
+                at_second = min(1.0, (video.duration or 0) / 2)
+                try:
+                    with _local_copy(video.file_path) as video_path:
+                        extract_cover_frame(video_path, cover_tmp_path, settings.COVER_SAMPLE_FRAMES, at_second)
+                    cover_relative_path = _store_blob(session, cover_tmp_path, ".jpg")
+                finally:
+                    if os.path.exists(cover_tmp_path):
+                        os.remove(cover_tmp_path)
+                try:
+                    _generate_cover_thumbnails(session, cover_relative_path)
+                except Exception as e:
+                    logger.warning(f"Cover thumbnail generation failed for video {video_id}: {e}")
+                release_blobs_sync(session, [video.cover_image])
+                video.cover_image = cover_relative_path
+            _report_progress(self, session, video, "cover", PROGRESS_COVERED)
+    except Exception as e:
+        _mark_failed(video_id, "cover", e)
+        raise
+    return video_id
+
+
+@celery_app.task(bind=True, name="video.publish")
+def publish_video(self, video_id: int) -> int:
+    """处理完成，发布视频"""
+    try:
+        with get_sync_session() as session:
+            video = _load_video(session, video_id)
+            video.status = VideoStatusEnum.PUBLISHED
+            video.processing_error = None
+            _report_progress(self, session, video, "publish", PROGRESS_PUBLISHED)
+            invalidate_counts_sync(PUBLISHED_VIDEO_COUNT_KEY, *uploader_video_count_keys(video.uploader_id))
+            refresh_video_in_feeds_sync(session, video_id)
+    except Exception as e:
+        _mark_failed(video_id, "publish", e)
+        raise
+    record_search_change_sync(video_id)
+    try:
+        fanout_video_task.delay(video_id)
+    except Exception as e:
+        logger.warning(f"Failed to enqueue timeline fanout for video {video_id}: {e}")
+    return video_id
+
+
+def build_video_pipeline(video_id: int):
+    """构造视频处理任务链（各阶段使用不可变签名，只依赖 video_id）"""
+    return chain(
+        probe_video.si(video_id),
+        transcode_video.si(video_id),
+        package_video_hls.si(video_id),
+        generate_video_sprites.si(video_id),
+        extract_cover.si(video_id),
+        publish_video.si(video_id),
+    )
+
+
+def enqueue_video_processing(video_id: int) -> bool:
+    """
+    投递视频处理任务链。
+
+    Returns:
+        bool: 是否投递成功（broker 不可用时返回 False，由调用方降级处理）；
+              eager 模式下任务在当前线程执行完毕才返回
+    """
+    try:
+        build_video_pipeline(video_id).apply_async()
+        return True
+    except Exception as e:
+        if settings.CELERY_TASK_ALWAYS_EAGER:
+            # eager 模式下异常来自任务本身，状态已由任务标记为 failed
+            logger.error(f"Video {video_id} pipeline failed in eager mode: {e}")
+            return True
+        logger.error(f"Failed to enqueue video {video_id} processing: {e}")
+        return False
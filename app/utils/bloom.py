@@ -0,0 +1,27 @@
+"""
+布隆过滤器的参数与位偏移计算（位图本身存放在 Redis String 中，通过 BITFIELD 读写）
+
+    bits   = -n · ln(p) / (ln 2)²
+    hashes = bits / n · ln 2
+
+每个元素用一次 blake2b 得到两个 64 位哈希，按双重哈希 h1 + i·h2 生成 hashes 个位偏移。
+"""
+
+import hashlib
+import math
+
+
+def bloom_size(capacity: int, error_rate: float) -> tuple[int, int]:
+    """按容量和误判率计算 (位数, 哈希函数个数)"""
+    capacity = max(capacity, 1)
+    bits = math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+    hashes = max(1, round(bits / capacity * math.log(2)))
+    return bits, hashes
+
+
+def bloom_offsets(item, bits: int, hashes: int) -> list[int]:
+    """元素在位图中的 hashes 个位偏移"""
+    digest = hashlib.blake2b(str(item).encode(), digest_size=16).digest()
+    h1 = int.from_bytes(digest[:8], "little")
+    h2 = int.from_bytes(digest[8:], "little") | 1
+    return [(h1 + i * h2) % bits for i in range(hashes)]
@@ -1,21 +1,137 @@
-from fastapi import UploadFile, HTTPException
+import os
+from fastapi import HTTPException
 
-def validate_image(file: UploadFile):
-    if file.content_type not in ["image/jpeg", "image/png"]:
-        raise HTTPException(status_code=400, detail="仅支持 JPG/PNG 格式")
-    if file.size and file.size > 5 * 1024 * 1024:
-        raise HTTPException(status_code=400, detail="图片不能超过 5MB")
+ALLOWED_VIDEO_TYPES = ['video/mp4', 'video/webm', 'video/quicktime']
+ALLOWED_VIDEO_EXTS = ['.mp4', '.webm', '.mov']
+ALLOWED_IMAGE_TYPES = ['image/jpeg', 'image/png']
 
+IMAGE_MAX_SIZE_MB = 5
 
-def validate_video(file: UploadFile, max_size_mb=100):
-    allowed_types = ['video/mp4', 'video/webm', 'video/quicktime']
-    if file.content_type not in allowed_types:
-        raise HTTPException(status_code=400, detail="仅支持 MP4、WebM、MOV 格式")
+# 嗅探到的真实类型 -> 存储时使用的扩展名
+MEDIA_TYPE_EXTS = {
+    'video/mp4': '.mp4',
+    'video/quicktime': '.mov',
+    'video/webm': '.webm',
+    'image/jpeg': '.jpg',
+    'image/png': '.png',
+}
+
+# 嗅探所需的文件头字节数（WebM 的 DocType 通常在前几十个字节内）
+SNIFF_BYTES = 4096
+
+_EBML_MAGIC = b'\x1a\x45\xdf\xa3'
+_PNG_MAGIC = b'\x89PNG\r\n\x1a\n'
+_JPEG_MAGIC = b'\xff\xd8\xff'
+
+
+def sniff_media_type(head: bytes) -> str | None:
+    """
+    根据文件头魔数判断真实的容器/图片类型，不信任客户端声明的 content_type。
+
+    Returns:
+        str | None: 识别出的 MIME 类型，无法识别返回 None
+    """
+    if head.startswith(_JPEG_MAGIC):
+        return 'image/jpeg'
+    if head.startswith(_PNG_MAGIC):
+        return 'image/png'
+    # ISO BMFF（MP4/MOV）：第 4~8 字节为 ftyp，其后 4 字节为主品牌
+    if len(head) >= 12 and head[4:8] == b'ftyp':
+        return 'video/quicktime' if head[8:12] == b'qt  ' else 'video/mp4'
+    if head.startswith(_EBML_MAGIC):
+        # Matroska 与 WebM 共用 EBML 头，靠 DocType 区分
+        return None if b'matroska' in head[:SNIFF_BYTES] else 'video/webm'
+    return None
+
+
+class IngestValidator:
+    """
+    上传流式校验：随字节到达检查类型与大小，伪造或超限的文件在前几 KB / 超限的那一块就被拒绝，
+    不必等整个文件传完。与写盘、计算摘要在同一次遍历中完成。
+
+        validator = video_ingest_validator()
+        for chunk in stream:
+            validator.feed(chunk)
+            ...
+        media_type = validator.finish()
+    """
+
+    def __init__(self, allowed_types: list[str], max_bytes: int, type_error: str, size_error: str):
+        self.allowed_types = allowed_types
+        self.max_bytes = max_bytes
+        self.type_error = type_error
+        self.size_error = size_error
+        self.size = 0
+        self.media_type: str | None = None
+        self._head = bytearray()
+
+    def feed(self, chunk: bytes) -> None:
+        """
+        Raises:
+            HTTPException: 413 超出大小限制；400 文件头与允许的类型不符
+        """
+        self.size += len(chunk)
+        if self.size > self.max_bytes:
+            raise HTTPException(status_code=413, detail=self.size_error)
+        if self.media_type is None and len(self._head) < SNIFF_BYTES:
+            self._head += chunk[:SNIFF_BYTES - len(self._head)]
+            if len(self._head) >= SNIFF_BYTES:
+                self._check_type()
 
-    file.file.seek(0, 2)  # Move to end of file
-    size = file.file.tell()
-    file.file.seek(0)  # Reset cursor
+    def finish(self) -> str:
+        """
+        数据接收完毕（文件可能不足 SNIFF_BYTES），返回嗅探出的真实类型。
 
+        Raises:
+            HTTPException: 400 文件为空或类型不符
+        """
+        if self.size == 0:
+            raise HTTPException(status_code=400, detail="文件内容为空")
+        if self.media_type is None:
+            self._check_type()
+        return self.media_type
+
+    @property
+    def ext(self) -> str:
+        """按真实类型确定的扩展名（需在 finish 之后调用）"""
+        return MEDIA_TYPE_EXTS[self.media_type]
+
+    def _check_type(self):
+        media_type = sniff_media_type(bytes(self._head))
+        if media_type not in self.allowed_types:
+            raise HTTPException(status_code=400, detail=self.type_error)
+        self.media_type = media_type
+        self._head = bytearray()
+
+
+def video_ingest_validator(max_size_mb=100) -> IngestValidator:
+    return IngestValidator(
+        ALLOWED_VIDEO_TYPES,
+        max_size_mb * 1024 * 1024,
+        type_error="仅支持 MP4、WebM、MOV 格式",
+        size_error=f"视频大小不能超过 {max_size_mb}MB",
+    )
+
+
+def image_ingest_validator(max_size_mb=IMAGE_MAX_SIZE_MB) -> IngestValidator:
+    return IngestValidator(
+        ALLOWED_IMAGE_TYPES,
+        max_size_mb * 1024 * 1024,
+        type_error="仅支持 JPG/PNG 格式",
+        size_error=f"图片不能超过 {max_size_mb}MB",
+    )
+
+
+def validate_video_meta(filename: str, content_type: str, size: int, max_size_mb=100):
+    """
+    分片上传初始化时校验客户端声明的视频元信息（此时还没有文件内容，
+    真实类型在第一个分片到达时由 IngestValidator 嗅探）。
+    """
+    if content_type not in ALLOWED_VIDEO_TYPES:
+        raise HTTPException(status_code=400, detail="仅支持 MP4、WebM、MOV 格式")
+    if os.path.splitext(filename)[-1].lower() not in ALLOWED_VIDEO_EXTS:
+        raise HTTPException(status_code=400, detail="仅支持 MP4、WebM、MOV 格式")
+    if size <= 0:
+        raise HTTPException(status_code=400, detail="视频大小不合法")
     if size > max_size_mb * 1024 * 1024:
         raise HTTPException(status_code=400, detail=f"视频大小不能超过 {max_size_mb}MB")
-
@@ -0,0 +1,128 @@
+"""
+HTTP 条件请求 / Range 请求辅助函数（RFC 9110）
+"""
+
+import re
+from email.utils import formatdate, parsedate_to_datetime
+
+
+class RangeNotSatisfiable(Exception):
+    """Range 头中没有任何一个区间落在文件范围内"""
+
+
+# uuid4().hex 命名的上传文件与 sha256 命名的内容寻址文件内容永不变化，可以长期强缓存
+IMMUTABLE_NAME_PATTERN = re.compile(r"[0-9a-f]{32}")
+
+
+def make_etag(size: int, mtime_ns: int) -> str:
+    """强 ETag：文件大小 + 纳秒级修改时间，任何写入都会改变它"""
+    return f'"{mtime_ns:x}-{size:x}"'
+
+
+def http_date(timestamp: float) -> str:
+    return formatdate(timestamp, usegmt=True)
+
+
+def is_immutable_name(filename: str) -> bool:
+    return IMMUTABLE_NAME_PATTERN.search(filename) is not None
+
+
+def _etag_list(header: str) -> list[str]:
+    return [tag.strip() for tag in header.split(",") if tag.strip()]
+
+
+def _weak_match(a: str, b: str) -> bool:
+    return a.removeprefix("W/") == b.removeprefix("W/")
+
+
+def is_not_modified(headers, etag: str, mtime: float) -> bool:
+    """
+    If-None-Match 使用弱比较；存在 If-None-Match 时忽略 If-Modified-Since。
+    """
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        return any(_weak_match(tag, etag) for tag in _etag_list(if_none_match))
+
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return int(mtime) <= since
+    return False
+
+
+def if_range_matches(if_range: str | None, etag: str, last_modified: str) -> bool:
+    """
+    If-Range 为 ETag 时必须强比较（弱 ETag 永不匹配），为日期时必须与 Last-Modified 完全一致。
+    不带 If-Range 视为匹配。
+    """
+    if if_range is None:
+        return True
+    if_range = if_range.strip()
+    if if_range.startswith('"') or if_range.startswith("W/"):
+        return not if_range.startswith("W/") and if_range == etag
+    return if_range == last_modified
+
+
+def parse_range_header(header: str, size: int, max_ranges: int = 16) -> list[tuple[int, int]] | None:
+    """
+    解析 Range 头，返回按起点排序、合并重叠/相邻区间后的 [(start, end_inclusive), ...]。
+
+    Returns:
+        None: Range 头无法解析、不是 bytes 单位或区间过多，按 RFC 应忽略 Range 返回完整内容
+
+    Raises:
+        RangeNotSatisfiable: 所有区间都超出文件范围
+    """
+    units, _, spec = header.partition("=")
+    if units.strip().lower() != "bytes" or not spec:
+        return None
+
+    ranges = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        start_str, sep, end_str = part.partition("-")
+        if not sep:
+            return None
+        try:
+            if start_str.strip() == "":
+                # 后缀区间：最后 N 个字节
+                suffix = int(end_str)
+                if suffix < 0:
+                    return None
+                if suffix == 0:
+                    continue
+                start, end = max(size - suffix, 0), size - 1
+            else:
+                start = int(start_str)
+                end = int(end_str) if end_str.strip() else None
+                if start < 0 or (end is not None and end < start):
+                    return None
+                if start >= size:
+                    continue
+                end = size - 1 if end is None else min(end, size - 1)
+        except ValueError:
+            return None
+        ranges.append((start, end))
+
+    if not ranges:
+        raise RangeNotSatisfiable()
+    if len(ranges) > max_ranges:
+        # 大量零碎区间常见于滥用请求，直接返回完整内容
+        return None
+
+    ranges.sort()
+    merged = [ranges[0]]
+    for start, end in ranges[1:]:
+        last_start, last_end = merged[-1]
+        if start <= last_end + 1:
+            merged[-1] = (last_start, max(last_end, end))
+        else:
+            merged.append((start, end))
+    return merged
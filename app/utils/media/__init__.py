@@ -0,0 +1,7 @@
+from .probe import *
+from .transcode import *
+from .frame import *
+from .hls import *
+from .thumbnail import *
+from .keyframe import *
+from .sprite import *
\ No newline at end of file
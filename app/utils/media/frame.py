@@ -0,0 +1,32 @@
+"""
+视频帧截取（同步实现）
+"""
+
+import os
+import cv2
+
+
+def extract_frame(video_path: str, output_path: str, at_second: float) -> None:
+    """
+    截取指定时间点的视频帧并保存为 JPEG。
+
+    Raises:
+        RuntimeError: 视频无法打开或读取帧失败
+    """
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise RuntimeError("无法打开视频文件")
+    try:
+        cap.set(cv2.CAP_PROP_POS_MSEC, max(at_second, 0) * 1000)
+        ok, frame = cap.read()
+        if not ok:
+            # 部分容器不支持按时间定位，退回读取第一帧
+            cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ok, frame = cap.read()
+        if not ok:
+            raise RuntimeError("读取视频帧失败")
+    finally:
+        cap.release()
+
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    cv2.imwrite(output_path, frame, [cv2.IMWRITE_JPEG_QUALITY, 90])
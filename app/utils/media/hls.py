@@ -0,0 +1,97 @@
+"""
+HLS 自适应码率打包（同步实现，运行在 Celery worker 中）
+"""
+
+import os
+import subprocess
+
+# 码率阶梯：(高度, 视频码率 kbps, 音频码率 kbps)
+HLS_LADDER = [
+    (360, 800, 96),
+    (720, 2800, 128),
+    (1080, 5000, 192),
+]
+
+MASTER_PLAYLIST_NAME = "master.m3u8"
+
+
+def select_renditions(source_height: int | None) -> list[tuple[int, int, int]]:
+    """
+    选择不超过源视频分辨率的档位，避免向上放大；源分辨率未知或过低时至少保留最低档。
+    """
+    if not source_height:
+        return HLS_LADDER[:1]
+    renditions = [r for r in HLS_LADDER if r[0] <= source_height]
+    return renditions or HLS_LADDER[:1]
+
+
+def _even(value: float) -> int:
+    """H.264 要求宽高为偶数"""
+    return max(2, int(round(value / 2)) * 2)
+
+
+def package_hls(
+        src_path: str,
+        output_dir: str,
+        renditions: list[tuple[int, int, int]],
+        ffmpeg_bin: str,
+        segment_seconds: int = 6,
+        source_size: tuple[int, int] | None = None,
+        timeout: int = 3600,
+) -> str:
+    """
+    为每个档位生成分片播放列表（{height}p/index.m3u8 + ts 分片），再写入主播放列表。
+
+    Args:
+        src_path: 源视频路径
+        output_dir: 输出目录
+        renditions: 档位列表，见 select_renditions
+        ffmpeg_bin: ffmpeg 可执行文件
+        segment_seconds: 分片时长（秒）
+        source_size: 源视频 (宽, 高)，用于计算各档位宽度
+        timeout: 单个档位的转码超时（秒）
+
+    Returns:
+        str: 主播放列表完整路径
+
+    Raises:
+        RuntimeError: ffmpeg 执行失败
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    master_lines = ["#EXTM3U", "#EXT-X-VERSION:3"]
+
+    for height, video_kbps, audio_kbps in renditions:
+        rendition_dir = os.path.join(output_dir, f"{height}p")
+        os.makedirs(rendition_dir, exist_ok=True)
+        cmd = [
+            ffmpeg_bin, "-y", "-v", "error",
+            "-i", src_path,
+            "-vf", f"scale=-2:{height}",
+            "-c:v", "libx264", "-preset", "veryfast", "-profile:v", "main", "-pix_fmt", "yuv420p",
+            "-b:v", f"{video_kbps}k", "-maxrate", f"{int(video_kbps * 1.07)}k", "-bufsize", f"{video_kbps * 2}k",
+            # 每个分片边界强制关键帧并关闭场景切换关键帧，保证各档位分片对齐，切换码率时无缝衔接
+            "-sc_threshold", "0",
+            "-force_key_frames", f"expr:gte(t,n_forced*{segment_seconds})",
+            "-c:a", "aac", "-b:a", f"{audio_kbps}k", "-ac", "2",
+            "-f", "hls",
+            "-hls_time", str(segment_seconds),
+            "-hls_playlist_type", "vod",
+            "-hls_segment_filename", os.path.join(rendition_dir, "seg_%05d.ts"),
+            os.path.join(rendition_dir, "index.m3u8"),
+        ]
+        result = subprocess.run(cmd, capture_output=True, timeout=timeout)
+        if result.returncode != 0:
+            raise RuntimeError(f"HLS 打包失败({height}p): {result.stderr.decode(errors='ignore')[-200:]}")
+
+        bandwidth = (video_kbps + audio_kbps) * 1000
+        stream_inf = f"#EXT-X-STREAM-INF:BANDWIDTH={bandwidth}"
+        if source_size and source_size[1]:
+            width = _even(source_size[0] * height / source_size[1])
+            stream_inf += f",RESOLUTION={width}x{height}"
+        master_lines.append(stream_inf)
+        master_lines.append(f"{height}p/index.m3u8")
+
+    master_path = os.path.join(output_dir, MASTER_PLAYLIST_NAME)
+    with open(master_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(master_lines) + "\n")
+    return master_path
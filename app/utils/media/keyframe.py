@@ -0,0 +1,122 @@
+"""
+自动封面：从均匀采样的候选帧中挑选清晰、亮度合适的一帧（同步实现，运行在 Celery worker 或进程池中）
+"""
+
+import os
+
+import cv2
+import numpy as np
+
+from app.utils.media.frame import extract_frame
+
+# 评分时把候选帧统一缩放到这个宽度的灰度图，既去掉噪点的影响也让打分足够快
+SCORE_WIDTH = 160
+# 片头片尾常是黑屏或字幕卡，只在中间区间采样
+SAMPLE_START_RATIO = 0.05
+SAMPLE_END_RATIO = 0.95
+# 清晰度与亮度的权重
+SHARPNESS_WEIGHT = 0.6
+BRIGHTNESS_WEIGHT = 0.4
+# 平均亮度低于该值视为黑屏，不参与挑选
+MIN_MEAN_BRIGHTNESS = 16
+
+
+def score_frames(gray_frames: np.ndarray) -> np.ndarray:
+    """
+    批量给灰度帧打分，整个批次一次完成向量化计算。
+
+    Args:
+        gray_frames: 形状为 (N, H, W) 的灰度帧
+
+    Returns:
+        np.ndarray: 形状为 (N,) 的得分，越大越适合作为封面
+    """
+    frames = gray_frames.astype(np.float32)
+    # 4 邻域拉普拉斯算子：边缘越多、越锐利，响应的方差越大
+    laplacian = (
+        frames[:, :-2, 1:-1] + frames[:, 2:, 1:-1]
+        + frames[:, 1:-1, :-2] + frames[:, 1:-1, 2:]
+        - 4 * frames[:, 1:-1, 1:-1]
+    )
+    sharpness = laplacian.var(axis=(1, 2))
+    sharpness = sharpness / sharpness.max() if sharpness.max() > 0 else sharpness
+
+    # 亮度越接近中灰越好，过暗和过曝都会扣分
+    mean_brightness = frames.mean(axis=(1, 2))
+    brightness = 1.0 - np.abs(mean_brightness - 128.0) / 128.0
+
+    scores = SHARPNESS_WEIGHT * sharpness + BRIGHTNESS_WEIGHT * brightness
+    scores[mean_brightness < MIN_MEAN_BRIGHTNESS] = -1.0
+    return scores
+
+
+def _score_thumbnail(frame: np.ndarray) -> np.ndarray:
+    height, width = frame.shape[:2]
+    size = (SCORE_WIDTH, max(1, SCORE_WIDTH * height // max(width, 1)))
+    return cv2.resize(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), size, interpolation=cv2.INTER_AREA)
+
+
+def select_keyframe(video_path: str, output_path: str, sample_count: int = 24) -> float:
+    """
+    在视频中均匀采样若干帧，选出得分最高的一帧保存为 JPEG 封面。
+
+    Returns:
+        float: 选中帧的时间点（秒）
+
+    Raises:
+        RuntimeError: 视频无法打开或一帧都读不出来
+    """
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise RuntimeError("无法打开视频文件")
+
+    positions = []  # 候选帧序号
+    gray_frames = []  # 候选帧缩小后的灰度图，只保留小图，避免同时持有多张原始帧
+    best_frame = None
+    try:
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+        fps = cap.get(cv2.CAP_PROP_FPS) or 0
+        if frame_count > 0:
+            sample_positions = np.linspace(
+                frame_count * SAMPLE_START_RATIO, frame_count * SAMPLE_END_RATIO, num=max(sample_count, 1)
+            ).astype(int)
+            for position in np.unique(sample_positions):
+                cap.set(cv2.CAP_PROP_POS_FRAMES, int(position))
+                ok, frame = cap.read()
+                if ok:
+                    positions.append(int(position))
+                    gray_frames.append(_score_thumbnail(frame))
+                    best_frame = frame if best_frame is None else best_frame
+
+        if not positions:
+            # 帧数未知或无法定位的容器，退回读取开头的一帧
+            cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ok, best_frame = cap.read()
+            if not ok:
+                raise RuntimeError("读取视频帧失败")
+            position = 0
+        else:
+            best = int(np.argmax(score_frames(np.stack(gray_frames))))
+            position = positions[best]
+            # 重新定位读取选中的原始帧
+            cap.set(cv2.CAP_PROP_POS_FRAMES, position)
+            ok, frame = cap.read()
+            if ok:
+                best_frame = frame
+    finally:
+        cap.release()
+
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    if not cv2.imwrite(output_path, best_frame, [cv2.IMWRITE_JPEG_QUALITY, 90]):
+        raise RuntimeError("保存封面失败")
+    return position / fps if fps else 0.0
+
+
+def extract_cover_frame(video_path: str, output_path: str, sample_count: int = 24, fallback_second: float = 1.0) -> None:
+    """
+    自动生成封面：优先挑选最佳关键帧，挑选失败时退回截取固定时间点的一帧。
+    """
+    try:
+        select_keyframe(video_path, output_path, sample_count)
+    except Exception:
+        extract_frame(video_path, output_path, fallback_second)
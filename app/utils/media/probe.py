@@ -0,0 +1,55 @@
+"""
+媒体文件探测（同步实现，运行在媒体处理进程池中）
+"""
+
+import os
+import cv2
+
+
+def _fourcc_to_str(fourcc: int) -> str | None:
+    """将 OpenCV 返回的 FOURCC 整数转换为编码名称，如 avc1 / hev1 / vp09"""
+    codec = "".join(chr((fourcc >> (8 * i)) & 0xFF) for i in range(4)).strip("\x00 ")
+    return codec if codec.isprintable() and codec else None
+
+
+def probe_video_file(full_path: str) -> dict:
+    """
+    使用 OpenCV 读取视频元信息。
+
+    Args:
+        full_path: 视频文件完整路径
+
+    Returns:
+        dict: duration（秒）、fps、width、height、codec、bitrate（bps）
+
+    Raises:
+        RuntimeError: 视频文件无法打开
+    """
+    cap = cv2.VideoCapture(full_path)
+    if not cap.isOpened():
+        raise RuntimeError("无法打开视频文件")
+
+    try:
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        frame_count = cap.get(cv2.CAP_PROP_FRAME_COUNT)
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        codec = _fourcc_to_str(int(cap.get(cv2.CAP_PROP_FOURCC)))
+        # OpenCV 的 FFmpeg 后端返回 kbps，其他后端可能为 0
+        bitrate = int(cap.get(cv2.CAP_PROP_BITRATE) * 1000)
+    finally:
+        cap.release()
+
+    duration_exact = frame_count / fps if fps > 0 else 0
+    if bitrate <= 0 and duration_exact > 0:
+        # 后端不支持时按文件大小估算平均码率
+        bitrate = int(os.path.getsize(full_path) * 8 / duration_exact)
+
+    return {
+        "duration": int(duration_exact),
+        "fps": round(fps, 3) if fps > 0 else None,
+        "width": width or None,
+        "height": height or None,
+        "codec": codec,
+        "bitrate": bitrate or None,
+    }
@@ -0,0 +1,172 @@
+"""
+拖动预览：按固定间隔截帧拼成雪碧图，并生成 WebVTT 缩略图轨道（同步实现，运行在 Celery worker 中）
+
+    WEBVTT
+
+    00:00:00.000 --> 00:00:05.000
+    sprite_000.webp#xywh=0,0,160,90
+
+播放器按 URL 相对于 VTT 文件解析，雪碧图与 VTT 放在同一目录即可。
+"""
+
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+PREVIEW_TRACK_NAME = "thumbnails.vtt"
+
+SPRITE_ENCODE_PARAMS = {
+    "webp": (".webp", cv2.IMWRITE_WEBP_QUALITY),
+    "jpeg": (".jpg", cv2.IMWRITE_JPEG_QUALITY),
+}
+
+# 相邻两个截帧点之间不超过该秒数时顺序解码过去，否则重新定位（定位需要从关键帧开始解码）
+SEQUENTIAL_DECODE_SECONDS = 2.0
+
+
+def _even(value: float) -> int:
+    return max(2, int(round(value / 2)) * 2)
+
+
+def _vtt_time(seconds: float) -> str:
+    millis = int(round(seconds * 1000))
+    hours, millis = divmod(millis, 3600 * 1000)
+    minutes, millis = divmod(millis, 60 * 1000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}.{millis:03d}"
+
+
+def _render_sheet(
+        video_path: str,
+        timestamps: list[float],
+        fps: float,
+        tile_size: tuple[int, int],
+        columns: int,
+        output_path: str,
+        encode_params: list[int],
+) -> None:
+    """截取一张雪碧图中的所有帧并拼接保存（每张图使用独立的解码器，可在多个线程中并行）"""
+    tile_width, tile_height = tile_size
+    rows = math.ceil(len(timestamps) / columns)
+    sheet = np.zeros((rows * tile_height, min(len(timestamps), columns) * tile_width, 3), dtype=np.uint8)
+
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise RuntimeError("无法打开视频文件")
+    try:
+        position = None  # 下一次 read 将得到的帧序号
+        tile = None
+        for index, timestamp in enumerate(timestamps):
+            target = int(timestamp * fps)
+            if position is None or target < position or target - position > SEQUENTIAL_DECODE_SECONDS * fps:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, target)
+                position = target
+            while position < target and cap.grab():
+                position += 1
+            ok, frame = cap.read()
+            position += 1
+            if ok:
+                tile = cv2.resize(frame, tile_size, interpolation=cv2.INTER_AREA)
+            if tile is not None:
+                # 个别帧读取失败时沿用上一张，避免出现黑块
+                row, column = divmod(index, columns)
+                sheet[row * tile_height:(row + 1) * tile_height, column * tile_width:(column + 1) * tile_width] = tile
+    finally:
+        cap.release()
+
+    if not cv2.imwrite(output_path, sheet, encode_params):
+        raise RuntimeError("保存雪碧图失败")
+
+
+def generate_preview_sprites(
+        video_path: str,
+        output_dir: str,
+        duration: float | None = None,
+        interval: float = 5.0,
+        tile_width: int = 160,
+        columns: int = 10,
+        rows: int = 10,
+        max_tiles: int = 500,
+        fmt: str = "webp",
+        quality: int = 75,
+        workers: int = 2,
+) -> str:
+    """
+    生成雪碧图和 WebVTT 缩略图轨道。
+
+    Args:
+        video_path: 本地视频文件
+        output_dir: 输出目录（雪碧图与 VTT 文件）
+        duration: 视频时长（秒），未知时按帧数和帧率计算
+        interval: 截帧间隔（秒），视频很长时自动放大，使总帧数不超过 max_tiles
+        tile_width: 每个缩略图的宽度，高度按视频宽高比计算
+        columns / rows: 每张雪碧图的列数和行数
+        fmt: 雪碧图格式 webp / jpeg
+        workers: 并行生成雪碧图的线程数（OpenCV 解码和编码期间释放 GIL）
+
+    Returns:
+        str: VTT 文件的完整路径
+
+    Raises:
+        RuntimeError: 视频无法打开或时长、分辨率未知
+    """
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise RuntimeError("无法打开视频文件")
+    try:
+        fps = cap.get(cv2.CAP_PROP_FPS) or 0
+        frame_count = cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0
+        width = cap.get(cv2.CAP_PROP_FRAME_WIDTH) or 0
+        height = cap.get(cv2.CAP_PROP_FRAME_HEIGHT) or 0
+    finally:
+        cap.release()
+    if not duration and fps > 0:
+        duration = frame_count / fps
+    if not duration or duration <= 0 or fps <= 0 or not width or not height:
+        raise RuntimeError("无法获取视频时长或分辨率")
+
+    interval = max(interval, duration / max_tiles)
+    timestamps = [float(t) for t in np.arange(0, duration, interval)]
+    tile_size = (_even(tile_width), _even(tile_width * height / width))
+    ext, quality_flag = SPRITE_ENCODE_PARAMS[fmt]
+    per_sheet = columns * rows
+
+    os.makedirs(output_dir, exist_ok=True)
+    sheets = []
+    for sheet_index, start in enumerate(range(0, len(timestamps), per_sheet)):
+        sheets.append((f"sprite_{sheet_index:03d}{ext}", timestamps[start:start + per_sheet]))
+
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+        futures = [
+            executor.submit(
+                _render_sheet,
+                video_path,
+                sheet_timestamps,
+                fps,
+                tile_size,
+                columns,
+                os.path.join(output_dir, name),
+                [quality_flag, quality],
+            )
+            for name, sheet_timestamps in sheets
+        ]
+        for future in futures:
+            future.result()
+
+    tile_width, tile_height = tile_size
+    lines = ["WEBVTT", ""]
+    for name, sheet_timestamps in sheets:
+        for index, start in enumerate(sheet_timestamps):
+            end = min(start + interval, duration)
+            row, column = divmod(index, columns)
+            lines.append(f"{_vtt_time(start)} --> {_vtt_time(end)}")
+            lines.append(f"{name}#xywh={column * tile_width},{row * tile_height},{tile_width},{tile_height}")
+            lines.append("")
+
+    vtt_path = os.path.join(output_dir, PREVIEW_TRACK_NAME)
+    with open(vtt_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines))
+    return vtt_path
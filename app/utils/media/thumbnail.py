@@ -0,0 +1,53 @@
+"""
+封面 / 头像缩略图生成（同步实现，运行在进程池或 Celery worker 中）
+"""
+
+import os
+
+from PIL import Image, ImageOps
+
+# 输出格式 -> (Pillow 格式名, 保存参数)
+THUMBNAIL_FORMATS = {
+    "webp": ("WEBP", {"method": 4}),
+    "jpeg": ("JPEG", {"optimize": True, "progressive": True}),
+}
+
+
+def make_thumbnails(src_path: str, outputs: list[tuple[int, str]], fmt: str = "webp", quality: int = 80,
+                    square: bool = False) -> None:
+    """
+    把一张图片缩放为多个固定宽度的缩略图，源图只解码一次。
+
+    Args:
+        src_path: 源图片路径
+        outputs: [(目标宽度, 输出路径), ...]
+        fmt: 输出格式，webp / jpeg
+        quality: 压缩质量
+        square: 是否先居中裁剪为正方形（头像）
+
+    Raises:
+        ValueError: 不支持的输出格式
+        PIL.UnidentifiedImageError: 源文件不是可解析的图片
+    """
+    if fmt not in THUMBNAIL_FORMATS:
+        raise ValueError(f"不支持的缩略图格式: {fmt}")
+    pil_format, save_kwargs = THUMBNAIL_FORMATS[fmt]
+
+    with Image.open(src_path) as image:
+        max_width = max(width for width, _ in outputs)
+        # JPEG 可在解码阶段直接按 1/2、1/4、1/8 缩小，大图能省下大部分解码时间
+        # 裁剪为正方形时短边要不小于目标宽度
+        draft_height = max_width if square else max_width * image.height // max(image.width, 1)
+        image.draft("RGB", (max_width, draft_height))
+        image = ImageOps.exif_transpose(image).convert("RGB")
+        if square:
+            side = min(image.size)
+            image = ImageOps.fit(image, (side, side), method=Image.Resampling.LANCZOS)
+
+        # 从大到小依次缩放，每一档都以上一档为源，减少重采样的计算量
+        for width, output_path in sorted(outputs, key=lambda item: item[0], reverse=True):
+            if image.width > width:
+                height = max(1, round(image.height * width / image.width))
+                image = image.resize((width, height), Image.Resampling.LANCZOS)
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            image.save(output_path, pil_format, quality=quality, **save_kwargs)
@@ -0,0 +1,43 @@
+"""
+视频转码（同步实现，运行在 Celery worker 中）
+"""
+
+import os
+import shutil
+import subprocess
+
+# 浏览器可直接播放、无需重新编码的编码（FOURCC）
+WEB_SAFE_CODECS = {"avc1", "h264", "H264"}
+
+
+def ffmpeg_available(ffmpeg_bin: str) -> bool:
+    return shutil.which(ffmpeg_bin) is not None
+
+
+def transcode_to_web_mp4(src_path: str, dst_path: str, ffmpeg_bin: str, copy_video: bool = False, timeout: int = 3600):
+    """
+    转为 H.264/AAC 的 MP4，并把 moov 移到文件头（faststart），便于边下边播。
+
+    Args:
+        src_path: 源视频路径
+        dst_path: 输出路径
+        ffmpeg_bin: ffmpeg 可执行文件
+        copy_video: 源视频已是 H.264 时只做封装转换，不重新编码
+        timeout: 超时时间（秒）
+
+    Raises:
+        RuntimeError: ffmpeg 执行失败
+    """
+    os.makedirs(os.path.dirname(dst_path), exist_ok=True)
+    video_args = ["-c:v", "copy"] if copy_video else ["-c:v", "libx264", "-preset", "veryfast", "-crf", "23", "-pix_fmt", "yuv420p"]
+    cmd = [
+        ffmpeg_bin, "-y", "-v", "error",
+        "-i", src_path,
+        *video_args,
+        "-c:a", "aac", "-b:a", "128k",
+        "-movflags", "+faststart",
+        dst_path,
+    ]
+    result = subprocess.run(cmd, capture_output=True, timeout=timeout)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg 转码失败: {result.stderr.decode(errors='ignore')[-200:]}")
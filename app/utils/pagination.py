@@ -0,0 +1,61 @@
+"""
+游标分页辅助函数
+
+游标对客户端不透明：内容为 [列表名, 排序键..., id] 的 JSON，经 urlsafe base64 编码。
+排序键中的 datetime / Decimal 带类型标记，解码后能与数据库中的值按原类型比较。
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from fastapi import HTTPException
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {"dec": str(value)}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "dec" in value:
+            return Decimal(value["dec"])
+        raise ValueError("未知的游标值类型")
+    if value is not None and not isinstance(value, (int, float, str)):
+        raise ValueError("非法的游标值")
+    return value
+
+
+def encode_cursor(feed: str, values) -> str:
+    """把某个列表最后一条记录的排序键编码为游标"""
+    payload = json.dumps([feed, *map(_encode_value, values)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).rstrip(b"=").decode()
+
+
+def decode_cursor(feed: str, cursor: str, size: int) -> list:
+    """
+    解码游标。
+
+    Args:
+        feed: 列表名，不同列表的游标不能混用
+        cursor: 客户端传回的游标
+        size: 排序键个数（含 id）
+
+    Raises:
+        HTTPException: 游标格式错误或不属于该列表（400）
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(payload, list) or len(payload) != size + 1 or payload[0] != feed:
+            raise ValueError("游标与列表不匹配")
+        return [_decode_value(value) for value in payload[1:]]
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError, InvalidOperation):
+        raise HTTPException(status_code=400, detail="无效的分页游标")
@@ -0,0 +1,90 @@
+"""
+媒体处理进程池
+
+OpenCV / Pillow 等 CPU 密集型操作不能直接在 async 接口中执行，否则会阻塞整个事件循环。
+这里提供一个全局、有界的进程池，由各媒体服务按需提交任务。
+"""
+
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Optional, TypeVar
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """懒加载进程池；使用 spawn 启动方式，避免 fork 事件循环和数据库连接"""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.MEDIA_PROCESS_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+
+async def run_in_process_pool(
+        func: Callable[..., T],
+        *args,
+        timeout: Optional[float] = None,
+        semaphore: Optional[asyncio.Semaphore] = None,
+) -> T:
+    """
+    在进程池中执行同步函数并异步等待结果。
+
+    Args:
+        func: 模块级同步函数（需可被 pickle）
+        *args: 函数参数（需可被 pickle）
+        timeout: 等待超时时间（秒），None 表示不限制
+        semaphore: 限制并发的信号量；子进程中的任务真正结束（或排队中被取消）后才释放，
+            等待超时后任务仍在执行时继续占用
+
+    Raises:
+        asyncio.TimeoutError: 等待超时（子进程中的任务不会被强制终止）
+        BrokenProcessPool: 子进程异常退出；进程池会被重置，下次调用自动重建
+    """
+    global _executor
+    loop = asyncio.get_running_loop()
+    if semaphore is not None:
+        await semaphore.acquire()
+    executor = get_process_pool()
+    future = None
+    try:
+        future = executor.submit(func, *args)
+        if semaphore is not None:
+            future.add_done_callback(lambda _: _release_threadsafe(loop, semaphore))
+        # 超时后 wait_for 会取消 future：仍在排队的任务被移出队列，已在执行的任务继续运行到结束
+        return await asyncio.wait_for(asyncio.wrap_future(future), timeout=timeout)
+    except BrokenProcessPool:
+        # 子进程崩溃（如解码器段错误）后整个进程池不可再用，丢弃后重建
+        if _executor is executor:
+            _executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    finally:
+        if future is None and semaphore is not None:
+            # 未能提交到进程池
+            semaphore.release()
+
+
+def _release_threadsafe(loop: asyncio.AbstractEventLoop, semaphore: asyncio.Semaphore) -> None:
+    """进程池的回调线程中释放事件循环里的信号量"""
+    try:
+        loop.call_soon_threadsafe(semaphore.release)
+    except RuntimeError:
+        # 事件循环已关闭（应用退出），信号量不会再被使用
+        pass
+
+
+def shutdown_process_pool():
+    """应用关闭时回收进程池"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
@@ -0,0 +1 @@
+from .item_cf import *
\ No newline at end of file
@@ -0,0 +1,2 @@
+from .tokenizer import *
+from .index import *
\ No newline at end of file
@@ -0,0 +1,254 @@
+"""
+视频搜索的倒排索引与 BM25 排序
+
+    score(d) = Σ idf(t) · tf · (k1 + 1) / (tf + k1 · (1 - b + b · |d| / avgdl))
+    idf(t)   = ln(1 + (N - df + 0.5) / (df + 0.5))
+
+文档为标题 + 描述前若干字，标题中的词频乘以 title_weight，文档长度同样加权。
+文档同时按单字建索引（tokenize 的 unigrams），查询单个汉字时能命中包含它的词。
+
+主段（build_segment 构建）是按词项哈希排序的几个 NumPy 数组，可保存为 .npy 文件后以 mmap 方式加载，
+多个进程共享同一份页缓存：
+
+    terms        uint64   词项哈希（升序）
+    offsets      int64    词项 i 的倒排表为 postings[offsets[i]:offsets[i + 1]]
+    postings     int32    文档在主段中的序号
+    frequencies  uint16   加权词频
+    doc_ids      int64    文档序号 -> 视频 ID（升序）
+    doc_lengths  float32  加权文档长度
+
+InvertedIndex 在主段之上维护内存中的增量：新增或修改的视频写入增量倒排表，删除或修改的视频在主段中标记为已删除；
+定期全量重建把增量合并进新的主段。
+"""
+
+import json
+import math
+import os
+from array import array
+
+import numpy as np
+
+from app.utils.search.tokenizer import term_hash, tokenize
+
+SEGMENT_ARRAYS = ("terms", "offsets", "postings", "frequencies", "doc_ids", "doc_lengths")
+_MAX_FREQUENCY = np.iinfo(np.uint16).max
+# 多词查询的倒排表总长度超过主段文档数的 1 / _DENSE_RATIO 时改用稠密数组累加分数
+_DENSE_RATIO = 16
+_TIE_BREAK = 1e-12
+
+
+def document_terms(title: str | None, description: str | None, title_weight: int, description_chars: int) -> tuple[dict[int, int], int]:
+    """文档的 {词项哈希: 加权词频} 与加权长度"""
+    frequencies: dict[int, int] = {}
+    title_tokens = tokenize(title, unigrams=True)
+    description_tokens = tokenize((description or "")[:description_chars], unigrams=True)
+    for tokens, weight in ((title_tokens, title_weight), (description_tokens, 1)):
+        for token in tokens:
+            term = term_hash(token)
+            frequencies[term] = frequencies.get(term, 0) + weight
+    return frequencies, len(title_tokens) * title_weight + len(description_tokens)
+
+
+def build_segment(documents, title_weight: int = 3, description_chars: int = 200) -> dict[str, np.ndarray]:
+    """
+    构建主段。
+
+    Args:
+        documents: 可迭代的 (视频 ID, 标题, 描述)，同一视频只出现一次
+    """
+    terms, positions, frequencies = array("Q"), array("i"), array("H")
+    doc_ids, doc_lengths = array("q"), array("f")
+    for video_id, title, description in documents:
+        document, length = document_terms(title, description, title_weight, description_chars)
+        if not document:
+            continue
+        position = len(doc_ids)
+        doc_ids.append(video_id)
+        doc_lengths.append(length)
+        terms.extend(document.keys())
+        positions.extend([position] * len(document))
+        frequencies.extend(min(frequency, _MAX_FREQUENCY) for frequency in document.values())
+
+    doc_ids = np.frombuffer(doc_ids, dtype=np.int64)
+    doc_lengths = np.frombuffer(doc_lengths, dtype=np.float32)
+    terms = np.frombuffer(terms, dtype=np.uint64)
+    positions = np.frombuffer(positions, dtype=np.int32)
+    frequencies = np.frombuffer(frequencies, dtype=np.uint16)
+
+    # 文档按视频 ID 升序重新编号，删除时可二分查找
+    doc_order = np.argsort(doc_ids, kind="stable")
+    renumber = np.empty_like(doc_order)
+    renumber[doc_order] = np.arange(len(doc_order))
+    positions = renumber[positions].astype(np.int32)
+
+    order = np.lexsort((positions, terms))
+    terms = terms[order]
+    unique_terms, starts = np.unique(terms, return_index=True)
+    return {
+        "terms": unique_terms,
+        "offsets": np.append(starts, len(terms)).astype(np.int64),
+        "postings": positions[order],
+        "frequencies": frequencies[order],
+        "doc_ids": doc_ids[doc_order],
+        "doc_lengths": doc_lengths[doc_order],
+    }
+
+
+def save_segment(path: str, segment: dict[str, np.ndarray], meta: dict) -> None:
+    os.makedirs(path, exist_ok=True)
+    for name in SEGMENT_ARRAYS:
+        np.save(os.path.join(path, f"{name}.npy"), segment[name])
+    with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+
+
+def load_segment(path: str, mmap: bool = True) -> tuple[dict[str, np.ndarray], dict]:
+    segment = {
+        name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r" if mmap else None)
+        for name in SEGMENT_ARRAYS
+    }
+    with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+        return segment, json.load(f)
+
+
+class InvertedIndex:
+    """主段 + 内存增量的倒排索引，add / remove / search 均为同步调用，不做并发保护"""
+
+    def __init__(
+            self,
+            segment: dict[str, np.ndarray] | None = None,
+            k1: float = 1.2,
+            b: float = 0.75,
+            title_weight: int = 3,
+            description_chars: int = 200,
+    ):
+        segment = segment or build_segment((), title_weight, description_chars)
+        self.k1, self.b = k1, b
+        self.title_weight, self.description_chars = title_weight, description_chars
+        self._terms = segment["terms"]
+        self._offsets = segment["offsets"]
+        self._postings = segment["postings"]
+        self._frequencies = segment["frequencies"]
+        self._doc_ids = segment["doc_ids"]
+        self._doc_lengths = segment["doc_lengths"]
+        self._alive = np.ones(len(self._doc_ids), dtype=bool)
+        self._documents = len(self._doc_ids)
+        self._total_length = float(self._doc_lengths.sum(dtype=np.float64))
+        # 增量：词项 -> {视频 ID: 加权词频}，视频 ID -> (词项集合, 加权长度)
+        self._delta_postings: dict[int, dict[int, int]] = {}
+        self._delta_docs: dict[int, tuple[tuple[int, ...], int]] = {}
+
+    def __len__(self) -> int:
+        return self._documents
+
+    def _segment_position(self, video_id: int) -> int | None:
+        position = int(np.searchsorted(self._doc_ids, video_id))
+        if position < len(self._doc_ids) and self._doc_ids[position] == video_id:
+            return position
+        return None
+
+    def remove(self, video_id: int) -> None:
+        position = self._segment_position(video_id)
+        if position is not None and self._alive[position]:
+            self._alive[position] = False
+            self._documents -= 1
+            self._total_length -= float(self._doc_lengths[position])
+        delta = self._delta_docs.pop(video_id, None)
+        if delta is not None:
+            terms, length = delta
+            for term in terms:
+                postings = self._delta_postings[term]
+                del postings[video_id]
+                if not postings:
+                    del self._delta_postings[term]
+            self._documents -= 1
+            self._total_length -= length
+
+    def add(self, video_id: int, title: str | None, description: str | None) -> None:
+        """新增或更新视频（已存在时替换）"""
+        self.remove(video_id)
+        document, length = document_terms(title, description, self.title_weight, self.description_chars)
+        if not document:
+            return
+        for term, frequency in document.items():
+            self._delta_postings.setdefault(term, {})[video_id] = frequency
+        self._delta_docs[video_id] = (tuple(document), length)
+        self._documents += 1
+        self._total_length += length
+
+    def _segment_postings(self, term: int) -> tuple[np.ndarray, np.ndarray]:
+        index = int(np.searchsorted(self._terms, term))
+        if index >= len(self._terms) or self._terms[index] != term:
+            return self._postings[:0], self._frequencies[:0]
+        start, end = self._offsets[index], self._offsets[index + 1]
+        return self._postings[start:end], self._frequencies[start:end]
+
+    def search(self, query: str, limit: int) -> tuple[int, list[tuple[int, float]]]:
+        """
+        按 BM25 分数排序（同分时新视频在前）。
+
+        Returns:
+            tuple: (命中的视频数, 前 limit 个 [(视频 ID, 分数)])
+        """
+        query_terms: dict[int, int] = {}
+        for token in tokenize(query):
+            term = term_hash(token)
+            query_terms[term] = query_terms.get(term, 0) + 1
+        if not query_terms or self._documents <= 0:
+            return 0, []
+
+        k1, b = self.k1, self.b
+        average_length = self._total_length / self._documents
+        segment_positions, segment_scores = [], []
+        delta_scores: dict[int, float] = {}
+        for term, query_frequency in query_terms.items():
+            positions, frequencies = self._segment_postings(term)
+            delta = self._delta_postings.get(term, {})
+            df = len(positions) + len(delta)
+            if df == 0:
+                continue
+            # 已删除的文档仍留在主段倒排表中，df 可能大于 N，idf 至少取一个极小的正数
+            weight = query_frequency * max(math.log(1 + (self._documents - df + 0.5) / (df + 0.5)), 1e-6)
+            if len(positions):
+                tf = frequencies.astype(np.float32)
+                norm = k1 * (1 - b + b * self._doc_lengths[positions] / average_length)
+                segment_positions.append(positions)
+                segment_scores.append(weight * tf * (k1 + 1) / (tf + norm))
+            for video_id, tf in delta.items():
+                norm = k1 * (1 - b + b * self._delta_docs[video_id][1] / average_length)
+                delta_scores[video_id] = delta_scores.get(video_id, 0.0) + weight * tf * (k1 + 1) / (tf + norm)
+
+        if segment_positions:
+            positions, scores = self._merge_segment_scores(segment_positions, segment_scores)
+            alive = self._alive[positions]
+            positions, scores = positions[alive], scores[alive]
+        else:
+            positions, scores = np.empty(0, dtype=np.int64), np.empty(0)
+        total = len(positions) + len(delta_scores)
+        if len(positions) > limit:
+            # 主段只取前 limit 个参与最终排序；文档序号按视频 ID 升序，加上极小的序号偏移使同分时新视频在前
+            keys = scores + positions * _TIE_BREAK
+            top = np.argpartition(keys, len(keys) - limit)[len(keys) - limit:]
+            positions, scores = positions[top], scores[top]
+
+        video_ids = self._doc_ids[positions]
+        if delta_scores:
+            video_ids = np.concatenate([video_ids, np.fromiter(delta_scores.keys(), dtype=np.int64, count=len(delta_scores))])
+            scores = np.concatenate([scores, np.fromiter(delta_scores.values(), dtype=np.float64, count=len(delta_scores))])
+        order = np.lexsort((-video_ids, -scores))[:limit]
+        return total, [(int(video_ids[i]), float(scores[i])) for i in order]
+
+    def _merge_segment_scores(self, segment_positions: list, segment_scores: list) -> tuple[np.ndarray, np.ndarray]:
+        """把各词项在主段中的 (文档序号, 分数) 按文档累加"""
+        if len(segment_positions) == 1:
+            return segment_positions[0], segment_scores[0].astype(np.float64)
+        size = len(self._doc_ids)
+        if sum(len(positions) for positions in segment_positions) * _DENSE_RATIO < size:
+            positions, inverse = np.unique(np.concatenate(segment_positions), return_inverse=True)
+            return positions, np.bincount(inverse, weights=np.concatenate(segment_scores))
+        # 命中较多时直接在按文档序号的数组上累加（同一词项的倒排表内文档序号不重复），省去排序去重
+        accumulator = np.zeros(size)
+        for positions, scores in zip(segment_positions, segment_scores):
+            accumulator[positions] += scores
+        positions = np.flatnonzero(accumulator)
+        return positions, accumulator[positions]
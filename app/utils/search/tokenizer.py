@@ -0,0 +1,45 @@
+"""
+搜索分词：中日韩文字按相邻两字切分（bigram），其他文字按连续的字母、数字切词
+
+    "周杰伦 MV 合集" -> ["周杰", "杰伦", "mv", "合集"]
+
+先做 NFKC 规范化（全角转半角）并转小写；只有一个字的中日韩片段保留单字。
+建索引时（unigrams=True）再切出每个单字，查询单个汉字时也能命中包含它的词；多字查询仍只用相邻两字。
+不需要词典，新词、人名也能命中。
+索引中的词项用 64 位哈希表示（term_hash），不保存词表本身。
+"""
+
+import hashlib
+import re
+import unicodedata
+
+# 中日韩文字：平假名 / 片假名、CJK 扩展 A、CJK 统一汉字、兼容汉字、韩文音节
+_CJK = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af"
+_TOKEN_PATTERN = re.compile(f"([{_CJK}]+)|([^\\W_{_CJK}]+)")
+
+# 过长的字母数字串（链接、哈希值等）只保留前缀
+MAX_TOKEN_LENGTH = 32
+
+
+def tokenize(text: str | None, unigrams: bool = False) -> list[str]:
+    """切分为词项列表（保留重复，用于统计词频）；unigrams 为 True 时多字的中日韩片段同时切出每个单字"""
+    if not text:
+        return []
+    text = unicodedata.normalize("NFKC", text).lower()
+    tokens = []
+    for match in _TOKEN_PATTERN.finditer(text):
+        cjk, word = match.groups()
+        if word:
+            tokens.append(word[:MAX_TOKEN_LENGTH])
+        elif len(cjk) == 1:
+            tokens.append(cjk)
+        else:
+            tokens.extend(cjk[i:i + 2] for i in range(len(cjk) - 1))
+            if unigrams:
+                tokens.extend(cjk)
+    return tokens
+
+
+def term_hash(token: str) -> int:
+    """词项的 64 位哈希（无符号）"""
+    return int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), "little")
@@ -0,0 +1,135 @@
+"""
+视频列表卡片基准：查询完整 Video 实体 vs 只查询卡片列（VIDEO_CARD_COLUMNS → VideoCard）
+
+按 latest 列表的排序键做键集分页，逐页执行与 paginate_video_feed 相同的查询并转换为列表字典（video_to_dict），
+每页使用新的会话（与每个请求一个会话相同）。分别统计：
+每秒处理的行数，以及一页（查询 + 转换，结果保留到页末）的内存峰值（tracemalloc）。
+
+默认使用内存 SQLite 并写入合成数据；--url 可指定同步驱动的数据库（如 mysql+pymysql://...），
+数据库中需已有 videos / users 表，--rows > 0 时会写入合成视频。
+
+用法（在项目根目录）：
+    python -m benchmarks.bench_feed_cards --rows 20000 --pages 500 --size 20
+"""
+
+import argparse
+import statistics
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, insert, select, tuple_
+from sqlalchemy.orm import Session
+
+from app.crud.video.video import FEED_ORDERINGS, VIDEO_CARD_COLUMNS, VideoCard, published_video_conditions
+from app.models.mysql.base import Base
+from app.models.mysql.user import User
+from app.models.mysql.video import Video, VideoStatusEnum
+from app.services.video.video import video_to_dict
+
+
+def populate(engine, rows: int, description_chars: int):
+    Base.metadata.create_all(engine, tables=[User.__table__, Video.__table__])
+    started = datetime(2024, 1, 1)
+    with Session(engine) as session:
+        if session.get(User, 1) is None:
+            session.add(User(id=1, email="bench@example.com", username="bench", password="x", unique_id="bench"))
+            session.commit()
+        description = "描述" * (description_chars // 2)
+        batch = []
+        for i in range(rows):
+            batch.append({
+                "title": f"video {i}",
+                "description": description,
+                "file_path": f"videos/{i}.mp4",
+                "cover_image": f"covers/{i}.jpg",
+                "duration": 60 + i % 600,
+                "uploader_id": 1,
+                "is_public": True,
+                "is_deleted": False,
+                "status": VideoStatusEnum.PUBLISHED,
+                "processing_progress": 100,
+                "view_count": i % 1000,
+                "like_count": i % 100,
+                "collect_count": 0,
+                "comment_count": 0,
+                "hot_score": 0,
+                "created_at": started + timedelta(seconds=i),
+            })
+            if len(batch) == 1000:
+                session.execute(insert(Video), batch)
+                batch = []
+        if batch:
+            session.execute(insert(Video), batch)
+        session.commit()
+
+
+def entity_page(session, order_keys, size, after):
+    stmt = select(Video, *order_keys).where(*published_video_conditions())
+    if after:
+        stmt = stmt.where(tuple_(*order_keys) < tuple_(*after))
+    rows = session.execute(stmt.order_by(*(key.desc() for key in order_keys)).limit(size + 1)).all()
+    items = [video_to_dict(row[0]) for row in rows[:size]]
+    return items, (rows[size - 1][1:] if len(rows) > size else None)
+
+
+def card_page(session, order_keys, size, after):
+    stmt = select(*VIDEO_CARD_COLUMNS, *order_keys).where(*published_video_conditions())
+    if after:
+        stmt = stmt.where(tuple_(*order_keys) < tuple_(*after))
+    rows = session.execute(stmt.order_by(*(key.desc() for key in order_keys)).limit(size + 1)).all()
+    width = len(VIDEO_CARD_COLUMNS)
+    items = [video_to_dict(VideoCard(row)) for row in rows[:size]]
+    return items, (rows[size - 1][width:] if len(rows) > size else None)
+
+
+def run(engine, fetch_page, pages: int, size: int):
+    order_keys = FEED_ORDERINGS["latest"]
+    # 预热，并让两种方式从同一位置开始
+    with Session(engine) as session:
+        fetch_page(session, order_keys, size, None)
+
+    rows = 0
+    after = None
+    start = time.perf_counter()
+    for _ in range(pages):
+        with Session(engine) as session:
+            items, after = fetch_page(session, order_keys, size, after)
+        rows += len(items)
+        if after is None:
+            break
+    elapsed = time.perf_counter() - start
+
+    peaks = []
+    after = None
+    for _ in range(min(pages, 50)):
+        tracemalloc.start()
+        with Session(engine) as session:
+            items, after = fetch_page(session, order_keys, size, after)
+            peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        if after is None:
+            break
+    return rows / elapsed, statistics.median(peaks)
+
+
+def main(url: str, rows: int, pages: int, size: int, description_chars: int):
+    engine = create_engine(url)
+    if rows > 0:
+        populate(engine, rows, description_chars)
+    print(f"pages: {pages}, size: {size}, description: {description_chars} chars\n")
+    print(f"{'path':<16} {'rows/s':>12} {'peak KiB/page':>15}")
+    for name, fetch_page in (("entity", entity_page), ("card columns", card_page)):
+        rate, peak = run(engine, fetch_page, pages, size)
+        print(f"{name:<16} {rate:>12.0f} {peak / 1024:>15.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="视频列表卡片查询基准")
+    parser.add_argument("--url", default="sqlite://")
+    parser.add_argument("--rows", type=int, default=20000, help="写入的合成视频数，0 表示使用已有数据")
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--size", type=int, default=20)
+    parser.add_argument("--description-chars", type=int, default=2000)
+    args = parser.parse_args()
+    main(args.url, args.rows, args.pages, args.size, args.description_chars)
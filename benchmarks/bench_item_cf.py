@@ -0,0 +1,91 @@
+"""
+item-item 协同过滤基准：离线构建相似度与在线打分的耗时
+
+合成数据：视频分属若干兴趣簇，用户偏好一两个簇，视频热度服从 Zipf 分布；
+每个用户的互动数服从几何分布。分别计时：
+构建稀疏矩阵、全量计算 top-K 近邻、增量重算 1% 的视频、单个用户在线打分（p50 / p99）。
+在线打分只计进程内计算，不含 Redis 往返（生产环境中为一次 pipeline）。
+
+用法（在项目根目录）：
+    python -m benchmarks.bench_item_cf --users 100000 --videos 20000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from app.utils.recommend import build_interaction_matrix, item_neighbors, score_candidates
+
+
+def synthetic_interactions(users: int, videos: int, mean_per_user: int, clusters: int, seed: int):
+    rng = np.random.default_rng(seed)
+    counts = rng.geometric(1 / mean_per_user, users)
+    user_ids = np.repeat(np.arange(users), counts)
+
+    video_cluster = rng.integers(0, clusters, videos)
+    members = [np.flatnonzero(video_cluster == c) for c in range(clusters)]
+    favourite = rng.integers(0, clusters, users)[user_ids]
+    # 80% 的互动落在用户偏好的簇内，其余随机
+    in_cluster = rng.random(len(user_ids)) < 0.8
+    rank = rng.zipf(1.3, len(user_ids)) - 1
+
+    video_ids = rng.integers(0, videos, len(user_ids))
+    for c in range(clusters):
+        # 视频数少于簇数时部分簇为空，偏好这些簇的互动保持随机
+        if not len(members[c]):
+            continue
+        picked = in_cluster & (favourite == c)
+        video_ids[picked] = members[c][np.minimum(rank[picked], len(members[c]) - 1)]
+    weights = rng.choice([1.0, 3.0, 4.0], len(user_ids), p=[0.7, 0.2, 0.1])
+    return user_ids, video_ids + 1, weights
+
+
+def main(users: int, videos: int, mean_per_user: int, top_k: int, block_size: int, samples: int):
+    user_ids, video_ids, weights = synthetic_interactions(users, videos, mean_per_user, clusters=50, seed=7)
+    print(f"interactions: {len(user_ids)}, users: {users}, videos: {videos}, top_k: {top_k}\n")
+
+    start = time.perf_counter()
+    matrix, column_video_ids = build_interaction_matrix(user_ids, video_ids, weights)
+    print(f"{'build matrix':<24} {time.perf_counter() - start:>8.3f} s  nnz={matrix.nnz}")
+
+    start = time.perf_counter()
+    neighbor_lists: dict[int, list[tuple[int, float]]] = {}
+    for _, columns, neighbors, scores in item_neighbors(matrix, top_k=top_k, block_size=block_size):
+        for column, neighbor, score in zip(columns.tolist(), neighbors.tolist(), scores.tolist()):
+            neighbor_lists.setdefault(int(column_video_ids[column]), []).append(
+                (int(column_video_ids[neighbor]), score)
+            )
+    elapsed = time.perf_counter() - start
+    print(f"{'full neighbors':<24} {elapsed:>8.3f} s  {matrix.shape[1] / elapsed:>10.0f} videos/s")
+
+    changed = np.random.default_rng(1).choice(matrix.shape[1], max(matrix.shape[1] // 100, 1), replace=False)
+    start = time.perf_counter()
+    for _ in item_neighbors(matrix, top_k=top_k, columns=np.sort(changed), block_size=block_size):
+        pass
+    print(f"{'incremental (1%)':<24} {time.perf_counter() - start:>8.3f} s  {len(changed)} videos")
+
+    rng = np.random.default_rng(2)
+    csr = matrix.tocsr()
+    latencies = []
+    for user in rng.integers(0, matrix.shape[0], samples):
+        row = slice(csr.indptr[user], csr.indptr[user + 1])
+        history = {int(column_video_ids[c]): float(w) for c, w in zip(csr.indices[row], csr.data[row])}
+        lists = {video_id: neighbor_lists.get(video_id, []) for video_id in history}
+        start = time.perf_counter()
+        score_candidates(history, lists, 500)
+        latencies.append(time.perf_counter() - start)
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+    print(f"{'online scoring':<24} p50={p50:.3f} ms  p99={p99:.3f} ms  ({samples} users)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="item-item 协同过滤基准")
+    parser.add_argument("--users", type=int, default=50000)
+    parser.add_argument("--videos", type=int, default=10000)
+    parser.add_argument("--mean-per-user", type=int, default=20)
+    parser.add_argument("--top-k", type=int, default=50)
+    parser.add_argument("--block-size", type=int, default=2048)
+    parser.add_argument("--samples", type=int, default=1000)
+    args = parser.parse_args()
+    main(args.users, args.videos, args.mean_per_user, args.top_k, args.block_size, args.samples)
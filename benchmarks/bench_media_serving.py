@@ -0,0 +1,118 @@
+"""
+媒体文件服务基准：StaticFiles 挂载 vs MediaFileEndpoint
+
+在进程内直接驱动 ASGI 应用（不经过网络与 HTTP 服务器），对比三类请求的吞吐：
+完整文件、单区间 Range（模拟拖动进度条）、多区间 Range。
+同时分别测试服务器支持 / 不支持 zero-copy send 扩展两种情况
+（支持时响应体由服务器 sendfile，这里只统计交给服务器的字节数）。
+
+用法（在项目根目录）：
+    python -m benchmarks.bench_media_serving --size-mb 64 --requests 200
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from uuid import uuid4
+
+from starlette.staticfiles import StaticFiles
+
+from app.api.media import MediaFileEndpoint
+from app.api.media.media import ZERO_COPY_EXTENSION
+from app.core.config import settings
+from app.storage.local import LocalStorage
+
+
+def make_scope(path: str, headers: dict, zero_copy: bool) -> dict:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in headers.items()],
+        "server": ("bench", 80),
+        "client": ("127.0.0.1", 12345),
+        "media_path": path.lstrip("/"),
+        "extensions": {ZERO_COPY_EXTENSION: {}} if zero_copy else {},
+    }
+    return scope
+
+
+async def run_request(app, scope: dict) -> tuple[int, int]:
+    """执行一次请求，返回 (状态码, 响应体字节数)"""
+    status = 0
+    body_bytes = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status, body_bytes
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            body_bytes += len(message.get("body", b""))
+        elif message["type"] == ZERO_COPY_EXTENSION:
+            body_bytes += message["count"]
+
+    await app(dict(scope), receive, send)
+    return status, body_bytes
+
+
+async def bench(name: str, app, path: str, headers: dict, requests: int, zero_copy: bool = False):
+    scope = make_scope(path, headers, zero_copy)
+    status, _ = await run_request(app, scope)  # 预热页缓存
+    total_bytes = 0
+    start = time.perf_counter()
+    for _ in range(requests):
+        _, body_bytes = await run_request(app, scope)
+        total_bytes += body_bytes
+    elapsed = time.perf_counter() - start
+    print(
+        f"{name:<48} status={status}  {requests / elapsed:>9.1f} req/s  "
+        f"{total_bytes / elapsed / 1024 / 1024:>9.1f} MB/s"
+    )
+
+
+async def main(size_mb: int, requests: int):
+    with tempfile.TemporaryDirectory() as base_dir:
+        media_root = os.path.join(base_dir, settings.MEDIA_ROOT)
+        os.makedirs(media_root)
+        filename = f"video_1_{uuid4().hex}.mp4"
+        with open(os.path.join(media_root, filename), "wb") as f:
+            f.write(os.urandom(size_mb * 1024 * 1024))
+
+        size = size_mb * 1024 * 1024
+        static_app = StaticFiles(directory=media_root)
+        endpoint = MediaFileEndpoint(LocalStorage(base_dir, media_root, settings.MEDIA_PUBLIC_BASE_URL))
+        path = f"/{filename}"
+
+        cases = [
+            ("full", {}),
+            ("single range (1MB @ middle)", {"Range": f"bytes={size // 2}-{size // 2 + 1024 * 1024 - 1}"}),
+            ("multi range (4 x 256KB)", {
+                "Range": "bytes=" + ",".join(f"{i * size // 4}-{i * size // 4 + 256 * 1024 - 1}" for i in range(4))
+            }),
+        ]
+
+        print(f"file size: {size_mb}MB, requests per case: {requests}\n")
+        for case_name, headers in cases:
+            await bench(f"StaticFiles       {case_name}", static_app, path, headers, requests)
+            await bench(f"MediaEndpoint     {case_name}", endpoint, path, headers, requests)
+            await bench(f"MediaEndpoint(zc) {case_name}", endpoint, path, headers, requests, zero_copy=True)
+            print()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="媒体文件服务基准")
+    parser.add_argument("--size-mb", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=100)
+    args = parser.parse_args()
+    asyncio.run(main(args.size_mb, args.requests))
@@ -0,0 +1,105 @@
+"""
+视频搜索基准：倒排索引构建耗时、索引大小、BM25 查询延迟（p50 / p99）
+
+合成标题：由 3000 个汉字（常用字的出现概率更高）随机组成的 2 ~ 4 字词（词频服从 Zipf-Mandelbrot 分布）加少量英文单词、数字拼成，
+查询按同一分布抽取 1 ~ 3 个词。分别计时：
+构建主段、仅主段时的查询、写入 1% 增量（新增 + 删除）后的查询；
+另外对少量查询计时逐条子串匹配（相当于 title LIKE '%q%' 全表扫描）作为对照。
+
+用法（在项目根目录）：
+    python -m benchmarks.bench_search --titles 1000000 --queries 2000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from app.utils.search import InvertedIndex, build_segment
+
+_CHARS = (
+    "的一是在不了有和人这中大为上个国我以要他时来用们生到作地于出就分对成会可主发年动同工也能下过子说产种面而方后多定行学法所"
+    "民得经十三之进着等部度家电力里如水化高自二理起小物现实加量都两体制机当使点从业本去把性好应开它合还因由其些然前外天政四日"
+    "那社义事平形相全表间样与关各重新线内数正心反你明看原又么利比或但质气第向道命此变条只没结解问意建月公无系军很情者最立代想"
+)
+_ENGLISH = ["vlog", "mv", "live", "python", "game", "music", "cover", "4k", "hd", "tutorial", "review", "2024", "2025"]
+
+
+def word_probabilities(count: int) -> np.ndarray:
+    # 排名 r 的词出现概率 ∝ 1 / (r + 50) ^ 1.1（高频词不至于出现在大半标题中）
+    weights = 1 / (np.arange(count) + 50.0) ** 1.1
+    return weights / weights.sum()
+
+
+def synthetic_titles(count: int, vocabulary: int, seed: int) -> tuple[list[str], list[str]]:
+    rng = np.random.default_rng(seed)
+    rare = sorted({chr(code) for code in range(0x4E00, 0x9FA6, 7)} - set(_CHARS))[:3000 - len(_CHARS)]
+    chars = np.array(list(_CHARS) + rare)
+    probabilities = np.where(np.arange(len(chars)) < len(_CHARS), 10.0, 1.0)
+    probabilities /= probabilities.sum()
+    lengths = rng.integers(2, 5, vocabulary)
+    words = ["".join(rng.choice(chars, length, p=probabilities)) for length in lengths] + _ENGLISH
+    word_ids = rng.choice(len(words), (count, 4), p=word_probabilities(len(words)))
+    per_title = rng.integers(2, 5, count)
+    titles = [" ".join(words[w] for w in row[:n]) for row, n in zip(word_ids, per_title)]
+    return titles, words
+
+
+def timed_queries(index: InvertedIndex, queries: list[str], limit: int) -> tuple[float, float, float]:
+    latencies = []
+    hits = 0
+    for query in queries:
+        start = time.perf_counter()
+        total, _ = index.search(query, limit)
+        latencies.append(time.perf_counter() - start)
+        hits += total
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+    return p50, p99, hits / len(queries)
+
+
+def main(titles_count: int, vocabulary: int, queries_count: int, limit: int, delta_ratio: float):
+    titles, words = synthetic_titles(titles_count, vocabulary, seed=7)
+    rng = np.random.default_rng(2)
+    word_ids = rng.choice(len(words), (queries_count, 3), p=word_probabilities(len(words)))
+    queries = [" ".join(words[w] for w in row[:n]) for row, n in zip(word_ids, rng.integers(1, 4, queries_count))]
+    print(f"titles: {titles_count}, queries: {queries_count}, limit: {limit}\n")
+
+    start = time.perf_counter()
+    segment = build_segment((video_id, title, None) for video_id, title in enumerate(titles, 1))
+    elapsed = time.perf_counter() - start
+    size = sum(array.nbytes for array in segment.values()) / 2 ** 20
+    print(f"{'build segment':<24} {elapsed:>8.2f} s  {titles_count / elapsed:>8.0f} titles/s  "
+          f"terms={len(segment['terms'])} postings={len(segment['postings'])} size={size:.1f} MiB")
+
+    index = InvertedIndex(segment)
+    p50, p99, hits = timed_queries(index, queries, limit)
+    print(f"{'query (segment)':<24} p50={p50:.3f} ms  p99={p99:.3f} ms  avg hits={hits:.0f}")
+
+    changed = rng.choice(titles_count, int(titles_count * delta_ratio), replace=False) + 1
+    start = time.perf_counter()
+    for video_id in changed[::2]:
+        index.remove(int(video_id))
+    for offset, video_id in enumerate(changed[1::2]):
+        index.add(titles_count + offset + 1, titles[int(video_id) - 1], None)
+    elapsed = time.perf_counter() - start
+    print(f"{'incremental':<24} {elapsed:>8.2f} s  {len(changed) / elapsed:>8.0f} changes/s  ({len(changed)} changes)")
+    p50, p99, hits = timed_queries(index, queries, limit)
+    print(f"{'query (with delta)':<24} p50={p50:.3f} ms  p99={p99:.3f} ms  avg hits={hits:.0f}")
+
+    latencies = []
+    for query in queries[:20]:
+        start = time.perf_counter()
+        [title for title in titles if query in title]
+        latencies.append(time.perf_counter() - start)
+    print(f"{'substring scan':<24} p50={np.percentile(latencies, 50) * 1000:.3f} ms  (20 queries)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="视频搜索基准")
+    parser.add_argument("--titles", type=int, default=1000000)
+    parser.add_argument("--vocabulary", type=int, default=200000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--delta-ratio", type=float, default=0.01)
+    args = parser.parse_args()
+    main(args.titles, args.vocabulary, args.queries, args.limit, args.delta_ratio)
@@ -2,6 +2,7 @@
 import os
 import sys
 import unittest
+from functools import lru_cache
 
 # 自动把项目根目录加入 PYTHONPATH
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
@@ -14,6 +15,29 @@ import unittest
 import asyncio
 
 
+@lru_cache
+def redis_available() -> bool:
+    """能否连上配置的 Redis（依赖 Redis 的用例据此跳过）"""
+    from app.db.redis import get_redis_sync_client
+    try:
+        return bool(get_redis_sync_client().ping())
+    except Exception:
+        return False
+
+
+@lru_cache
+def mysql_available() -> bool:
+    """能否连上配置的 MySQL（依赖 MySQL 的用例据此跳过）"""
+    from sqlalchemy import text
+    from app.db.mysql import get_sync_session
+    try:
+        with get_sync_session() as session:
+            session.execute(text("SELECT 1"))
+        return True
+    except Exception:
+        return False
+
+
 class BaseTestCase(unittest.IsolatedAsyncioTestCase):
 
     # 异步类级别 setup/teardown
@@ -38,3 +62,15 @@ class BaseTestCase(unittest.IsolatedAsyncioTestCase):
 
     async def asyncTearDown(self):
         print("=== async teardown ===")
+
+
+class ServiceTestCase(BaseTestCase):
+    """依赖 MySQL / Redis 的用例：每个用例在独立的事件循环中运行，结束后关闭绑定在该循环上的连接"""
+
+    async def asyncTearDown(self):
+        import app.db.redis as redis_db
+        from app.db.mysql import engine
+        if redis_db.redis_client is not None:
+            await redis_db.redis_client.close()
+            redis_db.redis_client = None
+        await engine.dispose()
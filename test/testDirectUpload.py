@@ -0,0 +1,123 @@
+# test/testDirectUpload.py
+import hashlib
+import os
+import shutil
+import unittest
+from unittest import mock
+from uuid import uuid4
+
+from fastapi import HTTPException
+from sqlalchemy import delete, select
+
+import app.db.mysql as mysql_db
+from test.base import ServiceTestCase, mysql_available, redis_available
+from test.testVideoPipeline import _write_clip
+from app.api.video.upload import complete_direct, create_direct_upload
+from app.db.redis import get_redis_aioredis_client
+from app.models.mysql.media_blob import MediaBlob
+from app.models.mysql.user import User
+from app.models.mysql.video import Video
+from app.models.redis.upload import direct_upload_key
+from app.schemas.video import DirectUploadInitRequest
+from app.storage import get_storage
+from app.storage.blob import blob_tmp_full_path
+
+
+@unittest.skipUnless(mysql_available() and redis_available(), "未连接 MySQL / Redis")
+class TestDirectUpload(ServiceTestCase):
+    """预签名直传：客户端 PUT 由直接写入暂存 key 代替"""
+
+    async def asyncSetUp(self):
+        self.clip_path = blob_tmp_full_path(".mp4")
+        _write_clip(self.clip_path)
+        with open(self.clip_path, "rb") as f:
+            data = f.read()
+        self.size, self.sha256 = len(data), hashlib.sha256(data).hexdigest()
+
+        self.db = mysql_db.async_session()
+        tag = uuid4().hex[:12]
+        self.user = User(email=f"{tag}@direct.test", username=f"direct_{tag}", password="x")
+        self.db.add(self.user)
+        await self.db.commit()
+        self.user_id = self.user.id
+        # 只验证上传流程，不投递后台处理任务
+        patcher = mock.patch("app.services.video.video.enqueue_video_processing", return_value=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def asyncTearDown(self):
+        await self.db.rollback()
+        paths = (await self.db.scalars(select(Video.file_path).where(Video.uploader_id == self.user_id))).all()
+        for path in paths:
+            await get_storage().delete(path)
+        await self.db.execute(delete(MediaBlob).where(MediaBlob.digest == self.sha256))
+        await self.db.execute(delete(Video).where(Video.uploader_id == self.user_id))
+        await self.db.execute(delete(User).where(User.id == self.user_id))
+        await self.db.commit()
+        await self.db.close()
+        if os.path.exists(self.clip_path):
+            os.remove(self.clip_path)
+        await super().asyncTearDown()
+
+    async def _init(self, sha256: str | None = None) -> tuple[str, str]:
+        req = DirectUploadInitRequest(
+            title="direct", filename="clip.mp4", content_type="video/mp4",
+            total_size=self.size, sha256=sha256 or self.sha256,
+        )
+        resp = await create_direct_upload(req, db=self.db, current_user=self.user)
+        upload_id = resp.data.upload_id
+        session = await (await get_redis_aioredis_client()).hgetall(direct_upload_key(upload_id))
+        # 本地存储的 put_file 会移走源文件
+        upload_path = blob_tmp_full_path(".mp4")
+        shutil.copyfile(self.clip_path, upload_path)
+        await get_storage().put_file(session["key"], upload_path)
+        return upload_id, session["key"]
+
+    async def _complete(self, upload_id: str):
+        return await complete_direct(upload_id, cover=None, db=self.db, current_user=self.user)
+
+    async def test_complete(self):
+        upload_id, key = await self._init()
+        resp = await self._complete(upload_id)
+
+        video = await self.db.get(Video, resp.data["video_id"])
+        self.assertEqual(video.uploader_id, self.user_id)
+        self.assertIsNotNone(await get_storage().stat(video.file_path))
+        self.assertIsNone(await get_storage().stat(key))
+        ref_count = await self.db.scalar(select(MediaBlob.ref_count).where(MediaBlob.path == video.file_path))
+        self.assertEqual(ref_count, 1)
+
+        # 重复提交完成请求不会再创建一条视频记录
+        with self.assertRaises(HTTPException) as ctx:
+            await self._complete(upload_id)
+        self.assertEqual(ctx.exception.status_code, 404)
+
+    async def test_checksum_mismatch(self):
+        upload_id, key = await self._init(sha256="0" * 64)
+        with self.assertRaises(HTTPException) as ctx:
+            await self._complete(upload_id)
+        self.assertEqual(ctx.exception.status_code, 400)
+        # 暂存对象被删除，会话保留，客户端可以重新上传后再次完成
+        self.assertIsNone(await get_storage().stat(key))
+        self.assertTrue(await (await get_redis_aioredis_client()).exists(direct_upload_key(upload_id)))
+
+    async def test_retry_after_failed_registration(self):
+        upload_id, _ = await self._init()
+        with mock.patch(
+                "app.services.video.direct_upload.register_uploaded_video", side_effect=RuntimeError("db down")
+        ):
+            with self.assertRaises(RuntimeError):
+                await self._complete(upload_id)
+        # 回滚后会话中的对象已过期
+        await self.db.refresh(self.user)
+
+        # 未提交的引用已回滚，会话已删除：重试得到明确的 404，而不是“视频文件尚未上传”
+        self.assertIsNone(await self.db.scalar(select(MediaBlob.ref_count).where(MediaBlob.digest == self.sha256)))
+        with self.assertRaises(HTTPException) as ctx:
+            await self._complete(upload_id)
+        self.assertEqual(ctx.exception.status_code, 404)
+
+        # 重新发起上传可以正常完成（内容相同，复用已移入存储的文件）
+        upload_id, _ = await self._init()
+        resp = await self._complete(upload_id)
+        self.assertIsNotNone(await self.db.get(Video, resp.data["video_id"]))
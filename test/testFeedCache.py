@@ -0,0 +1,226 @@
+# test/testFeedCache.py
+import unittest
+from unittest import mock
+from uuid import uuid4
+
+from sqlalchemy import delete
+
+import app.db.mysql as mysql_db
+from app.db.mysql import get_sync_session
+from app.db.redis import get_redis_aioredis_client, get_redis_sync_client
+from test.base import ServiceTestCase, mysql_available, redis_available
+from app.models.mysql.user import User
+from app.models.mysql.video import Video, VideoStatusEnum
+from app.models.redis.feed import (
+    FEED_INDEX_PREFIX,
+    feed_index_dirty_key,
+    feed_index_key,
+    feed_index_lock_key,
+    feed_index_ready_key,
+    feed_card_key,
+    feed_member,
+)
+from app.services.user.user_card import invalidate_user_card
+from app.services.video import feed_cache
+from app.services.video.feed_cache import (
+    FEED_SCORES,
+    _ensure_index,
+    _page_entries,
+    load_video_cards,
+    rebuild_feed_index_sync,
+    refresh_video_in_feeds_sync,
+)
+from app.services.video.video import get_my_video_list
+
+
+def _members(entries) -> list[int]:
+    return [int(member) for member, _ in entries]
+
+
+@unittest.skipUnless(redis_available(), "未连接 Redis")
+class TestFeedPageEntries(ServiceTestCase):
+
+    async def asyncSetUp(self):
+        self.feed = f"test_{uuid4().hex[:8]}"
+        self.key = feed_index_key(self.feed)
+        self.redis = await get_redis_aioredis_client()
+        # 4 个视频同分，ID 倒序排列
+        await self.redis.zadd(self.key, {feed_member(i): 5 for i in range(1, 5)} | {feed_member(9): 3})
+
+    async def asyncTearDown(self):
+        await self.redis.delete(self.key)
+        await super().asyncTearDown()
+
+    async def _first_page(self):
+        entries = await _page_entries(self.redis, self.feed, 1, 2, None)
+        self.assertEqual(_members(entries), [4, 3, 2])
+        member, score = entries[1]
+        return score, int(member)
+
+    async def test_cursor_in_place(self):
+        cursor = await self._first_page()
+        self.assertEqual(_members(await _page_entries(self.redis, self.feed, 1, 2, cursor)), [2, 1, 9])
+
+    async def test_cursor_score_changed(self):
+        cursor = await self._first_page()
+        # 两次请求之间游标所在视频的分数变了：同分的 2、1 不能被跳过
+        await self.redis.zadd(self.key, {feed_member(3): 10})
+        self.assertEqual(_members(await _page_entries(self.redis, self.feed, 1, 2, cursor)), [2, 1, 9])
+        await self.redis.zadd(self.key, {feed_member(3): 4})
+        self.assertEqual(_members(await _page_entries(self.redis, self.feed, 1, 2, cursor)), [2, 1, 3])
+
+    async def test_cursor_removed(self):
+        cursor = await self._first_page()
+        await self.redis.zrem(self.key, feed_member(3))
+        self.assertEqual(_members(await _page_entries(self.redis, self.feed, 1, 2, cursor)), [2, 1, 9])
+        # 同分的视频多于一页时继续向后取
+        await self.redis.zadd(self.key, {feed_member(i): 5 for i in range(10, 20)})
+        self.assertEqual(_members(await _page_entries(self.redis, self.feed, 1, 2, cursor)), [2, 1, 9])
+
+
+@unittest.skipUnless(mysql_available() and redis_available(), "未连接 MySQL / Redis")
+class TestFeedIndexRebuild(ServiceTestCase):
+    """使用单独的列表名重建，分数取视频 ID，不影响正式索引"""
+
+    async def asyncSetUp(self):
+        self.feed = f"test_{uuid4().hex[:8]}"
+        patcher = mock.patch.dict(FEED_SCORES, {self.feed: lambda row: float(row.id)})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.redis = get_redis_sync_client()
+        self.session = get_sync_session()
+        tag = uuid4().hex[:12]
+        user = User(email=f"{tag}@feed.test", username=f"feed_{tag}", password="x")
+        self.session.add(user)
+        self.session.commit()
+        self.user_id = user.id
+        self.published = self._add_video(VideoStatusEnum.PUBLISHED)
+        self.processing = self._add_video(VideoStatusEnum.PROCESSING)
+
+    async def asyncTearDown(self):
+        self.session.rollback()
+        self.session.query(Video).filter(Video.uploader_id == self.user_id).delete()
+        self.session.query(User).filter(User.id == self.user_id).delete()
+        self.session.commit()
+        self.session.close()
+        # 增量更新也写入了正式索引
+        for feed in FEED_SCORES:
+            self.redis.zrem(feed_index_key(feed), feed_member(self.published), feed_member(self.processing))
+        keys = self.redis.keys(f"{FEED_INDEX_PREFIX}{self.feed}*")
+        if keys:
+            self.redis.delete(*keys)
+        await super().asyncTearDown()
+
+    def _add_video(self, status: VideoStatusEnum) -> int:
+        with get_sync_session() as session:
+            video = Video(title="feed", file_path=f"feed_{uuid4().hex}.mp4", uploader_id=self.user_id, status=status)
+            session.add(video)
+            session.commit()
+            return video.id
+
+    def _index(self, key: str | None = None) -> set[int]:
+        return {int(member) for member in self.redis.zrange(key or feed_index_key(self.feed), 0, -1)}
+
+    async def test_rebuild(self):
+        self.redis.zadd(feed_index_key(self.feed), {feed_member(self.processing): 1})
+        rebuild_feed_index_sync(self.session, self.redis, self.feed)
+
+        index = self._index()
+        self.assertIn(self.published, index)
+        self.assertNotIn(self.processing, index)
+        self.assertEqual(self.redis.ttl(feed_index_key(self.feed)), -1)
+        self.assertTrue(self.redis.exists(feed_index_ready_key(self.feed)))
+        # 临时 key 和锁都已删除
+        self.assertEqual(self.redis.keys(f"{feed_index_key(self.feed)}:rebuild:*"), [])
+        self.assertFalse(self.redis.exists(feed_index_lock_key(self.feed)))
+
+    async def test_dirty_recorded_only_while_rebuilding(self):
+        refresh_video_in_feeds_sync(self.session, self.published)
+        self.assertFalse(self.redis.exists(feed_index_dirty_key(self.feed)))
+        self.redis.set(feed_index_lock_key(self.feed), 1, ex=60)
+        refresh_video_in_feeds_sync(self.session, self.published)
+        self.assertTrue(self.redis.sismember(feed_index_dirty_key(self.feed), feed_member(self.published)))
+
+    async def test_changes_during_rebuild_are_replayed(self):
+        replay = feed_cache._replay_dirty_videos
+        changed = []
+
+        def publish_then_replay(session, redis, feed, target_key):
+            # 扫描结束、替换正式索引之前发布视频并撤下另一个：增量更新只写到旧索引
+            if not changed:
+                with get_sync_session() as other:
+                    other.query(Video).filter(Video.id == self.processing).update({"status": VideoStatusEnum.PUBLISHED})
+                    other.query(Video).filter(Video.id == self.published).update({"is_deleted": True})
+                    other.commit()
+                    for video_id in (self.processing, self.published):
+                        refresh_video_in_feeds_sync(other, video_id)
+                changed.append(target_key)
+            return replay(session, redis, feed, target_key)
+
+        with mock.patch.object(feed_cache, "_replay_dirty_videos", side_effect=publish_then_replay):
+            rebuild_feed_index_sync(self.session, self.redis, self.feed)
+
+        index = self._index()
+        self.assertIn(self.processing, index)
+        self.assertNotIn(self.published, index)
+        self.assertIn(":rebuild:", changed[0])
+
+    async def test_ensure_index_enqueues_once(self):
+        redis = await get_redis_aioredis_client()
+        with mock.patch("app.tasks.feed_tasks.enqueue_feed_index_rebuild", return_value=True) as enqueue:
+            # 没有旧索引：回退到 MySQL 分页，重建在后台进行
+            self.assertFalse(await _ensure_index(redis, self.feed))
+            self.assertFalse(await _ensure_index(redis, self.feed))
+            enqueue.assert_called_once_with(self.feed)
+
+            await redis.zadd(feed_index_key(self.feed), {feed_member(self.published): 1})
+            self.assertTrue(await _ensure_index(redis, self.feed))
+            await redis.set(feed_index_ready_key(self.feed), 1)
+            self.assertTrue(await _ensure_index(redis, self.feed))
+            enqueue.assert_called_once()
+
+
+@unittest.skipUnless(mysql_available() and redis_available(), "未连接 MySQL / Redis")
+class TestFeedCardUploader(ServiceTestCase):
+
+    async def asyncSetUp(self):
+        self.db = mysql_db.async_session()
+        tag = uuid4().hex[:12]
+        self.user = User(email=f"{tag}@card.test", username=f"card_{tag}", password="x")
+        self.db.add(self.user)
+        await self.db.flush()
+        video = Video(title="card", file_path=f"card_{tag}.mp4", uploader_id=self.user.id, status=VideoStatusEnum.PUBLISHED)
+        self.db.add(video)
+        await self.db.commit()
+        self.user_id, self.video_id = self.user.id, video.id
+        self.redis = await get_redis_aioredis_client()
+
+    async def asyncTearDown(self):
+        await self.db.rollback()
+        await self.db.execute(delete(Video).where(Video.uploader_id == self.user_id))
+        await self.db.execute(delete(User).where(User.id == self.user_id))
+        await self.db.commit()
+        await self.db.close()
+        await self.redis.delete(feed_card_key(self.video_id))
+        await super().asyncTearDown()
+
+    async def test_username_resolved_at_read_time(self):
+        card = (await load_video_cards(self.db, self.redis, [self.video_id]))[0]
+        self.assertEqual(card["uploader_username"], self.user.username)
+        self.assertTrue(await self.redis.exists(feed_card_key(self.video_id)))
+
+        self.user.username = f"renamed_{uuid4().hex[:8]}"
+        await self.db.commit()
+        await invalidate_user_card(self.db, self.user_id)
+        # 视频卡片仍在缓存中，用户名取自已失效的用户卡片
+        async with mysql_db.async_session() as db:
+            card = (await load_video_cards(db, self.redis, [self.video_id]))[0]
+        self.assertEqual(card["uploader_username"], self.user.username)
+        self.assertEqual(card["uploader_unique_id"], self.user.unique_id)
+
+    async def test_missing_uploader(self):
+        loader = mock.Mock(load_many=mock.AsyncMock(return_value={}))
+        with mock.patch("app.services.video.video.get_user_card_loader", return_value=loader):
+            data = await get_my_video_list(self.db, self.user_id, 1, 10)
+        self.assertEqual([item.id for item in data["items"]], [self.video_id])
+        self.assertIsNone(data["items"][0].uploader_username)
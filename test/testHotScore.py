@@ -0,0 +1,55 @@
+# test/testHotScore.py
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+from uuid import uuid4
+
+from sqlalchemy import delete
+
+import app.db.mysql as mysql_db
+from test.base import ServiceTestCase, mysql_available, settings
+from app.crud.video.video import HOT_SCORE_MAX_HALF_LIVES, refresh_video_hot_score
+from app.models.mysql.user import User
+from app.models.mysql.video import Video, VideoStatusEnum
+
+
+@unittest.skipUnless(mysql_available(), "未连接 MySQL")
+class TestHotScoreDecay(ServiceTestCase):
+
+    async def asyncSetUp(self):
+        self.db = mysql_db.async_session()
+        tag = uuid4().hex[:12]
+        user = User(email=f"{tag}@hot.test", username=f"hot_{tag}", password="x")
+        self.db.add(user)
+        await self.db.flush()
+        self.user_id = user.id
+        patcher = mock.patch.object(settings, "HOT_SCORE_HALF_LIFE_HOURS", 1)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def asyncTearDown(self):
+        await self.db.execute(delete(Video).where(Video.uploader_id == self.user_id))
+        await self.db.execute(delete(User).where(User.id == self.user_id))
+        await self.db.commit()
+        await self.db.close()
+        await super().asyncTearDown()
+
+    async def _score(self, age: timedelta) -> float:
+        video = Video(
+            title="hot", file_path=f"hot_{uuid4().hex}.mp4", uploader_id=self.user_id,
+            status=VideoStatusEnum.PUBLISHED, like_count=100, created_at=datetime.now() - age,
+        )
+        self.db.add(video)
+        await self.db.flush()
+        await refresh_video_hot_score(self.db, video.id)
+        await self.db.commit()
+        await self.db.refresh(video)
+        return float(video.hot_score)
+
+    async def test_decay(self):
+        self.assertAlmostEqual(await self._score(timedelta(hours=2)), 50, delta=1)
+
+    async def test_older_than_overflow_age(self):
+        # 半衰期 1 小时，发布 2000 小时：不截断时 POW(2, 2000) 超出 DOUBLE 范围
+        age = timedelta(hours=HOT_SCORE_MAX_HALF_LIVES * 2)
+        self.assertAlmostEqual(await self._score(age), 0)
@@ -0,0 +1,105 @@
+# test/testItemCF.py
+import math
+import unittest
+
+import numpy as np
+
+from test.base import BaseTestCase, redis_available
+from app.db.redis import get_redis_sync_client
+from app.models.redis.recommend import item_neighbors_key
+from app.tasks.recommend_tasks import _write_neighbors
+from app.utils.recommend import build_interaction_matrix, item_neighbors, score_candidates
+
+# 用户 1、2 都看了 10、20，用户 2 还看了 30，用户 3 给 30 的权重为 2；40 只有用户 4 看过
+INTERACTIONS = (
+    [1, 1, 2, 2, 2, 3, 4, 1],
+    [10, 20, 10, 20, 30, 30, 40, 10],
+    [0.5, 1.0, 1.0, 1.0, 1.0, 2.0, 1.0, 0.5],
+)
+
+
+def _neighbor_lists(blocks, video_ids) -> dict[int, list[tuple[int, float]]]:
+    result = {}
+    for block, columns, neighbors, scores in blocks:
+        for column in block:
+            result.setdefault(int(video_ids[column]), [])
+        for column, neighbor, score in zip(columns, neighbors, scores):
+            result[int(video_ids[column])].append((int(video_ids[neighbor]), float(score)))
+    return result
+
+
+class TestItemCF(BaseTestCase):
+
+    def setUp(self):
+        self.matrix, self.video_ids = build_interaction_matrix(*INTERACTIONS)
+
+    def test_interaction_matrix(self):
+        self.assertEqual(self.video_ids.tolist(), [10, 20, 30, 40])
+        self.assertEqual(self.matrix.shape, (4, 4))
+        # 同一用户、视频的多条记录权重相加
+        self.assertEqual(self.matrix[0, 0], 1.0)
+        self.assertEqual(self.matrix.nnz, 7)
+
+    def test_similarity(self):
+        shrinkage = 1.0
+        neighbors = _neighbor_lists(item_neighbors(self.matrix, shrinkage=shrinkage), self.video_ids)
+        # cos(10, 20) = 1，两个共现用户；cos(10, 30) = 1 / (√2 × √5)，一个共现用户
+        sim_10_20 = 1.0 * 2 / (2 + shrinkage)
+        sim_10_30 = 1 / (math.sqrt(2) * math.sqrt(5)) * 1 / (1 + shrinkage)
+        self.assertEqual([video_id for video_id, _ in neighbors[10]], [20, 30])
+        self.assertAlmostEqual(neighbors[10][0][1], sim_10_20, places=5)
+        self.assertAlmostEqual(neighbors[10][1][1], sim_10_30, places=5)
+        # 对称，且不包含自身
+        self.assertAlmostEqual(dict(neighbors[30])[10], sim_10_30, places=5)
+        self.assertNotIn(10, dict(neighbors[10]))
+        # 没有共现用户的视频出现在块中，但没有近邻
+        self.assertEqual(neighbors[40], [])
+
+    def test_top_k_and_blocks(self):
+        full = _neighbor_lists(item_neighbors(self.matrix, shrinkage=0), self.video_ids)
+        top1 = _neighbor_lists(item_neighbors(self.matrix, top_k=1, shrinkage=0), self.video_ids)
+        self.assertEqual({video_id: items[:1] for video_id, items in full.items()}, top1)
+        # 分块大小和只算部分列不影响结果
+        blocked = _neighbor_lists(item_neighbors(self.matrix, shrinkage=0, block_size=1), self.video_ids)
+        self.assertEqual(blocked.keys(), full.keys())
+        for video_id in full:
+            np.testing.assert_allclose([s for _, s in blocked[video_id]], [s for _, s in full[video_id]], rtol=1e-6)
+        partial = _neighbor_lists(item_neighbors(self.matrix, shrinkage=0, columns=[2]), self.video_ids)
+        self.assertEqual(list(partial), [30])
+        self.assertEqual([video_id for video_id, _ in partial[30]], [video_id for video_id, _ in full[30]])
+
+    def test_score_candidates(self):
+        history = {10: 2.0, 30: 1.0}
+        neighbor_lists = {10: [(20, 0.5), (30, 0.4), (50, 0.1)], 30: [(20, 0.2), (60, 0.7)]}
+        self.assertEqual(
+            score_candidates(history, neighbor_lists, 10),
+            [(20, 1.2), (60, 0.7), (50, 0.2)],
+        )
+        self.assertEqual(score_candidates(history, neighbor_lists, 1), [(20, 1.2)])
+        # 同分按视频 ID 倒序
+        self.assertEqual(score_candidates({1: 1.0}, {1: [(2, 0.5), (3, 0.5)]}, 2), [(3, 0.5), (2, 0.5)])
+
+
+@unittest.skipUnless(redis_available(), "未连接 Redis")
+class TestWriteNeighbors(BaseTestCase):
+
+    def setUp(self):
+        self.redis = get_redis_sync_client()
+        self.video_ids = np.asarray([900000001, 900000002, 900000003], dtype=np.int64)
+        self.keys = [item_neighbors_key(int(video_id)) for video_id in self.video_ids]
+
+    def tearDown(self):
+        self.redis.delete(*self.keys)
+
+    def test_stale_neighbors_deleted(self):
+        # 视频 3 上一次构建时有近邻，这次重算后没有了
+        self.redis.zadd(self.keys[2], {int(self.video_ids[0]): 0.9})
+        blocks = [(
+            np.asarray([0, 1, 2]),
+            np.asarray([0, 1]),
+            np.asarray([1, 0]),
+            np.asarray([0.5, 0.5], dtype=np.float32),
+        )]
+        self.assertEqual(_write_neighbors(self.redis, self.video_ids, blocks, incremental=False), 2)
+        self.assertEqual(self.redis.zrange(self.keys[0], 0, -1), [str(self.video_ids[1])])
+        self.assertFalse(self.redis.exists(self.keys[2]))
@@ -0,0 +1,134 @@
+# test/testMediaGC.py
+import hashlib
+import os
+import tempfile
+import time
+import unittest
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from sqlalchemy import delete
+
+from test.base import BaseTestCase, mysql_available, settings
+from app.db.mysql import get_sync_session
+from app.models.mysql.media_blob import MediaBlob
+from app.storage.blob import (
+    BLOB_DIR,
+    HLS_DIR,
+    QUARANTINE_DIR,
+    blob_relative_path,
+    thumbnail_relative_path,
+)
+from app.storage.local import LocalStorage
+from app.tasks.media_tasks import QUARANTINE_DATE_FORMAT, MediaGarbageCollector
+
+
+def _digest() -> str:
+    return hashlib.sha256(uuid4().bytes).hexdigest()
+
+
+@unittest.skipUnless(mysql_available(), "未连接 MySQL")
+class TestMediaGarbageCollector(BaseTestCase):
+    """在临时目录的本地存储上运行清理任务（数据库中的其他记录不影响临时目录中的文件）"""
+
+    async def asyncSetUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        media_root = os.path.join(self.tmp_dir.name, settings.MEDIA_ROOT)
+        self.storage = LocalStorage(self.tmp_dir.name, media_root, settings.MEDIA_PUBLIC_BASE_URL)
+        self.session = get_sync_session()
+        self.digests = []
+
+    async def asyncTearDown(self):
+        self.session.rollback()
+        self.session.execute(delete(MediaBlob).where(MediaBlob.digest.in_(self.digests)))
+        self.session.commit()
+        self.session.close()
+        self.tmp_dir.cleanup()
+
+    async def _put(self, key: str, age_seconds: float = 0) -> str:
+        src = os.path.join(self.tmp_dir.name, uuid4().hex)
+        with open(src, "wb") as f:
+            f.write(b"media")
+        await self.storage.put_file(key, src)
+        if age_seconds:
+            mtime = time.time() - age_seconds
+            os.utime(self.storage.local_path(key), (mtime, mtime))
+        return key
+
+    def _add_blob(self, ref_count: int) -> str:
+        digest = _digest()
+        path = blob_relative_path(digest, ".jpg")
+        self.session.add(MediaBlob(digest=digest, path=path, size=5, ref_count=ref_count))
+        self.session.commit()
+        self.digests.append(digest)
+        return path
+
+    def _collector(self, dry_run: bool = False) -> MediaGarbageCollector:
+        return MediaGarbageCollector(self.session, self.storage, dry_run=dry_run, mode="quarantine")
+
+    def _exists(self, key: str) -> bool:
+        return os.path.exists(os.path.join(self.tmp_dir.name, key))
+
+    async def test_is_live(self):
+        collector = self._collector()
+        live_blob = blob_relative_path(_digest(), ".mp4")
+        collector.live_paths.add(live_blob)
+        collector.live_digests.add(os.path.splitext(os.path.basename(live_blob))[0])
+        collector.live_asset_dirs.add(os.path.join(HLS_DIR, "1"))
+        # 引用数归零但记录还在（保留期内）
+        released = self._add_blob(ref_count=0)
+
+        self.assertTrue(collector._is_live(live_blob))
+        self.assertTrue(collector._is_live(thumbnail_relative_path(live_blob, 320, "webp")))
+        self.assertTrue(collector._is_live(os.path.join(HLS_DIR, "1", "360p", "index.m3u8")))
+        self.assertTrue(collector._is_live(released))
+        self.assertFalse(collector._is_live(os.path.join(HLS_DIR, "2", "master.m3u8")))
+        self.assertFalse(collector._is_live(blob_relative_path(_digest(), ".mp4")))
+        self.assertFalse(collector._is_live(os.path.join(BLOB_DIR, "not-a-digest.mp4")))
+
+    async def test_grace_period(self):
+        grace = self._collector().grace_seconds
+        live = await self._put(self._add_blob(ref_count=1), age_seconds=grace + 60)
+        fresh = await self._put(blob_relative_path(_digest(), ".mp4"))
+        stale = await self._put(blob_relative_path(_digest(), ".mp4"), age_seconds=grace + 60)
+
+        report = await self._collector().run()
+        self.assertEqual(report.orphan_files, 1)
+        self.assertTrue(self._exists(live))
+        self.assertTrue(self._exists(fresh))
+        self.assertFalse(self._exists(stale))
+
+    async def test_quarantine_then_purge(self):
+        grace = self._collector().grace_seconds
+        orphan = await self._put(blob_relative_path(_digest(), ".mp4"), age_seconds=grace + 60)
+        expired_day = datetime.now() - timedelta(days=settings.MEDIA_GC_QUARANTINE_DAYS + 1)
+        expired = await self._put(
+            os.path.join(QUARANTINE_DIR, expired_day.strftime(QUARANTINE_DATE_FORMAT), blob_relative_path(_digest(), ".mp4"))
+        )
+
+        collector = self._collector()
+        report = await collector.run()
+        # 孤儿文件先移入当天的隔离目录，过期的隔离文件被彻底删除
+        quarantined = os.path.join(collector.quarantine_dir, orphan)
+        self.assertFalse(self._exists(orphan))
+        self.assertTrue(self._exists(quarantined))
+        self.assertFalse(self._exists(expired))
+        self.assertEqual((report.orphan_files, report.purged_files), (1, 1))
+
+        # 隔离区中的文件不会被当作孤儿再次移动，保留期内也不会被删除
+        report = await self._collector().run()
+        self.assertTrue(self._exists(quarantined))
+        self.assertEqual((report.orphan_files, report.purged_files), (0, 0))
+
+    async def test_dry_run(self):
+        grace = self._collector().grace_seconds
+        orphan = await self._put(blob_relative_path(_digest(), ".mp4"), age_seconds=grace + 60)
+        expired_day = datetime.now() - timedelta(days=settings.MEDIA_GC_QUARANTINE_DAYS + 1)
+        expired = await self._put(
+            os.path.join(QUARANTINE_DIR, expired_day.strftime(QUARANTINE_DATE_FORMAT), blob_relative_path(_digest(), ".mp4"))
+        )
+
+        report = await self._collector(dry_run=True).run()
+        self.assertEqual((report.orphan_files, report.purged_files, report.reclaimed_bytes), (1, 1, 5))
+        self.assertTrue(self._exists(orphan))
+        self.assertTrue(self._exists(expired))
@@ -0,0 +1,108 @@
+# test/testPagination.py
+import base64
+import json
+import unittest
+from datetime import datetime
+from decimal import Decimal
+from uuid import uuid4
+
+from fastapi import HTTPException
+from sqlalchemy import delete
+
+import app.db.mysql as mysql_db
+from test.base import BaseTestCase, ServiceTestCase, mysql_available
+from app.crud.video.video import paginate_video_feed
+from app.models.mysql.user import User
+from app.models.mysql.video import Video, VideoStatusEnum
+from app.utils.pagination import decode_cursor, encode_cursor
+
+
+class TestCursor(BaseTestCase):
+
+    async def test_round_trip(self):
+        values = [datetime(2026, 1, 2, 3, 4, 5, 678000), Decimal("12.50"), 42, "x", None]
+        cursor = encode_cursor("recommend", values)
+        self.assertNotIn("=", cursor)
+        decoded = decode_cursor("recommend", cursor, len(values))
+        self.assertEqual(decoded, values)
+        self.assertIsInstance(decoded[0], datetime)
+        self.assertIsInstance(decoded[1], Decimal)
+
+    def _assert_invalid(self, feed: str, cursor: str, size: int):
+        with self.assertRaises(HTTPException) as ctx:
+            decode_cursor(feed, cursor, size)
+        self.assertEqual(ctx.exception.status_code, 400)
+
+    async def test_wrong_feed(self):
+        self._assert_invalid("hot", encode_cursor("latest", [1, 2]), 2)
+
+    async def test_wrong_number_of_values(self):
+        cursor = encode_cursor("latest", [1, 2])
+        self._assert_invalid("latest", cursor, 1)
+        self._assert_invalid("latest", cursor, 3)
+
+    async def test_tampered(self):
+        cursor = encode_cursor("latest", [datetime(2026, 1, 1), 7])
+        self._assert_invalid("latest", cursor[:-3], 2)
+        self._assert_invalid("latest", "A" + cursor[1:], 2)
+        self._assert_invalid("latest", "not a cursor", 2)
+
+        def forge(payload) -> str:
+            return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+        self._assert_invalid("latest", forge({"feed": "latest"}), 2)
+        self._assert_invalid("latest", forge(["latest", {"dt": "yesterday"}, 7]), 2)
+        self._assert_invalid("latest", forge(["latest", {"dec": "abc"}, 7]), 2)
+        self._assert_invalid("latest", forge(["latest", {"evil": 1}, 7]), 2)
+        self._assert_invalid("latest", forge(["latest", [1], 7]), 2)
+
+
+@unittest.skipUnless(mysql_available(), "未连接 MySQL")
+class TestPaginateVideoFeed(ServiceTestCase):
+
+    async def asyncSetUp(self):
+        self.db = mysql_db.async_session()
+        tag = uuid4().hex[:12]
+        user = User(email=f"{tag}@page.test", username=f"page_{tag}", password="x")
+        self.db.add(user)
+        await self.db.flush()
+        self.user_id = user.id
+        # 发布时间完全相同，只能靠 id 区分先后
+        created_at = datetime(2026, 1, 1, 12, 0, 0)
+        videos = [
+            Video(title=f"tie {i}", file_path=f"tie_{tag}_{i}.mp4", uploader_id=user.id,
+                  status=VideoStatusEnum.PUBLISHED, created_at=created_at)
+            for i in range(5)
+        ]
+        self.db.add_all(videos)
+        await self.db.commit()
+        self.video_ids = sorted((video.id for video in videos), reverse=True)
+
+    async def asyncTearDown(self):
+        await self.db.execute(delete(Video).where(Video.uploader_id == self.user_id))
+        await self.db.execute(delete(User).where(User.id == self.user_id))
+        await self.db.commit()
+        await self.db.close()
+        await super().asyncTearDown()
+
+    async def test_cursor_pages_across_tie(self):
+        conditions = (Video.uploader_id == self.user_id,)
+        seen, cursor = [], None
+        while True:
+            _, cards, cursor = await paginate_video_feed(self.db, "uploader", conditions, 0, 2, cursor=cursor)
+            seen.extend(card.id for card in cards)
+            if cursor is None:
+                break
+        # 同一排序键下既不重复也不遗漏，按 id 倒序
+        self.assertEqual(seen, self.video_ids)
+
+    async def test_page_and_total(self):
+        conditions = (Video.uploader_id == self.user_id,)
+        total, cards, cursor = await paginate_video_feed(self.db, "uploader", conditions, 2, 2)
+        self.assertEqual(total, 5)
+        self.assertEqual([card.id for card in cards], self.video_ids[2:4])
+        self.assertIsNotNone(cursor)
+        total, cards, cursor = await paginate_video_feed(self.db, "uploader", conditions, 0, 2, cursor=cursor)
+        self.assertIsNone(total)
+        self.assertEqual([card.id for card in cards], self.video_ids[4:])
+        self.assertIsNone(cursor)
@@ -0,0 +1,31 @@
+# test/testProcessPool.py
+import asyncio
+import time
+
+from test.base import BaseTestCase
+from app.utils.process_pool import run_in_process_pool, shutdown_process_pool
+
+
+def _sleep(seconds: float) -> float:
+    time.sleep(seconds)
+    return seconds
+
+
+class TestProcessPool(BaseTestCase):
+
+    async def asyncTearDown(self):
+        shutdown_process_pool()
+
+    async def test_result(self):
+        self.assertEqual(await run_in_process_pool(_sleep, 0, timeout=60), 0)
+
+    async def test_permit_held_until_task_finishes(self):
+        # 先跑一次，排除进程启动耗时
+        await run_in_process_pool(_sleep, 0, timeout=60)
+        semaphore = asyncio.Semaphore(1)
+        with self.assertRaises(asyncio.TimeoutError):
+            await run_in_process_pool(_sleep, 1, timeout=0.1, semaphore=semaphore)
+        # 等待超时，但子进程中的任务仍在执行，名额不能释放
+        self.assertTrue(semaphore.locked())
+        await asyncio.wait_for(semaphore.acquire(), timeout=10)
+        semaphore.release()
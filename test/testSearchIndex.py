@@ -0,0 +1,128 @@
+# test/testSearchIndex.py
+import tempfile
+from unittest import mock
+
+import numpy as np
+
+from test.base import BaseTestCase
+from app.utils.search import InvertedIndex, build_segment, load_segment, save_segment, term_hash, tokenize
+
+DOCUMENTS = [
+    (1, "周杰伦 MV 合集", "经典歌曲"),
+    (2, "猫咪日常", "周末和猫一起晒太阳"),
+    (3, "Python 教程", "从零开始学 python"),
+    (4, "周末 vlog", None),
+    (5, "", ""),
+]
+
+
+def _ids(ranked) -> list[int]:
+    return [video_id for video_id, _ in ranked]
+
+
+class TestTokenize(BaseTestCase):
+
+    async def test_bigrams_and_words(self):
+        self.assertEqual(tokenize("周杰伦 MV 合集"), ["周杰", "杰伦", "mv", "合集"])
+        # 全角转半角、转小写，下划线和标点作为分隔
+        self.assertEqual(tokenize("ＭＶ_Hello，世界!"), ["mv", "hello", "世界"])
+        self.assertEqual(tokenize("猫 a"), ["猫", "a"])
+        self.assertEqual(tokenize("x" * 100), ["x" * 32])
+        self.assertEqual(tokenize(None), [])
+        self.assertEqual(tokenize(""), [])
+
+    async def test_unigrams(self):
+        self.assertEqual(tokenize("周杰伦", unigrams=True), ["周杰", "杰伦", "周", "杰", "伦"])
+        # 单字片段和字母数字不重复切出
+        self.assertEqual(tokenize("猫 mv", unigrams=True), ["猫", "mv"])
+
+
+class TestSegment(BaseTestCase):
+
+    async def test_build(self):
+        segment = build_segment(reversed(DOCUMENTS))
+        # 没有词项的文档不进入主段，文档按视频 ID 升序编号
+        self.assertEqual(segment["doc_ids"].tolist(), [1, 2, 3, 4])
+        self.assertTrue(np.all(np.diff(segment["terms"].astype(np.float64)) > 0))
+        self.assertEqual(segment["offsets"][-1], len(segment["postings"]))
+        # 词项“周末”出现在视频 2 的描述和视频 4 的标题中，标题词频加权
+        index = int(np.searchsorted(segment["terms"], np.uint64(term_hash("周末"))))
+        start, end = segment["offsets"][index], segment["offsets"][index + 1]
+        self.assertEqual(segment["doc_ids"][segment["postings"][start:end]].tolist(), [2, 4])
+        self.assertEqual(segment["frequencies"][start:end].tolist(), [1, 3])
+
+    async def test_save_and_load(self):
+        segment = build_segment(DOCUMENTS)
+        with tempfile.TemporaryDirectory() as path:
+            save_segment(path, segment, {"seq": 7})
+            loaded, meta = load_segment(path)
+            self.assertEqual(meta, {"seq": 7})
+            for name, array in segment.items():
+                self.assertIsInstance(loaded[name], np.memmap)
+                np.testing.assert_array_equal(loaded[name], array)
+                self.assertEqual(loaded[name].dtype, array.dtype)
+            self.assertEqual(_ids(InvertedIndex(loaded).search("周末", 10)[1]), [4, 2])
+            del loaded
+
+
+class TestInvertedIndex(BaseTestCase):
+
+    def setUp(self):
+        self.index = InvertedIndex(build_segment(DOCUMENTS))
+
+    async def test_ordering(self):
+        self.assertEqual(len(self.index), 4)
+        # 标题命中排在描述命中之前
+        total, ranked = self.index.search("周末", 10)
+        self.assertEqual((total, _ids(ranked)), (2, [4, 2]))
+        self.assertGreater(ranked[0][1], ranked[1][1])
+        # 多个词项的分数累加
+        self.assertEqual(_ids(self.index.search("python 教程", 10)[1]), [3])
+        self.assertEqual(self.index.search("不存在", 10), (0, []))
+        self.assertEqual(self.index.search("   ", 10), (0, []))
+
+    async def test_single_character_query(self):
+        # 单字查询命中包含这个字的词
+        self.assertEqual(_ids(self.index.search("周", 10)[1]), [4, 1, 2])
+        self.assertEqual(_ids(self.index.search("猫", 10)[1]), [2])
+
+    async def test_ties_and_limit(self):
+        index = InvertedIndex(build_segment([(video_id, "相同标题", None) for video_id in range(10, 20)]))
+        total, ranked = index.search("相同", 3)
+        # 同分时新视频在前
+        self.assertEqual((total, _ids(ranked)), (10, [19, 18, 17]))
+
+    async def test_delta_and_deleted(self):
+        self.index.remove(4)
+        self.assertEqual(_ids(self.index.search("周末", 10)[1]), [2])
+        self.assertEqual(len(self.index), 3)
+
+        # 新增的视频进入增量，与主段一起排序
+        self.index.add(6, "周末露营", None)
+        self.assertEqual(_ids(self.index.search("周末", 10)[1]), [6, 2])
+        # 修改主段中的视频：主段标记删除，新内容写入增量
+        self.index.add(2, "狗狗日常", None)
+        self.assertEqual(_ids(self.index.search("周末", 10)[1]), [6])
+        self.assertEqual(_ids(self.index.search("狗狗", 10)[1]), [2])
+        self.assertEqual(self.index.search("猫咪", 10), (0, []))
+        self.assertEqual(len(self.index), 4)
+
+        self.index.remove(6)
+        self.index.remove(2)
+        self.assertEqual(self.index.search("周末", 10), (0, []))
+        self.assertEqual(len(self.index), 2)
+        # 重复删除、删除不存在的视频不影响计数
+        self.index.remove(6)
+        self.index.remove(99)
+        self.assertEqual(len(self.index), 2)
+
+    async def test_dense_merge_matches_sparse(self):
+        documents = [(video_id, f"标题{video_id % 7} 周末 猫咪", None) for video_id in range(1, 200)]
+        index = InvertedIndex(build_segment(documents))
+        with mock.patch("app.utils.search.index._DENSE_RATIO", 0):
+            sparse = index.search("周末猫咪", 50)
+        with mock.patch("app.utils.search.index._DENSE_RATIO", 10 ** 9):
+            dense = index.search("周末猫咪", 50)
+        self.assertEqual(sparse[0], dense[0])
+        self.assertEqual(_ids(sparse[1]), _ids(dense[1]))
+        np.testing.assert_allclose([s for _, s in sparse[1]], [s for _, s in dense[1]])
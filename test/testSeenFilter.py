@@ -0,0 +1,113 @@
+# test/testSeenFilter.py
+import unittest
+from unittest import mock
+from uuid import uuid4
+
+from test.base import BaseTestCase, ServiceTestCase, redis_available, settings
+from app.db.redis import get_redis_aioredis_client
+from app.models.redis.seen import seen_filter_count_key, seen_filter_key, seen_filter_ready_key
+from app.services.video.seen_filter import drop_seen_videos, mark_videos_seen
+from app.utils.bloom import bloom_offsets, bloom_size
+
+
+class TestBloom(BaseTestCase):
+
+    async def test_size(self):
+        self.assertEqual(bloom_size(1000, 0.01), (9586, 7))
+        bits, hashes = bloom_size(2000, 0.001)
+        self.assertGreater(bits, 2 * 9586)
+        self.assertEqual(hashes, 10)
+        # 容量为 0 时按 1 计算
+        self.assertEqual(bloom_size(0, 0.01), bloom_size(1, 0.01))
+
+    async def test_offsets(self):
+        bits, hashes = bloom_size(1000, 0.01)
+        offsets = bloom_offsets(42, bits, hashes)
+        self.assertEqual(len(offsets), hashes)
+        self.assertTrue(all(0 <= offset < bits for offset in offsets))
+        self.assertEqual(offsets, bloom_offsets("42", bits, hashes))
+        self.assertNotEqual(offsets, bloom_offsets(43, bits, hashes))
+
+    async def test_error_rate(self):
+        bits, hashes = bloom_size(1000, 0.01)
+        filled = set()
+        for item in range(1000):
+            filled.update(bloom_offsets(item, bits, hashes))
+        false_positives = sum(
+            all(offset in filled for offset in bloom_offsets(item, bits, hashes)) for item in range(1000, 11000)
+        )
+        self.assertLess(false_positives / 10000, 0.02)
+
+
+def _fetcher(video_ids: list[int]):
+    """按页码或游标（上一页最后一个视频 ID）分页的列表"""
+    calls = []
+
+    async def fetch(page, size, cursor, with_total):
+        calls.append((page, size, cursor))
+        start = video_ids.index(int(cursor)) + 1 if cursor else (page - 1) * size
+        chunk = video_ids[start:start + size]
+        more = start + size < len(video_ids)
+        return {
+            "total": len(video_ids) if with_total else None,
+            "items": [{"id": video_id} for video_id in chunk],
+            "next_cursor": str(chunk[-1]) if more else None,
+        }
+
+    return fetch, calls
+
+
+@unittest.skipUnless(redis_available(), "未连接 Redis")
+class TestDropSeenVideos(ServiceTestCase):
+    """过滤器已构建（设置了 ready 标记），不需要从 MySQL 读取观看记录"""
+
+    async def asyncSetUp(self):
+        self.user_id = 900000000 + uuid4().int % 100000000
+        self.redis = await get_redis_aioredis_client()
+        await self.redis.set(seen_filter_ready_key(self.user_id), 1, ex=100)
+        await mark_videos_seen(self.user_id, [2, 3, 5])
+        self.fetch, self.calls = _fetcher(list(range(1, 21)))
+
+    async def asyncTearDown(self):
+        await self.redis.delete(
+            seen_filter_key(self.user_id), seen_filter_count_key(self.user_id), seen_filter_ready_key(self.user_id)
+        )
+        await super().asyncTearDown()
+
+    async def _drop(self, page, size, cursor=None, with_total=None):
+        data = await drop_seen_videos(None, self.user_id, self.fetch, page, size, cursor, with_total)
+        return [item["id"] for item in data["items"]], data
+
+    async def test_page_mode_unfiltered(self):
+        ids, data = await self._drop(1, 4, with_total=True)
+        self.assertEqual(ids, [1, 2, 3, 4])
+        self.assertEqual(data["total"], 20)
+        ids, _ = await self._drop(2, 4, with_total=True)
+        self.assertEqual(ids, [5, 6, 7, 8])
+
+    async def test_cursor_refill(self):
+        ids, data = await self._drop(1, 4, cursor="1")
+        # 2、3、5 看过：补取缺少的 3 条，游标指向最后检查过的视频
+        self.assertEqual(ids, [4, 6, 7, 8])
+        self.assertEqual(data["next_cursor"], "8")
+        self.assertEqual(self.calls, [(1, 4, "1"), (1, 3, "5")])
+        ids, data = await self._drop(1, 4, cursor=data["next_cursor"])
+        self.assertEqual(ids, [9, 10, 11, 12])
+
+    async def test_refill_limits(self):
+        with mock.patch.object(settings, "SEEN_FILTER_MAX_ROUNDS", 1):
+            ids, data = await self._drop(1, 4, cursor="1")
+        self.assertEqual((ids, data["next_cursor"]), ([4], "5"))
+        # 列表到底后不再补取
+        await mark_videos_seen(self.user_id, [19, 20])
+        ids, data = await self._drop(1, 4, cursor="17")
+        self.assertEqual((ids, data["next_cursor"]), ([18], None))
+
+    async def test_mark_refreshes_ready_ttl(self):
+        await mark_videos_seen(self.user_id, [6])
+        self.assertGreater(await self.redis.ttl(seen_filter_ready_key(self.user_id)), 100)
+        # 尚未构建的过滤器不会因为写入而被当作已构建
+        other = self.user_id + 1
+        await mark_videos_seen(other, [6])
+        self.assertFalse(await self.redis.exists(seen_filter_ready_key(other)))
+        await self.redis.delete(seen_filter_key(other), seen_filter_count_key(other))
@@ -0,0 +1,148 @@
+# test/testStorage.py
+import asyncio
+import os
+import tempfile
+import unittest
+from urllib.parse import parse_qs, urlsplit
+
+from test.base import BaseTestCase, settings
+from app.storage import create_storage
+from app.storage.local import LocalStorage
+from app.storage.tiered import TieredStorage
+
+
+async def _chunks(data: bytes, size: int):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+class StorageContract:
+    """各存储后端共用的读写用例"""
+
+    storage = None
+    key = None
+
+    async def test_put_stream_and_get_range(self):
+        # 超过一个分片，S3 后端会走并发分片上传
+        data = os.urandom(settings.S3_MULTIPART_PART_SIZE * 2 + 12345)
+        stat = await self.storage.put_stream(self.key, _chunks(data, 1024 * 1024), "video/mp4")
+        self.assertEqual(stat.size, len(data))
+        self.assertTrue(stat.etag.startswith('"'))
+
+        chunks = [c async for c in self.storage.get_range(self.key, 100, 200099)]
+        self.assertEqual(b"".join(chunks), data[100:200100])
+
+        await self.storage.delete(self.key)
+        self.assertIsNone(await self.storage.stat(self.key))
+
+    async def test_put_file(self):
+        with tempfile.NamedTemporaryFile(delete=False) as f:
+            f.write(b"hello storage")
+        stat = await self.storage.put_file(self.key, f.name)
+        self.assertEqual(stat.size, 13)
+        self.assertFalse(os.path.exists(f.name))
+        self.assertTrue(await self.storage.presign(self.key, 60))
+        await self.storage.delete(self.key)
+
+    async def test_move(self):
+        await self.storage.put_stream(self.key, _chunks(b"move me", 4))
+        dst_key = self.key + ".moved"
+        await self.storage.move(self.key, dst_key)
+        self.assertIsNone(await self.storage.stat(self.key))
+        self.assertEqual((await self.storage.stat(dst_key)).size, 7)
+        await self.storage.delete(dst_key)
+
+
+    async def test_list_objects(self):
+        prefix = os.path.join(os.path.dirname(self.key), "list")
+        keys = {os.path.join(prefix, name) for name in ("a.bin", os.path.join("sub", "b.bin"))}
+        for key in keys:
+            await self.storage.put_stream(key, _chunks(b"12345", 2))
+        listed = {key: stat.size async for key, stat in self.storage.list_objects(prefix)}
+        self.assertEqual(listed, {key: 5 for key in keys})
+        for key in keys:
+            await self.storage.delete(key)
+
+
+class TestLocalStorage(StorageContract, BaseTestCase):
+
+    async def asyncSetUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        media_root = os.path.join(self.tmp_dir.name, settings.MEDIA_ROOT)
+        self.storage = LocalStorage(self.tmp_dir.name, media_root, settings.MEDIA_PUBLIC_BASE_URL, "test-secret")
+        self.key = os.path.join(settings.MEDIA_ROOT, "test", "storage.bin")
+
+    async def asyncTearDown(self):
+        self.tmp_dir.cleanup()
+
+    async def test_reject_path_outside_media_root(self):
+        self.assertIsNone(await self.storage.stat("../etc/passwd"))
+
+    async def test_presigned_put_signature(self):
+        url = await self.storage.presign(self.key, 60, method="PUT")
+        query = parse_qs(urlsplit(url).query)
+        expires, signature = query["expires"][0], query["signature"][0]
+        self.assertTrue(self.storage.verify_presigned(self.key, "PUT", expires, signature))
+        self.assertFalse(self.storage.verify_presigned(self.key + "x", "PUT", expires, signature))
+        self.assertFalse(self.storage.verify_presigned(self.key, "PUT", "1", signature))
+
+    async def test_presign_unsupported(self):
+        with self.assertRaises(ValueError):
+            await self.storage.presign(self.key, 60, method="DELETE")
+        unsigned = LocalStorage(self.tmp_dir.name, self.storage.media_root, settings.MEDIA_PUBLIC_BASE_URL)
+        with self.assertRaises(ValueError):
+            await unsigned.presign(self.key, 60, method="PUT")
+
+
+class TestTieredStorage(StorageContract, BaseTestCase):
+
+    async def asyncSetUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        tiers = {}
+        for name in ("hot", "archive"):
+            base_dir = os.path.join(self.tmp_dir.name, name)
+            tiers[name] = LocalStorage(base_dir, os.path.join(base_dir, settings.MEDIA_ROOT), settings.MEDIA_PUBLIC_BASE_URL)
+        self.storage = TieredStorage(
+            tiers["hot"],
+            tiers["archive"],
+            os.path.join(self.tmp_dir.name, "warm"),
+            settings.MEDIA_ROOT,
+            settings.MEDIA_PUBLIC_BASE_URL,
+            warm_max_bytes=1024 * 1024,
+        )
+        self.key = os.path.join(settings.MEDIA_ROOT, "test", "storage.bin")
+
+    async def asyncTearDown(self):
+        self.tmp_dir.cleanup()
+
+    async def test_demote_and_rehydrate(self):
+        await self.storage.put_stream(self.key, _chunks(b"cold video", 4))
+        self.assertEqual(await self.storage.demote(self.key), 10)
+        self.assertIsNone(await self.storage.hot.stat(self.key))
+        self.assertIsNone(self.storage.local_path(self.key))
+
+        # 只查询元数据不回温
+        self.assertEqual((await self.storage.stat(self.key)).size, 10)
+        self.assertEqual(self.storage.metrics.rehydrations, 0)
+        self.assertIsNone(self.storage.local_path(self.key))
+
+        # 并发读取只回温一次，之后从回温缓存读取
+        async def read(start: int, end: int) -> bytes:
+            return b"".join([c async for c in self.storage.get_range(self.key, start, end)])
+
+        self.assertEqual(await asyncio.gather(*[read(5, 9) for _ in range(3)]), [b"video"] * 3)
+        self.assertEqual(self.storage.metrics.rehydrations, 1)
+        self.assertIsNotNone(self.storage.local_path(self.key))
+        self.assertEqual(await read(0, 3), b"cold")
+        self.assertEqual(self.storage.metrics.rehydrations, 1)
+
+
+@unittest.skipUnless(settings.STORAGE_BACKEND == "s3", "未配置 S3 兼容存储（可用本地 MinIO）")
+class TestS3Storage(StorageContract, BaseTestCase):
+
+    async def asyncSetUp(self):
+        self.storage = create_storage()
+        self.key = f"{settings.MEDIA_ROOT}/test/storage.bin"
+
+    async def asyncTearDown(self):
+        await self.storage.close()
@@ -0,0 +1,71 @@
+# test/testThumbnail.py
+import os
+import tempfile
+
+import cv2
+import numpy as np
+
+from test.base import BaseTestCase, settings
+from app.services.media.thumbnail import avatar_variant, cover_variant, ensure_thumbnails
+from app.storage.blob import blob_relative_path, thumbnail_relative_path, thumbnail_variant
+from app.storage.local import LocalStorage
+
+COVER_PATH = blob_relative_path("ab" * 32, ".jpg")
+
+
+class TestThumbnailVariant(BaseTestCase):
+
+    def _variant(self, width: int) -> str:
+        return thumbnail_variant(width, settings.THUMBNAIL_FORMAT)
+
+    def _thumb(self, width: int) -> str:
+        return thumbnail_relative_path(COVER_PATH, width, settings.THUMBNAIL_FORMAT)
+
+    async def test_pick_recorded_variant(self):
+        small, large = settings.cover_thumb_widths[0], settings.cover_thumb_widths[-1]
+        variants = {self._variant(width) for width in settings.cover_thumb_widths}
+        self.assertEqual(cover_variant(COVER_PATH, variants), self._thumb(small))
+        self.assertEqual(cover_variant(COVER_PATH, variants, large=True), self._thumb(large))
+
+    async def test_fallback_to_next_recorded_variant(self):
+        large = settings.cover_thumb_widths[-1]
+        self.assertEqual(cover_variant(COVER_PATH, {self._variant(large)}), self._thumb(large))
+
+    async def test_fallback_to_original(self):
+        # 没有记录（生成失败、尚未补生成）或只有旧格式 / 旧档位时返回原图
+        self.assertEqual(cover_variant(COVER_PATH, None), COVER_PATH)
+        self.assertEqual(cover_variant(COVER_PATH, {"1.unknown"}), COVER_PATH)
+        self.assertIsNone(avatar_variant(None, None))
+        legacy = os.path.join(settings.MEDIA_ROOT, "avatars", "default.png")
+        self.assertEqual(avatar_variant(legacy, {self._variant(settings.avatar_thumb_widths[0])}), legacy)
+
+
+class TestEnsureThumbnails(BaseTestCase):
+
+    async def asyncSetUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        media_root = os.path.join(self.tmp_dir.name, settings.MEDIA_ROOT)
+        self.storage = LocalStorage(self.tmp_dir.name, media_root, settings.MEDIA_PUBLIC_BASE_URL)
+        image_path = os.path.join(self.tmp_dir.name, "cover.jpg")
+        cv2.imwrite(image_path, np.full((120, 200, 3), 128, dtype=np.uint8))
+        await self.storage.put_file(COVER_PATH, image_path)
+
+    async def asyncTearDown(self):
+        self.tmp_dir.cleanup()
+
+    async def test_generate_missing_variants(self):
+        widths = settings.cover_thumb_widths
+        variants = await ensure_thumbnails(self.storage, COVER_PATH, widths, in_process_pool=False)
+        self.assertEqual(variants, {thumbnail_variant(width, settings.THUMBNAIL_FORMAT) for width in widths})
+        for width in widths:
+            self.assertIsNotNone(await self.storage.stat(thumbnail_relative_path(COVER_PATH, width, settings.THUMBNAIL_FORMAT)))
+
+        # 已存在的档位直接返回
+        self.assertEqual(await ensure_thumbnails(self.storage, COVER_PATH, widths, in_process_pool=False), variants)
+
+    async def test_undecodable_source(self):
+        broken = os.path.join(self.tmp_dir.name, "broken.jpg")
+        with open(broken, "wb") as f:
+            f.write(b"not an image")
+        await self.storage.put_file(COVER_PATH, broken)
+        self.assertEqual(await ensure_thumbnails(self.storage, COVER_PATH, settings.cover_thumb_widths, in_process_pool=False), set())
@@ -0,0 +1,103 @@
+# test/testTimeline.py
+import unittest
+from unittest import mock
+from uuid import uuid4
+
+from sqlalchemy import delete, or_
+
+import app.db.mysql as mysql_db
+from test.base import ServiceTestCase, mysql_available, redis_available, settings
+from app.db.redis import get_redis_aioredis_client
+from app.models.mysql.follow import Follow
+from app.models.mysql.user import User
+from app.models.mysql.video import Video, VideoStatusEnum
+from app.models.redis.feed import TIMELINE_PULL_CREATORS_KEY, timeline_key, timeline_ready_key
+from app.services.user.follow_service import toggle_follow_service
+from app.services.video.timeline import get_following_timeline
+from app.tasks.feed_tasks import fanout_video
+
+
+@unittest.skipUnless(mysql_available() and redis_available(), "未连接 MySQL / Redis")
+class TestFollowingTimeline(ServiceTestCase):
+    """一个创作者、两个粉丝；读取一次时间线使其构建完成，之后只靠增量更新"""
+
+    async def asyncSetUp(self):
+        self.db = mysql_db.async_session()
+        self.redis = await get_redis_aioredis_client()
+        tag = uuid4().hex[:10]
+        users = [User(email=f"{tag}{i}@timeline.test", username=f"tl_{tag}_{i}", password="x") for i in range(3)]
+        self.db.add_all(users)
+        await self.db.commit()
+        self.creator, self.fan, self.other_fan = (user.id for user in users)
+        self.user_ids = [self.creator, self.fan, self.other_fan]
+        self.db.add_all([Follow(user_id=fan, followed_user_id=self.creator) for fan in (self.fan, self.other_fan)])
+        await self.db.commit()
+        for fan in (self.fan, self.other_fan):
+            await get_following_timeline(self.db, fan, 1, 10)
+
+    async def asyncTearDown(self):
+        await self.db.rollback()
+        await self.db.execute(delete(Follow).where(or_(Follow.user_id.in_(self.user_ids), Follow.followed_user_id.in_(self.user_ids))))
+        await self.db.execute(delete(Video).where(Video.uploader_id == self.creator))
+        await self.db.execute(delete(User).where(User.id.in_(self.user_ids)))
+        await self.db.commit()
+        await self.db.close()
+        await self.redis.srem(TIMELINE_PULL_CREATORS_KEY, self.creator)
+        for user_id in self.user_ids:
+            await self.redis.delete(timeline_key(user_id), timeline_ready_key(user_id))
+        await super().asyncTearDown()
+
+    async def _publish(self) -> int:
+        video = Video(title="timeline", file_path=f"tl_{uuid4().hex}.mp4", uploader_id=self.creator, status=VideoStatusEnum.PUBLISHED)
+        self.db.add(video)
+        await self.db.commit()
+        return video.id
+
+    async def _pushed(self, user_id: int) -> list[int]:
+        return [int(member) for member in await self.redis.zrevrange(timeline_key(user_id), 0, -1)]
+
+    async def _timeline(self, user_id: int) -> list[int]:
+        data = await get_following_timeline(self.db, user_id, 1, 10)
+        return [item["id"] for item in data["items"]]
+
+    async def test_fanout(self):
+        video_id = await self._publish()
+        report = fanout_video(video_id)
+        self.assertEqual((report["mode"], report["followers"]), ("push", 2))
+        self.assertEqual(await self._pushed(self.fan), [video_id])
+        self.assertEqual(await self._pushed(self.other_fan), [video_id])
+        self.assertEqual(await self._timeline(self.fan), [video_id])
+
+    async def test_pull_merge_and_prune(self):
+        pushed = await self._publish()
+        fanout_video(pushed)
+        with mock.patch.object(settings, "TIMELINE_FANOUT_MAX_FOLLOWERS", 1):
+            pulled = await self._publish()
+            self.assertEqual(fanout_video(pulled)["mode"], "pull")
+        self.assertTrue(await self.redis.sismember(TIMELINE_PULL_CREATORS_KEY, self.creator))
+        # 没有写进时间线，读取时从 MySQL 拉取后合并
+        self.assertEqual(await self._pushed(self.fan), [pushed])
+        self.assertEqual(await self._timeline(self.fan), [pulled, pushed])
+
+        # 粉丝数回落：补写此前只靠拉取的视频，再移出拉取集合
+        latest = await self._publish()
+        report = fanout_video(latest)
+        self.assertEqual((report["mode"], report["pushed"]), ("push", 3))
+        self.assertFalse(await self.redis.sismember(TIMELINE_PULL_CREATORS_KEY, self.creator))
+        self.assertEqual(await self._pushed(self.fan), [latest, pulled, pushed])
+        self.assertEqual(await self._timeline(self.other_fan), [latest, pulled, pushed])
+
+    async def test_follow_and_unfollow(self):
+        video_ids = [await self._publish() for _ in range(2)]
+        for video_id in video_ids:
+            fanout_video(video_id)
+
+        self.assertFalse(await toggle_follow_service(self.db, self.fan, self.creator))
+        self.assertEqual(await self._pushed(self.fan), [])
+        self.assertEqual(await self._timeline(self.fan), [])
+
+        self.assertTrue(await toggle_follow_service(self.db, self.fan, self.creator))
+        self.assertEqual(await self._pushed(self.fan), video_ids[::-1])
+        self.assertEqual(await self._timeline(self.fan), video_ids[::-1])
+        # 另一个粉丝的时间线不受影响
+        self.assertEqual(await self._pushed(self.other_fan), video_ids[::-1])
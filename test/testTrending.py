@@ -0,0 +1,56 @@
+# test/testTrending.py
+import unittest
+from datetime import datetime
+from unittest import mock
+
+from test.base import ServiceTestCase, redis_available, settings
+from app.db.redis import get_redis_sync_client
+from app.models.redis.trending import TRENDING_TOP_PREFIX, trending_top_key, trending_views_key, trending_watch_key
+from app.services.analytics.analytics import get_popular_videos
+from app.tasks.trending_tasks import compute_trending
+
+# 固定在很早的时间，不与真实的每小时计数重叠
+NOW = datetime(2001, 1, 1, 12, 30)
+
+
+@unittest.skipUnless(redis_available(), "未连接 Redis")
+class TestComputeTrending(ServiceTestCase):
+
+    async def asyncSetUp(self):
+        for name, value in (("TRENDING_MAX_DAYS", 2), ("TRENDING_HALF_LIFE_HOURS", 1), ("TRENDING_TOP_N", 3)):
+            patcher = mock.patch.object(settings, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.redis = get_redis_sync_client()
+        self.hours = ["2001010112", "2001010109", "2000123112"]
+        # 视频 1 半小时前看了 4 次；视频 2 三个半小时前看了 10 次；视频 3 一天前看了 100 次
+        self.redis.hset(trending_views_key(self.hours[0]), mapping={1: 4})
+        self.redis.hset(trending_watch_key(self.hours[0]), mapping={1: 60})
+        self.redis.hset(trending_views_key(self.hours[1]), mapping={2: 10})
+        self.redis.hset(trending_views_key(self.hours[2]), mapping={3: 100, 1: 1})
+
+    async def asyncTearDown(self):
+        self.redis.delete(*[trending_views_key(hour) for hour in self.hours])
+        self.redis.delete(*[trending_watch_key(hour) for hour in self.hours])
+        # 发布的结果会被下一次定期计算覆盖
+        self.redis.delete(*self.redis.keys(f"{TRENDING_TOP_PREFIX}*"))
+        await super().asyncTearDown()
+
+    async def test_decayed_order(self):
+        self.assertEqual(compute_trending(NOW)["videos"], 3)
+        one_day = await get_popular_videos(1, 10)
+        # 按衰减后的分数排序：观看次数少但更近的视频 1 排在前面
+        self.assertEqual([item["_id"] for item in one_day], [1, 2])
+        self.assertEqual([item["view_count"] for item in one_day], [4, 10])
+        self.assertEqual(one_day[0]["total_watch_time"], 60)
+        self.assertAlmostEqual(one_day[0]["score"], 4 * 0.5 ** 0.5, places=4)
+        self.assertAlmostEqual(one_day[1]["score"], 10 * 0.5 ** 3.5, places=4)
+
+        # 两天的窗口包含更早的观看，次数累加，分数几乎没有变化
+        two_days = await get_popular_videos(2, 10)
+        self.assertEqual([item["_id"] for item in two_days], [1, 2, 3])
+        self.assertEqual([item["view_count"] for item in two_days], [5, 10, 100])
+        self.assertAlmostEqual(two_days[0]["score"], one_day[0]["score"], places=4)
+
+        self.assertEqual([item["_id"] for item in await get_popular_videos(2, 1)], [1])
+        self.assertGreater(self.redis.ttl(trending_top_key(1)), 0)
@@ -0,0 +1,178 @@
+# test/testUploadSession.py
+import asyncio
+import hashlib
+import os
+import unittest
+from unittest import mock
+from uuid import uuid4
+
+from fastapi import HTTPException
+from sqlalchemy import delete, func, select
+
+import app.db.mysql as mysql_db
+from test.base import ServiceTestCase, mysql_available, redis_available, settings
+from test.testVideoPipeline import _write_clip
+from app.api.video.upload import complete_upload, create_upload_session
+from app.db.redis import get_redis_aioredis_client
+from app.models.mysql.media_blob import MediaBlob
+from app.models.mysql.user import User
+from app.models.mysql.video import Video
+from app.models.redis.upload import upload_session_key
+from app.schemas.video import UploadInitRequest
+from app.services.video.upload_session import append_upload_chunk
+from app.storage import get_storage
+from app.storage.blob import blob_tmp_full_path
+
+
+async def _stream(*chunks: bytes, gate: asyncio.Event | None = None):
+    for chunk in chunks:
+        yield chunk
+        if gate:
+            await gate.wait()
+
+
+@unittest.skipUnless(mysql_available() and redis_available(), "未连接 MySQL / Redis")
+class TestUploadSession(ServiceTestCase):
+    """分片上传：分片请求体由字节流代替"""
+
+    async def asyncSetUp(self):
+        clip_path = blob_tmp_full_path(".mp4")
+        _write_clip(clip_path)
+        with open(clip_path, "rb") as f:
+            self.data = f.read()
+        os.remove(clip_path)
+        self.sha256 = hashlib.sha256(self.data).hexdigest()
+        self.file_paths = []
+
+        self.db = mysql_db.async_session()
+        tag = uuid4().hex[:12]
+        self.user = User(email=f"{tag}@chunk.test", username=f"chunk_{tag}", password="x")
+        self.db.add(self.user)
+        await self.db.commit()
+        self.user_id = self.user.id
+        self.redis = await get_redis_aioredis_client()
+        # 只验证上传流程，不投递后台处理任务
+        patcher = mock.patch("app.services.video.video.enqueue_video_processing", return_value=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def asyncTearDown(self):
+        await self.db.rollback()
+        paths = (await self.db.scalars(select(Video.file_path).where(Video.uploader_id == self.user_id))).all()
+        for path in paths:
+            await get_storage().delete(path)
+        await self.db.execute(delete(MediaBlob).where(MediaBlob.digest == self.sha256))
+        await self.db.execute(delete(Video).where(Video.uploader_id == self.user_id))
+        await self.db.execute(delete(User).where(User.id == self.user_id))
+        await self.db.commit()
+        await self.db.close()
+        for path in self.file_paths:
+            full_path = os.path.join(settings.media_root_parent, path)
+            if os.path.exists(full_path):
+                os.remove(full_path)
+        await super().asyncTearDown()
+
+    async def _init(self) -> str:
+        req = UploadInitRequest(title="chunk", filename="clip.mp4", content_type="video/mp4", total_size=len(self.data))
+        resp = await create_upload_session(req, db=self.db, current_user=self.user)
+        upload_id = resp.data.upload_id
+        self.file_paths.append(await self.redis.hget(upload_session_key(upload_id), "file_path"))
+        return upload_id
+
+    async def _append(self, upload_id: str, offset: int, *chunks: bytes, gate: asyncio.Event | None = None):
+        return await append_upload_chunk(self.user_id, upload_id, offset, _stream(*chunks, gate=gate))
+
+    async def _complete(self, upload_id: str):
+        return await complete_upload(upload_id, cover=None, db=self.db, current_user=self.user)
+
+    async def _video_count(self) -> int:
+        return await self.db.scalar(select(func.count()).select_from(Video).where(Video.uploader_id == self.user_id))
+
+    async def _uploaded(self) -> str:
+        upload_id = await self._init()
+        middle = len(self.data) // 2
+        await self._append(upload_id, 0, self.data[:middle])
+        out = await self._append(upload_id, middle, self.data[middle:])
+        self.assertEqual(out.offset, len(self.data))
+        return upload_id
+
+    async def test_offset_mismatch(self):
+        upload_id = await self._init()
+        await self._append(upload_id, 0, self.data[:1024])
+        # 重放已确认的分片或跳过字节都被拒绝，偏移量不变
+        for offset in (0, 2048):
+            with self.assertRaises(HTTPException) as ctx:
+                await self._append(upload_id, offset, self.data[offset:offset + 1024])
+            self.assertEqual(ctx.exception.status_code, 409)
+        self.assertEqual(await self.redis.hget(upload_session_key(upload_id), "offset"), "1024")
+
+    async def test_concurrent_chunk(self):
+        upload_id = await self._init()
+        gate = asyncio.Event()
+        first = asyncio.create_task(self._append(upload_id, 0, self.data[:1024], self.data[1024:2048], gate=gate))
+        await asyncio.sleep(0.05)
+
+        # 第一个分片写入期间，另一个分片和完成请求都返回 409
+        with self.assertRaises(HTTPException) as ctx:
+            await self._append(upload_id, 0, self.data[:1024])
+        self.assertEqual(ctx.exception.status_code, 409)
+        with self.assertRaises(HTTPException) as ctx:
+            await self._complete(upload_id)
+        self.assertEqual(ctx.exception.status_code, 409)
+
+        gate.set()
+        self.assertEqual((await first).offset, 2048)
+        # 锁已释放，按新的偏移量继续上传
+        self.assertEqual((await self._append(upload_id, 2048, self.data[2048:4096])).offset, 4096)
+
+    async def test_first_chunk_magic_bytes(self):
+        upload_id = await self._init()
+        with self.assertRaises(HTTPException) as ctx:
+            await self._append(upload_id, 0, b"<html>" + b"\0" * 4090)
+        self.assertEqual(ctx.exception.status_code, 400)
+        # 伪造的字节被截断，可以从 0 重新上传
+        self.assertEqual(await self.redis.hget(upload_session_key(upload_id), "offset"), "0")
+        full_path = os.path.join(settings.media_root_parent, self.file_paths[0])
+        self.assertEqual(os.path.getsize(full_path), 0)
+        self.assertEqual((await self._append(upload_id, 0, self.data[:4096])).offset, 4096)
+
+    async def test_complete_before_done(self):
+        upload_id = await self._init()
+        await self._append(upload_id, 0, self.data[:1024])
+        with self.assertRaises(HTTPException) as ctx:
+            await self._complete(upload_id)
+        self.assertEqual(ctx.exception.status_code, 400)
+        # 会话保留，可以继续上传
+        self.assertTrue(await self.redis.exists(upload_session_key(upload_id)))
+        self.assertEqual(await self._video_count(), 0)
+
+    async def test_complete_twice(self):
+        upload_id = await self._uploaded()
+        resp = await self._complete(upload_id)
+
+        video = await self.db.get(Video, resp.data["video_id"])
+        self.assertIsNotNone(await get_storage().stat(video.file_path))
+        # 重复提交完成请求不会再创建一条视频记录，引用数不变
+        with self.assertRaises(HTTPException) as ctx:
+            await self._complete(upload_id)
+        self.assertEqual(ctx.exception.status_code, 404)
+        self.assertEqual(await self._video_count(), 1)
+        ref_count = await self.db.scalar(select(MediaBlob.ref_count).where(MediaBlob.path == video.file_path))
+        self.assertEqual(ref_count, 1)
+
+    async def test_failed_registration(self):
+        upload_id = await self._uploaded()
+        with mock.patch(
+                "app.services.video.upload_session.register_uploaded_video", side_effect=RuntimeError("db down")
+        ):
+            with self.assertRaises(RuntimeError):
+                await self._complete(upload_id)
+        # 回滚后会话中的对象已过期
+        await self.db.refresh(self.user)
+
+        # 会话已在写入视频记录之前认领，未提交的引用已回滚
+        self.assertIsNone(await self.db.scalar(select(MediaBlob.ref_count).where(MediaBlob.digest == self.sha256)))
+        with self.assertRaises(HTTPException) as ctx:
+            await self._complete(upload_id)
+        self.assertEqual(ctx.exception.status_code, 404)
+        self.assertEqual(await self._video_count(), 0)
@@ -0,0 +1,68 @@
+# test/testVideoCard.py
+import unittest
+from uuid import uuid4
+
+from sqlalchemy import delete, select
+
+import app.db.mysql as mysql_db
+from test.base import BaseTestCase, ServiceTestCase, mysql_available
+from app.crud.video.video import VIDEO_CARD_COLUMNS, VideoCard, get_video_cards_by_ids
+from app.models.mysql.user import User
+from app.models.mysql.video import Video, VideoStatusEnum
+from app.services.video.video import video_to_dict
+
+
+class TestVideoCardMapping(BaseTestCase):
+
+    async def test_slots_follow_columns(self):
+        self.assertEqual(VideoCard.__slots__, tuple(column.key for column in VIDEO_CARD_COLUMNS))
+        self.assertNotIn("description", VideoCard.__slots__)
+        card = VideoCard(range(len(VIDEO_CARD_COLUMNS)))
+        # 按列的顺序逐个赋值
+        for index, name in enumerate(VideoCard.__slots__):
+            self.assertEqual(getattr(card, name), index)
+        self.assertFalse(hasattr(card, "__dict__"))
+
+    async def test_video_to_dict_keeps_description(self):
+        card = VideoCard([None] * len(VIDEO_CARD_COLUMNS))
+        card.id, card.uploader_id, card.cover_image = 7, 3, None
+        data = video_to_dict(card, {"username": "alice", "unique_id": "u3"})
+        self.assertIn("description", data)
+        self.assertIsNone(data["description"])
+        self.assertEqual((data["id"], data["uploader_username"]), (7, "alice"))
+        self.assertIsNone(video_to_dict(card)["uploader_username"])
+
+
+@unittest.skipUnless(mysql_available(), "未连接 MySQL")
+class TestVideoCardQuery(ServiceTestCase):
+
+    async def asyncSetUp(self):
+        self.db = mysql_db.async_session()
+        tag = uuid4().hex[:12]
+        user = User(email=f"{tag}@card.test", username=f"vc_{tag}", password="x")
+        self.db.add(user)
+        await self.db.flush()
+        self.user_id = user.id
+        video = Video(
+            title="card", description="long text", file_path=f"vc_{tag}.mp4", cover_image=f"vc_{tag}.jpg",
+            uploader_id=user.id, status=VideoStatusEnum.PUBLISHED, duration=12, like_count=3, view_count=40,
+        )
+        self.db.add(video)
+        await self.db.commit()
+        self.video_id = video.id
+
+    async def asyncTearDown(self):
+        await self.db.execute(delete(Video).where(Video.uploader_id == self.user_id))
+        await self.db.execute(delete(User).where(User.id == self.user_id))
+        await self.db.commit()
+        await self.db.close()
+        await super().asyncTearDown()
+
+    async def test_matches_entity(self):
+        cards = await get_video_cards_by_ids(self.db, [self.video_id])
+        video = await self.db.scalar(select(Video).where(Video.id == self.video_id))
+        self.assertEqual(len(cards), 1)
+        for name in VideoCard.__slots__:
+            self.assertEqual(getattr(cards[0], name), getattr(video, name), name)
+        # 额外条件生效
+        self.assertEqual(await get_video_cards_by_ids(self.db, [self.video_id], Video.is_deleted == True), [])
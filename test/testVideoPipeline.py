@@ -0,0 +1,122 @@
+# test/testVideoPipeline.py
+import asyncio
+import os
+import unittest
+from uuid import uuid4
+
+import cv2
+import numpy as np
+
+from test.base import settings, mysql_available, redis_available
+from app.db.mysql import get_sync_session
+from app.models.mysql.media_blob import MediaBlob
+from app.models.mysql.user import User
+from app.models.mysql.video import Video, VideoStatusEnum
+from app.storage import create_storage
+from app.storage.blob import blob_tmp_full_path, thumbnail_relative_path, thumbnail_variant
+from app.tasks.celery_app import celery_app
+from app.tasks.video_tasks import enqueue_video_processing
+from app.utils.media.transcode import ffmpeg_available
+
+
+def _write_clip(path: str, seconds: int = 2, fps: int = 10, size: tuple[int, int] = (64, 48)):
+    """生成一段画面逐帧变化的小视频（mp4v 编码，转码阶段会重新编码为 H.264）"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, size)
+    for i in range(seconds * fps):
+        frame = np.full((size[1], size[0], 3), (i * 12) % 256, dtype=np.uint8)
+        cv2.rectangle(frame, (i * 2 % size[0], 8), (i * 2 % size[0] + 12, 20), (0, 0, 255), -1)
+        writer.write(frame)
+    writer.release()
+
+
+def _run_storage(func):
+    async def runner():
+        storage = create_storage()
+        try:
+            return await func(storage)
+        finally:
+            await storage.close()
+
+    return asyncio.run(runner())
+
+
+@unittest.skipUnless(mysql_available() and redis_available(), "未连接 MySQL / Redis")
+@unittest.skipUnless(ffmpeg_available(settings.FFMPEG_BIN), "未安装 ffmpeg")
+class TestVideoPipelineEager(unittest.TestCase):
+    """eager 模式下在当前进程跑完 probe -> transcode -> hls -> sprites -> cover -> publish"""
+
+    def setUp(self):
+        tag = uuid4().hex[:12]
+        self.source_key = os.path.join(settings.MEDIA_ROOT, "test", f"pipeline_{tag}.mp4")
+        clip_path = blob_tmp_full_path(".mp4")
+        _write_clip(clip_path)
+        _run_storage(lambda storage: storage.put_file(self.source_key, clip_path))
+
+        with get_sync_session() as session:
+            user = User(email=f"{tag}@pipeline.test", username=f"pipeline_{tag}", password="x")
+            session.add(user)
+            session.flush()
+            video = Video(
+                title="pipeline",
+                file_path=self.source_key,
+                uploader_id=user.id,
+                status=VideoStatusEnum.PROCESSING,
+                processing_progress=0,
+            )
+            session.add(video)
+            session.commit()
+            self.user_id, self.video_id = user.id, video.id
+
+    def tearDown(self):
+        with get_sync_session() as session:
+            video = session.get(Video, self.video_id)
+            files = {self.source_key, video.file_path, video.cover_image}
+            files.update(thumbnail_relative_path(video.cover_image, width, settings.THUMBNAIL_FORMAT)
+                         for width in settings.cover_thumb_widths)
+            prefixes = [os.path.dirname(p) for p in (video.hls_path, video.preview_track_path) if p]
+
+            async def cleanup(storage):
+                keys = {key for key in files if key}
+                for prefix in prefixes:
+                    keys.update([key async for key, _ in storage.list_objects(prefix)])
+                for key in keys:
+                    await storage.delete(key)
+
+            _run_storage(cleanup)
+            session.query(MediaBlob).filter(MediaBlob.path.in_([p for p in files if p])).delete(synchronize_session=False)
+            session.delete(video)
+            session.query(User).filter(User.id == self.user_id).delete()
+            session.commit()
+
+    def test_pipeline_publishes_processed_video(self):
+        eager = celery_app.conf.task_always_eager
+        celery_app.conf.task_always_eager = True
+        try:
+            self.assertTrue(enqueue_video_processing(self.video_id))
+        finally:
+            celery_app.conf.task_always_eager = eager
+
+        with get_sync_session() as session:
+            video = session.get(Video, self.video_id)
+            self.assertEqual(video.status, VideoStatusEnum.PUBLISHED, video.processing_error)
+            self.assertEqual(video.processing_progress, 100)
+            self.assertEqual((video.width, video.height), (64, 48))
+            self.assertGreater(video.duration, 0)
+            self.assertEqual(video.codec, "avc1")
+            self.assertNotEqual(video.file_path, self.source_key)
+            self.assertTrue(video.hls_path.endswith("master.m3u8"))
+            self.assertTrue(video.preview_track_path.endswith("thumbnails.vtt"))
+            self.assertIsNotNone(video.cover_image)
+
+            async def stat_all(storage):
+                keys = (video.file_path, video.hls_path, video.preview_track_path, video.cover_image)
+                return [await storage.stat(key) for key in keys]
+
+            self.assertTrue(all(_run_storage(stat_all)))
+            # 封面缩略图的档位记录在 media_blobs 上，列表据此选择缩略图
+            thumbnails = session.query(MediaBlob.thumbnails).filter(MediaBlob.path == video.cover_image).scalar()
+            self.assertEqual(
+                set(thumbnails.split(",")),
+                {thumbnail_variant(width, settings.THUMBNAIL_FORMAT) for width in settings.cover_thumb_widths},
+            )